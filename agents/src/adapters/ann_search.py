@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Friday 2.0 - Recherche ANN filtrée (pgvector HNSW)
+
+`ORDER BY embedding <=> $1 LIMIT k` + WHERE sélectif : l'index HNSW renvoie
+ef_search candidats (40 par défaut), le filtre en rejette la plupart, et la
+requête retourne moins de k lignes (ou le planner repart en scan séquentiel).
+Même sans filtre, top_k > ef_search tronque les résultats.
+
+Stratégie (une connexion, réglages de session) :
+    1. Sans filtre : hnsw.ef_search >= top_k
+    2. Avec filtre : COUNT borné des lignes éligibles (index B-tree)
+        - <= ANN_EXACT_SCAN_MAX_ROWS → scan exact (enable_indexscan = off,
+          recall 100 %, quelques ms sur un petit ensemble)
+        - sinon → HNSW itératif (hnsw.iterative_scan = strict_order,
+          ef_search élevé, max_scan_tuples borné) ; si le scan s'arrête
+          avant k résultats, repli sur le scan exact
+    3. source_type connus (PARTIAL_HNSW_SOURCE_TYPES) : prédicat en littéral
+       pour que le planner choisisse l'index partiel (migration 048)
+
+Tier de stockage de l'index (PGVECTOR_INDEX_MODE) :
+    - full    : HNSW sur vector(1024) float32 (migration 008)
+    - halfvec : HNSW sur embedding::halfvec(1024), index 2x plus petit
+    - binary  : HNSW sur binary_quantize(embedding)::bit(1024), distance de
+                Hamming, index ~32x plus petit
+    Un seul tier indexé à la fois : rebuild_hnsw_index (embedding_bulk.py)
+    crée les index du tier actif et supprime ceux des autres (migration 049).
+    La colonne reste en float32 : en mode quantifié, l'index renvoie
+    top_k x PGVECTOR_RERANK_FACTOR candidats, re-classés par distance cosinus
+    exacte sur le vecteur complet. Le scan exact ignore l'index (pleine précision).
+
+Les SET de session sont annulés par le RESET ALL d'asyncpg au retour de la
+connexion dans le pool.
+
+Usage:
+    from agents.src.adapters.ann_search import fetch_nearest
+
+    async with pool.acquire() as conn:
+        rows = await fetch_nearest(
+            conn, columns, from_where_sql, params, top_k, count_sql, count_params
+        )
+
+Date: 2026-10-16
+"""
+
+import os
+import time
+from typing import Any, Optional, Sequence
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# ef_search recherche non filtrée (défaut pgvector = 40)
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "40"))
+# ef_search recherche filtrée (plus de candidats par itération)
+HNSW_EF_SEARCH_FILTERED = int(os.getenv("HNSW_EF_SEARCH_FILTERED", "200"))
+# Tuples visités max par le scan itératif avant abandon (défaut pgvector = 20000)
+HNSW_MAX_SCAN_TUPLES = int(os.getenv("HNSW_MAX_SCAN_TUPLES", "20000"))
+# En dessous : scan exact plutôt qu'HNSW
+ANN_EXACT_SCAN_MAX_ROWS = int(os.getenv("ANN_EXACT_SCAN_MAX_ROWS", "5000"))
+
+# Dimensions de knowledge.embeddings.embedding (migration 008 : vector(1024))
+EMBEDDING_DIMENSIONS = 1024
+
+INDEX_MODES = ("full", "halfvec", "binary")
+PGVECTOR_INDEX_MODE = os.getenv("PGVECTOR_INDEX_MODE", "full")
+if PGVECTOR_INDEX_MODE not in INDEX_MODES:
+    logger.warning("pgvector_index_mode_invalid", mode=PGVECTOR_INDEX_MODE, fallback="full")
+    PGVECTOR_INDEX_MODE = "full"
+
+# Candidats index par résultat final, re-classés en pleine précision
+RERANK_FACTORS = {
+    "full": 1,
+    "halfvec": int(os.getenv("PGVECTOR_RERANK_FACTOR_HALFVEC", "2")),
+    "binary": int(os.getenv("PGVECTOR_RERANK_FACTOR_BINARY", "10")),
+}
+# Plafond pgvector de hnsw.ef_search
+HNSW_EF_SEARCH_MAX = 1000
+
+# Expression indexée et opclass HNSW par tier ($1::vector : un seul type déduit pour $1)
+_INDEX_EXPRESSIONS = {
+    "full": ("embedding", "vector_cosine_ops"),
+    "halfvec": (f"(embedding::halfvec({EMBEDDING_DIMENSIONS}))", "halfvec_cosine_ops"),
+    "binary": (f"(binary_quantize(embedding)::bit({EMBEDDING_DIMENSIONS}))", "bit_hamming_ops"),
+}
+_INDEX_DISTANCES = {
+    "full": "e.embedding <=> $1",
+    "halfvec": (
+        f"e.embedding::halfvec({EMBEDDING_DIMENSIONS}) "
+        f"<=> $1::vector::halfvec({EMBEDDING_DIMENSIONS})"
+    ),
+    "binary": (
+        f"binary_quantize(e.embedding)::bit({EMBEDDING_DIMENSIONS}) "
+        "<~> binary_quantize($1::vector)"
+    ),
+}
+_INDEX_NAMES = {
+    "full": "idx_embeddings_vector",
+    "halfvec": "idx_embeddings_vector_halfvec",
+    "binary": "idx_embeddings_vector_binary",
+}
+
+# source_type ayant un index HNSW partiel (migrations 048/049)
+PARTIAL_HNSW_SOURCE_TYPES = frozenset({"document", "email"})
+
+_HNSW_DDL = """
+    CREATE INDEX IF NOT EXISTS {name} ON knowledge.embeddings
+    USING hnsw ({expression} {opclass})
+    WITH (m = {m}, ef_construction = {ef_construction})
+    {predicate}
+    """
+
+
+def hnsw_index_ddls(
+    mode: Optional[str] = None, m: int = 16, ef_construction: int = 64
+) -> dict[str, str]:
+    """
+    DDL des index HNSW d'un tier (global + partiels par source_type).
+
+    Args:
+        mode: Tier (None = PGVECTOR_INDEX_MODE)
+        m, ef_construction: Paramètres HNSW (défaut = migration 008)
+
+    Returns:
+        {nom_index: CREATE INDEX ...}
+    """
+    expression, opclass = _INDEX_EXPRESSIONS[mode or PGVECTOR_INDEX_MODE]
+    base_name = _INDEX_NAMES[mode or PGVECTOR_INDEX_MODE]
+    predicates = {base_name: ""}
+    for source_type in sorted(PARTIAL_HNSW_SOURCE_TYPES):
+        predicates[f"{base_name}_{source_type}"] = f"WHERE source_type = '{source_type}'"
+    return {
+        name: _HNSW_DDL.format(
+            name=name,
+            expression=expression,
+            opclass=opclass,
+            m=m,
+            ef_construction=ef_construction,
+            predicate=predicate,
+        )
+        for name, predicate in predicates.items()
+    }
+
+
+def inactive_hnsw_index_names(mode: Optional[str] = None) -> list[str]:
+    """
+    Index HNSW des autres tiers que `mode` (à supprimer : un tier inactif
+    occupe sa mémoire d'index et reste maintenu à chaque INSERT).
+
+    Args:
+        mode: Tier actif (None = PGVECTOR_INDEX_MODE)
+    """
+    active = mode or PGVECTOR_INDEX_MODE
+    return [name for other in INDEX_MODES if other != active for name in hnsw_index_ddls(other)]
+
+
+def candidate_limit(top_k: int, mode: Optional[str] = None) -> int:
+    """Candidats demandés à l'index avant re-classement (borné par ef_search max)."""
+    return min(top_k * RERANK_FACTORS[mode or PGVECTOR_INDEX_MODE], HNSW_EF_SEARCH_MAX)
+
+
+def nearest_sql(
+    columns: str, from_where_sql: str, mode: Optional[str] = None, exact: bool = False
+) -> str:
+    """
+    Requête k plus proches voisins ($1 = vecteur requête, $2 = k).
+
+    Args:
+        columns: Liste SELECT (alias e = knowledge.embeddings)
+        from_where_sql: FROM ... [JOIN ...] [WHERE ...]
+        mode: Tier de l'index (None = PGVECTOR_INDEX_MODE)
+        exact: True = tri pleine précision seul (scan exact)
+
+    Returns:
+        SQL ; en mode quantifié : candidats par distance quantifiée puis
+        re-classement par distance cosinus exacte
+    """
+    mode = mode or PGVECTOR_INDEX_MODE
+    if exact or mode == "full":
+        return f"""
+            SELECT {columns}
+            {from_where_sql}
+            ORDER BY e.embedding <=> $1
+            LIMIT $2
+        """
+
+    factor = RERANK_FACTORS[mode]
+    return f"""
+        SELECT * FROM (
+            SELECT {columns}, e.embedding <=> $1 AS full_distance
+            {from_where_sql}
+            ORDER BY {_INDEX_DISTANCES[mode]}
+            LIMIT LEAST($2 * {factor}, {HNSW_EF_SEARCH_MAX})
+        ) candidates
+        ORDER BY full_distance
+        LIMIT $2
+    """
+
+
+def source_type_predicate(source_type: str, column: str = "e.source_type") -> Optional[str]:
+    """
+    Prédicat littéral pour un source_type couvert par un index partiel.
+
+    Returns:
+        "e.source_type = 'document'" ou None (source_type sans index partiel :
+        l'appelant le passe en paramètre $n)
+    """
+    if source_type not in PARTIAL_HNSW_SOURCE_TYPES:
+        return None
+    # Liste blanche : aucune valeur utilisateur interpolée
+    return f"{column} = '{source_type}'"
+
+
+async def fetch_nearest(
+    conn: Any,
+    columns: str,
+    from_where_sql: str,
+    params: Sequence[Any],
+    top_k: int,
+    count_sql: Optional[str] = None,
+    count_params: Sequence[Any] = (),
+) -> list:
+    """
+    Exécute une recherche k plus proches voisins avec le bon plan.
+
+    Args:
+        conn: Connexion asyncpg (les SET de session s'y appliquent)
+        columns: Liste SELECT (alias e = knowledge.embeddings)
+        from_where_sql: FROM ... [JOIN ...] [WHERE <filtres $3...>]
+        params: [vecteur requête, top_k, *filtres]
+        top_k: Nombre de résultats
+        count_sql: `SELECT count(*) FROM (SELECT 1 ... WHERE <filtres> LIMIT n) c`
+            (None = recherche non filtrée)
+        count_params: Paramètres de count_sql
+
+    Returns:
+        Lignes asyncpg triées par distance cosinus pleine précision
+    """
+    started = time.monotonic()
+    sql = nearest_sql(columns, from_where_sql)
+    ef_search = max(HNSW_EF_SEARCH, candidate_limit(top_k))
+
+    if count_sql is None:
+        await conn.execute(f"SET hnsw.ef_search = {ef_search}")
+        return await conn.fetch(sql, *params)
+
+    candidates = await conn.fetchval(count_sql, *count_params)
+    if candidates <= ANN_EXACT_SCAN_MAX_ROWS:
+        rows = await _fetch_exact(conn, columns, from_where_sql, params)
+        plan = "exact"
+    else:
+        await conn.execute(
+            f"SET hnsw.ef_search = {max(HNSW_EF_SEARCH_FILTERED, ef_search)}; "
+            "SET hnsw.iterative_scan = strict_order; "
+            f"SET hnsw.max_scan_tuples = {HNSW_MAX_SCAN_TUPLES}"
+        )
+        rows = await conn.fetch(sql, *params)
+        plan = "iterative"
+        if len(rows) < top_k:
+            # max_scan_tuples atteint avant k résultats éligibles
+            rows = await _fetch_exact(conn, columns, from_where_sql, params)
+            plan = "iterative_then_exact"
+
+    logger.debug(
+        "ann_filtered_search",
+        plan=plan,
+        index_mode=PGVECTOR_INDEX_MODE,
+        candidates=candidates,
+        results_count=len(rows),
+        duration_ms=int((time.monotonic() - started) * 1000),
+    )
+    return rows
+
+
+def bounded_count_sql(from_where_sql: str) -> str:
+    """COUNT des lignes éligibles, borné à ANN_EXACT_SCAN_MAX_ROWS + 1."""
+    return (
+        f"SELECT count(*) FROM (SELECT 1 {from_where_sql} "
+        f"LIMIT {ANN_EXACT_SCAN_MAX_ROWS + 1}) c"
+    )
+
+
+async def _fetch_exact(conn: Any, columns: str, from_where_sql: str, params: Sequence[Any]) -> list:
+    """Scan exact : HNSW désactivé, filtres via bitmap/seq scan puis tri pleine précision."""
+    await conn.execute("SET enable_indexscan = off")
+    try:
+        return await conn.fetch(nearest_sql(columns, from_where_sql, exact=True), *params)
+    finally:
+        await conn.execute("RESET enable_indexscan")
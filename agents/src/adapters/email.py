@@ -9,22 +9,40 @@ Architecture:
 Le consumer et le fetcher utilisent cet adaptateur. Si besoin de
 rebrancher EmailEngine ou un autre provider, changer UN fichier.
 
+Sessions IMAP : IMAPSessionPool garde des sessions authentifiees (INBOX
+selectionnee) par compte, maintenues par NOOP et reconnectees si perimees.
+Un email avec 4 PJ = 1 handshake au lieu de 5.
+
 Decision: D25 (2026-02-13) - EmailEngine retire, IMAP direct
 Libs: aioimaplib 2.0.1, aiosmtplib
 Date: 2026-02-13
 Version: 1.0.0
 """
 
+import asyncio
 import email
 import os
+import ssl
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from contextlib import suppress
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
 
 import structlog
 from pydantic import BaseModel, Field
 
 logger = structlog.get_logger(__name__)
 
+T = TypeVar("T")
+
+# Pool de sessions IMAP (par compte)
+IMAP_POOL_MAX_SESSIONS = int(os.getenv("IMAP_POOL_MAX_SESSIONS", "2"))
+IMAP_POOL_KEEPALIVE_SECONDS = float(os.getenv("IMAP_POOL_KEEPALIVE_SECONDS", "60"))
+IMAP_POOL_MAX_IDLE_SECONDS = float(os.getenv("IMAP_POOL_MAX_IDLE_SECONDS", "600"))
+IMAP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("IMAP_CONNECT_TIMEOUT_SECONDS", "30"))
+
 
 # ============================================================================
 # Models
@@ -92,6 +110,100 @@ class SMTPSendError(EmailAdapterError):
     """Erreur envoi SMTP"""
 
 
+# ============================================================================
+# Parsing RFC822
+# ============================================================================
+
+
+def parse_email_message(account_id: str, message_id: str, raw_bytes: bytes) -> EmailMessage:
+    """
+    Parse un email brut (RFC822) en EmailMessage.
+
+    Utilise par IMAPDirectAdapter.get_message() et par le consumer quand
+    le fetcher lui transmet directement les bytes (handoff, sans 2e fetch IMAP).
+
+    Args:
+        account_id: ID compte IMAP source
+        message_id: UID IMAP
+        raw_bytes: Contenu BODY[] complet
+
+    Returns:
+        EmailMessage avec body, headers, metadata PJ
+    """
+    msg = email.message_from_bytes(raw_bytes)
+
+    # Extraire body
+    body_text = ""
+    body_html = ""
+    attachments = []
+
+    if msg.is_multipart():
+        for part in msg.walk():
+            content_type = part.get_content_type()
+            content_disposition = str(part.get("Content-Disposition", ""))
+
+            if "attachment" in content_disposition:
+                attachments.append(
+                    {
+                        "filename": part.get_filename() or "unnamed",
+                        "content_type": content_type,
+                        "size": len(part.get_payload(decode=True) or b""),
+                        "part_id": part.get("X-Attachment-Id", ""),
+                    }
+                )
+            elif content_type == "text/plain":
+                payload = part.get_payload(decode=True)
+                if payload:
+                    body_text = payload.decode(
+                        part.get_content_charset() or "utf-8", errors="replace"
+                    )
+            elif content_type == "text/html":
+                payload = part.get_payload(decode=True)
+                if payload:
+                    body_html = payload.decode(
+                        part.get_content_charset() or "utf-8", errors="replace"
+                    )
+    else:
+        payload = msg.get_payload(decode=True)
+        if payload:
+            text = payload.decode(msg.get_content_charset() or "utf-8", errors="replace")
+            if msg.get_content_type() == "text/html":
+                body_html = text
+            else:
+                body_text = text
+
+    # Extraire from
+    from_header = msg.get("From", "")
+    from_name = ""
+    from_address = from_header
+    if "<" in from_header and ">" in from_header:
+        from_name = from_header.split("<")[0].strip().strip('"')
+        from_address = from_header.split("<")[1].split(">")[0]
+
+    # Extraire to
+    to_header = msg.get("To", "")
+    to_addresses = [addr.strip() for addr in to_header.split(",") if addr.strip()]
+
+    return EmailMessage(
+        message_id=message_id,
+        account_id=account_id,
+        from_address=from_address,
+        from_name=from_name,
+        to_addresses=to_addresses,
+        subject=msg.get("Subject", ""),
+        body_text=body_text,
+        body_html=body_html,
+        date=msg.get("Date", ""),
+        has_attachments=len(attachments) > 0,
+        attachments=attachments,
+        raw_headers={
+            "message-id": msg.get("Message-ID", ""),
+            "in-reply-to": msg.get("In-Reply-To", ""),
+            "references": msg.get("References", ""),
+        },
+    )
+
+
 # ============================================================================
 # Interface abstraite
 # ============================================================================
@@ -182,6 +294,184 @@ class EmailAdapter(ABC):
         """
         raise NotImplementedError
 
+    async def close(self) -> None:
+        """Libere les ressources du provider (sessions, sockets). No-op par defaut."""
+
+
+# ============================================================================
+# Pool de sessions IMAP
+# ============================================================================
+
+
+@dataclass
+class _PooledSession:
+    """Session IMAP authentifiee, INBOX selectionnee."""
+
+    account_id: str
+    client: Any
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    reused: bool = False
+
+
+class IMAPSessionPool:
+    """
+    Pool de sessions IMAP persistantes par compte.
+
+    - Sessions idle reutilisees (LIFO) : pas de TLS + LOGIN + SELECT par fetch
+    - Plafond de sessions simultanees par compte (Gmail/Zimbra limitent les logins)
+    - Health check NOOP si la session a dormi plus de keepalive_interval
+    - Keepalive en tache de fond, fermeture des sessions idle > max_idle
+    - Session en erreur jetee ; si elle etait reutilisee, retry une fois sur une neuve
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[str], Awaitable[Any]],
+        max_sessions_per_account: int = IMAP_POOL_MAX_SESSIONS,
+        keepalive_interval: float = IMAP_POOL_KEEPALIVE_SECONDS,
+        max_idle: float = IMAP_POOL_MAX_IDLE_SECONDS,
+    ):
+        """
+        Args:
+            connect: Coroutine (account_id) -> client IMAP loggue, INBOX selectionnee
+            max_sessions_per_account: Sessions simultanees max par compte
+            keepalive_interval: Delai (s) d'inactivite avant NOOP de controle
+            max_idle: Delai (s) d'inactivite avant fermeture de la session
+        """
+        self._connect = connect
+        self._max_sessions = max(1, max_sessions_per_account)
+        self._keepalive_interval = keepalive_interval
+        self._max_idle = max_idle
+        self._idle: Dict[str, List[_PooledSession]] = {}
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def idle_count(self, account_id: str) -> int:
+        """Nombre de sessions idle pour un compte."""
+        return len(self._idle.get(account_id, []))
+
+    async def run(self, account_id: str, operation: Callable[[Any], Awaitable[T]]) -> T:
+        """
+        Execute une operation IMAP sur une session du pool.
+
+        Args:
+            account_id: ID compte IMAP
+            operation: Coroutine recevant le client IMAP
+
+        Returns:
+            Resultat de l'operation
+
+        Raises:
+            Exception: Erreur de l'operation (apres retry si session perimee)
+        """
+        limit = self._limits.setdefault(account_id, asyncio.Semaphore(self._max_sessions))
+        self._ensure_keepalive()
+
+        async with limit:
+            for attempt in range(2):
+                session = await self._checkout(account_id)
+                try:
+                    result = await operation(session.client)
+                except Exception as e:
+                    await self._discard(session)
+                    if attempt == 0 and session.reused:
+                        logger.info(
+                            "imap_session_stale_reconnecting",
+                            account_id=account_id,
+                            error=str(e),
+                        )
+                        continue
+                    raise
+                session.last_used = time.monotonic()
+                session.reused = True
+                idle = self._idle.setdefault(account_id, [])
+                if len(idle) < self._max_sessions:
+                    idle.append(session)
+                else:
+                    await self._discard(session)
+                return result
+
+        raise EmailAdapterError(f"IMAP session unavailable for {account_id}")  # pragma: no cover
+
+    async def _checkout(self, account_id: str) -> _PooledSession:
+        """Recupere une session idle saine, ou en ouvre une nouvelle."""
+        idle = self._idle.setdefault(account_id, [])
+        while idle:
+            session = idle.pop()
+            idle_for = time.monotonic() - session.last_used
+            if idle_for > self._max_idle:
+                await self._discard(session)
+                continue
+            if idle_for > self._keepalive_interval and not await self._is_healthy(session):
+                await self._discard(session)
+                continue
+            return session
+
+        client = await self._connect(account_id)
+        logger.debug("imap_session_opened", account_id=account_id)
+        return _PooledSession(account_id=account_id, client=client)
+
+    async def _is_healthy(self, session: _PooledSession) -> bool:
+        """NOOP de controle : session vivante et toujours en etat SELECTED."""
+        try:
+            response = await asyncio.wait_for(session.client.noop(), timeout=10)
+            healthy = getattr(response, "result", "OK") == "OK"
+            if hasattr(session.client, "get_state"):
+                healthy = healthy and session.client.get_state() == "SELECTED"
+        except Exception as e:
+            logger.debug("imap_session_unhealthy", account_id=session.account_id, error=str(e))
+            return False
+        if healthy:
+            session.last_used = time.monotonic()
+        return healthy
+
+    async def _discard(self, session: _PooledSession) -> None:
+        """Ferme une session sans propager d'erreur."""
+        with suppress(Exception):
+            await asyncio.wait_for(session.client.logout(), timeout=5)
+
+    def _ensure_keepalive(self) -> None:
+        """Demarre la tache de keepalive au premier usage (necessite une loop active)."""
+        if self._closed or self._keepalive_interval <= 0:
+            return
+        if self._keepalive_task and not self._keepalive_task.done():
+            return
+        self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+
+    async def _keepalive_loop(self) -> None:
+        """NOOP periodique sur les sessions idle, fermeture au-dela de max_idle."""
+        while not self._closed:
+            await asyncio.sleep(self._keepalive_interval)
+            now = time.monotonic()
+            for account_id, idle in list(self._idle.items()):
+                keep = []
+                # Sessions retirees pendant le controle : pas de checkout concurrent
+                self._idle[account_id] = []
+                for session in idle:
+                    if now - session.last_used > self._max_idle:
+                        await self._discard(session)
+                    elif now - session.last_used < self._keepalive_interval:
+                        keep.append(session)
+                    elif await self._is_healthy(session):
+                        keep.append(session)
+                    else:
+                        await self._discard(session)
+                self._idle[account_id].extend(keep)
+
+    async def close(self) -> None:
+        """Arrete le keepalive et ferme toutes les sessions (LOGOUT)."""
+        self._closed = True
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+            with suppress(asyncio.CancelledError, Exception):
+                await self._keepalive_task
+        for idle in self._idle.values():
+            for session in idle:
+                await self._discard(session)
+        self._idle.clear()
+
 
 # ============================================================================
 # Implementation IMAP Direct (D25)
@@ -199,6 +489,9 @@ class IMAPDirectAdapter(EmailAdapter):
     Le fetcher IMAP (imap_fetcher.py) gere la detection de nouveaux
     mails et publie dans Redis Streams. L'adapter est pour les
     operations on-demand (fetch message complet, download PJ, send).
+
+    Les fetch passent par un IMAPSessionPool : une session par compte est
+    gardee ouverte entre deux appels (voir IMAP_POOL_* env vars).
     """
 
     def __init__(self, accounts_config: Optional[Dict[str, Dict]] = None):
@@ -220,7 +513,7 @@ class IMAPDirectAdapter(EmailAdapter):
                 }
         """
         self._accounts = accounts_config or self._load_accounts_from_env()
-        self._imap_connections: Dict[str, Any] = {}
+        self._pool = IMAPSessionPool(connect=self._open_session)
 
     def _load_accounts_from_env(self) -> Dict[str, Dict]:
         """Charge config comptes depuis variables d'environnement."""
@@ -249,50 +542,66 @@ class IMAPDirectAdapter(EmailAdapter):
 
         return accounts
 
-    async def get_message(self, account_id: str, message_id: str) -> EmailMessage:
-        """Fetch email complet via IMAP FETCH."""
-        try:
-            import ssl
-            from pathlib import Path
-
-            import aioimaplib
+    def _build_ssl_context(self, account_id: str) -> Optional[ssl.SSLContext]:
+        """Contexte SSL personnalise pour ProtonMail Bridge (comme fetcher)."""
+        if "protonmail" not in account_id.lower():
+            return None
+
+        ssl_context = ssl.create_default_context()
+        cert_path = Path("/app/config/certs/protonmail_bridge.pem")
+        if cert_path.exists():
+            ssl_context.load_verify_locations(cafile=str(cert_path))
+            # Désactiver vérification hostname (certificat 127.0.0.1 vs Tailscale IP)
+            ssl_context.check_hostname = False
+            logger.info(
+                "ssl_cert_loaded",
+                account_id=account_id,
+                cert_path=str(cert_path),
+            )
+        else:
+            logger.warning(
+                "ssl_cert_missing",
+                account_id=account_id,
+                cert_path=str(cert_path),
+            )
+        return ssl_context
 
-            account = self._get_account(account_id)
+    async def _open_session(self, account_id: str) -> Any:
+        """Ouvre une session IMAP : TLS + LOGIN + SELECT INBOX."""
+        import aioimaplib
 
-            # Créer contexte SSL personnalisé pour ProtonMail Bridge (comme fetcher)
-            ssl_context = None
-            if "protonmail" in account_id.lower():
-                ssl_context = ssl.create_default_context()
-                cert_path = Path("/app/config/certs/protonmail_bridge.pem")
-                if cert_path.exists():
-                    ssl_context.load_verify_locations(cafile=str(cert_path))
-                    # Désactiver vérification hostname (certificat 127.0.0.1 vs Tailscale IP)
-                    ssl_context.check_hostname = False
-                    logger.info(
-                        "ssl_cert_loaded",
-                        account_id=account_id,
-                        cert_path=str(cert_path),
-                    )
-                else:
-                    logger.warning(
-                        "ssl_cert_missing",
-                        account_id=account_id,
-                        cert_path=str(cert_path),
-                    )
+        account = self._get_account(account_id)
 
-            imap = aioimaplib.IMAP4_SSL(
-                host=account["imap_host"],
-                port=account["imap_port"],
-                ssl_context=ssl_context,
+        imap = aioimaplib.IMAP4_SSL(
+            host=account["imap_host"],
+            port=account["imap_port"],
+            ssl_context=self._build_ssl_context(account_id),
+        )
+        try:
+            await asyncio.wait_for(
+                imap.wait_hello_from_server(), timeout=IMAP_CONNECT_TIMEOUT_SECONDS
             )
-            await imap.wait_hello_from_server()
-            await imap.login(account["imap_user"], account["imap_password"])
+            response = await imap.login(account["imap_user"], account["imap_password"])
+            if getattr(response, "result", "OK") != "OK":
+                raise IMAPConnectionError(f"IMAP login failed for {account_id}")
             # SELECT pour ouvrir INBOX (état SELECTED requis pour UID FETCH)
             # BODY.PEEK[] garantit que \Seen n'est PAS posé (RFC 3501)
             await imap.select("INBOX")
+        except Exception:
+            with suppress(Exception):
+                await imap.logout()
+            raise
+        return imap
+
+    async def get_message(self, account_id: str, message_id: str) -> EmailMessage:
+        """Fetch email complet via IMAP FETCH (session poolee)."""
+        try:
+            self._get_account(account_id)
 
             # Fetch par UID avec BODY.PEEK[] (ne marque PAS \Seen)
-            status, data = await imap.uid("fetch", message_id, "(BODY.PEEK[])")
+            status, data = await self._pool.run(
+                account_id, lambda imap: imap.uid("fetch", message_id, "(BODY.PEEK[])")
+            )
 
             if status != "OK" or not data:
                 raise EmailAdapterError(
@@ -357,81 +666,7 @@ class IMAPDirectAdapter(EmailAdapter):
                         f"No email content found in IMAP response for {account_id}/{message_id}"
                     )
 
-            msg = email.message_from_bytes(raw_bytes)
-
-            # Extraire body
-            body_text = ""
-            body_html = ""
-            attachments = []
-
-            if msg.is_multipart():
-                for part in msg.walk():
-                    content_type = part.get_content_type()
-                    content_disposition = str(part.get("Content-Disposition", ""))
-
-                    if "attachment" in content_disposition:
-                        attachments.append(
-                            {
-                                "filename": part.get_filename() or "unnamed",
-                                "content_type": content_type,
-                                "size": len(part.get_payload(decode=True) or b""),
-                                "part_id": part.get("X-Attachment-Id", ""),
-                            }
-                        )
-                    elif content_type == "text/plain":
-                        payload = part.get_payload(decode=True)
-                        if payload:
-                            body_text = payload.decode(
-                                part.get_content_charset() or "utf-8", errors="replace"
-                            )
-                    elif content_type == "text/html":
-                        payload = part.get_payload(decode=True)
-                        if payload:
-                            body_html = payload.decode(
-                                part.get_content_charset() or "utf-8", errors="replace"
-                            )
-            else:
-                payload = msg.get_payload(decode=True)
-                if payload:
-                    text = payload.decode(msg.get_content_charset() or "utf-8", errors="replace")
-                    if msg.get_content_type() == "text/html":
-                        body_html = text
-                    else:
-                        body_text = text
-
-            # Extraire from
-            from_header = msg.get("From", "")
-            from_name = ""
-            from_address = from_header
-            if "<" in from_header and ">" in from_header:
-                from_name = from_header.split("<")[0].strip().strip('"')
-                from_address = from_header.split("<")[1].split(">")[0]
-
-            # Extraire to
-            to_header = msg.get("To", "")
-            to_addresses = [addr.strip() for addr in to_header.split(",") if addr.strip()]
-
-            result = EmailMessage(
-                message_id=message_id,
-                account_id=account_id,
-                from_address=from_address,
-                from_name=from_name,
-                to_addresses=to_addresses,
-                subject=msg.get("Subject", ""),
-                body_text=body_text,
-                body_html=body_html,
-                date=msg.get("Date", ""),
-                has_attachments=len(attachments) > 0,
-                attachments=attachments,
-                raw_headers={
-                    "message-id": msg.get("Message-ID", ""),
-                    "in-reply-to": msg.get("In-Reply-To", ""),
-                    "references": msg.get("References", ""),
-                },
-            )
-
-            await imap.logout()
-            return result
+            return parse_email_message(account_id, message_id, raw_bytes)
 
         except ImportError:
             raise EmailAdapterError("aioimaplib not installed. Run: pip install aioimaplib>=2.0.1")
@@ -447,23 +682,15 @@ class IMAPDirectAdapter(EmailAdapter):
             raise EmailAdapterError(f"IMAP get_message failed: {e}") from e
 
     async def download_attachment(self, account_id: str, message_id: str, part_id: str) -> bytes:
-        """Download piece jointe via IMAP FETCH BODY[part_id]."""
+        """Download piece jointe via IMAP FETCH BODY[part_id] (session poolee)."""
         try:
-            import aioimaplib
-
-            account = self._get_account(account_id)
-
-            imap = aioimaplib.IMAP4_SSL(
-                host=account["imap_host"],
-                port=account["imap_port"],
-            )
-            await imap.wait_hello_from_server()
-            await imap.login(account["imap_user"], account["imap_password"])
-            # SELECT INBOX (BODY.PEEK[] empêche le marquage \Seen)
-            await imap.select("INBOX")
+            self._get_account(account_id)
 
             # Fetch la partie specifique (PEEK = ne marque PAS \Seen)
-            status, data = await imap.uid("fetch", message_id, f"(BODY.PEEK[{part_id}])")
+            status, data = await self._pool.run(
+                account_id,
+                lambda imap: imap.uid("fetch", message_id, f"(BODY.PEEK[{part_id}])"),
+            )
 
             if status != "OK" or not data:
                 raise EmailAdapterError(f"IMAP attachment fetch failed: {status}")
@@ -493,7 +720,6 @@ class IMAPDirectAdapter(EmailAdapter):
             if not raw_bytes:
                 raise EmailAdapterError(f"No attachment content in IMAP response")
 
-            await imap.logout()
             return raw_bytes
 
         except ImportError:
@@ -589,6 +815,10 @@ class IMAPDirectAdapter(EmailAdapter):
 
         return results
 
+    async def close(self) -> None:
+        """Ferme les sessions IMAP du pool (LOGOUT)."""
+        await self._pool.close()
+
     def _get_account(self, account_id: str) -> Dict:
         """Recupere config d'un compte par ID."""
         if account_id not in self._accounts:
@@ -0,0 +1,275 @@
+"""
+Friday 2.0 - Handoff RFC822 entre imap-fetcher et email-processor
+
+Le fetcher telecharge deja BODY.PEEK[] complet pour construire l'evenement
+emails:received. Plutot que de laisser le consumer re-telecharger le meme
+message via IMAP, le fetcher depose les bytes bruts UNE fois :
+
+    - backend "redis" : blob chiffre, cle email_raw:{account_id}:{uid}, TTL court
+    - backend "spool" : fichier chiffre dans un repertoire partage (volume Docker)
+
+L'evenement Redis Streams porte alors un champ raw_ref. Le consumer lit le
+blob, le supprime apres traitement, et retombe sur le fetch IMAP si le blob
+a expire ou est absent (mode degrade identique a avant).
+
+Securite (RGPD) :
+    - AES-256-GCM, cle derivee de EMAIL_HANDOFF_KEY (jamais de clair sur disque/Redis)
+    - raw_ref passe en donnee associee : un blob ne peut pas etre rejoue sous un autre ref
+    - Pas de cle configuree = handoff desactive (jamais de fallback en clair)
+
+Config (env):
+    EMAIL_RAW_HANDOFF=off|redis|spool (defaut: off)
+    EMAIL_HANDOFF_KEY=secret partage fetcher/consumer
+    EMAIL_HANDOFF_TTL_SECONDS=86400
+    EMAIL_HANDOFF_MAX_BYTES=10485760 (au-dela : fetch IMAP classique cote consumer)
+    EMAIL_HANDOFF_SPOOL_DIR=/var/friday/email-spool
+"""
+
+import asyncio
+import base64
+import hashlib
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+HANDOFF_MODE = os.getenv("EMAIL_RAW_HANDOFF", "off").lower()
+HANDOFF_TTL_SECONDS = int(os.getenv("EMAIL_HANDOFF_TTL_SECONDS", "86400"))
+HANDOFF_MAX_BYTES = int(os.getenv("EMAIL_HANDOFF_MAX_BYTES", str(10 * 1024 * 1024)))
+HANDOFF_SPOOL_DIR = os.getenv("EMAIL_HANDOFF_SPOOL_DIR", "/var/friday/email-spool")
+
+REDIS_KEY_PREFIX = "email_raw"
+_NONCE_SIZE = 12
+_SAFE_COMPONENT = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class EmailHandoffError(Exception):
+    """Erreur handoff RFC822 (chiffrement, stockage)"""
+
+
+class RawEmailHandoff:
+    """
+    Depot chiffre a courte duree de vie des emails bruts (RFC822).
+
+    Usage fetcher:
+        ref = await handoff.store(account_id, uid, raw_bytes)  # None si trop gros
+        event["raw_ref"] = ref
+
+    Usage consumer:
+        raw = await handoff.load(ref)  # None si expire/absent
+        ...
+        await handoff.discard(ref)
+    """
+
+    def __init__(
+        self,
+        key: str,
+        backend: str = "redis",
+        redis_client: Optional[Any] = None,
+        spool_dir: str = HANDOFF_SPOOL_DIR,
+        ttl_seconds: int = HANDOFF_TTL_SECONDS,
+        max_bytes: int = HANDOFF_MAX_BYTES,
+    ):
+        """
+        Args:
+            key: Secret partage (EMAIL_HANDOFF_KEY), derive en cle AES-256
+            backend: "redis" ou "spool"
+            redis_client: Client redis.asyncio (requis pour backend redis)
+            spool_dir: Repertoire partage (backend spool)
+            ttl_seconds: Duree de vie d'un blob
+            max_bytes: Taille max d'un email depose
+
+        Raises:
+            ValueError: Si cle absente, backend inconnu ou redis_client manquant
+        """
+        if not key:
+            raise ValueError("EMAIL_HANDOFF_KEY manquante")
+        if backend not in ("redis", "spool"):
+            raise ValueError(f"Backend handoff inconnu: {backend}")
+        if backend == "redis" and redis_client is None:
+            raise ValueError("redis_client requis pour backend redis")
+
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+        self._aead = AESGCM(hashlib.sha256(key.encode("utf-8")).digest())
+        self.backend = backend
+        self._redis = redis_client
+        self._spool_dir = Path(spool_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def make_ref(account_id: str, uid: str) -> str:
+        """Reference stable d'un email (sert aussi de donnee associee AEAD)."""
+        return f"{_SAFE_COMPONENT.sub('_', account_id)}:{_SAFE_COMPONENT.sub('_', uid)}"
+
+    async def store(self, account_id: str, uid: str, raw: bytes) -> Optional[str]:
+        """
+        Depose un email brut chiffre.
+
+        Returns:
+            raw_ref a publier dans l'evenement, ou None si email trop gros
+        """
+        if len(raw) > self.max_bytes:
+            logger.info(
+                "email_handoff_skipped_too_large",
+                account_id=account_id,
+                uid=uid,
+                size_bytes=len(raw),
+                max_bytes=self.max_bytes,
+            )
+            return None
+
+        ref = self.make_ref(account_id, uid)
+        blob = self._encrypt(ref, raw)
+
+        if self.backend == "redis":
+            await self._redis.set(
+                f"{REDIS_KEY_PREFIX}:{ref}",
+                base64.b64encode(blob).decode("ascii"),
+                ex=self.ttl_seconds,
+            )
+        else:
+            await asyncio.to_thread(self._write_spool, ref, blob)
+
+        logger.debug("email_handoff_stored", ref=ref, backend=self.backend, size=len(raw))
+        return ref
+
+    async def load(self, ref: str) -> Optional[bytes]:
+        """
+        Relit un email depose.
+
+        Returns:
+            Bytes RFC822, ou None si absent/expire/illisible
+        """
+        try:
+            if self.backend == "redis":
+                encoded = await self._redis.get(f"{REDIS_KEY_PREFIX}:{ref}")
+                if encoded is None:
+                    return None
+                if isinstance(encoded, str):
+                    encoded = encoded.encode("ascii")
+                blob = base64.b64decode(encoded)
+            else:
+                blob = await asyncio.to_thread(self._read_spool, ref)
+                if blob is None:
+                    return None
+
+            return self._decrypt(ref, blob)
+
+        except Exception as e:
+            logger.warning("email_handoff_load_failed", ref=ref, error=str(e))
+            return None
+
+    async def discard(self, ref: str) -> None:
+        """Supprime un blob (apres traitement). Ne leve jamais."""
+        try:
+            if self.backend == "redis":
+                await self._redis.delete(f"{REDIS_KEY_PREFIX}:{ref}")
+            else:
+                await asyncio.to_thread(self._spool_path(ref).unlink, missing_ok=True)
+        except Exception as e:
+            logger.warning("email_handoff_discard_failed", ref=ref, error=str(e))
+
+    async def purge_expired(self) -> int:
+        """
+        Supprime les fichiers spool expires (Redis gere le TTL nativement).
+
+        Returns:
+            Nombre de fichiers supprimes
+        """
+        if self.backend != "spool":
+            return 0
+        return await asyncio.to_thread(self._purge_spool)
+
+    # ------------------------------------------------------------------
+    # Chiffrement
+    # ------------------------------------------------------------------
+
+    def _encrypt(self, ref: str, raw: bytes) -> bytes:
+        nonce = os.urandom(_NONCE_SIZE)
+        return nonce + self._aead.encrypt(nonce, raw, ref.encode("utf-8"))
+
+    def _decrypt(self, ref: str, blob: bytes) -> bytes:
+        if len(blob) <= _NONCE_SIZE:
+            raise EmailHandoffError(f"Blob handoff tronque pour {ref}")
+        nonce, ciphertext = blob[:_NONCE_SIZE], blob[_NONCE_SIZE:]
+        return self._aead.decrypt(nonce, ciphertext, ref.encode("utf-8"))
+
+    # ------------------------------------------------------------------
+    # Backend spool (appele dans un thread)
+    # ------------------------------------------------------------------
+
+    def _spool_path(self, ref: str) -> Path:
+        return self._spool_dir / f"{ref.replace(':', '__')}.eml.enc"
+
+    def _write_spool(self, ref: str, blob: bytes) -> None:
+        self._spool_dir.mkdir(parents=True, exist_ok=True)
+        path = self._spool_path(ref)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(blob)
+        os.replace(tmp_path, path)  # Ecriture atomique
+
+    def _read_spool(self, ref: str) -> Optional[bytes]:
+        path = self._spool_path(ref)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _purge_spool(self) -> int:
+        if not self._spool_dir.exists():
+            return 0
+        cutoff = time.time() - self.ttl_seconds
+        purged = 0
+        for path in self._spool_dir.glob("*.eml.enc"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink(missing_ok=True)
+                    purged += 1
+            except FileNotFoundError:
+                continue
+        if purged:
+            logger.info("email_handoff_spool_purged", count=purged)
+        return purged
+
+
+def get_raw_email_handoff(
+    redis_client: Optional[Any] = None, mode: Optional[str] = None
+) -> Optional[RawEmailHandoff]:
+    """
+    Factory : handoff configure depuis l'environnement.
+
+    Args:
+        redis_client: Client redis.asyncio (backend redis)
+        mode: Override EMAIL_RAW_HANDOFF ("off", "redis", "spool")
+
+    Returns:
+        RawEmailHandoff, ou None si desactive / mal configure
+    """
+    mode = (mode or HANDOFF_MODE).lower()
+    if mode in ("", "off", "false", "0"):
+        return None
+
+    key = os.getenv("EMAIL_HANDOFF_KEY", "")
+    if not key:
+        logger.error("email_handoff_disabled_missing_key", mode=mode)
+        return None
+
+    try:
+        return RawEmailHandoff(key=key, backend=mode, redis_client=redis_client)
+    except (ValueError, ImportError) as e:
+        logger.error("email_handoff_disabled", mode=mode, error=str(e))
+        return None
@@ -91,6 +91,16 @@ class VoyageEmbeddingAdapter(EmbeddingAdapter):
         self.voyage_adapter = VoyageAIAdapter(api_key=self.api_key)
         logger.info("VoyageEmbeddingAdapter initialized", model="voyage-4-large")
 
+    @property
+    def model(self) -> str:
+        """Modèle Voyage effectivement appelé"""
+        return self.voyage_adapter.model
+
+    @property
+    def dimensions(self) -> int:
+        """Dimensions des vecteurs retournés"""
+        return self.voyage_adapter.dimensions
+
     async def embed(
         self,
         texts: list[str],
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Friday 2.0 - Ingestion bulk des embeddings (knowledge.embeddings)
+
+Un INSERT par vecteur = un aller-retour réseau + un parse texte de 1024 floats.
+Sur un backfill de 100k chunks, c'est des heures. Ici :
+
+    1. COPY binaire (asyncpg copy_records_to_table) dans une table temporaire,
+       vecteur encodé en float4[] binaire (pas de sérialisation texte '[x,y,...]')
+    2. Un seul INSERT ... SELECT embedding::vector ... ON CONFLICT
+       (source_type, source_id, chunk_index) DO UPDATE par batch (migration 044)
+    3. Option rebuild_index : DROP des index HNSW (tous tiers) avant
+       chargement puis CREATE INDEX du tier actif en fin de backfill (build
+       unique bien plus rapide que 100k insertions incrémentales dans le
+       graphe HNSW)
+
+Bascule de tier (PGVECTOR_INDEX_MODE, migration 049) : rebuild_hnsw_index()
+crée les index du tier actif et supprime ceux des autres tiers.
+
+Usage:
+    from agents.src.adapters.embedding_bulk import EmbeddingRecord, bulk_upsert_embeddings
+
+    records = [
+        EmbeddingRecord(source_type="document", source_id=doc_id, chunk_index=i,
+                        total_chunks=n, embedding=vector, content_hash=h, model=model)
+        for i, (vector, h) in enumerate(...)
+    ]
+    await bulk_upsert_embeddings(db_pool, records)
+    await bulk_upsert_embeddings(db_pool, records, rebuild_index=True)  # gros backfill
+
+Date: 2026-10-16
+"""
+
+import json
+import os
+import time
+from typing import Any, Optional, Sequence
+from uuid import UUID
+
+import asyncpg
+import structlog
+from agents.src.adapters.ann_search import hnsw_index_ddls, inactive_hnsw_index_names
+from pydantic import BaseModel, Field
+
+logger = structlog.get_logger(__name__)
+
+EMBEDDING_BULK_BATCH_SIZE = int(os.getenv("EMBEDDING_BULK_BATCH_SIZE", "5000"))
+# maintenance_work_mem pour le rebuild HNSW (migration 038 recommande 2GB)
+EMBEDDING_BULK_MAINTENANCE_WORK_MEM = os.getenv("EMBEDDING_BULK_MAINTENANCE_WORK_MEM", "1GB")
+
+# Index HNSW du tier configuré (PGVECTOR_INDEX_MODE) : global + partiels par
+# source_type (migrations 008/048/049, m=16, ef_construction=64)
+HNSW_INDEX_DDLS = hnsw_index_ddls()
+HNSW_INDEX_NAME = next(iter(HNSW_INDEX_DDLS))
+
+_STAGING_TABLE = "embeddings_bulk_staging"
+_STAGING_COLUMNS = (
+    "seq",
+    "source_type",
+    "source_id",
+    "chunk_index",
+    "total_chunks",
+    "embedding",
+    "metadata",
+    "content_hash",
+    "model",
+    "dimensions",
+)
+
+
+class EmbeddingRecord(BaseModel):
+    """Une ligne knowledge.embeddings à upserter"""
+
+    source_type: str = Field(..., description="email, document, person, ...")
+    source_id: UUID = Field(..., description="UUID de la source (nœud, document)")
+    chunk_index: int = Field(0, ge=0, description="Index du chunk dans la source")
+    total_chunks: int = Field(1, ge=1, description="Nombre total de chunks")
+    embedding: list[float] = Field(..., description="Vecteur embedding")
+    metadata: dict[str, Any] = Field(default_factory=dict, description="Métadonnées JSONB")
+    content_hash: Optional[str] = Field(None, description="SHA-256 texte anonymisé")
+    model: Optional[str] = Field(None, description="Modèle embeddings")
+
+
+async def bulk_upsert_embeddings(
+    db: Any,
+    records: Sequence[EmbeddingRecord],
+    batch_size: int = EMBEDDING_BULK_BATCH_SIZE,
+    rebuild_index: bool = False,
+) -> int:
+    """
+    Upsert bulk dans knowledge.embeddings (COPY binaire + INSERT ... ON CONFLICT).
+
+    Args:
+        db: Pool asyncpg ou connexion
+        records: Lignes à écrire (doublons de clé : la dernière l'emporte)
+        batch_size: Lignes par COPY / transaction
+        rebuild_index: True = DROP index HNSW, chargement, CREATE INDEX
+            (réservé aux gros backfills : la recherche sémantique est dégradée
+            en scan séquentiel pendant le chargement)
+
+    Returns:
+        Nombre de lignes insérées ou mises à jour
+    """
+    if not records:
+        return 0
+
+    if isinstance(db, asyncpg.Connection):
+        return await _bulk_upsert(db, records, batch_size, rebuild_index)
+
+    async with db.acquire() as conn:
+        return await _bulk_upsert(conn, records, batch_size, rebuild_index)
+
+
+async def _bulk_upsert(
+    conn: asyncpg.Connection,
+    records: Sequence[EmbeddingRecord],
+    batch_size: int,
+    rebuild_index: bool,
+) -> int:
+    started = time.monotonic()
+
+    if rebuild_index:
+        # Tous tiers : un index inactif ne doit pas être maintenu pendant le chargement
+        for index_name in [*HNSW_INDEX_DDLS, *inactive_hnsw_index_names()]:
+            await conn.execute(f"DROP INDEX IF EXISTS knowledge.{index_name}")
+        logger.info("embedding_bulk_hnsw_dropped", rows=len(records))
+
+    written = 0
+    try:
+        for start in range(0, len(records), batch_size):
+            batch = records[start : start + batch_size]
+            async with conn.transaction():
+                written += await _upsert_batch(conn, batch, seq_offset=start)
+            logger.info(
+                "embedding_bulk_batch_written",
+                rows=written,
+                total=len(records),
+            )
+    finally:
+        # Index recréé même si le chargement échoue (jamais de table sans HNSW)
+        if rebuild_index:
+            await rebuild_hnsw_index(conn)
+
+    logger.info(
+        "embedding_bulk_upsert_completed",
+        rows=written,
+        rebuild_index=rebuild_index,
+        duration_ms=int((time.monotonic() - started) * 1000),
+    )
+    return written
+
+
+async def _upsert_batch(
+    conn: asyncpg.Connection, batch: Sequence[EmbeddingRecord], seq_offset: int
+) -> int:
+    """COPY d'un batch dans la table temporaire puis upsert en une requête."""
+    await conn.execute(
+        f"""
+        CREATE TEMP TABLE IF NOT EXISTS {_STAGING_TABLE} (
+            seq INTEGER,
+            source_type VARCHAR(50),
+            source_id UUID,
+            chunk_index INTEGER,
+            total_chunks INTEGER,
+            embedding REAL[],
+            metadata JSONB,
+            content_hash VARCHAR(64),
+            model VARCHAR(100),
+            dimensions INTEGER
+        ) ON COMMIT DROP
+        """
+    )
+
+    await conn.copy_records_to_table(
+        _STAGING_TABLE,
+        records=[_to_row(seq_offset + i, record) for i, record in enumerate(batch)],
+        columns=_STAGING_COLUMNS,
+    )
+
+    # DISTINCT ON : ON CONFLICT ne peut pas toucher deux fois la même ligne
+    status = await conn.execute(
+        f"""
+        INSERT INTO knowledge.embeddings (
+            source_type, source_id, chunk_index, total_chunks, embedding,
+            metadata, content_hash, model, dimensions, created_at
+        )
+        SELECT DISTINCT ON (source_type, source_id, chunk_index)
+            source_type, source_id, chunk_index, total_chunks, embedding::vector,
+            metadata, content_hash, model, dimensions, NOW()
+        FROM {_STAGING_TABLE}
+        ORDER BY source_type, source_id, chunk_index, seq DESC
+        ON CONFLICT (source_type, source_id, chunk_index) DO UPDATE
+        SET total_chunks = EXCLUDED.total_chunks,
+            embedding = EXCLUDED.embedding,
+            metadata = EXCLUDED.metadata,
+            content_hash = EXCLUDED.content_hash,
+            model = EXCLUDED.model,
+            dimensions = EXCLUDED.dimensions
+        """
+    )
+    # Connexion appelante déjà en transaction : ON COMMIT DROP n'a pas encore joué
+    await conn.execute(f"DROP TABLE {_STAGING_TABLE}")
+    return _rowcount(status)
+
+
+async def rebuild_hnsw_index(conn: asyncpg.Connection, mode: Optional[str] = None) -> None:
+    """
+    (Re)crée les index HNSW d'un tier (global + partiels) avec
+    maintenance_work_mem élevé, puis supprime ceux des autres tiers.
+
+    Args:
+        conn: Connexion asyncpg
+        mode: Tier à indexer (None = PGVECTOR_INDEX_MODE)
+    """
+    started = time.monotonic()
+    ddls = hnsw_index_ddls(mode) if mode else HNSW_INDEX_DDLS
+    await conn.execute(f"SET maintenance_work_mem = '{EMBEDDING_BULK_MAINTENANCE_WORK_MEM}'")
+    try:
+        for ddl in ddls.values():
+            await conn.execute(ddl)
+    finally:
+        await conn.execute("RESET maintenance_work_mem")
+    # Après le build : jamais de fenêtre sans index HNSW utilisable
+    for index_name in inactive_hnsw_index_names(mode):
+        await conn.execute(f"DROP INDEX IF EXISTS knowledge.{index_name}")
+    logger.info(
+        "embedding_bulk_hnsw_rebuilt",
+        indexes=list(ddls),
+        duration_ms=int((time.monotonic() - started) * 1000),
+    )
+
+
+def _to_row(seq: int, record: EmbeddingRecord) -> tuple:
+    """EmbeddingRecord → tuple COPY (ordre _STAGING_COLUMNS)."""
+    return (
+        seq,
+        record.source_type,
+        record.source_id,
+        record.chunk_index,
+        record.total_chunks,
+        record.embedding,  # float4[] binaire, casté en vector côté serveur
+        json.dumps(record.metadata),  # JSONB binaire = texte JSON
+        record.content_hash,
+        record.model,
+        len(record.embedding),
+    )
+
+
+def _rowcount(status: str) -> int:
+    """'INSERT 0 42' → 42"""
+    try:
+        return int(status.split()[-1])
+    except (AttributeError, IndexError, ValueError):
+        return 0
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Friday 2.0 - Cache embeddings par content_hash
+
+Un chunk déjà indexé (même texte anonymisé, même modèle, mêmes dimensions) a
+déjà son vecteur dans knowledge.embeddings : inutile de rappeler Voyage AI.
+Reclassement, déplacement de fichier, ré-indexation = quasi gratuit.
+
+Niveaux:
+    - LRU en mémoire (par process)
+    - knowledge.embeddings : lookup batch WHERE content_hash = ANY($1)
+      AND model = $2 AND dimensions = $3 (migration 043)
+
+RGPD:
+    content_hash = SHA-256 du texte ANONYMISÉ (celui réellement envoyé au
+    provider). Jamais de hash du texte clair.
+
+Usage:
+    from agents.src.adapters.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache(db_pool=db_pool)
+    result = await cache.embed_many(anonymized_texts, model, dimensions, embed_fn)
+    result.embeddings  # même ordre que anonymized_texts
+    result.content_hashes  # à stocker avec chaque vecteur
+
+Date: 2026-10-16
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Sequence
+
+import structlog
+from pydantic import BaseModel, Field
+
+logger = structlog.get_logger(__name__)
+
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "1024"))
+
+EmbedFunction = Callable[[list[str]], Awaitable[list[list[float]]]]
+
+
+def compute_content_hash(anonymized_text: str) -> str:
+    """SHA-256 hex du texte anonymisé (colonne knowledge.embeddings.content_hash)."""
+    return hashlib.sha256(anonymized_text.encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddings(BaseModel):
+    """Résultat embed_many : vecteurs dans l'ordre d'entrée + hashes + stats"""
+
+    embeddings: list[list[float]] = Field(..., description="Vecteurs (ordre des textes)")
+    content_hashes: list[str] = Field(..., description="content_hash par texte")
+    cache_hits: int = Field(0, description="Textes servis par le cache (mémoire ou DB)")
+    api_texts: int = Field(0, description="Textes envoyés au provider")
+
+
+class EmbeddingCache:
+    """
+    Cache (content_hash, model, dimensions) → vecteur.
+
+    Les vecteurs sont persistés par les chemins de stockage existants
+    (EmbeddingPipeline._store_embedding, bulk EmbeddingRecord via store_many :
+    content_hash/model/dimensions renseignés) ; ce cache ne fait que les relire.
+    """
+
+    def __init__(
+        self, db_pool: Optional[Any] = None, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES
+    ):
+        """
+        Args:
+            db_pool: Pool asyncpg (None = cache mémoire uniquement)
+            max_entries: Entrées max du LRU mémoire
+        """
+        self.db_pool = db_pool
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[tuple[str, str, int], list[float]]" = OrderedDict()
+
+        self.hits_memory = 0
+        self.hits_db = 0
+        self.misses = 0
+
+    async def get_many(
+        self, content_hashes: Sequence[str], model: str, dimensions: int
+    ) -> dict[str, list[float]]:
+        """
+        Cherche les vecteurs existants pour une liste de hashes.
+
+        Returns:
+            {content_hash: vecteur} pour les hashes trouvés (les autres = miss)
+        """
+        found: dict[str, list[float]] = {}
+        missing: list[str] = []
+
+        for content_hash in dict.fromkeys(content_hashes):
+            key = (content_hash, model, dimensions)
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                found[content_hash] = vector
+                self.hits_memory += 1
+            else:
+                missing.append(content_hash)
+
+        if missing and self.db_pool is not None:
+            from_db = await self._fetch_from_db(missing, model, dimensions)
+            for content_hash, vector in from_db.items():
+                self.remember(content_hash, model, dimensions, vector)
+                found[content_hash] = vector
+            self.hits_db += len(from_db)
+            self.misses += len(missing) - len(from_db)
+        else:
+            self.misses += len(missing)
+
+        return found
+
+    def remember(self, content_hash: str, model: str, dimensions: int, vector: list[float]) -> None:
+        """Ajoute un vecteur au LRU mémoire."""
+        key = (content_hash, model, dimensions)
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def embed_many(
+        self,
+        texts: Sequence[str],
+        model: str,
+        dimensions: int,
+        embed_fn: EmbedFunction,
+    ) -> CachedEmbeddings:
+        """
+        Embeddings avec dédup : seuls les textes inconnus partent au provider.
+
+        Args:
+            texts: Textes DÉJÀ anonymisés
+            model: Modèle embeddings
+            dimensions: Dimensions attendues
+            embed_fn: Coroutine texts → vecteurs (appelée une fois, misses uniquement)
+
+        Returns:
+            CachedEmbeddings (vecteurs dans l'ordre de texts)
+        """
+        content_hashes = [compute_content_hash(text) for text in texts]
+        vectors = await self.get_many(content_hashes, model, dimensions)
+
+        # Textes à envoyer : un seul par hash manquant
+        to_embed = {h: t for h, t in zip(content_hashes, texts) if h not in vectors}
+        cache_hits = sum(1 for h in content_hashes if h in vectors)
+
+        if to_embed:
+            new_vectors = await embed_fn(list(to_embed.values()))
+            if len(new_vectors) != len(to_embed):
+                raise ValueError(
+                    f"embed_fn returned {len(new_vectors)} vectors for {len(to_embed)} texts"
+                )
+            for content_hash, vector in zip(to_embed, new_vectors):
+                vectors[content_hash] = vector
+                self.remember(content_hash, model, dimensions, vector)
+
+        logger.info(
+            "embedding_cache_lookup",
+            texts=len(texts),
+            cache_hits=cache_hits,
+            api_texts=len(to_embed),
+            model=model,
+        )
+
+        return CachedEmbeddings(
+            embeddings=[vectors[h] for h in content_hashes],
+            content_hashes=content_hashes,
+            cache_hits=cache_hits,
+            api_texts=len(to_embed),
+        )
+
+    def get_stats(self) -> dict:
+        """
+        Retourne statistiques hit/miss.
+
+        Returns:
+            Dict métriques
+        """
+        hits = self.hits_memory + self.hits_db
+        lookups = hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "hits_memory": self.hits_memory,
+            "hits_db": self.hits_db,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+        }
+
+    async def _fetch_from_db(
+        self, content_hashes: list[str], model: str, dimensions: int
+    ) -> dict[str, list[float]]:
+        """Lookup batch knowledge.embeddings. Erreur DB = miss (jamais bloquant)."""
+        try:
+            rows = await self.db_pool.fetch(
+                """
+                SELECT DISTINCT ON (content_hash) content_hash, embedding::text AS embedding
+                FROM knowledge.embeddings
+                WHERE content_hash = ANY($1::varchar[])
+                  AND model = $2
+                  AND dimensions = $3
+                  AND embedding IS NOT NULL
+                """,
+                content_hashes,
+                model,
+                dimensions,
+            )
+        except Exception as e:
+            logger.warning("embedding_cache_db_lookup_failed", error=str(e))
+            return {}
+
+        found = {}
+        for row in rows:
+            vector = _parse_vector(row["embedding"])
+            if len(vector) == dimensions:
+                found[row["content_hash"]] = vector
+        return found
+
+
+def _parse_vector(value: Any) -> list[float]:
+    """pgvector texte '[0.1,0.2,...]' (ou liste/array) → list[float]."""
+    if isinstance(value, str):
+        return [float(x) for x in value.strip("[]").split(",") if x]
+    return [float(x) for x in value]
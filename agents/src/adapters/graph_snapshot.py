@@ -0,0 +1,756 @@
+#!/usr/bin/env python3
+"""
+Friday 2.0 - Snapshot mémoire du graphe de connaissances (CSR)
+
+Briefings, brouillons de réponse et lookups de contexte redemandent sans cesse
+les mêmes voisinages à 1-2 sauts dans knowledge.nodes / knowledge.edges.
+Ce snapshot garde l'adjacence en mémoire sous forme compacte et sert
+get_related_nodes / query_path sans aller-retour PostgreSQL.
+
+Structure (ids entiers, tableaux `array`) :
+    - nœuds : index UUID → int, type (code uint8), nom, metadata JSON (bytes, None si vide)
+    - edges : from/to (int32), relation (uint8), UUID (16 octets), metadata (creux)
+    - CSR sortant + entrant : offsets[n+1] + indices d'edges, reconstruits
+      (compaction) quand le delta incrémental dépasse GRAPH_SNAPSHOT_COMPACT_THRESHOLD
+    → ~40 Mo pour 100k nœuds / 500k edges (borne GRAPH_SNAPSHOT_MAX_EDGES)
+
+Fraîcheur :
+    - LISTEN knowledge_graph (triggers migration 045) : DELETE appliqués
+      immédiatement, INSERT/UPDATE déclenchent un refresh incrémental
+    - refresh() : watermark nodes.updated_at / edges.created_at
+    - write-through depuis PostgreSQLMemorystore (create_node / create_edge)
+    - reload complet périodique (filet de sécurité, notifications perdues)
+    - connexion LISTEN perdue : ready=False (fallback SQL), reconnexion + reload
+
+Usage:
+    snapshot = GraphSnapshot(db_pool)
+    await snapshot.load()
+    await snapshot.start_listening()
+    memorystore = PostgreSQLMemorystore(db_pool, graph_snapshot=snapshot)
+    ...
+    await memorystore.close()  # → snapshot.stop()
+
+Config (env):
+    GRAPH_SNAPSHOT_ENABLED=false
+    GRAPH_SNAPSHOT_FULL_RELOAD_SECONDS=3600
+    GRAPH_SNAPSHOT_COMPACT_THRESHOLD=10000
+    GRAPH_SNAPSHOT_MAX_EDGES=2000000
+
+Date: 2026-10-16
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from array import array
+from collections import deque
+from datetime import datetime
+from typing import Any, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+GRAPH_SNAPSHOT_ENABLED = os.getenv("GRAPH_SNAPSHOT_ENABLED", "false").lower() == "true"
+GRAPH_SNAPSHOT_FULL_RELOAD_SECONDS = int(os.getenv("GRAPH_SNAPSHOT_FULL_RELOAD_SECONDS", "3600"))
+GRAPH_SNAPSHOT_COMPACT_THRESHOLD = int(os.getenv("GRAPH_SNAPSHOT_COMPACT_THRESHOLD", "10000"))
+GRAPH_SNAPSHOT_MAX_EDGES = int(os.getenv("GRAPH_SNAPSHOT_MAX_EDGES", "2000000"))
+
+NOTIFY_CHANNEL = "knowledge_graph"
+
+# Délai minimal entre deux tentatives (reconnexion LISTEN, reload en échec)
+RETRY_SECONDS = 30
+
+_EMPTY_METADATA = (None, b"{}", "{}")
+
+
+class GraphSnapshotError(Exception):
+    """Snapshot indisponible ou trop gros (fallback SQL)"""
+
+
+class GraphSnapshot:
+    """
+    Adjacence CSR en mémoire de knowledge.nodes / knowledge.edges.
+
+    Lecture sans I/O (ready=True requis). Les écritures passent par load(),
+    refresh(), les notifications ou le write-through du memorystore.
+    """
+
+    def __init__(
+        self,
+        db_pool: Any,
+        full_reload_seconds: int = GRAPH_SNAPSHOT_FULL_RELOAD_SECONDS,
+        compact_threshold: int = GRAPH_SNAPSHOT_COMPACT_THRESHOLD,
+        max_edges: int = GRAPH_SNAPSHOT_MAX_EDGES,
+    ):
+        """
+        Args:
+            db_pool: Pool asyncpg
+            full_reload_seconds: Intervalle de reload complet (0 = jamais)
+            compact_threshold: Edges ajoutées/supprimées avant reconstruction CSR
+            max_edges: Au-delà, load() refuse (GraphSnapshotError) → fallback SQL
+        """
+        self.db_pool = db_pool
+        self.full_reload_seconds = full_reload_seconds
+        self.compact_threshold = compact_threshold
+        self.max_edges = max_edges
+
+        self.ready = False
+        self.loaded_at = 0.0
+        self.watermark: Optional[datetime] = None
+
+        self._listen_conn = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._reload_task: Optional[asyncio.Task] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._refresh_lock = asyncio.Lock()
+        self._dirty_edges: set[str] = set()
+
+        self._reset()
+
+    # ------------------------------------------------------------------
+    # Chargement
+    # ------------------------------------------------------------------
+
+    def _reset(self) -> None:
+        # Nœuds
+        self._index: dict[str, int] = {}
+        self._node_ids: list[str] = []
+        self._node_types = array("B")
+        self._node_names: list[str] = []
+        self._node_metadata: list[Optional[bytes]] = []
+        self._node_alive = bytearray()
+
+        # Edges (tableaux parallèles, append-only jusqu'à compaction)
+        self._edge_from = array("i")
+        self._edge_to = array("i")
+        self._edge_rel = array("B")
+        self._edge_uuid = bytearray()
+        self._edge_alive = bytearray()
+        self._edge_metadata: dict[int, bytes] = {}  # Creux : la plupart des edges = {}
+
+        # CSR (indices d'edges groupés par nœud)
+        self._out_offsets = array("i", [0])
+        self._out_edges = array("i")
+        self._in_offsets = array("i", [0])
+        self._in_edges = array("i")
+
+        # Delta depuis la dernière compaction
+        self._pending_out: dict[int, list[int]] = {}
+        self._pending_in: dict[int, list[int]] = {}
+        self._delta = 0
+
+        # Dictionnaires de codes (types de nœuds, relations)
+        self._type_codes: dict[str, int] = {}
+        self._type_names: list[str] = []
+        self._relation_codes: dict[str, int] = {}
+        self._relation_names: list[str] = []
+
+    async def load(self) -> None:
+        """Chargement complet depuis PostgreSQL (remplace le snapshot courant)."""
+        started = time.monotonic()
+
+        async with self.db_pool.acquire() as conn:
+            edge_count = await conn.fetchval("SELECT COUNT(*) FROM knowledge.edges")
+            if edge_count > self.max_edges:
+                raise GraphSnapshotError(
+                    f"{edge_count} edges > GRAPH_SNAPSHOT_MAX_EDGES={self.max_edges}"
+                )
+
+            watermark = await conn.fetchval(
+                "SELECT GREATEST((SELECT MAX(updated_at) FROM knowledge.nodes), "
+                "(SELECT MAX(created_at) FROM knowledge.edges))"
+            )
+            node_rows = await conn.fetch(
+                "SELECT id, type, name, metadata::text AS metadata FROM knowledge.nodes"
+            )
+            edge_rows = await conn.fetch(
+                "SELECT id, from_node_id, to_node_id, relation_type, metadata::text AS metadata "
+                "FROM knowledge.edges"
+            )
+
+        self._reset()
+        for row in node_rows:
+            self._upsert_node(str(row["id"]), row["type"], row["name"], row["metadata"])
+        for row in edge_rows:
+            self._append_edge(
+                str(row["id"]),
+                str(row["from_node_id"]),
+                str(row["to_node_id"]),
+                row["relation_type"],
+                row["metadata"],
+            )
+        self._compact()
+
+        self.watermark = watermark
+        self.loaded_at = time.monotonic()
+        self.ready = True
+
+        logger.info(
+            "graph_snapshot_loaded",
+            nodes=len(self._node_ids),
+            edges=len(self._edge_from),
+            memory_mb=round(self.memory_bytes() / 1_000_000, 1),
+            duration_ms=int((time.monotonic() - started) * 1000),
+        )
+
+    async def refresh(self) -> None:
+        """
+        Refresh incrémental : nœuds modifiés et edges créées depuis le watermark,
+        edges signalées modifiées par NOTIFY. Reload complet si périmé.
+        """
+        async with self._refresh_lock:
+            if not self.ready or (
+                self.full_reload_seconds
+                and time.monotonic() - self.loaded_at > self.full_reload_seconds
+            ):
+                await self.load()
+                return
+
+            dirty_edges, self._dirty_edges = list(self._dirty_edges), set()
+
+            async with self.db_pool.acquire() as conn:
+                # >= : lignes au même timestamp que le watermark rejouées (idempotent)
+                node_rows = await conn.fetch(
+                    "SELECT id, type, name, metadata::text AS metadata, updated_at "
+                    "FROM knowledge.nodes WHERE $1::timestamptz IS NULL OR updated_at >= $1",
+                    self.watermark,
+                )
+                edge_rows = await conn.fetch(
+                    "SELECT id, from_node_id, to_node_id, relation_type, "
+                    "metadata::text AS metadata, created_at FROM knowledge.edges "
+                    "WHERE $1::timestamptz IS NULL OR created_at >= $1 OR id = ANY($2::uuid[])",
+                    self.watermark,
+                    dirty_edges,
+                )
+
+            for row in node_rows:
+                self._upsert_node(str(row["id"]), row["type"], row["name"], row["metadata"])
+                self._advance_watermark(row["updated_at"])
+            for row in edge_rows:
+                self.add_edge(
+                    str(row["id"]),
+                    str(row["from_node_id"]),
+                    str(row["to_node_id"]),
+                    row["relation_type"],
+                    row["metadata"],
+                )
+                self._advance_watermark(row["created_at"])
+
+            logger.debug("graph_snapshot_refreshed", nodes=len(node_rows), edges=len(edge_rows))
+
+    # ------------------------------------------------------------------
+    # LISTEN / NOTIFY
+    # ------------------------------------------------------------------
+
+    async def start_listening(self) -> None:
+        """
+        LISTEN knowledge_graph sur une connexion dédiée (triggers migration 045)
+        et démarre le reload complet périodique.
+        """
+        if self._listen_conn is None:
+            conn = await self.db_pool.acquire()
+            try:
+                await conn.add_listener(NOTIFY_CHANNEL, self._on_notify)
+            except Exception:
+                await self.db_pool.release(conn)
+                raise
+            conn.add_termination_listener(self._on_connection_lost)
+            self._listen_conn = conn
+            logger.info("graph_snapshot_listening", channel=NOTIFY_CHANNEL)
+
+        if self.full_reload_seconds and (self._reload_task is None or self._reload_task.done()):
+            self._reload_task = asyncio.get_running_loop().create_task(self._reload_loop())
+
+    async def stop(self) -> None:
+        """Arrête l'écoute, le reload périodique et libère la connexion dédiée."""
+        for task in (self._refresh_task, self._reload_task, self._reconnect_task):
+            if task is not None:
+                task.cancel()
+        self._refresh_task = self._reload_task = self._reconnect_task = None
+
+        if self._listen_conn is not None:
+            conn, self._listen_conn = self._listen_conn, None
+            conn.remove_termination_listener(self._on_connection_lost)
+            try:
+                await conn.remove_listener(NOTIFY_CHANNEL, self._on_notify)
+            finally:
+                await self.db_pool.release(conn)
+
+    async def _reload_loop(self) -> None:
+        # refresh() recharge tout dès que loaded_at dépasse full_reload_seconds :
+        # sans ce timer, le reload n'aurait lieu qu'à la prochaine notification
+        while True:
+            remaining = self.full_reload_seconds - (time.monotonic() - self.loaded_at)
+            await asyncio.sleep(max(remaining, RETRY_SECONDS))
+            if time.monotonic() - self.loaded_at >= self.full_reload_seconds:
+                await self._safe_refresh()
+
+    def _on_connection_lost(self, connection: Any) -> None:
+        """Callback asyncpg : connexion LISTEN fermée → notifications perdues."""
+        if connection is not self._listen_conn:
+            return
+        logger.warning("graph_snapshot_listen_lost", channel=NOTIFY_CHANNEL)
+        # Snapshot potentiellement périmé : lectures en SQL jusqu'au reload
+        self.ready = False
+        self._listen_conn = None
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.get_running_loop().create_task(
+                self._reconnect(connection)
+            )
+
+    async def _reconnect(self, lost_conn: Any) -> None:
+        try:
+            await self.db_pool.release(lost_conn)
+        except Exception as e:
+            logger.debug("graph_snapshot_release_failed", error=str(e))
+
+        while True:
+            try:
+                await self.start_listening()
+                await self.refresh()  # ready=False → reload complet
+                logger.info("graph_snapshot_reconnected", channel=NOTIFY_CHANNEL)
+                return
+            except Exception as e:
+                logger.warning("graph_snapshot_reconnect_failed", error=str(e))
+                await asyncio.sleep(RETRY_SECONDS)
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        """Callback asyncpg : DELETE appliqués tout de suite, le reste via refresh()."""
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("graph_snapshot_bad_payload", payload=payload[:200])
+            return
+
+        if event.get("op") == "DELETE":
+            if event.get("table") == "edges":
+                self.remove_edge(event["from"], event["to"], event["relation_type"])
+            elif event.get("table") == "nodes":
+                self.remove_node(event["id"])
+            return
+
+        if event.get("table") == "edges" and event.get("op") == "UPDATE":
+            self._dirty_edges.add(event["id"])
+        self._schedule_refresh()
+
+    def _schedule_refresh(self) -> None:
+        # Debounce : un seul refresh en vol, les notifications suivantes s'y agrègent
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self._safe_refresh())
+
+    async def _safe_refresh(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning("graph_snapshot_refresh_failed", error=str(e))
+
+    # ------------------------------------------------------------------
+    # Écritures (write-through memorystore, refresh, notifications)
+    # ------------------------------------------------------------------
+
+    def upsert_node(self, node_id: str, node_type: str, name: str, metadata: Any = None) -> None:
+        """Ajoute ou met à jour un nœud."""
+        self._upsert_node(str(node_id), node_type, name, metadata)
+
+    def add_edge(
+        self,
+        edge_id: str,
+        from_node_id: str,
+        to_node_id: str,
+        relation_type: str,
+        metadata: Any = None,
+    ) -> None:
+        """Ajoute une edge (idempotent sur (from, to, relation) : met à jour metadata)."""
+        from_node_id, to_node_id = str(from_node_id), str(to_node_id)
+        existing = self._find_edge(from_node_id, to_node_id, relation_type)
+        if existing is not None:
+            self._set_edge_metadata(existing, metadata)
+            return
+
+        self._append_edge(str(edge_id), from_node_id, to_node_id, relation_type, metadata)
+        position = len(self._edge_from) - 1
+        self._pending_out.setdefault(self._edge_from[position], []).append(position)
+        self._pending_in.setdefault(self._edge_to[position], []).append(position)
+        self._bump_delta()
+
+    def remove_edge(self, from_node_id: str, to_node_id: str, relation_type: str) -> None:
+        """Supprime une edge (tombstone jusqu'à la prochaine compaction)."""
+        position = self._find_edge(str(from_node_id), str(to_node_id), relation_type)
+        if position is not None:
+            self._edge_alive[position] = 0
+            self._edge_metadata.pop(position, None)
+            self._bump_delta()
+
+    def remove_node(self, node_id: str) -> None:
+        """Supprime un nœud (ses edges suivent via ON DELETE CASCADE + notifications)."""
+        index = self._index.get(str(node_id))
+        if index is not None:
+            self._node_alive[index] = 0
+
+    # ------------------------------------------------------------------
+    # Lectures (même API que PostgreSQLMemorystore)
+    # ------------------------------------------------------------------
+
+    def get_related_nodes(
+        self,
+        node_id: str,
+        direction: str = "out",
+        relation_type: Optional[str] = None,
+        limit: int = 100,
+    ) -> list[dict[str, Any]]:
+        """
+        Nœuds reliés (voir PostgreSQLMemorystore.get_related_nodes).
+
+        Returns:
+            Liste de nœuds [{id, type, name, metadata, relation_type}, ...]
+        """
+        if direction not in ("out", "in", "both"):
+            raise ValueError(f"Invalid direction '{direction}'. Must be 'out', 'in', or 'both'")
+
+        index = self._index.get(str(node_id))
+        if index is None or not self._node_alive[index]:
+            return []
+
+        relation_code = self._relation_codes.get(relation_type) if relation_type else None
+        if relation_type and relation_code is None:
+            return []
+
+        results = []
+        for position, other in self._neighbors(index, direction):
+            if relation_code is not None and self._edge_rel[position] != relation_code:
+                continue
+            results.append(
+                {
+                    "id": self._node_ids[other],
+                    "type": self._type_names[self._node_types[other]],
+                    "name": self._node_names[other],
+                    "metadata": _decode(self._node_metadata[other]),
+                    "relation_type": self._relation_names[self._edge_rel[position]],
+                }
+            )
+            if len(results) >= limit:
+                break
+        return results
+
+    def query_path(
+        self,
+        from_node_id: str,
+        to_node_id: str,
+        max_depth: int = 3,
+        relation_types: Optional[list[str]] = None,
+        direction: str = "out",
+        bidirectional: bool = False,
+    ) -> list[dict[str, Any]]:
+        """
+        Plus court chemin (BFS en mémoire, voir PostgreSQLMemorystore.query_path).
+
+        Returns:
+            Liste d'edges [{id, from_node_id, to_node_id, relation_type, metadata}, ...]
+        """
+        if direction not in ("out", "both"):
+            raise ValueError(f"Invalid direction '{direction}'. Must be 'out' or 'both'")
+
+        source = self._index.get(str(from_node_id))
+        target = self._index.get(str(to_node_id))
+        if source is None or target is None or source == target or max_depth < 1:
+            return []
+
+        allowed = None
+        if relation_types is not None:
+            allowed = {self._relation_codes[r] for r in relation_types if r in self._relation_codes}
+
+        backward_direction = "in" if direction == "out" else "both"
+        if bidirectional:
+            forward_depth = (max_depth + 1) // 2
+            backward_depth = max_depth - forward_depth
+        else:
+            forward_depth, backward_depth = max_depth, 0
+
+        # BFS par niveaux des deux côtés ; parents[nœud] = edge d'arrivée
+        forward_parents: dict[int, int] = {source: -1}
+        backward_parents: dict[int, int] = {target: -1}
+        forward_frontier, backward_frontier = [source], [target]
+        meet = target if target in forward_parents else None
+        forward_level = backward_level = 0
+
+        while meet is None and (forward_level < forward_depth or backward_level < backward_depth):
+            # Étendre le côté le moins large (ou le seul qui a encore du budget)
+            expand_forward = forward_level < forward_depth and (
+                backward_level >= backward_depth or len(forward_frontier) <= len(backward_frontier)
+            )
+            if expand_forward:
+                forward_frontier = self._expand(
+                    forward_frontier, forward_parents, direction, allowed, stop=target
+                )
+                forward_level += 1
+                frontier, others = forward_frontier, backward_parents
+            else:
+                backward_frontier = self._expand(
+                    backward_frontier, backward_parents, backward_direction, allowed, stop=source
+                )
+                backward_level += 1
+                frontier, others = backward_frontier, forward_parents
+
+            if not frontier:
+                break
+            # Jonction la plus proche de l'autre extrémité (chemin le plus court)
+            candidates = [node for node in frontier if node in others]
+            if candidates:
+                meet = min(candidates, key=lambda node: self._depth(node, others))
+
+        if meet is None:
+            return []
+
+        path = self._walk(meet, forward_parents, reverse=True)
+        path.extend(self._walk(meet, backward_parents, reverse=False))
+        return [self._edge_dict(position) for position in path]
+
+    def get_stats(self) -> dict:
+        """
+        Retourne statistiques snapshot.
+
+        Returns:
+            Dict métriques
+        """
+        return {
+            "ready": self.ready,
+            "nodes": sum(self._node_alive),
+            "edges": sum(self._edge_alive),
+            "pending_delta": self._delta,
+            "memory_bytes": self.memory_bytes(),
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "listening": self._listen_conn is not None,
+        }
+
+    def memory_bytes(self) -> int:
+        """Estimation de l'empreinte mémoire (tableaux + index + chaînes)."""
+        total = sum(
+            sys.getsizeof(container)
+            for container in (
+                self._node_types,
+                self._node_alive,
+                self._edge_from,
+                self._edge_to,
+                self._edge_rel,
+                self._edge_uuid,
+                self._edge_alive,
+                self._out_offsets,
+                self._out_edges,
+                self._in_offsets,
+                self._in_edges,
+                self._index,
+                self._node_ids,
+                self._node_names,
+                self._node_metadata,
+                self._edge_metadata,
+            )
+        )
+        total += sum(sys.getsizeof(node_id) for node_id in self._node_ids)
+        total += sum(sys.getsizeof(name) for name in self._node_names)
+        total += sum(sys.getsizeof(m) for m in self._node_metadata if m is not None)
+        total += sum(sys.getsizeof(m) for m in self._edge_metadata.values())
+        return total
+
+    # ------------------------------------------------------------------
+    # Interne
+    # ------------------------------------------------------------------
+
+    def _upsert_node(self, node_id: str, node_type: str, name: str, metadata: Any) -> int:
+        type_code = _code(node_type, self._type_codes, self._type_names)
+        encoded = _encode(metadata)
+        index = self._index.get(node_id)
+        if index is None:
+            index = len(self._node_ids)
+            self._index[node_id] = index
+            self._node_ids.append(node_id)
+            self._node_types.append(type_code)
+            self._node_names.append(name)
+            self._node_metadata.append(encoded)
+            self._node_alive.append(1)
+        else:
+            self._node_types[index] = type_code
+            self._node_names[index] = name
+            self._node_metadata[index] = encoded
+            self._node_alive[index] = 1
+        return index
+
+    def _append_edge(
+        self, edge_id: str, from_node_id: str, to_node_id: str, relation_type: str, metadata: Any
+    ) -> None:
+        # Nœud inconnu (edge reçue avant son nœud) : placeholder complété au refresh
+        from_index = self._index.get(from_node_id)
+        if from_index is None:
+            from_index = self._upsert_node(from_node_id, "entity", "", None)
+        to_index = self._index.get(to_node_id)
+        if to_index is None:
+            to_index = self._upsert_node(to_node_id, "entity", "", None)
+
+        position = len(self._edge_from)
+        self._edge_from.append(from_index)
+        self._edge_to.append(to_index)
+        self._edge_rel.append(_code(relation_type, self._relation_codes, self._relation_names))
+        self._edge_uuid.extend(uuid.UUID(edge_id).bytes)
+        self._edge_alive.append(1)
+        self._set_edge_metadata(position, metadata)
+
+    def _set_edge_metadata(self, position: int, metadata: Any) -> None:
+        encoded = _encode(metadata)
+        if encoded is None:
+            self._edge_metadata.pop(position, None)
+        else:
+            self._edge_metadata[position] = encoded
+
+    def _find_edge(self, from_node_id: str, to_node_id: str, relation_type: str) -> Optional[int]:
+        from_index = self._index.get(from_node_id)
+        to_index = self._index.get(to_node_id)
+        relation_code = self._relation_codes.get(relation_type)
+        if from_index is None or to_index is None or relation_code is None:
+            return None
+        for position, other in self._neighbors(from_index, "out"):
+            if other == to_index and self._edge_rel[position] == relation_code:
+                return position
+        return None
+
+    def _neighbors(self, index: int, direction: str):
+        """(position edge, nœud voisin) vivants, CSR + delta."""
+        if direction in ("out", "both"):
+            yield from self._scan(
+                index, self._out_offsets, self._out_edges, self._pending_out, True
+            )
+        if direction in ("in", "both"):
+            yield from self._scan(index, self._in_offsets, self._in_edges, self._pending_in, False)
+
+    def _scan(self, index, offsets, edges, pending, outgoing: bool):
+        targets = self._edge_to if outgoing else self._edge_from
+        if index + 1 < len(offsets):
+            for k in range(offsets[index], offsets[index + 1]):
+                position = edges[k]
+                if self._edge_alive[position] and self._node_alive[targets[position]]:
+                    yield position, targets[position]
+        for position in pending.get(index, ()):
+            if self._edge_alive[position] and self._node_alive[targets[position]]:
+                yield position, targets[position]
+
+    def _expand(self, frontier, parents, direction, allowed, stop) -> list[int]:
+        next_frontier = []
+        for node in frontier:
+            if node == stop:
+                continue
+            for position, other in self._neighbors(node, direction):
+                if allowed is not None and self._edge_rel[position] not in allowed:
+                    continue
+                if other not in parents:
+                    parents[other] = position
+                    next_frontier.append(other)
+        return next_frontier
+
+    def _walk(self, meet: int, parents: dict[int, int], reverse: bool) -> list[int]:
+        """Remonte les parents depuis le point de jonction (positions d'edges)."""
+        edges = deque()
+        node = meet
+        while parents[node] != -1:
+            position = parents[node]
+            if reverse:
+                edges.appendleft(position)
+            else:
+                edges.append(position)
+            node = self._other_end(position, node)
+        return list(edges)
+
+    def _depth(self, node: int, parents: dict[int, int]) -> int:
+        depth = 0
+        while parents[node] != -1:
+            node = self._other_end(parents[node], node)
+            depth += 1
+        return depth
+
+    def _other_end(self, position: int, node: int) -> int:
+        return (
+            self._edge_from[position]
+            if self._edge_to[position] == node
+            else self._edge_to[position]
+        )
+
+    def _edge_dict(self, position: int) -> dict[str, Any]:
+        return {
+            "id": str(uuid.UUID(bytes=bytes(self._edge_uuid[position * 16 : position * 16 + 16]))),
+            "from_node_id": self._node_ids[self._edge_from[position]],
+            "to_node_id": self._node_ids[self._edge_to[position]],
+            "relation_type": self._relation_names[self._edge_rel[position]],
+            "metadata": _decode(self._edge_metadata.get(position)),
+        }
+
+    def _bump_delta(self) -> None:
+        self._delta += 1
+        if self._delta >= self.compact_threshold:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Reconstruit les CSR sortant/entrant et purge les edges supprimées."""
+        alive = [p for p in range(len(self._edge_from)) if self._edge_alive[p]]
+
+        if len(alive) != len(self._edge_from):
+            remap = {old: new for new, old in enumerate(alive)}
+            self._edge_from = array("i", (self._edge_from[p] for p in alive))
+            self._edge_to = array("i", (self._edge_to[p] for p in alive))
+            self._edge_rel = array("B", (self._edge_rel[p] for p in alive))
+            self._edge_uuid = bytearray(
+                b"".join(bytes(self._edge_uuid[p * 16 : p * 16 + 16]) for p in alive)
+            )
+            self._edge_alive = bytearray(b"\x01" * len(alive))
+            self._edge_metadata = {
+                remap[p]: m for p, m in self._edge_metadata.items() if p in remap
+            }
+
+        node_count = len(self._node_ids)
+        self._out_offsets, self._out_edges = _build_csr(self._edge_from, node_count)
+        self._in_offsets, self._in_edges = _build_csr(self._edge_to, node_count)
+        self._pending_out.clear()
+        self._pending_in.clear()
+        self._delta = 0
+
+    def _advance_watermark(self, timestamp: Optional[datetime]) -> None:
+        if timestamp is not None and (self.watermark is None or timestamp > self.watermark):
+            self.watermark = timestamp
+
+
+def _build_csr(endpoints: array, node_count: int) -> tuple[array, array]:
+    """Tri par comptage : offsets[n+1] + positions d'edges groupées par nœud."""
+    counts = array("i", bytes(4 * (node_count + 1)))
+    for node in endpoints:
+        counts[node + 1] += 1
+    for i in range(node_count):
+        counts[i + 1] += counts[i]
+    offsets = array("i", counts)
+    cursor = array("i", counts)
+    edges = array("i", bytes(4 * len(endpoints)))
+    for position, node in enumerate(endpoints):
+        edges[cursor[node]] = position
+        cursor[node] += 1
+    return offsets, edges
+
+
+def _code(value: str, codes: dict[str, int], names: list[str]) -> int:
+    code = codes.get(value)
+    if code is None:
+        code = len(names)
+        codes[value] = code
+        names.append(value)
+    return code
+
+
+def _encode(metadata: Any) -> Optional[bytes]:
+    """Metadata → JSON bytes compact (None si vide)."""
+    if metadata in _EMPTY_METADATA or metadata == {}:
+        return None
+    if isinstance(metadata, str):
+        return metadata.encode("utf-8")
+    return json.dumps(metadata, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _decode(encoded: Optional[bytes]) -> dict[str, Any]:
+    return json.loads(encoded) if encoded else {}
@@ -14,6 +14,7 @@ Date: 2026-02-11
 Version: 2.0.0 (Story 6.3 - Interface abstraite)
 """
 
+import json
 import logging
 import os
 import uuid
@@ -22,6 +23,8 @@ from typing import Any, Optional
 
 import asyncpg
 
+from .embedding_bulk import EmbeddingRecord, bulk_upsert_embeddings
+from .graph_snapshot import GRAPH_SNAPSHOT_ENABLED, GraphSnapshot, GraphSnapshotError
 from .memorystore_interface import MemoryStore, NodeType, RelationType
 
 logger = logging.getLogger(__name__)
@@ -40,16 +43,31 @@ class PostgreSQLMemorystore(MemoryStore):
         - Recherche sémantique via cosine distance (<=>)
     """
 
-    def __init__(self, db_pool: asyncpg.Pool):
+    def __init__(self, db_pool: asyncpg.Pool, graph_snapshot: Optional[GraphSnapshot] = None):
         """
         Initialise l'adaptateur memorystore.
 
         Args:
             db_pool: Pool de connexions PostgreSQL (avec extension pgvector)
+            graph_snapshot: Snapshot mémoire du graphe (optionnel) : sert
+                get_related_nodes / query_path sans requête SQL quand il est prêt
         """
         self.db_pool = db_pool
+        self.graph_snapshot = graph_snapshot
         self._pgvector_initialized = False
 
+    @property
+    def _snapshot(self) -> Optional[GraphSnapshot]:
+        """Snapshot utilisable (None = requêtes SQL)."""
+        if self.graph_snapshot is not None and self.graph_snapshot.ready:
+            return self.graph_snapshot
+        return None
+
+    async def close(self) -> None:
+        """Arrête le snapshot (connexion LISTEN rendue au pool, tâches annulées)."""
+        if self.graph_snapshot is not None:
+            await self.graph_snapshot.stop()
+
     async def init_pgvector(self) -> None:
         """
         Vérifie que l'extension pgvector est installée.
@@ -88,7 +106,9 @@ class PostgreSQLMemorystore(MemoryStore):
             source: Source du nœud (backward compatibility, deprecated)
 
         Returns:
-            UUID du nœud créé (string)
+            UUID du nœud créé (string). Types dédupliqués (person, document,
+            entity) : si la clé de déduplication existe déjà (migration 046),
+            UUID du nœud existant, métadonnées fusionnées
 
         Raises:
             ValueError: Si node_type n'est pas dans NodeType enum
@@ -104,9 +124,11 @@ class PostgreSQLMemorystore(MemoryStore):
         async with self.db_pool.acquire() as conn:
             # 1. Créer nœud dans PostgreSQL knowledge.nodes
             created_id = await conn.fetchval(
-                """
-                INSERT INTO knowledge.nodes (id, type, name, metadata, created_at, updated_at)
-                VALUES ($1, $2, $3, $4, $5, $6)
+                f"""
+                INSERT INTO knowledge.nodes
+                (id, type, name, metadata, created_at, updated_at, dedup_key)
+                VALUES ($1, $2, $3, $4, $5, $6, $7)
+                {_NODE_CONFLICT_CLAUSE}
                 RETURNING id
                 """,
                 node_id,
@@ -115,13 +137,17 @@ class PostgreSQLMemorystore(MemoryStore):
                 metadata,
                 now,
                 now,
+                _dedup_key(node_type, name, metadata),
             )
 
             logger.info("Created node: %s (%s)", name, node_type)
 
+            if self._snapshot:
+                self._snapshot.upsert_node(str(created_id), node_type, name, metadata)
+
             # 2. Si embedding fourni, stocker dans pgvector
             if embedding:
-                await self._store_embedding(conn, node_id, node_type, embedding, metadata)
+                await self._store_embedding(conn, str(created_id), node_type, embedding, metadata)
 
         return str(created_id)
 
@@ -139,6 +165,7 @@ class PostgreSQLMemorystore(MemoryStore):
         - Pour type=person : match sur metadata.email si présent, sinon nom exact
         - Pour type=document : match sur metadata.source_id
         - Pour type=topic : match sur nom exact (case-insensitive)
+        - Création : ON CONFLICT sur dedup_key (migration 046, cf. create_node)
 
         Args:
             node_type: Type de nœud
@@ -332,8 +359,159 @@ class PostgreSQLMemorystore(MemoryStore):
             to_node_id[:8],
         )
 
+        if self._snapshot:
+            self._snapshot.add_edge(
+                str(created_id), from_node_id, to_node_id, relation_type, metadata
+            )
+
         return str(created_id)
 
+    async def upsert_subgraph(
+        self,
+        nodes: list[dict[str, Any]],
+        edges: Optional[list[dict[str, Any]]] = None,
+    ) -> dict[str, Any]:
+        """
+        Upsert d'un sous-graphe complet : 2 requêtes (nœuds puis edges), 1 transaction.
+
+        Nœuds : INSERT ... SELECT FROM unnest(...) ON CONFLICT (type, dedup_key)
+        (migration 046). Un nœud déjà connu garde son id et son nom, ses
+        métadonnées sont fusionnées. Edges : ON CONFLICT (from, to, relation_type),
+        métadonnées fusionnées.
+
+        Args:
+            nodes: [{key, type, name, metadata?, source?}, ...] — key = identifiant
+                local référencé par les edges
+            edges: [{from, to, relation_type, metadata?}, ...] — from/to = key
+                d'un nœud de `nodes` ou UUID d'un nœud existant
+
+        Returns:
+            {"nodes": {key: node_id}, "edges": [edge_id, ...]} (edges dans
+            l'ordre d'entrée ; doublons fusionnés → même id)
+
+        Raises:
+            ValueError: Type de nœud/relation invalide, key dupliquée, extrémité
+                d'edge ni key ni UUID
+        """
+        edges = edges or []
+        valid_types = [t.value for t in NodeType]
+        valid_relations = [r.value for r in RelationType]
+
+        # 1. Nœuds : dédup locale sur (type, dedup_key) — ON CONFLICT ne peut
+        #    pas toucher deux fois la même ligne dans un même INSERT
+        node_rows: list[list[Any]] = []  # [id, type, name, metadata, source, dedup_key]
+        row_by_dedup: dict[tuple[str, str], int] = {}
+        row_by_key: dict[str, int] = {}
+        for node in nodes:
+            key, node_type, name = node["key"], node["type"], node["name"]
+            if node_type not in valid_types:
+                raise ValueError(f"Invalid node_type '{node_type}'. Must be one of: {valid_types}")
+            if key in row_by_key:
+                raise ValueError(f"Duplicate node key '{key}'")
+
+            metadata = node.get("metadata") or {}
+            dedup_key = _dedup_key(node_type, name, metadata)
+            index = row_by_dedup.get((node_type, dedup_key)) if dedup_key else None
+            if index is None:
+                index = len(node_rows)
+                node_rows.append(
+                    [
+                        str(uuid.uuid4()),
+                        node_type,
+                        name,
+                        dict(metadata),
+                        node.get("source"),
+                        dedup_key,
+                    ]
+                )
+                if dedup_key:
+                    row_by_dedup[(node_type, dedup_key)] = index
+            else:
+                node_rows[index][3].update(metadata)
+            row_by_key[key] = index
+
+        for edge in edges:
+            if edge["relation_type"] not in valid_relations:
+                raise ValueError(
+                    f"Invalid relation_type '{edge['relation_type']}'. "
+                    f"Must be one of: {valid_relations}"
+                )
+            for ref in (edge["from"], edge["to"]):
+                if ref not in row_by_key:
+                    _as_node_uuid(ref)
+
+        async with self.db_pool.acquire() as conn:
+            async with conn.transaction():
+                upserted_nodes = []
+                if node_rows:
+                    upserted_nodes = await conn.fetch(
+                        _UPSERT_NODES_QUERY,
+                        [row[0] for row in node_rows],
+                        [row[1] for row in node_rows],
+                        [row[2] for row in node_rows],
+                        [json.dumps(row[3]) for row in node_rows],
+                        [row[4] for row in node_rows],
+                        [row[5] for row in node_rows],
+                    )
+
+                # Conflit → id du nœud existant (retrouvé par sa clé de dédup)
+                existing = {
+                    (row["type"], row["dedup_key"]): str(row["id"])
+                    for row in upserted_nodes
+                    if row["dedup_key"]
+                }
+                row_ids = [existing.get((row[1], row[5]), row[0]) for row in node_rows]
+                node_ids = {key: row_ids[index] for key, index in row_by_key.items()}
+
+                # 2. Edges : extrémités résolues, dédup locale sur (from, to, relation)
+                edge_rows: dict[tuple[str, str, str], dict[str, Any]] = {}
+                edge_keys = []
+                for edge in edges:
+                    from_id = node_ids.get(edge["from"]) or str(edge["from"])
+                    to_id = node_ids.get(edge["to"]) or str(edge["to"])
+                    edge_key = (from_id, to_id, edge["relation_type"])
+                    edge_rows.setdefault(edge_key, {}).update(edge.get("metadata") or {})
+                    edge_keys.append(edge_key)
+
+                upserted_edges = []
+                if edge_rows:
+                    upserted_edges = await conn.fetch(
+                        _UPSERT_EDGES_QUERY,
+                        [str(uuid.uuid4()) for _ in edge_rows],
+                        [key[0] for key in edge_rows],
+                        [key[1] for key in edge_rows],
+                        [key[2] for key in edge_rows],
+                        [json.dumps(metadata) for metadata in edge_rows.values()],
+                    )
+
+        edge_ids = {
+            (str(row["from_node_id"]), str(row["to_node_id"]), row["relation_type"]): str(row["id"])
+            for row in upserted_edges
+        }
+
+        logger.info(
+            "Upserted subgraph: %d nodes (%d keys), %d edges",
+            len(node_rows),
+            len(row_by_key),
+            len(edge_rows),
+        )
+
+        if self._snapshot:
+            for row in upserted_nodes:
+                self._snapshot.upsert_node(
+                    str(row["id"]), row["type"], row["name"], row["metadata"]
+                )
+            for row in upserted_edges:
+                self._snapshot.add_edge(
+                    str(row["id"]),
+                    str(row["from_node_id"]),
+                    str(row["to_node_id"]),
+                    row["relation_type"],
+                    row["metadata"],
+                )
+
+        return {"nodes": node_ids, "edges": [edge_ids.get(key) for key in edge_keys]}
+
     async def _store_embedding(
         self,
         conn: asyncpg.Connection,
@@ -355,11 +533,15 @@ class PostgreSQLMemorystore(MemoryStore):
         # pgvector attend un string format '[0.1, 0.2, ...]'
         vector_str = "[" + ",".join(str(v) for v in embedding) + "]"
 
+        # Upsert : re-stocker l'embedding d'un nœud remplace le vecteur (migration 044)
         await conn.execute(
             """
             INSERT INTO knowledge.embeddings
-            (source_type, source_id, embedding, metadata)
-            VALUES ($1, $2, $3::vector, $4)
+            (source_type, source_id, chunk_index, embedding, metadata)
+            VALUES ($1, $2, 0, $3::vector, $4)
+            ON CONFLICT (source_type, source_id, chunk_index) DO UPDATE
+            SET embedding = EXCLUDED.embedding,
+                metadata = EXCLUDED.metadata
             """,
             source_type,
             source_id,
@@ -369,6 +551,23 @@ class PostgreSQLMemorystore(MemoryStore):
 
         logger.debug("Stored embedding for node: %s", source_id)
 
+    async def store_embeddings_bulk(
+        self, records: list[EmbeddingRecord], rebuild_index: bool = False
+    ) -> int:
+        """
+        Stocke un lot d'embeddings (COPY binaire + upsert, voir embedding_bulk).
+
+        Args:
+            records: Lignes (source_type, source_id, chunk_index, embedding, ...)
+            rebuild_index: True = DROP/CREATE de l'index HNSW (gros backfills)
+
+        Returns:
+            Nombre de lignes insérées ou mises à jour
+        """
+        count = await bulk_upsert_embeddings(self.db_pool, records, rebuild_index=rebuild_index)
+        logger.info("Stored %d embeddings (bulk)", count)
+        return count
+
     async def semantic_search(
         self,
         query_embedding: list[float],
@@ -472,6 +671,9 @@ class PostgreSQLMemorystore(MemoryStore):
         Returns:
             Liste de nœuds [{id, type, name, metadata, relation_type}, ...]
         """
+        if self._snapshot:
+            return self._snapshot.get_related_nodes(node_id, direction, relation_type, limit)
+
         if direction == "out":
             query = """
                 SELECT n.id, n.type, n.name, n.metadata, e.relation_type
@@ -575,6 +777,9 @@ class PostgreSQLMemorystore(MemoryStore):
         """
         Récupère un nœud avec ses relations sur N niveaux de profondeur.
 
+        Traversée côté serveur (WITH RECURSIVE) : 2 requêtes quelle que soit la
+        profondeur, au lieu de 2 requêtes par nœud visité.
+
         Args:
             node_id: UUID du nœud racine
             depth: Profondeur de récursion (1 = relations directes uniquement)
@@ -599,101 +804,335 @@ class PostgreSQLMemorystore(MemoryStore):
             "created_at": node_row["created_at"],
         }
 
-        # Récupérer relations sortantes (depth = 1)
-        edges_out = await self.get_related_nodes(node_id, direction="out")
-
-        # Récupérer relations entrantes (depth = 1)
-        edges_in = await self.get_related_nodes(node_id, direction="in")
+        # Relations (out + in) de tous les nœuds à développer, en une requête
+        rows = await self.db_pool.fetch(
+            _NEIGHBORHOOD_QUERY, node_id, max(depth, 1) - 1, GRAPH_RELATIONS_LIMIT
+        )
 
-        result = {"node": node, "edges_out": edges_out, "edges_in": edges_in}
+        nodes: dict[str, dict[str, Any]] = {node["id"]: node}
+        relations: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        for row in rows:
+            related_id = str(row["id"])
+            nodes.setdefault(
+                related_id,
+                {
+                    "id": related_id,
+                    "type": row["type"],
+                    "name": row["name"],
+                    "metadata": row["metadata"],
+                    "created_at": row["created_at"],
+                },
+            )
+            relations.setdefault((str(row["anchor_id"]), row["direction"]), []).append(
+                {
+                    "id": related_id,
+                    "type": row["type"],
+                    "name": row["name"],
+                    "metadata": row["metadata"],
+                    "relation_type": row["relation_type"],
+                }
+            )
 
-        # Si depth > 1, récursion sur les nœuds liés
-        if depth > 1:
-            for rel in edges_out:
-                rel["children"] = await self.get_node_with_relations(rel["id"], depth - 1)
-            for rel in edges_in:
-                rel["children"] = await self.get_node_with_relations(rel["id"], depth - 1)
+        def _expand(current_id: str, remaining: int) -> dict[str, Any]:
+            result = {
+                "node": dict(nodes[current_id]),
+                "edges_out": [dict(rel) for rel in relations.get((current_id, "out"), [])],
+                "edges_in": [dict(rel) for rel in relations.get((current_id, "in"), [])],
+            }
+            # Si depth > 1, développer les nœuds liés (même forme que la récursion d'origine)
+            if remaining > 1:
+                for rel in result["edges_out"] + result["edges_in"]:
+                    rel["children"] = _expand(rel["id"], remaining - 1)
+            return result
 
-        return result
+        return _expand(node["id"], depth)
 
     async def query_path(
-        self, from_node_id: str, to_node_id: str, max_depth: int = 3
+        self,
+        from_node_id: str,
+        to_node_id: str,
+        max_depth: int = 3,
+        relation_types: Optional[list[str]] = None,
+        direction: str = "out",
+        bidirectional: bool = False,
     ) -> list[dict[str, Any]]:
         """
-        Trouve le chemin le plus court entre deux nœuds (BFS).
+        Trouve le chemin le plus court entre deux nœuds (BFS côté serveur).
+
+        Une seule requête WITH RECURSIVE : BFS par niveaux (dédup (nœud, profondeur)
+        → pas d'explosion sur les cycles ni sur les graphes denses), puis
+        reconstruction du chemin par remontée des prédécesseurs.
 
         Args:
             from_node_id: UUID du nœud source
             to_node_id: UUID du nœud cible
             max_depth: Profondeur maximale de recherche
+            relation_types: Types de relations autorisés (None = tous)
+            direction: "out" (suivre le sens des edges) ou "both" (non orienté)
+            bidirectional: True = recherche depuis les deux extrémités, jonction
+                au milieu (max_depth/2 de chaque côté, pour les graphes denses)
 
         Returns:
             Liste d'edges formant le chemin [{relation_type, from_node_id, to_node_id}, ...]
         """
-        # Cas simple : connexion directe
-        direct_edge = await self.db_pool.fetchrow(
-            """
-            SELECT id, from_node_id, to_node_id, relation_type, metadata
-            FROM knowledge.edges
-            WHERE from_node_id = $1 AND to_node_id = $2
-            LIMIT 1
-            """,
+        if direction not in _TRAVERSAL_ORIENTATIONS:
+            raise ValueError(f"Invalid direction '{direction}'. Must be 'out' or 'both'")
+
+        if max_depth < 1 or str(from_node_id) == str(to_node_id):
+            return []
+
+        if self._snapshot:
+            return self._snapshot.query_path(
+                from_node_id, to_node_id, max_depth, relation_types, direction, bidirectional
+            )
+
+        if bidirectional:
+            forward_depth = (max_depth + 1) // 2
+            backward_depth = max_depth - forward_depth
+        else:
+            forward_depth, backward_depth = max_depth, 0
+
+        rows = await self.db_pool.fetch(
+            _path_query(direction),
             from_node_id,
             to_node_id,
+            forward_depth,
+            backward_depth,
+            relation_types,
         )
 
-        if direct_edge:
-            return [
-                {
-                    "id": str(direct_edge["id"]),
-                    "from_node_id": str(direct_edge["from_node_id"]),
-                    "to_node_id": str(direct_edge["to_node_id"]),
-                    "relation_type": direct_edge["relation_type"],
-                    "metadata": direct_edge["metadata"],
-                }
-            ]
+        return [
+            {
+                "id": str(row["id"]),
+                "from_node_id": str(row["from_node_id"]),
+                "to_node_id": str(row["to_node_id"]),
+                "relation_type": row["relation_type"],
+                "metadata": row["metadata"],
+            }
+            for row in rows
+        ]
 
-        # Cas complexe : BFS pour trouver chemin multi-hop
-        from collections import deque
 
-        queue = deque([([from_node_id], [])])  # (nodes_path, edges_path)
+# ============================================================
+# Traversée graphe (WITH RECURSIVE)
+# ============================================================
 
-        visited = {from_node_id}
+GRAPH_RELATIONS_LIMIT = 100  # Relations max par nœud et par sens (= get_related_nodes)
+
+# Orientations (colonne d'ancrage, colonne voisine) suivies depuis chaque extrémité :
+# (recherche avant depuis la source, recherche arrière depuis la cible)
+_TRAVERSAL_ORIENTATIONS = {
+    "out": (
+        [("from_node_id", "to_node_id")],
+        [("to_node_id", "from_node_id")],
+    ),
+    "both": (
+        [("from_node_id", "to_node_id"), ("to_node_id", "from_node_id")],
+        [("to_node_id", "from_node_id"), ("from_node_id", "to_node_id")],
+    ),
+}
+
+_RELATION_FILTER = "($5::text[] IS NULL OR e.relation_type = ANY($5::text[]))"
+
+# Relations out/in de chaque nœud à moins de $2 sauts de la racine ($1)
+_NEIGHBORHOOD_QUERY = """
+    WITH RECURSIVE reach(node_id, depth) AS (
+        SELECT $1::uuid, 0
+        UNION
+        SELECT n.next_id, r.depth + 1
+        FROM reach r
+        CROSS JOIN LATERAL (
+            SELECT e.to_node_id AS next_id FROM knowledge.edges e
+            WHERE e.from_node_id = r.node_id
+            UNION ALL
+            SELECT e.from_node_id FROM knowledge.edges e
+            WHERE e.to_node_id = r.node_id
+        ) n
+        WHERE r.depth < $2
+    ),
+    expanded AS (SELECT DISTINCT node_id FROM reach)
+    SELECT x.node_id AS anchor_id, 'out' AS direction, rel.relation_type,
+           n.id, n.type, n.name, n.metadata, n.created_at
+    FROM expanded x
+    CROSS JOIN LATERAL (
+        SELECT e.to_node_id AS other_id, e.relation_type FROM knowledge.edges e
+        WHERE e.from_node_id = x.node_id
+        LIMIT $3
+    ) rel
+    JOIN knowledge.nodes n ON n.id = rel.other_id
+    UNION ALL
+    SELECT x.node_id, 'in', rel.relation_type,
+           n.id, n.type, n.name, n.metadata, n.created_at
+    FROM expanded x
+    CROSS JOIN LATERAL (
+        SELECT e.from_node_id AS other_id, e.relation_type FROM knowledge.edges e
+        WHERE e.to_node_id = x.node_id
+        LIMIT $3
+    ) rel
+    JOIN knowledge.nodes n ON n.id = rel.other_id
+"""
 
-        while queue:
-            nodes_path, edges_path = queue.popleft()
-            current_node = nodes_path[-1]
 
-            if len(nodes_path) > max_depth + 1:
-                continue
+def _steps(orientations: list[tuple[str, str]], anchor: str, column: str) -> str:
+    """
+    Sous-requête des pas possibles depuis/vers un nœud.
+
+    column="anchor" : voisins de `anchor` (next_id) ; column="next" : prédécesseurs
+    de `anchor` (prev_id) pour la remontée du chemin.
+    """
+    selects = []
+    for anchor_col, next_col in orientations:
+        if column == "anchor":
+            selects.append(
+                f"SELECT e.id AS edge_id, e.{next_col} AS next_id FROM knowledge.edges e "
+                f"WHERE e.{anchor_col} = {anchor} AND {_RELATION_FILTER}"
+            )
+        else:
+            selects.append(
+                f"SELECT e.id AS edge_id, e.{anchor_col} AS prev_id FROM knowledge.edges e "
+                f"WHERE e.{next_col} = {anchor} AND {_RELATION_FILTER}"
+            )
+    return " UNION ALL ".join(selects)
 
-            # Explorer les voisins (relations sortantes)
-            neighbors = await self.get_related_nodes(current_node, direction="out")
 
-            for neighbor in neighbors:
-                neighbor_id = neighbor["id"]
+def _path_query(direction: str) -> str:
+    """
+    Plus court chemin $1 → $2 en une requête.
+
+    Paramètres: $1 source, $2 cible, $3 profondeur côté source, $4 profondeur
+    côté cible (0 = recherche unidirectionnelle), $5 types de relations (NULL = tous).
+    """
+    forward, backward = _TRAVERSAL_ORIENTATIONS[direction]
+    return f"""
+        WITH RECURSIVE
+        fwd(node_id, depth) AS (
+            SELECT $1::uuid, 0
+            UNION
+            SELECT n.next_id, r.depth + 1
+            FROM fwd r
+            CROSS JOIN LATERAL ({_steps(forward, "r.node_id", "anchor")}) n
+            WHERE r.depth < $3 AND r.node_id <> $2::uuid
+        ),
+        bwd(node_id, depth) AS (
+            SELECT $2::uuid, 0
+            UNION
+            SELECT n.next_id, r.depth + 1
+            FROM bwd r
+            CROSS JOIN LATERAL ({_steps(backward, "r.node_id", "anchor")}) n
+            WHERE r.depth < $4 AND r.node_id <> $1::uuid
+        ),
+        fdist AS (SELECT node_id, MIN(depth) AS depth FROM fwd GROUP BY node_id),
+        bdist AS (SELECT node_id, MIN(depth) AS depth FROM bwd GROUP BY node_id),
+        meet AS (
+            SELECT f.node_id, f.depth AS fdepth, b.depth AS bdepth
+            FROM fdist f JOIN bdist b USING (node_id)
+            WHERE f.depth + b.depth > 0
+            ORDER BY f.depth + b.depth, f.depth
+            LIMIT 1
+        ),
+        fback(node_id, depth, edge_id) AS (
+            SELECT node_id, fdepth, NULL::uuid FROM meet
+            UNION ALL
+            SELECT p.prev_id, b.depth - 1, p.edge_id
+            FROM fback b
+            CROSS JOIN LATERAL (
+                SELECT s.edge_id, s.prev_id
+                FROM ({_steps(forward, "b.node_id", "next")}) s
+                JOIN fdist d ON d.node_id = s.prev_id AND d.depth = b.depth - 1
+                WHERE s.prev_id <> $2::uuid
+                ORDER BY s.edge_id
+                LIMIT 1
+            ) p
+            WHERE b.depth > 0
+        ),
+        bback(node_id, depth, edge_id) AS (
+            SELECT node_id, bdepth, NULL::uuid FROM meet
+            UNION ALL
+            SELECT p.prev_id, b.depth - 1, p.edge_id
+            FROM bback b
+            CROSS JOIN LATERAL (
+                SELECT s.edge_id, s.prev_id
+                FROM ({_steps(backward, "b.node_id", "next")}) s
+                JOIN bdist d ON d.node_id = s.prev_id AND d.depth = b.depth - 1
+                WHERE s.prev_id <> $1::uuid
+                ORDER BY s.edge_id
+                LIMIT 1
+            ) p
+            WHERE b.depth > 0
+        ),
+        path_edges(edge_id, position) AS (
+            SELECT edge_id, depth FROM fback WHERE edge_id IS NOT NULL
+            UNION ALL
+            SELECT bb.edge_id, m.fdepth + m.bdepth - 1 - bb.depth
+            FROM bback bb CROSS JOIN meet m
+            WHERE bb.edge_id IS NOT NULL
+        )
+        SELECT e.id, e.from_node_id, e.to_node_id, e.relation_type, e.metadata
+        FROM path_edges pe
+        JOIN knowledge.edges e ON e.id = pe.edge_id
+        ORDER BY pe.position
+    """
+
 
-                if neighbor_id == to_node_id:
-                    # Chemin trouvé !
-                    final_edge = {
-                        "from_node_id": current_node,
-                        "to_node_id": neighbor_id,
-                        "relation_type": neighbor["relation_type"],
-                        "metadata": neighbor.get("metadata", {}),
-                    }
-                    return edges_path + [final_edge]
+# ============================================================
+# Upsert bulk (sous-graphe)
+# ============================================================
+
+# Cible = index UNIQUE partiel idx_nodes_dedup_key (migration 046). Un nœud
+# existant garde id et nom ; ses métadonnées sont complétées.
+_NODE_CONFLICT_CLAUSE = """
+    ON CONFLICT (type, dedup_key) WHERE dedup_key IS NOT NULL DO UPDATE
+    SET metadata = COALESCE(knowledge.nodes.metadata, '{}'::jsonb) || EXCLUDED.metadata
+"""
+
+_UPSERT_NODES_QUERY = f"""
+    INSERT INTO knowledge.nodes
+    (id, type, name, metadata, source, dedup_key, created_at, updated_at)
+    SELECT input.id, input.type, input.name, input.metadata::jsonb, input.source,
+           input.dedup_key, NOW(), NOW()
+    FROM unnest($1::uuid[], $2::text[], $3::text[], $4::text[], $5::text[], $6::text[])
+        AS input(id, type, name, metadata, source, dedup_key)
+    {_NODE_CONFLICT_CLAUSE}
+    RETURNING id, type, name, metadata, dedup_key
+"""
+
+_UPSERT_EDGES_QUERY = """
+    INSERT INTO knowledge.edges
+    (id, from_node_id, to_node_id, relation_type, metadata, created_at)
+    SELECT input.id, input.from_node_id, input.to_node_id, input.relation_type,
+           input.metadata::jsonb, NOW()
+    FROM unnest($1::uuid[], $2::uuid[], $3::uuid[], $4::text[], $5::text[])
+        AS input(id, from_node_id, to_node_id, relation_type, metadata)
+    ON CONFLICT (from_node_id, to_node_id, relation_type) DO UPDATE
+    SET metadata = COALESCE(knowledge.edges.metadata, '{}'::jsonb) || EXCLUDED.metadata
+    RETURNING id, from_node_id, to_node_id, relation_type, metadata
+"""
+
+
+def _dedup_key(node_type: str, name: str, metadata: dict[str, Any]) -> Optional[str]:
+    """
+    Clé de déduplication d'un nœud (miroir du backfill de la migration 046).
+
+    person → email, document → source_id, entity → entity_type:nom.
+    None = type jamais dédupliqué (email, event, task...) ou clé absente.
+    """
+    if node_type == NodeType.PERSON.value:
+        key = str(metadata.get("email") or "").lower()
+    elif node_type == NodeType.DOCUMENT.value:
+        key = str(metadata.get("source_id") or "")
+    elif node_type == NodeType.ENTITY.value:
+        key = f"{metadata.get('entity_type') or ''}:{name}".lower()
+    else:
+        return None
+    return key or None
 
-                if neighbor_id not in visited:
-                    visited.add(neighbor_id)
-                    new_edge = {
-                        "from_node_id": current_node,
-                        "to_node_id": neighbor_id,
-                        "relation_type": neighbor["relation_type"],
-                        "metadata": neighbor.get("metadata", {}),
-                    }
-                    queue.append((nodes_path + [neighbor_id], edges_path + [new_edge]))
 
-        return []  # Aucun chemin trouvé
+def _as_node_uuid(ref: Any) -> str:
+    """Extrémité d'edge hors sous-graphe : doit être l'UUID d'un nœud existant."""
+    try:
+        return str(uuid.UUID(str(ref)))
+    except ValueError:
+        raise ValueError(f"Unknown edge endpoint '{ref}': not a node key nor a UUID") from None
 
 
 # ============================================================
@@ -735,7 +1174,18 @@ async def get_memorystore_adapter(
             pool = await asyncpg.create_pool(database_url, min_size=2, max_size=10)
             logger.info("memorystore_pool_created", provider="postgresql")
 
-        adapter = PostgreSQLMemorystore(pool)
+        graph_snapshot = None
+        if GRAPH_SNAPSHOT_ENABLED:
+            graph_snapshot = GraphSnapshot(pool)
+            try:
+                await graph_snapshot.load()
+                await graph_snapshot.start_listening()
+            except GraphSnapshotError as e:
+                # Graphe trop gros : requêtes SQL uniquement
+                logger.warning("Graph snapshot disabled: %s", e)
+                graph_snapshot = None
+
+        adapter = PostgreSQLMemorystore(pool, graph_snapshot=graph_snapshot)
         await adapter.init_pgvector()
 
         logger.info(
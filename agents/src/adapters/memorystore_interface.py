@@ -244,6 +244,40 @@ class MemoryStore(ABC):
             )
         """
 
+    @abstractmethod
+    async def upsert_subgraph(
+        self,
+        nodes: list[dict[str, Any]],
+        edges: Optional[list[dict[str, Any]]] = None,
+    ) -> dict[str, Any]:
+        """
+        Crée ou met à jour un sous-graphe (nœuds + edges) en une transaction.
+
+        Déduplication des nœuds identique à get_or_create_node ; les edges déjà
+        présentes (from, to, relation_type) sont mises à jour.
+
+        Args:
+            nodes: [{key, type, name, metadata?, source?}, ...] (key = identifiant local)
+            edges: [{from, to, relation_type, metadata?}, ...] (from/to = key ou UUID existant)
+
+        Returns:
+            {"nodes": {key: node_id}, "edges": [edge_id, ...]}
+
+        Raises:
+            ValueError: Si type de nœud ou de relation invalide
+
+        Example:
+            result = await adapter.upsert_subgraph(
+                nodes=[
+                    {"key": "email", "type": "email", "name": "RE: Projet", "metadata": {}},
+                    {"key": "sender", "type": "person", "name": "Antonio",
+                     "metadata": {"email": "antonio@example.com"}},
+                ],
+                edges=[{"from": "email", "to": "sender", "relation_type": "sent_by"}],
+            )
+            email_node_id = result["nodes"]["email"]
+        """
+
     @abstractmethod
     async def get_edges_by_type(self, relation_type: str, limit: int = 100) -> list[dict[str, Any]]:
         """
@@ -322,7 +356,13 @@ class MemoryStore(ABC):
 
     @abstractmethod
     async def query_path(
-        self, from_node_id: str, to_node_id: str, max_depth: int = 3
+        self,
+        from_node_id: str,
+        to_node_id: str,
+        max_depth: int = 3,
+        relation_types: Optional[list[str]] = None,
+        direction: str = "out",
+        bidirectional: bool = False,
     ) -> list[dict[str, Any]]:
         """
         Trouve le chemin le plus court entre deux nœuds (BFS).
@@ -331,6 +371,9 @@ class MemoryStore(ABC):
             from_node_id: UUID du nœud source
             to_node_id: UUID du nœud cible
             max_depth: Profondeur maximale de recherche (default: 3)
+            relation_types: Types de relations autorisés (None = tous)
+            direction: "out" (sens des edges) ou "both" (graphe non orienté)
+            bidirectional: Recherche depuis les deux extrémités (graphes denses)
 
         Returns:
             Liste d'edges formant le chemin [{relation_type, from_node_id, to_node_id}, ...]
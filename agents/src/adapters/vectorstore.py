@@ -34,12 +34,18 @@ Date: 2026-02-11
 Version: 1.0.0 (Story 6.2)
 """
 
+import asyncio
 import os
+import time
 from abc import ABC, abstractmethod
+from collections import deque
 from typing import Any, Optional
 
 import asyncpg
 import structlog
+from agents.src.adapters.ann_search import bounded_count_sql, fetch_nearest, source_type_predicate
+from agents.src.adapters.embedding_bulk import EmbeddingRecord, bulk_upsert_embeddings
+from agents.src.adapters.embedding_cache import EmbeddingCache
 from agents.src.tools.anonymize import AnonymizationError, anonymize_text
 from pydantic import BaseModel, Field
 
@@ -55,8 +61,13 @@ logger = structlog.get_logger(__name__)
 # Voyage AI constants
 VOYAGE_MODEL_DEFAULT = "voyage-4-large"
 VOYAGE_DIMENSIONS_DEFAULT = 1024
-VOYAGE_BATCH_MAX_TEXTS = 50  # Limite batch API Voyage
-VOYAGE_RATE_LIMIT_RPM = 300  # Requests per minute
+VOYAGE_BATCH_MAX_TEXTS = 50  # Textes max par requête Voyage (embed() découpe au-delà)
+VOYAGE_RATE_LIMIT_RPM = int(os.getenv("VOYAGE_RATE_LIMIT_RPM", "300"))  # Requests per minute
+# Budget tokens par requête (limite API voyage-4-large: 120k) - estimation chars/token
+VOYAGE_BATCH_MAX_TOKENS = int(os.getenv("VOYAGE_BATCH_MAX_TOKENS", "100000"))
+VOYAGE_CHARS_PER_TOKEN_ESTIMATE = 3  # Conservateur pour le français
+# Requêtes Voyage simultanées max pour un même embed() (threads)
+VOYAGE_MAX_CONCURRENT_BATCHES = int(os.getenv("VOYAGE_MAX_CONCURRENT_BATCHES", "4"))
 
 # PostgreSQL pgvector constants
 PGVECTOR_SEARCH_TOP_K_MAX = 100  # Limite recherche pour performance
@@ -80,7 +91,8 @@ class EmbeddingRequest(BaseModel):
     """Requête génération embeddings"""
 
     texts: list[str] = Field(
-        ..., description=f"Textes à embedder (max {VOYAGE_BATCH_MAX_TEXTS} batch Voyage)"
+        ...,
+        description=f"Textes à embedder (découpés en batches de {VOYAGE_BATCH_MAX_TEXTS})",
     )
     model: str = Field(default=VOYAGE_MODEL_DEFAULT, description="Modèle embeddings")
     anonymize: bool = Field(default=True, description="Appliquer anonymisation Presidio")
@@ -132,7 +144,7 @@ class VectorStoreAdapter(ABC):
         Générer embeddings pour liste de textes.
 
         Args:
-            texts: Textes à embedder (max 50 pour batch Voyage)
+            texts: Textes à embedder (découpage en batches géré par l'adapter)
             anonymize: Si True, applique Presidio AVANT envoi au provider
 
         Returns:
@@ -198,6 +210,76 @@ class VectorStoreAdapter(ABC):
         """Fermer connexions proprement"""
 
 
+# ============================================================
+# Rate limiting + découpage batches Voyage
+# ============================================================
+
+
+class RateLimiter:
+    """
+    Fenêtre glissante N requêtes / 60s (budget RPM Voyage, partagé par process).
+
+    Pas de verrou : la vérification et l'enregistrement se font sans await
+    intermédiaire, donc atomiques pour l'event loop.
+    """
+
+    def __init__(self, requests_per_minute: int, window_seconds: float = 60.0):
+        self.requests_per_minute = requests_per_minute
+        self.window_seconds = window_seconds
+        self._timestamps: deque = deque()
+
+    async def acquire(self) -> None:
+        """Attend qu'un slot soit disponible dans la fenêtre puis le réserve."""
+        while True:
+            now = time.monotonic()
+            while self._timestamps and now - self._timestamps[0] >= self.window_seconds:
+                self._timestamps.popleft()
+
+            if len(self._timestamps) < self.requests_per_minute:
+                self._timestamps.append(now)
+                return
+
+            wait = self.window_seconds - (now - self._timestamps[0])
+            logger.debug("voyage_rate_limit_wait", wait_seconds=round(wait, 2))
+            await asyncio.sleep(wait)
+
+
+# Budget RPM commun à tous les VoyageAIAdapter du process (même clé API)
+_voyage_rate_limiter = RateLimiter(VOYAGE_RATE_LIMIT_RPM)
+
+
+def split_embedding_batches(
+    texts: list[str],
+    max_texts: int = VOYAGE_BATCH_MAX_TEXTS,
+    max_tokens: int = VOYAGE_BATCH_MAX_TOKENS,
+) -> list[list[str]]:
+    """
+    Découpe une liste de textes en batches Voyage (ordre conservé).
+
+    Chaque batch respecte max_texts et le budget tokens estimé
+    (len / VOYAGE_CHARS_PER_TOKEN_ESTIMATE). Un texte seul au-delà du budget
+    part dans son propre batch (Voyage tronque, truncation=True par défaut).
+
+    Returns:
+        Liste de batches, dont la concaténation == texts
+    """
+    batches: list[list[str]] = []
+    current: list[str] = []
+    current_tokens = 0
+
+    for text in texts:
+        tokens = len(text) // VOYAGE_CHARS_PER_TOKEN_ESTIMATE + 1
+        if current and (len(current) >= max_texts or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
 # ============================================================
 # Voyage AI Adapter
 # ============================================================
@@ -210,8 +292,10 @@ class VoyageAIAdapter:
     Features:
         - Batch API (-33% cost vs endpoint standard)
         - Multilingual (français supporté)
-        - Rate limits: 300 RPM
+        - Rate limits: 300 RPM (RateLimiter partagé par process)
         - Context: 32k tokens
+        - Client sync exécuté dans un thread (event loop jamais bloquée)
+        - Entrées longues découpées en batches parallèles, ordre conservé
     """
 
     def __init__(
@@ -263,26 +347,25 @@ class VoyageAIAdapter:
         """
         Générer embeddings via Voyage AI.
 
+        Les entrées sont découpées en batches (VOYAGE_BATCH_MAX_TEXTS textes,
+        VOYAGE_BATCH_MAX_TOKENS tokens estimés), envoyés en parallèle
+        (VOYAGE_MAX_CONCURRENT_BATCHES) sous le budget RPM. Un document de
+        200 pages = un seul appel embed().
+
         Args:
-            texts: Textes à embedder (max 50 batch)
+            texts: Textes à embedder (pas de limite, découpage automatique)
             anonymize: Si True, applique Presidio AVANT Voyage
 
         Returns:
-            EmbeddingResponse avec vecteurs
+            EmbeddingResponse avec vecteurs (même ordre que texts)
 
         Raises:
-            EmbeddingProviderError: Si Voyage API erreur
+            EmbeddingProviderError: Si Voyage API erreur (un batch suffit)
             AnonymizationError: Si Presidio down
         """
         if not texts:
             raise ValueError("texts ne peut pas être vide")
 
-        if len(texts) > VOYAGE_BATCH_MAX_TEXTS:
-            raise ValueError(
-                f"Batch max {VOYAGE_BATCH_MAX_TEXTS} textes (Voyage limit), reçu {len(texts)}. "
-                "Splittez en plusieurs batches."
-            )
-
         # Anonymisation RGPD obligatoire
         processed_texts = texts
         anonymization_applied = False
@@ -299,13 +382,13 @@ class VoyageAIAdapter:
                 anonymization_applied = True
 
                 # Fix Issue #6: Pas de double anonymisation - réutiliser résultats existants
-                pii_detected = any(len(r.entities) > 0 for r in anon_results)
+                pii_detected = any(len(r.entities_found) > 0 for r in anon_results)
 
                 logger.info(
                     "voyage_texts_anonymized",
                     count=len(texts),
                     pii_detected=pii_detected,
-                    pii_entities_total=sum(len(r.entities) for r in anon_results),
+                    pii_entities_total=sum(len(r.entities_found) for r in anon_results),
                 )
 
             except AnonymizationError as e:
@@ -315,24 +398,34 @@ class VoyageAIAdapter:
                 )
                 raise
 
-        # Appel Voyage API (batch endpoint)
+        # Appel Voyage API (batch endpoint), découpé + parallèle borné
+        batches = split_embedding_batches(processed_texts)
+        semaphore = asyncio.Semaphore(VOYAGE_MAX_CONCURRENT_BATCHES)
+
+        async def _embed_batch(batch: list[str]):
+            async with semaphore:
+                return await self._call_voyage(batch, input_type="document")
+
         try:
-            response = self.client.embed(
-                texts=processed_texts,
-                model=self.model,
-                input_type="document",  # "document" pour stockage, "query" pour recherche
+            responses = await asyncio.gather(*(_embed_batch(batch) for batch in batches))
+
+            embeddings = [vector for response in responses for vector in response.embeddings]
+            tokens_used = sum(
+                getattr(response, "total_tokens", len(batch) * 100)  # Estimation
+                for response, batch in zip(responses, batches)
             )
 
-            embeddings = response.embeddings
-            tokens_used = getattr(
-                response, "total_tokens", len(processed_texts) * 100
-            )  # Estimation
+            if len(embeddings) != len(processed_texts):
+                raise EmbeddingProviderError(
+                    f"Voyage returned {len(embeddings)} embeddings for {len(processed_texts)} texts"
+                )
 
             logger.info(
                 "voyage_embeddings_generated",
                 count=len(embeddings),
                 tokens=tokens_used,
                 model=self.model,
+                requests=len(batches),
             )
 
             # AC6: Track API usage pour budget monitoring
@@ -342,6 +435,7 @@ class VoyageAIAdapter:
                 metadata={
                     "model": self.model,
                     "batch_size": len(texts),
+                    "requests": len(batches),
                     "anonymized": anonymization_applied,
                 },
             )
@@ -381,7 +475,7 @@ class VoyageAIAdapter:
             query_text = query
 
         try:
-            response = self.client.embed(texts=[query_text], model=self.model, input_type="query")
+            response = await self._call_voyage([query_text], input_type="query")
 
             tokens_used = getattr(response, "total_tokens", 100)  # Estimation
 
@@ -398,6 +492,21 @@ class VoyageAIAdapter:
             logger.error("voyage_query_embed_error", error=str(e))
             raise EmbeddingProviderError(f"Voyage query embed error: {e}") from e
 
+    async def _call_voyage(self, texts: list[str], input_type: str):
+        """
+        Un appel Voyage (une requête HTTP) sous budget RPM.
+
+        Le client voyageai est synchrone : exécuté dans un thread pour ne pas
+        geler l'event loop pendant l'appel HTTP.
+        """
+        await _voyage_rate_limiter.acquire()
+        return await asyncio.to_thread(
+            self.client.embed,
+            texts=texts,
+            model=self.model,
+            input_type=input_type,  # "document" pour stockage, "query" pour recherche
+        )
+
     async def _track_api_usage(
         self,
         tokens_input: int,
@@ -470,7 +579,8 @@ class PgvectorStore:
     Features:
         - Index HNSW (m=16, ef_construction=64)
         - Cosine similarity (<=> operator)
-        - Filtres SQL (node_type, date_range, etc.)
+        - Filtres SQL (node_type, source_type, date_range) : scan exact ou
+          HNSW itératif selon sélectivité (ann_search.py)
         - CASCADE delete (FK constraint)
     """
 
@@ -483,6 +593,7 @@ class PgvectorStore:
         """
         self.pool = pool
         self._owns_pool = pool is None  # Si on crée le pool, on doit le fermer
+        self._embedding_cache: Optional[EmbeddingCache] = None
 
     async def _ensure_pool(self) -> asyncpg.Pool:
         """Assure que pool existe (lazy initialization)"""
@@ -497,6 +608,12 @@ class PgvectorStore:
 
         return self.pool
 
+    async def get_embedding_cache(self) -> EmbeddingCache:
+        """Cache content_hash → vecteur adossé à ce pool (LRU partagé par le store)."""
+        if self._embedding_cache is None:
+            self._embedding_cache = EmbeddingCache(db_pool=await self._ensure_pool())
+        return self._embedding_cache
+
     async def store(
         self, node_id: str, embedding: list[float], metadata: Optional[dict] = None
     ) -> None:
@@ -540,6 +657,25 @@ class PgvectorStore:
                 )
                 raise VectorStoreError(f"Échec stockage embedding: {e}") from e
 
+    async def store_many(self, records: list[EmbeddingRecord], rebuild_index: bool = False) -> int:
+        """
+        Stocker un lot d'embeddings (COPY binaire + upsert par batch).
+
+        Args:
+            records: Lignes à upserter sur (source_type, source_id, chunk_index)
+            rebuild_index: True = DROP/CREATE index HNSW autour du chargement
+
+        Returns:
+            Nombre de lignes insérées ou mises à jour
+        """
+        pool = await self._ensure_pool()
+
+        try:
+            return await bulk_upsert_embeddings(pool, records, rebuild_index=rebuild_index)
+        except Exception as e:
+            logger.error("pgvector_store_many_error", rows=len(records), error=str(e))
+            raise VectorStoreError(f"Échec stockage bulk embeddings: {e}") from e
+
     async def search(
         self,
         query_embedding: list[float],
@@ -552,7 +688,8 @@ class PgvectorStore:
         Args:
             query_embedding: Vecteur query ({VOYAGE_DIMENSIONS_DEFAULT} floats)
             top_k: Nombre résultats (max {PGVECTOR_SEARCH_TOP_K_MAX})
-            filters: Filtres {"node_type": "document", "date_range": {...}}
+            filters: Filtres {"node_type": "document", "source_type": "email",
+                "date_range": {...}}
 
         Returns:
             Liste SearchResult triés par similarity DESC
@@ -562,42 +699,30 @@ class PgvectorStore:
 
         pool = await self._ensure_pool()
 
-        # Construire WHERE clause depuis filtres
-        where_clauses = []
-        params = [query_embedding, top_k]
-
-        if filters:
-            if "node_type" in filters:
-                where_clauses.append(f"n.node_type = ${len(params) + 1}")
-                params.append(filters["node_type"])
-
-            if "date_range" in filters:
-                date_range = filters["date_range"]
-                if "start" in date_range:
-                    where_clauses.append(f"e.created_at >= ${len(params) + 1}")
-                    params.append(date_range["start"])
-                if "end" in date_range:
-                    where_clauses.append(f"e.created_at <= ${len(params) + 1}")
-                    params.append(date_range["end"])
+        # $1 = embedding, $2 = limit ; la requête COUNT numérote ses filtres depuis $1
+        where_sql, filter_params = self._build_filters(filters or {}, param_idx=3)
+        count_where_sql, _ = self._build_filters(filters or {}, param_idx=1)
+        params = [query_embedding, top_k, *filter_params]
 
-        where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+        # Schéma migré : embeddings.source_id = id du nœud, knowledge.nodes.type
+        from_sql = """
+            FROM knowledge.embeddings e
+            JOIN knowledge.nodes n ON n.id = e.source_id
+        """
 
-        query = f"""
-            SELECT
-                e.node_id,
+        columns = """
+                e.source_id::text AS node_id,
                 1 - (e.embedding <=> $1) AS similarity,
-                n.node_type,
+                n.type AS node_type,
                 e.metadata
-            FROM knowledge.embeddings e
-            JOIN knowledge.nodes n ON e.node_id = n.id
-            {where_sql}
-            ORDER BY e.embedding <=> $1
-            LIMIT $2
         """
+        count_sql = bounded_count_sql(from_sql + count_where_sql) if where_sql else None
 
         async with pool.acquire() as conn:
             try:
-                rows = await conn.fetch(query, *params)
+                rows = await fetch_nearest(
+                    conn, columns, from_sql + where_sql, params, top_k, count_sql, filter_params
+                )
 
                 results = [
                     SearchResult(
@@ -625,6 +750,48 @@ class PgvectorStore:
                 )
                 raise VectorStoreError(f"Échec recherche: {e}") from e
 
+    @staticmethod
+    def _build_filters(filters: dict, param_idx: int) -> tuple[str, list]:
+        """
+        Construit la clause WHERE des filtres.
+
+        Args:
+            filters: {"node_type", "source_type", "date_range": {"start", "end"}}
+            param_idx: Premier numéro de paramètre libre
+
+        Returns:
+            ("WHERE ..." ou "", paramètres)
+        """
+        where_clauses = []
+        params = []
+
+        if "node_type" in filters:
+            where_clauses.append(f"n.type = ${param_idx}")
+            params.append(filters["node_type"])
+            param_idx += 1
+
+        if "source_type" in filters:
+            # Littéral si index HNSW partiel (migration 048), sinon paramètre
+            predicate = source_type_predicate(filters["source_type"])
+            if predicate is None:
+                predicate = f"e.source_type = ${param_idx}"
+                params.append(filters["source_type"])
+                param_idx += 1
+            where_clauses.append(predicate)
+
+        date_range = filters.get("date_range") or {}
+        if "start" in date_range:
+            where_clauses.append(f"e.created_at >= ${param_idx}")
+            params.append(date_range["start"])
+            param_idx += 1
+        if "end" in date_range:
+            where_clauses.append(f"e.created_at <= ${param_idx}")
+            params.append(date_range["end"])
+            param_idx += 1
+
+        where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+        return where_sql, params
+
     async def delete(self, node_id: str) -> None:
         """
         Supprimer embedding(s) d'un nœud.
@@ -678,6 +845,24 @@ class CombinedVectorStoreAdapter(VectorStoreAdapter):
         """Délègue à PgvectorStore"""
         await self.pgvector.store(node_id, embedding, metadata)
 
+    async def store_many(self, records: list[EmbeddingRecord], rebuild_index: bool = False) -> int:
+        """Délègue à PgvectorStore (ingestion bulk)"""
+        return await self.pgvector.store_many(records, rebuild_index=rebuild_index)
+
+    async def get_embedding_cache(self) -> EmbeddingCache:
+        """Délègue à PgvectorStore (cache content_hash)"""
+        return await self.pgvector.get_embedding_cache()
+
+    @property
+    def model(self) -> str:
+        """Modèle embeddings du provider"""
+        return self.voyage.model
+
+    @property
+    def dimensions(self) -> int:
+        """Dimensions des vecteurs du provider"""
+        return self.voyage.dimensions
+
     async def search(
         self,
         query_embedding: list[float],
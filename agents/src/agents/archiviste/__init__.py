@@ -13,12 +13,13 @@ leve ImportError avec un message explicite.
 """
 
 from agents.src.agents.archiviste.metadata_extractor import MetadataExtractor
-from agents.src.agents.archiviste.models import MetadataExtraction, OCRResult, RenameResult
+from agents.src.agents.archiviste.models import MetadataExtraction, OCRPage, OCRResult, RenameResult
 from agents.src.agents.archiviste.ocr import SuryaOCREngine
 from agents.src.agents.archiviste.pipeline import OCRPipeline
 from agents.src.agents.archiviste.renamer import DocumentRenamer
 
 __all__ = [
+    "OCRPage",
     "OCRResult",
     "MetadataExtraction",
     "RenameResult",
@@ -3,8 +3,12 @@ Batch processor for processing folders of files.
 
 Features:
 - Recursive folder scan with filters
-- SHA256 deduplication (skip already processed)
-- Sequential processing with rate limiting (5 files/min)
+- SHA256 deduplication: threaded hashing pre-pass, (path, size, mtime) cache,
+  one bulk query against ingestion.document_metadata
+- Windowed processing: BATCH_MAX_IN_FLIGHT files in the pipeline at once,
+  with rate limiting (5 files/min by default)
+- Completion via Redis Streams (document.processed / pipeline.error, XREAD)
+  instead of polling PostgreSQL
 - Fail-safe error handling (continue on failure)
 - Pause/cancel support via bot_data
 - Progress tracking real-time
@@ -15,9 +19,12 @@ AC6: Error handling & retry
 
 import asyncio
 import hashlib
+import itertools
 import json
+import os
 import time
-from collections import deque
+from collections import OrderedDict, deque
+from contextlib import suppress
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -36,10 +43,23 @@ logger = structlog.get_logger(__name__)
 
 # Processing configuration
 PROCESSING_TIMEOUT = 300  # 5 min max per file
-RATE_LIMIT_MAX_FILES = 5  # 5 files per minute
+RATE_LIMIT_MAX_FILES = int(os.getenv("BATCH_RATE_LIMIT_MAX_FILES", "5"))  # files per window
 RATE_LIMIT_WINDOW = 60  # 60 seconds
 FAILURE_ALERT_THRESHOLD = 0.20  # Alert if >20% failures
 
+# Files in the pipeline at once (align with the number of OCR workers)
+BATCH_MAX_IN_FLIGHT = int(os.getenv("BATCH_MAX_IN_FLIGHT", "4"))
+
+# Dedup hashing: files read concurrently (thread pool)
+HASH_WORKERS = int(os.getenv("BATCH_HASH_WORKERS", "4"))
+# (path, size, mtime) -> SHA256 cache shared by batches (re-runs skip hashing)
+SHA256_CACHE_MAX_ENTRIES = 100_000
+
+# Completion events (published by OCRPipeline)
+PROCESSED_STREAM = "document.processed"
+ERROR_STREAM = "pipeline.error"
+COMPLETION_BLOCK_MS = 1000  # XREAD block duration
+
 
 # ============================================================================
 # Data Models
@@ -83,6 +103,29 @@ def compute_sha256(file_path: Path, chunk_size: int = 65536) -> str:
     return sha256.hexdigest()
 
 
+# str(path) -> (size, mtime_ns, sha256), LRU order
+_SHA256_CACHE: "OrderedDict[str, tuple[int, int, str]]" = OrderedDict()
+
+
+def _hash_if_changed(
+    file_path: Path, cached: Optional[tuple[int, int, str]]
+) -> tuple[int, int, str]:
+    """
+    Stat file and hash it only if size/mtime differ from the cached entry.
+
+    Args:
+        file_path: Path to file
+        cached: Previous (size, mtime_ns, sha256) or None
+
+    Returns:
+        (size, mtime_ns, sha256)
+    """
+    stat = file_path.stat()
+    if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+        return cached
+    return stat.st_size, stat.st_mtime_ns, compute_sha256(file_path)
+
+
 async def upload_file_to_vps(local_path: Path, remote_path: str):
     """
     Upload file to VPS transit zone.
@@ -196,6 +239,119 @@ class SimpleRateLimiter:
         self.requests.append(time.time())
 
 
+# ============================================================================
+# Completion Watcher
+# ============================================================================
+
+
+def _decode(value) -> str:
+    """Decode a Redis bytes/str value."""
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class StreamCompletionWatcher:
+    """
+    Signal per-file pipeline completion from Redis Streams.
+
+    A single reader task per batch XREADs document.processed (success) and
+    pipeline.error (failure), matches both on the transit file_path (unique
+    per file, see BatchProcessor.transit_path) and resolves the future
+    registered for each in-flight file.
+
+    AC2: Pipeline Archiviste complet
+    """
+
+    def __init__(self, redis_client, block_ms: int = COMPLETION_BLOCK_MS):
+        """
+        Initialize watcher.
+
+        Args:
+            redis_client: Redis client
+            block_ms: XREAD block duration (ms)
+        """
+        self.redis = redis_client
+        self.block_ms = block_ms
+        self._by_path: dict[str, asyncio.Future] = {}
+        self._last_ids: dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """True while the reader task is active."""
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """
+        Start reading from the current end of each stream.
+
+        Last IDs are resolved before any file is published, so no completion
+        event can be missed between publish and the first XREAD.
+        """
+        if self.running:
+            return
+        for stream in (PROCESSED_STREAM, ERROR_STREAM):
+            last = await self.redis.xrevrange(stream, count=1)
+            self._last_ids[stream] = _decode(last[0][0]) if last else "0-0"
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the reader task."""
+        if self._task:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def register(self, file_path: str) -> asyncio.Future:
+        """Register an in-flight transit file; the future resolves with the processed event."""
+        future = asyncio.get_running_loop().create_future()
+        self._by_path[file_path] = future
+        return future
+
+    def discard(self, file_path: str):
+        """Forget a file (completed, failed or timed out)."""
+        self._by_path.pop(file_path, None)
+
+    async def _run(self):
+        """Reader loop (one XREAD for both streams)."""
+        while True:
+            try:
+                response = await self.redis.xread(
+                    dict(self._last_ids), count=100, block=self.block_ms
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("batch_completion_read_failed", error=str(e))
+                await asyncio.sleep(1)
+                continue
+
+            for stream, messages in response or []:
+                stream = _decode(stream)
+                for msg_id, fields in messages:
+                    self._last_ids[stream] = _decode(msg_id)
+                    self._dispatch(stream, fields)
+
+    def _dispatch(self, stream: str, fields: dict):
+        """Resolve the future matching an event."""
+        raw = fields.get(b"data", fields.get("data"))
+        try:
+            data = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+
+        future = self._by_path.get(data.get("file_path", ""))
+        if not future or future.done():
+            return
+
+        if stream == PROCESSED_STREAM:
+            future.set_result(data)
+        else:
+            future.set_exception(
+                RuntimeError(f"Pipeline error ({data.get('error_type')}): {data.get('message')}")
+            )
+
+
 # ============================================================================
 # Batch Processor
 # ============================================================================
@@ -208,7 +364,8 @@ class BatchProcessor:
     Features:
     - Recursive folder scan with filters
     - SHA256 deduplication (skip already processed)
-    - Sequential processing with rate limiting (5 files/min)
+    - Windowed processing (max_in_flight files) with rate limiting
+    - Event-driven completion (StreamCompletionWatcher)
     - Fail-safe error handling (continue on failure)
     - Pause/cancel support
     - Progress tracking real-time
@@ -255,16 +412,71 @@ class BatchProcessor:
 
         # Processing config
         self.processing_timeout = PROCESSING_TIMEOUT
+        self.max_in_flight = BATCH_MAX_IN_FLIGHT
+
+        # Completion events (document.processed / pipeline.error)
+        self._completions = StreamCompletionWatcher(redis_client)
+        self._transit_seq = itertools.count(1)
 
-        # SHA256 cache to avoid double computation
-        self._sha256_cache: dict[str, str] = {}
+        # SHA256 cache keyed by path, validated by size + mtime
+        self.hash_workers = HASH_WORKERS
+        self._sha256_cache = _SHA256_CACHE
+
+    def _remember_sha256(self, key: str, entry: tuple[int, int, str]):
+        """Store cache entry (LRU, bounded)."""
+        self._sha256_cache[key] = entry
+        self._sha256_cache.move_to_end(key)
+        while len(self._sha256_cache) > SHA256_CACHE_MAX_ENTRIES:
+            self._sha256_cache.popitem(last=False)
 
     def _get_sha256(self, file_path: Path) -> str:
-        """Get SHA256 hash with caching (avoid double computation)."""
+        """Get SHA256 hash with caching (re-hash only if size/mtime changed)."""
         key = str(file_path)
-        if key not in self._sha256_cache:
-            self._sha256_cache[key] = compute_sha256(file_path)
-        return self._sha256_cache[key]
+        entry = _hash_if_changed(file_path, self._sha256_cache.get(key))
+        self._remember_sha256(key, entry)
+        return entry[2]
+
+    async def hash_files(self, files: List[Path]) -> dict[Path, Optional[str]]:
+        """
+        Hash files in worker threads, at most hash_workers reads at once.
+
+        Cache hits (same size and mtime) only cost a stat().
+
+        Args:
+            files: Files to hash
+
+        Returns:
+            {file: sha256}, None for unreadable files
+
+        AC2: Déduplication SHA256
+        """
+        semaphore = asyncio.Semaphore(self.hash_workers)
+
+        async def hash_one(file_path: Path) -> tuple[Path, Optional[str]]:
+            key = str(file_path)
+            async with semaphore:
+                try:
+                    entry = await asyncio.to_thread(
+                        _hash_if_changed, file_path, self._sha256_cache.get(key)
+                    )
+                except OSError as e:
+                    logger.warning(
+                        "file_hash_failed",
+                        batch_id=self.batch_id,
+                        file_path=key,
+                        error=str(e),
+                    )
+                    return file_path, None
+            # Cache updated on the event loop only
+            self._remember_sha256(key, entry)
+            return file_path, entry[2]
+
+        return dict(await asyncio.gather(*(hash_one(f) for f in files)))
+
+    async def _start_completions(self):
+        """Start the completion watcher on the current Redis client."""
+        self._completions.redis = self.redis
+        await self._completions.start()
 
     def _is_cancelled(self) -> bool:
         """Check if batch was cancelled via bot_data or progress tracker."""
@@ -286,7 +498,7 @@ class BatchProcessor:
         Steps:
         1. Scan folder with filters
         2. Deduplicate (SHA256 hash check)
-        3. Process each file sequentially (with pause/cancel support)
+        3. Process files, max_in_flight at a time (with pause/cancel support)
         4. Generate final report
 
         AC2: Pipeline complet
@@ -313,51 +525,36 @@ class BatchProcessor:
                     files_after_dedup=len(files),
                 )
 
-            # Step 3: Process each file
-            for file_path in files:
-                # Check cancel
-                if self._is_cancelled():
-                    logger.info("batch_cancelled_by_user", batch_id=self.batch_id)
-                    break
+            # Step 3: Process files, max_in_flight at a time
+            if self.redis is not None:
+                await self._start_completions()
 
-                # Wait if paused
-                await self._wait_if_paused()
+            in_flight: set[asyncio.Task] = set()
+            try:
+                for file_path in files:
+                    # Check cancel
+                    if self._is_cancelled():
+                        logger.info("batch_cancelled_by_user", batch_id=self.batch_id)
+                        break
+
+                    # Wait if paused
+                    await self._wait_if_paused()
+
+                    # Rate limiting
+                    await self.rate_limiter.wait()
+
+                    # Window full: wait for a slot
+                    while len(in_flight) >= self.max_in_flight:
+                        _, in_flight = await asyncio.wait(
+                            in_flight, return_when=asyncio.FIRST_COMPLETED
+                        )
 
-                # Rate limiting
-                await self.rate_limiter.wait()
+                    in_flight.add(asyncio.create_task(self._process_tracked(file_path)))
 
-                # Process single file (fail-safe)
-                try:
-                    await self.process_single_file(file_path)
-                    if self.progress:
-                        self.progress.increment_success()
-                except Exception as e:
-                    # Fail-safe: log error, continue (AC6)
-                    logger.error(
-                        "batch_file_failed",
-                        batch_id=self.batch_id,
-                        file_path=str(file_path),
-                        error=str(e),
-                    )
-                    if self.progress:
-                        self.progress.increment_failed(str(file_path), str(e))
-
-                    # Move to errors dir
-                    await self.move_to_errors(file_path)
-
-                # Update progress (throttled)
-                if self.progress:
-                    await self.progress.update_telegram(throttle=True)
-
-                # Alert if >20% failures (AC6)
-                if self.progress and self.progress.total_files > 0:
-                    failure_rate = self.progress.failed / max(self.progress.processed, 1)
-                    if failure_rate > FAILURE_ALERT_THRESHOLD and self.progress.processed >= 5:
-                        logger.warning(
-                            "batch_high_failure_rate",
-                            batch_id=self.batch_id,
-                            failure_rate=failure_rate,
-                        )
+                if in_flight:
+                    await asyncio.gather(*in_flight)
+            finally:
+                await self._completions.stop()
 
             # Step 4: Final report
             await self.generate_final_report()
@@ -370,6 +567,50 @@ class BatchProcessor:
             )
             raise
 
+    async def _process_tracked(self, file_path: Path):
+        """
+        Process one file and record the outcome (fail-safe).
+
+        AC6: Fail-safe (continue on error)
+        """
+        try:
+            await self.process_single_file(file_path)
+            if self.progress:
+                self.progress.increment_success()
+        except asyncio.CancelledError:
+            if not self._is_cancelled():
+                raise
+            # Cancelled by user while waiting: not a failure
+            logger.info("batch_file_cancelled", batch_id=self.batch_id, file_path=str(file_path))
+            return
+        except Exception as e:
+            # Fail-safe: log error, continue (AC6)
+            logger.error(
+                "batch_file_failed",
+                batch_id=self.batch_id,
+                file_path=str(file_path),
+                error=str(e),
+            )
+            if self.progress:
+                self.progress.increment_failed(str(file_path), str(e))
+
+            # Move to errors dir
+            await self.move_to_errors(file_path)
+
+        # Update progress (throttled)
+        if self.progress:
+            await self.progress.update_telegram(throttle=True)
+
+        # Alert if >20% failures (AC6)
+        if self.progress and self.progress.total_files > 0:
+            failure_rate = self.progress.failed / max(self.progress.processed, 1)
+            if failure_rate > FAILURE_ALERT_THRESHOLD and self.progress.processed >= 5:
+                logger.warning(
+                    "batch_high_failure_rate",
+                    batch_id=self.batch_id,
+                    failure_rate=failure_rate,
+                )
+
     def scan_folder_with_filters(self) -> List[Path]:
         """
         Scan folder recursively with filters applied.
@@ -440,7 +681,12 @@ class BatchProcessor:
         """
         Remove files already processed (SHA256 hash check).
 
-        Query ingestion.document_metadata for existing sha256_hash.
+        1. Hash all files (hash_files: thread pool + size/mtime cache)
+        2. One query against ingestion.document_metadata for all hashes
+        3. Skip files already processed and duplicates within the batch
+
+        Unreadable files are kept: they fail in process_single_file and are
+        reported like any other failure.
 
         Args:
             files: List of files to check
@@ -450,27 +696,48 @@ class BatchProcessor:
 
         AC2: Déduplication SHA256
         """
+        hashes = await self.hash_files(files)
+
+        known = {h for h in hashes.values() if h}
+        already_processed: set[str] = set()
+        if known:
+            rows = await self.db.fetch(
+                """
+                SELECT DISTINCT sha256_hash
+                FROM ingestion.document_metadata
+                WHERE sha256_hash = ANY($1::text[])
+                """,
+                list(known),
+            )
+            already_processed = {row["sha256_hash"] for row in rows}
+
         deduped = []
+        seen: set[str] = set()
 
         for file_path in files:
-            sha256_hash = self._get_sha256(file_path)
+            sha256_hash = hashes.get(file_path)
 
-            # Check if already processed
-            exists = await self.db.fetchval(
-                "SELECT EXISTS(SELECT 1 FROM ingestion.document_metadata WHERE sha256_hash = $1)",
-                sha256_hash,
-            )
-
-            if not exists:
+            if sha256_hash is None:
                 deduped.append(file_path)
+                continue
+
+            if sha256_hash in already_processed:
+                reason = "Already processed"
+            elif sha256_hash in seen:
+                reason = "Duplicate in batch"
             else:
-                logger.debug(
-                    "file_already_processed",
-                    batch_id=self.batch_id,
-                    file_path=str(file_path),
-                )
-                if self.progress:
-                    self.progress.increment_skipped(str(file_path), "Already processed")
+                seen.add(sha256_hash)
+                deduped.append(file_path)
+                continue
+
+            logger.debug(
+                "file_already_processed",
+                batch_id=self.batch_id,
+                file_path=str(file_path),
+                reason=reason,
+            )
+            if self.progress:
+                self.progress.increment_skipped(str(file_path), reason)
 
         return deduped
 
@@ -482,67 +749,97 @@ class BatchProcessor:
         1. Upload to VPS transit zone
         2. Publish document.received to Redis Streams
         3. Consumer processes (OCR -> Classification -> Sync PC)
-        4. Wait for completion (poll ingestion.document_metadata)
+        4. Wait for completion (document.processed / pipeline.error event)
 
         Args:
             file_path: File to process
 
+        Raises:
+            TimeoutError: No completion event within processing_timeout
+            RuntimeError: pipeline.error event for this file
+
         AC2: Pipeline Archiviste complet
         AC6: Timeout protection
         """
         # Upload to VPS
-        transit_path = f"/var/friday/transit/batch_{self.batch_id}/{file_path.name}"
+        transit_path = self.transit_path(file_path)
         await upload_file_to_vps(file_path, transit_path)
 
         # Use cached SHA256 (already computed during dedup)
         sha256_hash = self._get_sha256(file_path)
-        await publish_document_received(
-            redis_client=self.redis,
-            file_path=transit_path,
-            filename=file_path.name,
-            source="batch",
+
+        # Standalone call (outside process()): start the watcher for this file
+        owns_watcher = not self._completions.running
+        if owns_watcher:
+            await self._start_completions()
+
+        # Register before publishing: the event cannot arrive unobserved
+        completion = self._completions.register(transit_path)
+        try:
+            await publish_document_received(
+                redis_client=self.redis,
+                file_path=transit_path,
+                filename=file_path.name,
+                source="batch",
+                batch_id=self.batch_id,
+                sha256_hash=sha256_hash,
+            )
+            event = await self._wait_for_completion(completion)
+        finally:
+            self._completions.discard(transit_path)
+            if owns_watcher:
+                await self._completions.stop()
+
+        # Success — pass document type to progress tracker
+        category = (event.get("metadata") or {}).get("doc_type")
+        if self.progress and category:
+            self.progress.categories[category] = self.progress.categories.get(category, 0) + 1
+        logger.info(
+            "file_processed_success",
             batch_id=self.batch_id,
-            sha256_hash=sha256_hash,
+            file_path=str(file_path),
+            category=category,
         )
 
-        # Wait for completion (poll avec timeout)
-        start = time.time()
+    def transit_path(self, file_path: Path) -> str:
+        """
+        Unique transit path of a file (batch index prefix).
+
+        Files with the same name in different subfolders are processed
+        concurrently (BATCH_MAX_IN_FLIGHT): the prefix keeps their transit
+        files and completion events apart.
 
-        while time.time() - start < self.processing_timeout:
+        Args:
+            file_path: Local file
+
+        Returns:
+            Transit path on VPS
+        """
+        index = next(self._transit_seq)
+        return f"/var/friday/transit/batch_{self.batch_id}/{index:06d}_{file_path.name}"
+
+    async def _wait_for_completion(self, completion: asyncio.Future) -> dict:
+        """
+        Wait for the completion event, checking cancel every second.
+
+        Raises:
+            TimeoutError: processing_timeout exceeded
+            asyncio.CancelledError: Batch cancelled by user
+        """
+        deadline = time.monotonic() + self.processing_timeout
+
+        while not completion.done():
             # Check cancel during wait
             if self._is_cancelled():
                 raise asyncio.CancelledError("Batch cancelled by user")
 
-            # Check if processed
-            metadata = await self.db.fetchrow(
-                """
-                SELECT status, final_path, category
-                FROM ingestion.document_metadata
-                WHERE sha256_hash = $1
-                """,
-                sha256_hash,
-            )
-
-            if metadata and metadata["status"] == "completed":
-                # Success — pass category to progress tracker
-                category = metadata.get("category")
-                if self.progress and category:
-                    # Update last success with category info
-                    self.progress.categories[category] = (
-                        self.progress.categories.get(category, 0) + 1
-                    )
-                logger.info(
-                    "file_processed_success",
-                    batch_id=self.batch_id,
-                    file_path=str(file_path),
-                    category=category,
-                )
-                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"File processing timeout after {self.processing_timeout}s")
 
-            await asyncio.sleep(2)  # Poll every 2s
+            await asyncio.wait({completion}, timeout=min(remaining, 1.0))
 
-        # Timeout
-        raise TimeoutError(f"File processing timeout after {self.processing_timeout}s")
+        return completion.result()
 
     async def move_to_errors(self, file_path: Path):
         """
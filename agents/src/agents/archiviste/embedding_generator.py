@@ -38,6 +38,8 @@ from uuid import UUID
 import asyncpg
 import structlog
 from agents.src.adapters.embedding import get_embedding_adapter
+from agents.src.adapters.embedding_bulk import EmbeddingRecord
+from agents.src.adapters.embedding_cache import EmbeddingCache, compute_content_hash
 from agents.src.agents.archiviste.models import EmbeddingResult
 from agents.src.middleware.models import ActionResult
 from agents.src.middleware.trust import friday_action
@@ -68,14 +70,16 @@ class EmbeddingGenerator:
     Utilise Voyage AI voyage-4-large (1024 dimensions) avec anonymisation Presidio.
     """
 
-    def __init__(self, db_pool: asyncpg.Pool):
+    def __init__(self, db_pool: asyncpg.Pool, embedding_cache: Optional[EmbeddingCache] = None):
         """
         Initialise EmbeddingGenerator.
 
         Args:
             db_pool: Pool asyncpg pour budget tracking (core.api_usage)
+            embedding_cache: Cache content_hash → vecteur (défaut: lookup knowledge.embeddings)
         """
         self.db_pool = db_pool
+        self.embedding_cache = embedding_cache or EmbeddingCache(db_pool=db_pool)
         logger.info("EmbeddingGenerator initialized", model=MODEL_NAME)
 
     async def generate_embedding(
@@ -91,7 +95,8 @@ class EmbeddingGenerator:
         Pipeline:
         1. Valider text_content non vide
         2. Anonymiser via Presidio (RGPD NFR6)
-        3. Générer embedding via Voyage AI (retry automatique)
+        3. Réutiliser le vecteur existant si même content_hash/modèle/dimensions,
+           sinon générer via Voyage AI (retry automatique)
         4. Valider dimensions (1024)
         5. Valider normalization (L2 norm ≈ 1.0)
         6. Log budget tracking core.api_usage
@@ -129,14 +134,31 @@ class EmbeddingGenerator:
         anonymized_text = anonymization_result.anonymized_text
         anonymization_confidence = anonymization_result.confidence_min
 
-        # 2. Générer embedding avec retry automatique
-        embedding_response = await self._generate_with_retry(
-            texts=[anonymized_text], timeout=timeout
+        # 2. Cache content_hash (texte anonymisé) : pas d'appel Voyage si déjà indexé
+        content_hash = compute_content_hash(anonymized_text)
+        cached = await self.embedding_cache.get_many(
+            [content_hash], MODEL_NAME, EMBEDDING_DIMENSIONS
         )
+        cache_hit = content_hash in cached
+
+        if cache_hit:
+            embedding_vector = cached[content_hash]
+            tokens_used = 0
+            dimensions = len(embedding_vector)
+            logger.info(
+                "Embedding reused from cache",
+                document_id=str(document_id),
+                content_hash=content_hash[:12],
+            )
+        else:
+            # Générer embedding avec retry automatique
+            embedding_response = await self._generate_with_retry(
+                texts=[anonymized_text], timeout=timeout
+            )
 
-        embedding_vector = embedding_response["embeddings"][0]
-        tokens_used = embedding_response["tokens_used"]
-        dimensions = embedding_response["dimensions"]
+            embedding_vector = embedding_response["embeddings"][0]
+            tokens_used = embedding_response["tokens_used"]
+            dimensions = embedding_response["dimensions"]
 
         # 3. Valider dimensions (1024 pour voyage-4-large)
         if dimensions != EMBEDDING_DIMENSIONS:
@@ -151,13 +173,18 @@ class EmbeddingGenerator:
                 l2_norm=l2_norm,
             )
 
-        # 5. Budget tracking core.api_usage (AC7)
-        await self._log_api_usage(
-            document_id=document_id,
-            tokens_used=tokens_used,
-            model=MODEL_NAME,
-            provider="voyage-ai",
-        )
+        if not cache_hit:
+            self.embedding_cache.remember(
+                content_hash, MODEL_NAME, EMBEDDING_DIMENSIONS, embedding_vector
+            )
+
+            # 5. Budget tracking core.api_usage (AC7) - aucun coût sur cache hit
+            await self._log_api_usage(
+                document_id=document_id,
+                tokens_used=tokens_used,
+                model=MODEL_NAME,
+                provider="voyage-ai",
+            )
 
         # 6. Calculer métriques
         duration_ms = (time.time() - start_time) * 1000
@@ -186,6 +213,9 @@ class EmbeddingGenerator:
                 "duration_ms": round(duration_ms, 2),
                 "anonymization_confidence": round(anonymization_confidence, 3),
                 "l2_norm": round(l2_norm, 4),
+                "content_hash": content_hash,
+                "dimensions": dimensions,
+                "embedding_cache_hit": cache_hit,
                 **(metadata or {}),
             },
         )
@@ -418,6 +448,8 @@ async def generate_document_embeddings(
     vectorstore,
     chunk_size: int = 2000,
     overlap: int = 200,
+    embedding_cache: Optional[EmbeddingCache] = None,
+    source_type: str = "document",
 ) -> int:
     """
     Generate embeddings for document with chunking support.
@@ -428,6 +460,10 @@ async def generate_document_embeddings(
         vectorstore: Vectorstore adapter (mock in tests)
         chunk_size: Maximum chunk size
         overlap: Overlap between chunks
+        embedding_cache: Si fourni, chunks déjà indexés (même content_hash) réutilisés
+            et chunks manquants envoyés en un seul appel embed() ; stockage via
+            store_many (content_hash/model/dimensions renseignés)
+        source_type: knowledge.embeddings.source_type (chemin embedding_cache)
 
     Returns:
         Number of embeddings generated
@@ -435,6 +471,11 @@ async def generate_document_embeddings(
     # Chunk text
     chunks = chunk_text(text, chunk_size=chunk_size, overlap=overlap)
 
+    if embedding_cache is not None:
+        return await _generate_document_embeddings_cached(
+            document_node_id, chunks, vectorstore, embedding_cache, source_type
+        )
+
     count = 0
     for i, chunk in enumerate(chunks):
         # Anonymize chunk
@@ -454,3 +495,54 @@ async def generate_document_embeddings(
         count += 1
 
     return count
+
+
+async def _generate_document_embeddings_cached(
+    document_node_id: str,
+    chunks: list[str],
+    vectorstore,
+    embedding_cache: EmbeddingCache,
+    source_type: str,
+) -> int:
+    """
+    Variante dédupliquée : seuls les chunks inconnus partent à Voyage.
+
+    Stockage bulk (EmbeddingRecord) : content_hash, model et dimensions sont
+    écrits, les prochains lookups DB du cache peuvent donc les retrouver.
+    """
+    anonymized_chunks = []
+    for chunk in chunks:
+        anon_result = await anonymize_text(chunk)
+        anonymized_chunks.append(anon_result.anonymized_text)
+
+    async def _embed(texts: list[str]) -> list[list[float]]:
+        response = await vectorstore.embed(texts, anonymize=False)  # Déjà anonymisé
+        return response.embeddings
+
+    cached = await embedding_cache.embed_many(
+        anonymized_chunks, MODEL_NAME, EMBEDDING_DIMENSIONS, _embed
+    )
+
+    records = [
+        EmbeddingRecord(
+            source_type=source_type,
+            source_id=UUID(document_node_id),
+            chunk_index=i,
+            total_chunks=len(chunks),
+            embedding=embedding,
+            metadata={"chunk_index": i, "total_chunks": len(chunks)},
+            content_hash=content_hash,
+            model=MODEL_NAME,
+        )
+        for i, (embedding, content_hash) in enumerate(zip(cached.embeddings, cached.content_hashes))
+    ]
+    await vectorstore.store_many(records)
+
+    logger.info(
+        "Document embeddings generated",
+        document_node_id=document_node_id,
+        chunks=len(chunks),
+        cache_hits=cached.cache_hits,
+        api_texts=cached.api_texts,
+    )
+    return len(chunks)
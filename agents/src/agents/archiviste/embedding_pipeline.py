@@ -360,18 +360,25 @@ class EmbeddingPipeline:
         query = """
             INSERT INTO knowledge.embeddings (
                 document_id,
+                source_type,
+                source_id,
+                chunk_index,
                 embedding,
                 model,
                 confidence,
                 metadata,
+                content_hash,
+                dimensions,
                 created_at
-            ) VALUES ($1, $2, $3, $4, $5, NOW())
+            ) VALUES ($1, 'document', $1, 0, $2, $3, $4, $5, $6, $7, NOW())
             ON CONFLICT (document_id) DO UPDATE
             SET
                 embedding = EXCLUDED.embedding,
                 model = EXCLUDED.model,
                 confidence = EXCLUDED.confidence,
                 metadata = EXCLUDED.metadata,
+                content_hash = EXCLUDED.content_hash,
+                dimensions = EXCLUDED.dimensions,
                 updated_at = NOW()
         """
 
@@ -386,6 +393,8 @@ class EmbeddingPipeline:
             model_name,
             confidence,
             metadata,  # asyncpg gère dict → JSONB nativement
+            metadata.get("content_hash"),  # Clé cache embeddings (migration 043)
+            len(embedding_vector),
         )
 
         logger.debug(
@@ -3,12 +3,13 @@ Modèles Pydantic pour l'agent Archiviste (Story 3.1).
 
 Définit les structures de données pour :
 - OCRResult : Résultat d'OCR Surya
+- OCRPage : Résultat OCR d'une page (mode streaming)
 - MetadataExtraction : Métadonnées extraites par Claude
 - RenameResult : Résultat du renommage intelligent
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -23,6 +24,9 @@ class OCRResult(BaseModel):
         page_count: Nombre de pages traitées
         language: Langue détectée (ex: 'fr', 'en')
         processing_time: Durée du traitement OCR en secondes
+        extraction_method: Voie d'extraction ('text_layer' : couche texte PDF
+            native, 'ocr' : Surya, 'mixed' : pages natives + pages scannées)
+        text_layer_pages: Nombre de pages lues depuis la couche texte native
     """
 
     text: str = Field(..., description="Texte OCR extrait")
@@ -32,6 +36,12 @@ class OCRResult(BaseModel):
     processing_time: float = Field(
         default=0.0, ge=0.0, description="Durée traitement OCR (secondes)"
     )
+    extraction_method: Literal["text_layer", "ocr", "mixed"] = Field(
+        default="ocr", description="Voie d'extraction: text_layer, ocr ou mixed"
+    )
+    text_layer_pages: int = Field(
+        default=0, ge=0, description="Pages lues depuis la couche texte native"
+    )
 
     @field_validator("text")
     @classmethod
@@ -42,6 +52,23 @@ class OCRResult(BaseModel):
         return v
 
 
+class OCRPage(BaseModel):
+    """
+    Résultat OCR d'une page, produit au fil de l'eau par SuryaOCREngine.ocr_pages().
+
+    Attributes:
+        page_number: Numéro de page (1-indexé)
+        text: Texte extrait de la page
+        confidence: Score de confiance moyen des lignes de la page (0.0-1.0)
+        source: 'text_layer' (couche texte PDF native) ou 'ocr' (Surya)
+    """
+
+    page_number: int = Field(..., ge=1, description="Numéro de page (1-indexé)")
+    text: str = Field(..., description="Texte OCR de la page")
+    confidence: float = Field(..., ge=0.0, le=1.0, description="Confiance moyenne de la page")
+    source: Literal["text_layer", "ocr"] = Field(default="ocr", description="Voie d'extraction")
+
+
 class MetadataExtraction(BaseModel):
     """
     Métadonnées extraites par Claude depuis texte OCR (AC3, Task 2).
@@ -4,19 +4,34 @@ Surya OCR Engine pour Friday 2.0 (Story 3.1 - AC1).
 Implémente l'OCR de documents (images JPG/PNG/TIFF, PDF) via Surya OCR
 en mode CPU uniquement (VPS sans GPU).
 
+PDF natifs (factures, relevés générés par logiciel) : la couche texte est
+lue via PyMuPDF page.get_text() et notée page par page (text_layer_needs_ocr).
+Seules les pages scannées (image raster, page.get_images(), sans couche texte
+dense) ou à couche texte illisible passent par Surya. Une page native peu
+remplie (page blanche, couverture, signature) reste en couche texte : un PDF
+entièrement natif est traité en < 1s, sans charger le modèle.
+
+Les pages à OCRiser sont rendues et reconnues par lots de OCR_PAGE_BATCH_SIZE
+dans un thread : la RAM reste bornée par la taille du lot (et non par le
+nombre de pages du document) et l'event loop n'est jamais bloqué par PyMuPDF.
+
 Usage:
     engine = SuryaOCREngine(device="cpu")
     result = await engine.ocr_document("facture.pdf")
     print(result.text, result.confidence)
+
+    # Streaming page par page (gros PDF)
+    async for page in engine.ocr_pages("releve_annuel.pdf"):
+        print(page.page_number, page.confidence)
 """
 
 import asyncio
 import os
 import time
 from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 
-from agents.src.agents.archiviste.models import OCRResult
+from agents.src.agents.archiviste.models import OCRPage, OCRResult
 
 try:
     import fitz  # PyMuPDF pour PDF
@@ -25,6 +40,64 @@ except ImportError:
     Image = None  # type: ignore[assignment,misc]
     fitz = None  # type: ignore[assignment]
 
+# Résolution du rendu PDF (72 dpi = défaut PyMuPDF get_pixmap())
+OCR_PDF_DPI = int(os.getenv("OCR_PDF_DPI", "72"))
+# Pages rendues + reconnues par appel run_ocr (pic RAM ~ lot x taille page)
+OCR_PAGE_BATCH_SIZE = int(os.getenv("OCR_PAGE_BATCH_SIZE", "4"))
+# Fast path couche texte PDF (false = toujours OCR Surya)
+OCR_TEXT_LAYER_ENABLED = os.getenv("OCR_TEXT_LAYER_ENABLED", "true").lower() == "true"
+# Caractères non blancs attendus sur une page contenant une image (en dessous :
+# scan probable, score réduit)
+OCR_TEXT_LAYER_MIN_CHARS = int(os.getenv("OCR_TEXT_LAYER_MIN_CHARS", "50"))
+# Score minimal pour utiliser la couche texte plutôt que Surya
+OCR_TEXT_LAYER_MIN_COVERAGE = float(os.getenv("OCR_TEXT_LAYER_MIN_COVERAGE", "0.9"))
+
+
+def text_layer_coverage(text: str) -> float:
+    """
+    Score de la couche texte native d'une page PDF (0.0-1.0).
+
+    Densité (caractères non blancs / OCR_TEXT_LAYER_MIN_CHARS, plafonnée à 1)
+    x part de caractères lisibles (hors caractères de contrôle et U+FFFD,
+    typiques d'une police sans table ToUnicode).
+
+    Args:
+        text: Texte extrait par page.get_text()
+
+    Returns:
+        0.0 pour une page scannée (pas de texte), 1.0 pour une page native dense
+    """
+    chars = [c for c in text if not c.isspace()]
+    if not chars:
+        return 0.0
+    density = min(1.0, len(chars) / OCR_TEXT_LAYER_MIN_CHARS)
+    return round(density * _readable_ratio(chars), 2)
+
+
+def text_layer_needs_ocr(text: str, has_images: bool) -> bool:
+    """
+    Décide si une page PDF doit passer par Surya.
+
+    Page avec image raster (scan, photo) : OCR sauf couche texte dense
+    (text_layer_coverage). Page sans image : rien à reconnaître au-delà de la
+    couche texte, OCR seulement si celle-ci est illisible (police sans ToUnicode).
+    Une page native courte ou blanche n'est donc jamais envoyée à Surya.
+
+    Args:
+        text: Texte extrait par page.get_text()
+        has_images: page.get_images() non vide
+    """
+    if has_images:
+        return text_layer_coverage(text) < OCR_TEXT_LAYER_MIN_COVERAGE
+    chars = [c for c in text if not c.isspace()]
+    return bool(chars) and _readable_ratio(chars) < OCR_TEXT_LAYER_MIN_COVERAGE
+
+
+def _readable_ratio(chars: list[str]) -> float:
+    """Part de caractères lisibles (hors contrôle et U+FFFD)."""
+    readable = sum(1 for c in chars if c.isprintable() and c != "\ufffd")
+    return readable / len(chars)
+
 
 class SuryaOCREngine:
     """
@@ -122,13 +195,201 @@ class SuryaOCREngine:
                 f"Supported: {', '.join(self.SUPPORTED_FORMATS)}"
             )
 
-    async def ocr_document(self, file_path: str, language: str = "fr") -> OCRResult:
+    @staticmethod
+    def _read_text_layer(file_path: str) -> list[Optional[str]]:
+        """
+        Lire la couche texte de chaque page d'un PDF (synchrone, thread).
+
+        Returns:
+            Une entrée par page : texte natif, ou None si la page doit passer
+            par Surya (text_layer_needs_ocr)
+        """
+        pdf_doc = fitz.open(file_path)
+        try:
+            page_texts: list[Optional[str]] = []
+            for page_num in range(len(pdf_doc)):
+                if not OCR_TEXT_LAYER_ENABLED:
+                    page_texts.append(None)
+                    continue
+                page = pdf_doc[page_num]
+                text = page.get_text()
+                if text_layer_needs_ocr(text, has_images=bool(page.get_images())):
+                    page_texts.append(None)
+                else:
+                    page_texts.append(text)
+            return page_texts
+        finally:
+            pdf_doc.close()
+
+    @staticmethod
+    def _render_pdf_pages(file_path: str, page_indices: list[int], dpi: int) -> list:
+        """
+        Rendre des pages d'un PDF en images (synchrone, thread).
+
+        Args:
+            file_path: Chemin du PDF
+            page_indices: Index des pages du lot (0-indexés)
+            dpi: Résolution du rendu
+
+        Returns:
+            Images PIL du lot, dans l'ordre de page_indices
+        """
+        pdf_doc = fitz.open(file_path)
+        try:
+            images = []
+            for page_num in page_indices:
+                pix = pdf_doc[page_num].get_pixmap(dpi=dpi)
+                images.append(Image.frombytes("RGB", [pix.width, pix.height], pix.samples))
+                # Libérer le buffer du pixmap dès la conversion
+                del pix
+            return images
+        finally:
+            pdf_doc.close()
+
+    async def _recognize_batch(
+        self, file_path: str, page_indices: list[int], language: str, dpi: int
+    ) -> dict[int, Any]:
+        """
+        Rendre et reconnaître un lot de pages via Surya.
+
+        Le modèle n'est chargé qu'ici : un PDF entièrement natif ne le charge
+        jamais.
+
+        Returns:
+            {index de page: prédiction Surya}
+        """
+        # Charger modèle si nécessaire (lazy loading)
+        await self._load_model_if_needed()
+
+        # Import dynamique Surya (lourd, chargé à la demande)
+        from surya.ocr import run_ocr
+
+        if Path(file_path).suffix.lower() == ".pdf":
+            images = await asyncio.to_thread(self._render_pdf_pages, file_path, page_indices, dpi)
+        else:
+            # Charger image directement
+            images = [Image.open(file_path)]
+
+        # Exécuter OCR avec Surya
+        # Note: run_ocr() est synchrone, on l'exécute dans un thread
+        predictions = await asyncio.to_thread(
+            run_ocr,
+            images,
+            [[language]] * len(images),  # Une liste de langues par image
+            self.det_model,
+            self.det_processor,
+            self.rec_model,
+            self.rec_processor,
+        )
+        return dict(zip(page_indices, predictions))
+
+    async def _iter_page_lines(
+        self, file_path: str, language: str, dpi: int, batch_size: int
+    ) -> AsyncIterator[tuple[int, list[str], list[float], str]]:
+        """
+        Extraire un document page par page, dans l'ordre.
+
+        Pages natives : lignes de la couche texte (confidence 1.0).
+        Autres pages : reconnues par lots de batch_size ; un seul lot d'images
+        est en mémoire à la fois (libéré avant le rendu du suivant).
+
+        Yields:
+            (numéro de page 1-indexé, lignes, confidences, source)
+            avec source = "text_layer" ou "ocr"
+        """
+        if Path(file_path).suffix.lower() == ".pdf":
+            page_texts = await asyncio.to_thread(self._read_text_layer, file_path)
+        else:
+            page_texts = [None]
+
+        ocr_indices = [index for index, text in enumerate(page_texts) if text is None]
+        next_batch = 0
+        predictions: dict[int, Any] = {}
+
+        for index, native_text in enumerate(page_texts):
+            if native_text is not None:
+                lines = [line.strip() for line in native_text.splitlines() if line.strip()]
+                yield index + 1, lines, [1.0] * len(lines), "text_layer"
+                continue
+
+            if index not in predictions:
+                batch = ocr_indices[next_batch : next_batch + batch_size]
+                next_batch += len(batch)
+                predictions.update(await self._recognize_batch(file_path, batch, language, dpi))
+
+            texts, confidences = self._page_lines(predictions.pop(index))
+            yield index + 1, texts, confidences, "ocr"
+
+    @staticmethod
+    def _page_lines(page_pred: Any) -> tuple[list[str], list[float]]:
+        """Textes et confidences des lignes d'une prédiction Surya."""
+        texts = []
+        confidences = []
+        for line in page_pred.text_lines:
+            texts.append(line.text)
+            # Calculer confidence moyenne (Surya retourne confidence par caractère)
+            if hasattr(line, "confidence"):
+                confidences.append(line.confidence)
+        return texts, confidences
+
+    async def ocr_pages(
+        self,
+        file_path: str,
+        language: str = "fr",
+        dpi: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> AsyncIterator[OCRPage]:
+        """
+        OCR en streaming : produit chaque page dès qu'elle est extraite
+        (couche texte native) ou que son lot est reconnu (Surya).
+
+        Args:
+            file_path: Chemin vers le fichier à traiter
+            language: Code langue pour OCR (default 'fr')
+            dpi: Résolution du rendu PDF (None = OCR_PDF_DPI)
+            batch_size: Pages par lot (None = OCR_PAGE_BATCH_SIZE)
+
+        Yields:
+            OCRPage par page, dans l'ordre du document
+
+        Raises:
+            FileNotFoundError, ValueError, NotImplementedError: cf. ocr_document()
+        """
+        self._validate_file_format(file_path)
+
+        try:
+            async for page_number, texts, confidences, source in self._iter_page_lines(
+                file_path, language, dpi or OCR_PDF_DPI, batch_size or OCR_PAGE_BATCH_SIZE
+            ):
+                confidence = sum(confidences) / len(confidences) if confidences else 0.0
+                yield OCRPage(
+                    page_number=page_number,
+                    text="\n".join(texts),
+                    confidence=round(confidence, 2),
+                    source=source,
+                )
+        except (FileNotFoundError, ValueError, NotImplementedError):
+            raise
+        except Exception as e:
+            raise NotImplementedError(
+                f"Surya OCR unavailable: OCR processing failed - {str(e)}"
+            ) from e
+
+    async def ocr_document(
+        self,
+        file_path: str,
+        language: str = "fr",
+        dpi: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> OCRResult:
         """
         Effectuer l'OCR sur un document (image ou PDF).
 
         Args:
             file_path: Chemin vers le fichier à traiter
             language: Code langue pour OCR (default 'fr'). Surya supporte 90+ langues.
+            dpi: Résolution du rendu PDF (None = OCR_PDF_DPI)
+            batch_size: Pages rendues + reconnues par lot (None = OCR_PAGE_BATCH_SIZE)
 
         Returns:
             OCRResult avec texte extrait, confidence, nombre de pages
@@ -139,60 +400,30 @@ class SuryaOCREngine:
             NotImplementedError: Si Surya crash (fail-explicit AC7)
 
         Performance:
+            - PDF natif (couche texte) : < 1s, modèle Surya non chargé
             - Image 1 page : ~5-15s (CPU mode)
-            - PDF 3-5 pages : ~20-30s (CPU mode)
+            - PDF scanné 3-5 pages : ~20-30s (CPU mode)
         """
         start_time = time.time()
 
         # Valider fichier et format
         self._validate_file_format(file_path)
 
-        # Charger modèle si nécessaire (lazy loading)
-        await self._load_model_if_needed()
-
         try:
-            # Import dynamique Surya (lourd, chargé à la demande)
-            from surya.ocr import run_ocr
-
-            # Charger document
-            path = Path(file_path)
-            images = []
-
-            if path.suffix.lower() == ".pdf":
-                # Convertir PDF en images
-                pdf_doc = fitz.open(file_path)
-                for page_num in range(len(pdf_doc)):
-                    page = pdf_doc[page_num]
-                    pix = page.get_pixmap()
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    images.append(img)
-                pdf_doc.close()
-            else:
-                # Charger image directement
-                images = [Image.open(file_path)]
-
-            # Exécuter OCR avec Surya
-            # Note: run_ocr() est synchrone, on l'exécute dans un thread
-            predictions = await asyncio.to_thread(
-                run_ocr,
-                images,
-                [[language]],  # Langue configurable (default 'fr')
-                self.det_model,
-                self.det_processor,
-                self.rec_model,
-                self.rec_processor,
-            )
-
-            # Extraire texte et confidence
+            # Extraire texte et confidence page par page (couche texte ou Surya)
             all_text = []
             all_confidences = []
-
-            for page_pred in predictions:
-                for line in page_pred.text_lines:
-                    all_text.append(line.text)
-                    # Calculer confidence moyenne (Surya retourne confidence par caractère)
-                    if hasattr(line, "confidence"):
-                        all_confidences.append(line.confidence)
+            page_count = 0
+            text_layer_pages = 0
+
+            async for _, texts, confidences, source in self._iter_page_lines(
+                file_path, language, dpi or OCR_PDF_DPI, batch_size or OCR_PAGE_BATCH_SIZE
+            ):
+                page_count += 1
+                if source == "text_layer":
+                    text_layer_pages += 1
+                all_text.extend(texts)
+                all_confidences.extend(confidences)
 
             # Concaténer tout le texte avec saut de ligne
             full_text = "\n".join(all_text)
@@ -206,12 +437,21 @@ class SuryaOCREngine:
 
             processing_time = time.time() - start_time
 
+            if text_layer_pages == 0:
+                extraction_method = "ocr"
+            elif text_layer_pages == page_count:
+                extraction_method = "text_layer"
+            else:
+                extraction_method = "mixed"
+
             return OCRResult(
                 text=full_text,
                 confidence=round(avg_confidence, 2),
-                page_count=len(images),
+                page_count=max(page_count, 1),
                 language=language,
                 processing_time=round(processing_time, 2),
+                extraction_method=extraction_method,
+                text_layer_pages=text_layer_pages,
             )
 
         except Exception as e:
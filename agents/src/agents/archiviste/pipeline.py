@@ -47,7 +47,7 @@ class OCRPipeline:
     Orchestrateur pipeline OCR (AC3, AC4, AC7).
 
     Pipeline sequentiel :
-    1. OCR via Surya (~5-30s selon pages)
+    1. OCR : couche texte PDF native (<1s) ou Surya (~5-30s selon pages)
     2. Extract metadata via Claude (~2-5s)
     3. Rename intelligent (~0.5s)
     4. Store metadata dans PostgreSQL (Task 5.2)
@@ -160,6 +160,8 @@ class OCRPipeline:
                         filename=filename,
                         pages=ocr_result.page_count,
                         confidence=ocr_result.confidence,
+                        extraction_method=ocr_result.extraction_method,
+                        text_layer_pages=ocr_result.text_layer_pages,
                         duration=ocr_duration,
                     )
 
@@ -168,6 +170,7 @@ class OCRPipeline:
                     logger.error("pipeline.ocr_failed", filename=filename)
                     await self._publish_error_event(
                         filename=filename,
+                        file_path=file_path,
                         error_type="surya_unavailable",
                         message="Surya OCR unavailable",
                     )
@@ -194,6 +197,7 @@ class OCRPipeline:
                     logger.error("pipeline.metadata_extraction_failed", filename=filename)
                     await self._publish_error_event(
                         filename=filename,
+                        file_path=file_path,
                         error_type="metadata_extraction_unavailable",
                         message="Presidio or Claude unavailable",
                     )
@@ -219,6 +223,7 @@ class OCRPipeline:
                     logger.error("pipeline.rename_failed", filename=filename, error=str(e))
                     await self._publish_error_event(
                         filename=filename,
+                        file_path=file_path,
                         error_type="rename_failed",
                         message=f"Document rename failed: {str(e)}",
                     )
@@ -286,6 +291,7 @@ class OCRPipeline:
             )
             await self._publish_error_event(
                 filename=filename,
+                file_path=file_path,
                 error_type="timeout",
                 message=f"Pipeline timeout apres {duration:.1f}s (limite {self.timeout_seconds}s)",
             )
@@ -354,7 +360,7 @@ class OCRPipeline:
         """
         Stocker metadata dans PostgreSQL (Task 5.2, fix C1).
 
-        Table: ingestion.document_metadata (migration 030)
+        Table: ingestion.document_metadata (migration 030, extraction_method 050)
 
         Args:
             filename: Nom fichier
@@ -379,8 +385,9 @@ class OCRPipeline:
                     """
                     INSERT INTO ingestion.document_metadata
                         (filename, file_path, ocr_text, extracted_date, doc_type,
-                         emitter, amount, confidence, page_count, processing_duration)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+                         emitter, amount, confidence, page_count, processing_duration,
+                         extraction_method)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
                     """,
                     filename,
                     file_path,
@@ -392,6 +399,7 @@ class OCRPipeline:
                     float(min(ocr_result.confidence, extracted_meta.confidence)),
                     ocr_result.page_count,
                     total_duration,
+                    ocr_result.extraction_method,
                 )
                 logger.info(
                     "pipeline.metadata_stored", filename=filename, doc_type=extracted_meta.doc_type
@@ -419,11 +427,15 @@ class OCRPipeline:
         except Exception as e:
             logger.error("pipeline.publish_failed", error=str(e))
 
-    async def _publish_error_event(self, filename: str, error_type: str, message: str):
+    async def _publish_error_event(
+        self, filename: str, file_path: str, error_type: str, message: str
+    ):
         """
         Publier evenement erreur dans Redis Streams (Task 4.4).
 
         Fix M1: dot notation conforme CLAUDE.md.
+        file_path identifie le fichier sans ambiguite (deux fichiers d'un
+        batch peuvent porter le meme nom).
         """
         if not self.redis:
             await self.connect_redis()
@@ -431,6 +443,7 @@ class OCRPipeline:
         try:
             error_data = {
                 "filename": filename,
+                "file_path": file_path,
                 "error_type": error_type,
                 "message": message,
                 "timestamp": datetime.now(timezone.utc).isoformat(),
@@ -7,6 +7,11 @@ Recherche sémantique via pgvector HNSW + Voyage AI embeddings.
 Architecture:
     - SemanticSearcher: Classe principale recherche sémantique
     - search(): Query anonymisé → embedding → pgvector cosinus distance → top-k results
+    - Mode hybride (défaut): branche lexicale (full-text français sur OCR +
+      trigrammes sur filename, migration 047) en parallèle de la branche
+      vectorielle, fusion Reciprocal Rank Fusion (RRF)
+    - Fast path identifiant (n° facture, SIRET, nom de fichier): lexical seul,
+      ni Presidio ni Voyage AI
     - Filtres avancés: category, date_range, confidence_min, file_type
 
 Usage:
@@ -23,16 +28,21 @@ Date: 2026-02-16
 Story: 3.3 - Task 4
 """
 
+import asyncio
+import os
+import re
 import time
 from typing import Optional
 
 import asyncpg
 import structlog
+from agents.src.adapters.ann_search import bounded_count_sql, fetch_nearest, source_type_predicate
 from agents.src.adapters.embedding import get_embedding_adapter
 from agents.src.agents.archiviste.models import SearchResult
 from agents.src.middleware.models import ActionResult
 from agents.src.middleware.trust import friday_action
 from agents.src.tools.anonymize import AnonymizationResult, anonymize_text
+from agents.src.tools.query_embedding_cache import query_embedding_cache
 from agents.src.tools.search_metrics import search_metrics
 
 logger = structlog.get_logger(__name__)
@@ -47,6 +57,81 @@ TOP_K_DEFAULT = 5
 TOP_K_MAX = 100
 EXCERPT_LENGTH = 200
 
+# Recherche hybride (lexicale + vectorielle)
+SEARCH_MODES = ("hybrid", "vector")
+SEMANTIC_SEARCH_MODE = os.getenv("SEMANTIC_SEARCH_MODE", "hybrid")
+# Constante RRF (Cormack et al. 2009) : score = Σ 1 / (k + rang)
+SEARCH_RRF_K = int(os.getenv("SEARCH_RRF_K", "60"))
+# Candidats par branche avant fusion
+SEARCH_HYBRID_CANDIDATES = int(os.getenv("SEARCH_HYBRID_CANDIDATES", "50"))
+TEXT_SEARCH_CONFIG = "french"
+
+# Requêtes "identifiant" : la similarité cosinus ne les retrouve pas,
+# un match lexical exact suffit (pas d'anonymisation ni d'embedding)
+_IDENTIFIER_PATTERNS = (
+    re.compile(r"^\d[\d\s./-]{4,}\d$"),  # SIRET, SIREN, n° de dossier, téléphone
+    re.compile(r"^\S+\.[A-Za-z0-9]{2,5}$"),  # Nom de fichier avec extension
+    re.compile(r"^(?=\S*\d)(?=\S*[A-Za-z])[A-Za-z0-9][\w/#.-]{3,}$"),  # FAC-2026-0042
+    re.compile(r"^[A-Z]{2}\d{2}(?:\s?[A-Z0-9]{4}){2,7}(?:\s?[A-Z0-9]{1,4})?$"),  # IBAN
+)
+
+
+def looks_like_identifier(query: str) -> bool:
+    """
+    True si la query ressemble à un identifiant (n° facture, SIRET, fichier, IBAN).
+
+    Args:
+        query: Texte requête utilisateur
+
+    Returns:
+        True → fast path lexical
+    """
+    query = query.strip()
+    return any(pattern.match(query) for pattern in _IDENTIFIER_PATTERNS)
+
+
+def reciprocal_rank_fusion(
+    rankings: dict[str, list[SearchResult]],
+    top_k: int,
+    k: int = SEARCH_RRF_K,
+) -> list[SearchResult]:
+    """
+    Fusionne plusieurs classements par Reciprocal Rank Fusion.
+
+    Les scores des branches (cosinus, ts_rank) ne sont pas comparables : seuls
+    les rangs comptent. Score final normalisé dans [0, 1] (1.0 = premier dans
+    toutes les branches). Scores d'origine conservés dans metadata.
+
+    Args:
+        rankings: {"vector": [...], "lexical": [...]} (chaque liste triée)
+        top_k: Nombre de résultats
+        k: Constante RRF
+
+    Returns:
+        Liste SearchResult triée par score fusionné
+    """
+    fused: dict[str, float] = {}
+    merged: dict[str, SearchResult] = {}
+    for branch, results in rankings.items():
+        for rank, result in enumerate(results, start=1):
+            fused[result.document_id] = fused.get(result.document_id, 0.0) + 1.0 / (k + rank)
+            if result.document_id not in merged:
+                merged[result.document_id] = result.model_copy(
+                    update={"metadata": {**result.metadata, "retrieval": []}}
+                )
+            merged_result = merged[result.document_id]
+            merged_result.metadata["retrieval"].append(branch)
+            merged_result.metadata[f"{branch}_score"] = round(result.score, 4)
+
+    best_possible = len(rankings) / (k + 1)
+    ordered = sorted(fused, key=fused.get, reverse=True)[:top_k]
+    return [
+        merged[document_id].model_copy(
+            update={"score": min(1.0, fused[document_id] / best_possible)}
+        )
+        for document_id in ordered
+    ]
+
 
 # ============================================================
 # Semantic Searcher Class
@@ -75,28 +160,31 @@ class SemanticSearcher:
         query: str,
         top_k: int = TOP_K_DEFAULT,
         filters: Optional[dict] = None,
+        mode: Optional[str] = None,
     ) -> list[SearchResult]:
         """
         Recherche sémantique documents (AC1, AC4).
 
         Pipeline:
-        1. Anonymiser query (Presidio RGPD)
-        2. Générer embedding query via Voyage AI
-        3. Query pgvector avec cosinus distance (<=>)
-        4. Jointure ingestion.document_metadata
-        5. Extraction extrait pertinent (200 chars)
-        6. Retourner top-k SearchResults
+        1. Fast path (mode hybride) : query identifiant → lexical seul si résultats
+        2. Lancer la branche lexicale (texte brut, reste en local) en tâche de fond
+        3. Anonymiser query (Presidio RGPD)
+        4. Embedding query : cache (query_embedding_cache) sinon Voyage AI
+        5. Query pgvector avec cosinus distance (<=>)
+        6. Fusion RRF des deux branches (mode hybride)
+        7. Retourner top-k SearchResults
 
         Args:
             query: Texte requête utilisateur (natural language)
             top_k: Nombre résultats max (default 5, max 100)
             filters: Filtres optionnels (category, date_range, confidence_min, file_type)
+            mode: "hybrid" (lexical + vectoriel) ou "vector" (défaut: SEMANTIC_SEARCH_MODE)
 
         Returns:
             Liste SearchResult triés par score descendant
 
         Raises:
-            ValueError: Si query vide ou top_k invalide
+            ValueError: Si query vide, top_k ou mode invalide
         """
         # Validation query
         if not query or not query.strip():
@@ -106,31 +194,99 @@ class SemanticSearcher:
         if top_k < 1 or top_k > TOP_K_MAX:
             raise ValueError(f"top_k must be between 1 and {TOP_K_MAX}")
 
+        mode = mode or SEMANTIC_SEARCH_MODE
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"mode must be one of {SEARCH_MODES}")
+
+        filters = filters or {}
+
         # Métriques timing
         start_time = time.time()
 
-        # 1. Anonymiser query (Task 4.4)
-        logger.debug("Anonymizing query", query_length=len(query))
-        anonymization_result: AnonymizationResult = await anonymize_text(query)
-        anonymized_query = anonymization_result.anonymized_text
-
-        # 2. Générer embedding query (Task 4.5)
-        logger.debug("Generating query embedding")
-        adapter = get_embedding_adapter()
-        embedding_response = await adapter.embed(
-            texts=[anonymized_query],
-            anonymize=False,  # Déjà anonymisé
-        )
-        query_embedding = embedding_response["embeddings"][0]
+        # 1. Fast path identifiant : pas d'anonymisation ni d'appel Voyage
+        if mode == "hybrid" and looks_like_identifier(query):
+            results = await self._query_lexical(query=query, top_k=top_k, filters=filters)
+            if results:
+                return self._finish(query, results, start_time, retrieval="lexical")
+            logger.debug("Identifier fast path empty, falling back to hybrid")
 
-        # 3. Query pgvector avec filtres (Task 4.6, 4.7)
-        results = await self._query_pgvector(
-            query_embedding=query_embedding,
-            top_k=top_k,
-            filters=filters or {},
+        candidates = max(top_k, SEARCH_HYBRID_CANDIDATES)
+
+        # 2. Branche lexicale en parallèle de anonymisation + embedding + ANN
+        lexical_task = None
+        if mode == "hybrid":
+            lexical_task = asyncio.create_task(
+                self._query_lexical(query=query, top_k=candidates, filters=filters)
+            )
+
+        try:
+            # 3. Anonymiser query (Task 4.4)
+            logger.debug("Anonymizing query", query_length=len(query))
+            anonymization_result: AnonymizationResult = await anonymize_text(query)
+            anonymized_query = anonymization_result.anonymized_text
+
+            # 4. Embedding query (Task 4.5) : cache requête anonymisée → vecteur
+            adapter = get_embedding_adapter()
+            query_embedding = await query_embedding_cache.get(
+                anonymized_query, adapter.model, adapter.dimensions
+            )
+            embedding_cache_hit = query_embedding is not None
+            if not embedding_cache_hit:
+                logger.debug("Generating query embedding")
+                embedding_response = await adapter.embed(
+                    texts=[anonymized_query],
+                    anonymize=False,  # Déjà anonymisé
+                )
+                query_embedding = embedding_response["embeddings"][0]
+                await query_embedding_cache.set(
+                    anonymized_query,
+                    adapter.model,
+                    adapter.dimensions,
+                    query_embedding,
+                )
+
+            # 5. Query pgvector avec filtres (Task 4.6, 4.7)
+            vector_results = await self._query_pgvector(
+                query_embedding=query_embedding,
+                top_k=candidates if lexical_task else top_k,
+                filters=filters,
+            )
+        except BaseException:
+            if lexical_task:
+                lexical_task.cancel()
+            raise
+
+        if not lexical_task:
+            return self._finish(
+                query,
+                vector_results,
+                start_time,
+                retrieval="vector",
+                embedding_cache_hit=embedding_cache_hit,
+            )
+
+        # 6. Fusion RRF
+        lexical_results = await lexical_task
+        results = reciprocal_rank_fusion(
+            {"vector": vector_results, "lexical": lexical_results}, top_k=top_k
+        )
+        return self._finish(
+            query,
+            results,
+            start_time,
+            retrieval="hybrid",
+            embedding_cache_hit=embedding_cache_hit,
         )
 
-        # 4. Calculer et enregistrer métriques (Task 8)
+    def _finish(
+        self,
+        query: str,
+        results: list[SearchResult],
+        start_time: float,
+        retrieval: str,
+        embedding_cache_hit: Optional[bool] = None,
+    ) -> list[SearchResult]:
+        """Enregistre métriques (Task 8) + log, puis retourne les résultats."""
         duration_ms = (time.time() - start_time) * 1000
         top_score = results[0].score if results else 0.0
 
@@ -138,41 +294,34 @@ class SemanticSearcher:
             query_duration_ms=duration_ms,
             results_count=len(results),
             top_score=top_score,
+            embedding_cache_hit=embedding_cache_hit,
         )
 
         logger.info(
             "Semantic search completed",
             query_length=len(query),
             results_count=len(results),
+            retrieval=retrieval,
+            embedding_cache_hit=embedding_cache_hit,
             duration_ms=round(duration_ms, 2),
             top_score=round(top_score, 3),
         )
 
         return results
 
-    async def _query_pgvector(
-        self,
-        query_embedding: list[float],
-        top_k: int,
-        filters: dict,
-    ) -> list[SearchResult]:
+    def _build_filters(self, filters: dict, param_idx: int) -> tuple[str, list]:
         """
-        Query pgvector avec cosinus distance (Task 4.6, 4.7).
-
-        Jointure avec ingestion.document_metadata pour récupérer metadata.
+        Construit les clauses WHERE des filtres (Task 7).
 
         Args:
-            query_embedding: Vecteur query (1024 dims)
-            top_k: Nombre résultats
             filters: Filtres (category, date_range, confidence_min, file_type)
+            param_idx: Premier numéro de paramètre libre ($1/$2 pris par la requête)
 
         Returns:
-            Liste SearchResult
+            (" AND ..." ou "", paramètres)
         """
-        # Construire WHERE clauses depuis filters (Task 7)
         where_clauses = []
-        params = [query_embedding, top_k]
-        param_idx = 3  # $1 = embedding, $2 = limit
+        params = []
 
         # Filter: category
         if "category" in filters:
@@ -203,18 +352,46 @@ class SemanticSearcher:
             params.append(f"%.{filters['file_type']}")
             param_idx += 1
 
-        # Construire WHERE clause
         where_sql = " AND " + " AND ".join(where_clauses) if where_clauses else ""
+        return where_sql, params
 
-        # Activer hnsw.iterative_scan si filtres (pgvector 0.8.0, Task 7.3)
-        if where_clauses:
-            await self.db_pool.execute("SET LOCAL hnsw.iterative_scan = on")
+    async def _query_pgvector(
+        self,
+        query_embedding: list[float],
+        top_k: int,
+        filters: dict,
+    ) -> list[SearchResult]:
+        """
+        Query pgvector avec cosinus distance (Task 4.6, 4.7).
+
+        Jointure avec ingestion.document_metadata pour récupérer metadata.
+
+        Args:
+            query_embedding: Vecteur query (1024 dims)
+            top_k: Nombre résultats
+            filters: Filtres (category, date_range, confidence_min, file_type)
+
+        Returns:
+            Liste SearchResult
+        """
+        # $1 = embedding, $2 = limit ; la requête COUNT numérote ses filtres depuis $1
+        where_sql, filter_params = self._build_filters(filters, param_idx=3)
+        count_where_sql, _ = self._build_filters(filters, param_idx=1)
+        params = [query_embedding, top_k, *filter_params]
+
+        # source_type littéral → index HNSW partiel documents (migration 048)
+        from_sql = f"""
+            FROM knowledge.embeddings e
+            INNER JOIN ingestion.document_metadata dm
+                ON e.document_id = dm.document_id
+            WHERE e.document_id IS NOT NULL
+              AND {source_type_predicate("document")}
+        """
 
         # Query pgvector avec jointure (Task 4.6, 4.7)
         # Cosinus distance (<=>): 0 = identique, 2 = opposés
         # Score = 1 - (distance / 2) pour normaliser [0, 1]
-        query = f"""
-            SELECT
+        columns = """
                 e.document_id,
                 dm.original_filename AS title,
                 dm.final_path AS path,
@@ -224,41 +401,83 @@ class SemanticSearcher:
                 dm.classification_subcategory,
                 dm.classification_confidence,
                 dm.metadata AS document_metadata
-            FROM knowledge.embeddings e
-            INNER JOIN ingestion.document_metadata dm
+        """
+
+        # Filtres → scan exact ou HNSW itératif selon sélectivité (Task 7.3)
+        count_sql = bounded_count_sql(from_sql + count_where_sql) if where_sql else None
+
+        async with self.db_pool.acquire() as conn:
+            rows = await fetch_nearest(
+                conn, columns, from_sql + where_sql, params, top_k, count_sql, filter_params
+            )
+        return [self._to_result(row) for row in rows]
+
+    async def _query_lexical(self, query: str, top_k: int, filters: dict) -> list[SearchResult]:
+        """
+        Branche lexicale : full-text français (search_tsv) + trigrammes filename.
+
+        Texte brut de la query : il ne quitte pas PostgreSQL (pas d'anonymisation
+        requise). Index GIN migration 047.
+
+        Args:
+            query: Texte requête utilisateur
+            top_k: Nombre résultats
+            filters: Filtres (mêmes que la branche vectorielle)
+
+        Returns:
+            Liste SearchResult (score = max(ts_rank_cd normalisé, word_similarity))
+        """
+        # $1 = query, $2 = limit
+        where_sql, filter_params = self._build_filters(filters, param_idx=3)
+
+        sql = f"""
+            WITH q AS (SELECT websearch_to_tsquery('{TEXT_SEARCH_CONFIG}', $1) AS tsq)
+            SELECT
+                dm.document_id,
+                dm.original_filename AS title,
+                dm.final_path AS path,
+                GREATEST(
+                    ts_rank_cd(dm.search_tsv, q.tsq, 32),
+                    word_similarity($1, dm.filename)
+                ) AS score,
+                dm.ocr_text,
+                dm.classification_category,
+                dm.classification_subcategory,
+                dm.classification_confidence,
+                dm.metadata AS document_metadata
+            FROM ingestion.document_metadata dm
+            CROSS JOIN q
+            LEFT JOIN knowledge.embeddings e
                 ON e.document_id = dm.document_id
-            WHERE e.document_id IS NOT NULL
+            WHERE (dm.search_tsv @@ q.tsq OR $1 <% dm.filename)
             {where_sql}
-            ORDER BY e.embedding <=> $1
+            ORDER BY score DESC
             LIMIT $2
         """
 
-        rows = await self.db_pool.fetch(query, *params)
-
-        # 5. Construire SearchResults avec excerpts (Task 4.8)
-        results = []
-        for row in rows:
-            excerpt = self._extract_excerpt(
-                text=row["ocr_text"] or "",
-                max_length=EXCERPT_LENGTH,
-            )
+        rows = await self.db_pool.fetch(sql, query.strip(), top_k, *filter_params)
+        return [self._to_result(row) for row in rows]
 
-            result = SearchResult(
-                document_id=str(row["document_id"]),
-                title=row["title"],
-                path=row["path"],
-                score=float(row["score"]),
-                excerpt=excerpt,
-                metadata={
-                    "category": row["classification_category"],
-                    "subcategory": row["classification_subcategory"],
-                    "classification_confidence": float(row["classification_confidence"] or 0.0),
-                    "document_metadata": row["document_metadata"],
-                },
-            )
-            results.append(result)
+    def _to_result(self, row) -> SearchResult:
+        """Row SQL → SearchResult avec excerpt (Task 4.8)."""
+        excerpt = self._extract_excerpt(
+            text=row["ocr_text"] or "",
+            max_length=EXCERPT_LENGTH,
+        )
 
-        return results
+        return SearchResult(
+            document_id=str(row["document_id"]),
+            title=row["title"],
+            path=row["path"],
+            score=min(1.0, max(0.0, float(row["score"]))),
+            excerpt=excerpt,
+            metadata={
+                "category": row["classification_category"],
+                "subcategory": row["classification_subcategory"],
+                "classification_confidence": float(row["classification_confidence"] or 0.0),
+                "document_metadata": row["document_metadata"],
+            },
+        )
 
     def _extract_excerpt(self, text: str, max_length: int = EXCERPT_LENGTH) -> str:
         """
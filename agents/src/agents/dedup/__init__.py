@@ -3,6 +3,7 @@ Dedup Agent (Story 3.8).
 
 Modules:
 - scanner: PC-wide file scanner with SHA256 deduplication
+- hash_index: Persistent SQLite hash index reused across scans
 - priority_engine: Selection rules for duplicate groups
 - report_generator: CSV dry-run report generation
 - deleter: Batch deletion with safety checks
@@ -13,6 +14,7 @@ from agents.src.agents.dedup.models import (
     DedupGroup,
     DedupJob,
     FileEntry,
+    ScanChanges,
     ScanConfig,
     ScanResult,
     ScanStats,
@@ -22,6 +24,7 @@ __all__ = [
     "DedupGroup",
     "DedupJob",
     "FileEntry",
+    "ScanChanges",
     "ScanConfig",
     "ScanResult",
     "ScanStats",
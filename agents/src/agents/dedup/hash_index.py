@@ -0,0 +1,279 @@
+"""
+Persistent hash index for the dedup scanner (SQLite, on the scanned PC).
+
+Keeps the stat signature (size, mtime_ns, inode) and hashes of every file
+seen by the last scan, so a rescan only reads files that changed:
+
+- Walk: stat signatures go to a TEMP table (no per-file query)
+- Hashing: partial/full hashes of unchanged files are reused
+- Commit: index updated in one transaction; files gone from a complete
+  scan are dropped
+
+Also answers "what changed since the last scan" (added/modified/removed).
+
+SQLite rather than PostgreSQL: the scanner runs where the files are, the
+index stays usable offline and a weekly rescan writes ~1M rows locally.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Rows per executemany() when loading stat signatures
+INDEX_BATCH_ROWS = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    partial_bytes INTEGER,
+    partial_hash TEXT,
+    sha256 TEXT,
+    scan_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_scan_id ON files (scan_id);
+CREATE TABLE IF NOT EXISTS scans (
+    scan_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    root_path TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    completed_at TEXT
+);
+"""
+
+# Same stat signature = same content (hashes reusable). A stored inode of 0
+# comes from an index written with Windows DirEntry stats (st_ino = 0): it is
+# unknown, not different, and gets the real inode on the next commit.
+_UNCHANGED = "s.size = f.size AND s.mtime_ns = f.mtime_ns AND f.inode IN (0, s.inode)"
+_UNCHANGED_UPSERT = (
+    "excluded.size = f.size AND excluded.mtime_ns = f.mtime_ns AND f.inode IN (0, excluded.inode)"
+)
+
+
+class HashIndex:
+    """
+    On-disk index path -> (size, mtime_ns, inode, partial hash, SHA256).
+
+    Usage:
+        index = HashIndex(path)
+        index.begin_scan(root)
+        index.record_stats(rows)        # during walk
+        cached = index.cached_hashes(partial_bytes)
+        changes = index.changes(root, complete=True)
+        index.commit_scan(root, partial_hashes, full_hashes, partial_bytes, complete=True)
+        index.close()
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Open (or create) the index.
+
+        Args:
+            db_path: SQLite file (parent directory created if missing)
+        """
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path))
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._scan_id: Optional[int] = None
+        self.previous_scan_date: Optional[datetime] = None
+
+    def close(self) -> None:
+        """Close the connection (uncommitted scan is discarded)."""
+        self._conn.close()
+
+    def begin_scan(self, root_path: Path) -> int:
+        """
+        Start a scan: register it and reset the TEMP table of seen files.
+
+        Args:
+            root_path: Scanned root (previous scan date is per root)
+
+        Returns:
+            scan_id
+        """
+        row = self._conn.execute(
+            "SELECT max(completed_at) FROM scans WHERE root_path = ? AND completed_at IS NOT NULL",
+            (str(root_path),),
+        ).fetchone()
+        self.previous_scan_date = datetime.fromisoformat(row[0]) if row[0] else None
+
+        cursor = self._conn.execute(
+            "INSERT INTO scans (root_path, started_at) VALUES (?, ?)",
+            (str(root_path), _now()),
+        )
+        self._scan_id = cursor.lastrowid
+        self._conn.executescript(
+            """
+            DROP TABLE IF EXISTS temp.seen;
+            CREATE TEMP TABLE seen (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL
+            );
+            """
+        )
+        return self._scan_id
+
+    def record_stats(self, rows: Iterable[tuple[str, int, int, int]]) -> None:
+        """
+        Record walked files.
+
+        Args:
+            rows: (path, size, mtime_ns, inode) tuples
+        """
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO temp.seen (path, size, mtime_ns, inode) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+
+    def cached_hashes(self, partial_bytes: int) -> dict[str, tuple[Optional[str], Optional[str]]]:
+        """
+        Hashes of walked files whose stat signature is unchanged.
+
+        Args:
+            partial_bytes: Current partial hash size (other sizes are not reused)
+
+        Returns:
+            {path: (partial hash or None, SHA256 or None)}
+        """
+        rows = self._conn.execute(
+            f"""
+            SELECT s.path,
+                   CASE WHEN f.partial_bytes = ? THEN f.partial_hash END,
+                   f.sha256
+            FROM temp.seen s JOIN files f ON f.path = s.path
+            WHERE {_UNCHANGED}
+              AND ((f.partial_bytes = ? AND f.partial_hash IS NOT NULL) OR f.sha256 IS NOT NULL)
+            """,
+            (partial_bytes, partial_bytes),
+        )
+        return {path: (partial, full) for path, partial, full in rows}
+
+    def changes(self, root_path: Path, complete: bool) -> tuple[list[str], list[str], list[str]]:
+        """
+        Files added, modified and removed since the last scan.
+
+        Call before commit_scan() (which overwrites the previous state).
+
+        Args:
+            root_path: Scanned root (removed files are searched below it)
+            complete: Walk finished (otherwise unseen files are not "removed")
+
+        Returns:
+            (added, modified, removed) path lists
+        """
+        added = [
+            row[0]
+            for row in self._conn.execute(
+                "SELECT s.path FROM temp.seen s LEFT JOIN files f ON f.path = s.path "
+                "WHERE f.path IS NULL"
+            )
+        ]
+        modified = [
+            row[0]
+            for row in self._conn.execute(
+                "SELECT s.path FROM temp.seen s JOIN files f ON f.path = s.path "
+                f"WHERE NOT ({_UNCHANGED})"
+            )
+        ]
+        removed: list[str] = []
+        if complete:
+            root = _prefix(root_path)
+            removed = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT f.path FROM files f LEFT JOIN temp.seen s ON s.path = f.path "
+                    "WHERE s.path IS NULL AND substr(f.path, 1, ?) = ?",
+                    (len(root), root),
+                )
+            ]
+        return added, modified, removed
+
+    def commit_scan(
+        self,
+        root_path: Path,
+        partial_hashes: dict[str, str],
+        full_hashes: dict[str, str],
+        partial_bytes: int,
+        complete: bool,
+    ) -> None:
+        """
+        Persist the scan in one transaction.
+
+        Changed files lose their stored hashes, then the hashes computed by
+        this scan are written. A complete scan also drops files that were
+        not seen below root_path and marks the scan completed.
+
+        Args:
+            root_path: Scanned root
+            partial_hashes: {path: partial hash} computed by this scan
+            full_hashes: {path: SHA256} computed by this scan
+            partial_bytes: Partial hash size used by this scan
+            complete: Walk and hashing finished
+        """
+        with self._conn:
+            # "WHERE true": SQLite parsing of INSERT ... SELECT ... ON CONFLICT
+            self._conn.execute(
+                f"""
+                INSERT INTO files AS f (path, size, mtime_ns, inode, scan_id)
+                SELECT path, size, mtime_ns, inode, ? FROM temp.seen WHERE true
+                ON CONFLICT (path) DO UPDATE SET
+                    partial_bytes = CASE WHEN {_UNCHANGED_UPSERT} THEN f.partial_bytes END,
+                    partial_hash = CASE WHEN {_UNCHANGED_UPSERT} THEN f.partial_hash END,
+                    sha256 = CASE WHEN {_UNCHANGED_UPSERT} THEN f.sha256 END,
+                    size = excluded.size,
+                    mtime_ns = excluded.mtime_ns,
+                    inode = excluded.inode,
+                    scan_id = excluded.scan_id
+                """,
+                (self._scan_id,),
+            )
+            self._conn.executemany(
+                "UPDATE files SET partial_bytes = ?, partial_hash = ? WHERE path = ?",
+                ((partial_bytes, digest, path) for path, digest in partial_hashes.items()),
+            )
+            self._conn.executemany(
+                "UPDATE files SET sha256 = ? WHERE path = ?",
+                ((digest, path) for path, digest in full_hashes.items()),
+            )
+            if complete:
+                root = _prefix(root_path)
+                self._conn.execute(
+                    "DELETE FROM files WHERE scan_id < ? AND substr(path, 1, ?) = ?",
+                    (self._scan_id, len(root), root),
+                )
+                self._conn.execute(
+                    "UPDATE scans SET completed_at = ? WHERE scan_id = ?",
+                    (_now(), self._scan_id),
+                )
+
+        logger.info(
+            "dedup_hash_index_committed",
+            db_path=str(self.db_path),
+            scan_id=self._scan_id,
+            partial_hashes=len(partial_hashes),
+            full_hashes=len(full_hashes),
+            complete=complete,
+        )
+
+
+def _prefix(root_path: Path) -> str:
+    """Root with trailing separator (C:\\Users\\lopez must not match lopez2)."""
+    return os.path.join(str(root_path), "")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
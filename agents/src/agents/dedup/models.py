@@ -4,6 +4,7 @@ Pydantic models for dedup agent (Story 3.8).
 Models:
 - ScanConfig: Scan configuration (paths, exclusions, limits)
 - ScanStats: Real-time scan statistics
+- ScanChanges: Files changed since the previous scan (persistent hash index)
 - ScanResult: Final scan result
 - FileEntry: Single file with metadata
 - DedupGroup: Group of duplicate files (same SHA256)
@@ -12,6 +13,7 @@ Models:
 
 from __future__ import annotations
 
+import os
 import uuid
 from datetime import datetime, timezone
 from enum import Enum
@@ -107,10 +109,26 @@ class ScanConfig(BaseModel):
         default=65536,
         description="SHA256 hashing chunk size in bytes",
     )
+    partial_hash_bytes: int = Field(
+        default=65536,
+        description="Bytes hashed at the head and tail of same-size files (stage 2)",
+    )
+    walk_workers: int = Field(
+        default=8,
+        description="Threads listing directories in parallel (I/O bound: NAS latency)",
+    )
+    hash_workers: int = Field(
+        default_factory=lambda: min(os.cpu_count() or 1, 8),
+        description="Hashing processes (<= 1: default thread pool, no process pool)",
+    )
     scan_timeout_hours: int = Field(
         default=4,
         description="Abort scan if exceeds this duration",
     )
+    hash_index_path: Optional[Path] = Field(
+        default=None,
+        description="SQLite hash index reused across scans (None = no persistence)",
+    )
 
 
 class ScanStats(BaseModel):
@@ -123,6 +141,9 @@ class ScanStats(BaseModel):
     total_duplicates: int = 0
     space_reclaimable_bytes: int = 0
     current_directory: str = ""
+    phase: str = ""  # walk, partial_hash, full_hash
+    bytes_hashed: int = 0
+    hashes_reused: int = 0  # from the persistent hash index
 
 
 class FileEntry(BaseModel):
@@ -149,6 +170,15 @@ class DedupGroup(BaseModel):
     to_delete: list[FileEntry] = Field(default_factory=list)
 
 
+class ScanChanges(BaseModel):
+    """Files changed since the previous complete scan of the same root."""
+
+    previous_scan_date: datetime
+    added: list[Path] = Field(default_factory=list)
+    modified: list[Path] = Field(default_factory=list)
+    removed: list[Path] = Field(default_factory=list)
+
+
 class ScanResult(BaseModel):
     """Final scan result."""
 
@@ -160,6 +190,7 @@ class ScanResult(BaseModel):
     space_reclaimable_gb: float = 0.0
     groups: list[DedupGroup] = Field(default_factory=list)
     errors: list[str] = Field(default_factory=list)
+    changes: Optional[ScanChanges] = None  # None: no hash index or first scan
 
 
 class DedupJob(BaseModel):
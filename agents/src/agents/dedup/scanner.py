@@ -2,10 +2,18 @@
 PC-wide file scanner with SHA256 deduplication (Story 3.8).
 
 Features:
-- Recursive scan with Path.rglob()
+- Parallel os.scandir() walk (thread pool, excluded directories pruned,
+  DirEntry stat reused)
 - Smart exclusions (system paths, dev folders, extensions)
-- Chunked SHA256 hashing (65536 bytes)
+- Multi-stage dedup, each stage reading only what the previous one
+  could not rule out:
+    1. Walk: group files by size (stat only, no read)
+    2. Partial hash: first + last 64 KiB of files sharing a size
+    3. Full SHA256: files whose partial hashes collide
+- Hashing in a process pool (all cores)
 - In-memory hash cache for performance
+- Optional persistent hash index (SQLite): unchanged files are not re-read
+  across scans, changes since the last scan are reported
 - Priority path ordering (BeeStation first)
 - Progress callback for Telegram updates
 
@@ -17,25 +25,119 @@ from __future__ import annotations
 
 import asyncio
 import hashlib
+import os
 import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from typing import Callable, Optional
 
 import structlog
-from agents.src.agents.dedup.models import DedupGroup, FileEntry, ScanConfig, ScanResult, ScanStats
+from agents.src.agents.dedup.hash_index import INDEX_BATCH_ROWS, HashIndex
+from agents.src.agents.dedup.models import (
+    DedupGroup,
+    FileEntry,
+    ScanChanges,
+    ScanConfig,
+    ScanResult,
+    ScanStats,
+)
 
 logger = structlog.get_logger(__name__)
 
+# Files per hashing task sent to the pool (amortizes inter-process overhead)
+HASH_BATCH_FILES = 64
+
+
+# ============================================================================
+# Hashing (module-level: picklable for ProcessPoolExecutor)
+# ============================================================================
+
+
+def hash_file_full(path: str, chunk_size: int = 65536) -> tuple[str, int]:
+    """
+    Compute full SHA256 hash (chunked for memory efficiency).
+
+    Args:
+        path: File to hash
+        chunk_size: Read chunk size
+
+    Returns:
+        (hex digest, bytes read)
+
+    AC2: SHA256 chunks 65536 bytes
+    """
+    sha256 = hashlib.sha256()
+    bytes_read = 0
+
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            sha256.update(chunk)
+            bytes_read += len(chunk)
+
+    return sha256.hexdigest(), bytes_read
+
+
+def hash_file_partial(path: str, partial_bytes: int = 65536) -> tuple[str, int]:
+    """
+    Hash the first and last partial_bytes of a file.
+
+    Only meaningful between files of the same size: different partial
+    hashes prove different contents, equal ones still need a full hash.
+
+    Args:
+        path: File to hash
+        partial_bytes: Bytes read at each end
+
+    Returns:
+        (hex digest, bytes read)
+    """
+    sha256 = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        head = f.read(partial_bytes)
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(size - partial_bytes, len(head)))
+        tail = f.read(partial_bytes)
+
+    sha256.update(head)
+    sha256.update(tail)
+    return sha256.hexdigest(), len(head) + len(tail)
+
+
+def _hash_batch(
+    mode: str, paths: list[str], chunk_size: int, partial_bytes: int
+) -> list[tuple[str, Optional[str], int]]:
+    """
+    Hash a batch of files in a worker process.
+
+    Returns:
+        [(path, digest or None if unreadable, bytes read), ...]
+    """
+    results = []
+    for path in paths:
+        try:
+            if mode == "partial":
+                digest, bytes_read = hash_file_partial(path, partial_bytes)
+            else:
+                digest, bytes_read = hash_file_full(path, chunk_size)
+        except OSError:
+            results.append((path, None, 0))
+            continue
+        results.append((path, digest, bytes_read))
+    return results
+
 
 class DedupScanner:
     """
     PC-wide file scanner with SHA256 deduplication.
 
     Features:
-    - Recursive scan with Path.rglob()
+    - Parallel os.scandir() walk with directory pruning
     - Smart exclusions (system paths, dev folders)
-    - Chunked SHA256 hashing (65536 bytes)
+    - Size -> partial hash -> full SHA256 pipeline, hashing in a process pool
     - In-memory cache for performance
+    - Persistent hash index across scans (config.hash_index_path)
     - Priority path ordering
     """
 
@@ -55,11 +157,18 @@ class DedupScanner:
         self.progress_callback = progress_callback
         self.hash_cache: dict[str, str] = {}  # path_str -> sha256
         self.size_cache: dict[str, int] = {}  # path_str -> size
+        self._size_groups: dict[int, list[str]] = {}  # size -> [path_str, ...]
         self._hash_groups: dict[str, list[str]] = {}  # sha256 -> [path_str, ...]
         self.stats = ScanStats()
         self._start_time: float = 0.0
         self._cancelled = False
         self._dup_groups_count: int = 0
+        self._timed_out = False
+        self._walk_complete = False
+        self._index: Optional[HashIndex] = None
+        self._pending_stats: list[tuple[str, int, int, int]] = []  # (path, size, mtime_ns, inode)
+        self._cached_hashes: dict[str, tuple[Optional[str], Optional[str]]] = {}
+        self._new_hashes: dict[str, dict[str, str]] = {"partial": {}, "full": {}}
 
     def cancel(self) -> None:
         """Cancel the scan."""
@@ -70,8 +179,10 @@ class DedupScanner:
         Main scan entry point.
 
         Steps:
-        1. Scan priority paths first (BeeStation)
-        2. Scan remaining paths
+        1. Scan priority paths first (BeeStation), then remaining paths:
+           files grouped by size
+        2. Partial hash of same-size files, full SHA256 of collisions
+           (hashes of unchanged files reused from the hash index)
         3. Group duplicates by hash
         4. Return results
 
@@ -83,6 +194,7 @@ class DedupScanner:
         """
         self._start_time = time.time()
         self._cancelled = False
+        self._timed_out = False
 
         logger.info(
             "dedup_scan_started",
@@ -93,29 +205,49 @@ class DedupScanner:
         # Check timeout
         timeout_seconds = self.config.scan_timeout_hours * 3600
 
-        # Phase 1: Scan priority paths first (highest score first)
-        sorted_priorities = sorted(
-            self.config.priority_paths.items(),
-            key=lambda x: x[1],
-            reverse=True,
-        )
+        if self.config.hash_index_path is not None:
+            self._index = HashIndex(self.config.hash_index_path)
+            self._index.begin_scan(self.config.root_path)
+
+        changes: Optional[ScanChanges] = None
+        try:
+            # Phase 1: Scan priority paths first (highest score first)
+            sorted_priorities = sorted(
+                self.config.priority_paths.items(),
+                key=lambda x: x[1],
+                reverse=True,
+            )
+
+            scanned_dirs: set[str] = set()
+
+            for priority_fragment, _score in sorted_priorities:
+                if self._cancelled:
+                    break
 
-        scanned_paths: set[str] = set()
+                # Build full priority path
+                priority_path = self.config.root_path / priority_fragment
+                if priority_path.exists() and priority_path.is_dir():
+                    await self._scan_directory(priority_path, scanned_dirs, timeout_seconds)
 
-        for priority_fragment, _score in sorted_priorities:
-            if self._cancelled:
-                break
+            # Phase 2: Scan remaining paths under root
+            if not self._cancelled:
+                await self._scan_directory(self.config.root_path, scanned_dirs, timeout_seconds)
 
-            # Build full priority path
-            priority_path = self.config.root_path / priority_fragment
-            if priority_path.exists() and priority_path.is_dir():
-                await self._scan_directory(priority_path, scanned_paths, timeout_seconds)
+            if self._index is not None:
+                changes = self._load_index()
 
-        # Phase 2: Scan remaining paths under root
-        if not self._cancelled:
-            await self._scan_directory(self.config.root_path, scanned_paths, timeout_seconds)
+            # Phase 3: Hash only files that can still have a duplicate
+            if not self._cancelled:
+                await self._hash_candidates(timeout_seconds)
 
-        # Phase 3: Build duplicate groups
+            if self._index is not None:
+                self._commit_index()
+        finally:
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+
+        # Phase 4: Build duplicate groups
         groups = self._build_duplicate_groups()
 
         # Calculate space reclaimable
@@ -135,6 +267,7 @@ class DedupScanner:
             space_reclaimable_gb=round(space_reclaimable / (1024**3), 2),
             groups=groups,
             errors=[],
+            changes=changes,
         )
 
         logger.info(
@@ -143,6 +276,8 @@ class DedupScanner:
             duplicate_groups=result.duplicate_groups_count,
             total_duplicates=result.total_duplicates,
             space_reclaimable_gb=result.space_reclaimable_gb,
+            bytes_hashed=self.stats.bytes_hashed,
+            hashes_reused=self.stats.hashes_reused,
             elapsed_seconds=int(time.time() - self._start_time),
         )
 
@@ -151,86 +286,150 @@ class DedupScanner:
     async def _scan_directory(
         self,
         directory: Path,
-        already_scanned: set[str],
+        scanned_dirs: set[str],
         timeout_seconds: int,
     ) -> None:
         """
-        Scan a directory recursively.
+        Walk a directory tree: os.scandir() calls run in parallel on a thread
+        pool (one directory per call), results are consumed here.
 
         Args:
             directory: Directory to scan
-            already_scanned: Set of already-scanned file paths (avoid re-scan)
+            scanned_dirs: Normalized paths of directories already walked
+                (priority paths are not walked twice)
             timeout_seconds: Abort if exceeded
         """
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.config.walk_workers)
+        frontier: list[str] = [str(directory)]
+        pending: set[asyncio.Future] = set()
+
         try:
-            for file_path in directory.rglob("*"):
-                if self._cancelled:
-                    return
+            while frontier or pending:
+                while frontier and len(pending) < self.config.walk_workers:
+                    next_dir = frontier.pop()
+                    # Case-insensitive on Windows: Desktop/ == desktop/
+                    dir_key = os.path.normcase(os.path.abspath(next_dir))
+                    if dir_key in scanned_dirs:
+                        continue
+                    scanned_dirs.add(dir_key)
+                    pending.add(loop.run_in_executor(executor, self._list_directory, next_dir))
+
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        listed_dir, files, subdirs, skipped, errors = future.result()
+                    except OSError as e:
+                        self.stats.total_errors += 1
+                        logger.debug(
+                            "dedup_directory_unreadable",
+                            directory=e.filename,
+                            error=str(e),
+                        )
+                        continue
+
+                    frontier.extend(subdirs)
+                    self.stats.total_skipped += skipped
+                    self.stats.total_errors += errors
+                    self.stats.current_directory = listed_dir
+
+                    for path_str, size, mtime_ns, inode in files:
+                        if self._cancelled:
+                            return
+
+                        self._process_file(path_str, size, mtime_ns, inode)
+
+                        # Yield control periodically
+                        if self.stats.total_scanned % 100 == 0:
+                            await asyncio.sleep(0)
+
+                            # Progress callback
+                            self._report_progress("walk")
+
+                    # Timeout check
+                    if time.time() - self._start_time > timeout_seconds:
+                        self._timed_out = True
+                        logger.warning(
+                            "dedup_scan_timeout",
+                            timeout_hours=self.config.scan_timeout_hours,
+                        )
+                        return
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _list_directory(
+        self, directory: str
+    ) -> tuple[str, list[tuple[str, int, int, int]], list[str], int, int]:
+        """
+        List one directory (runs in a walker thread).
 
-                # Timeout check
-                if time.time() - self._start_time > timeout_seconds:
-                    logger.warning(
-                        "dedup_scan_timeout",
-                        timeout_hours=self.config.scan_timeout_hours,
-                    )
-                    return
+        Exclusions are applied on DirEntry data: excluded directories are
+        pruned before descending, file sizes come from the DirEntry stat
+        (cached by os.scandir on Windows, no extra system call). The Windows
+        DirEntry stat has st_ino = 0: with the hash index enabled, the real
+        inode is read with entry.inode() so the stored signature stays
+        comparable across scans.
 
-                # Skip already scanned (resolve to canonical path for
-                # case-insensitive Windows: Desktop/ == desktop/)
-                resolved_key = str(file_path.resolve())
-                if resolved_key in already_scanned:
-                    continue
+        Args:
+            directory: Directory to list
 
-                # Skip directories
-                if file_path.is_dir():
-                    continue
+        Returns:
+            (directory, [(path, size, mtime_ns, inode), ...], subdirectories,
+            skipped files, errors)
 
-                # Apply exclusions
-                if not self._should_scan(file_path):
-                    self.stats.total_skipped += 1
-                    already_scanned.add(resolved_key)
-                    continue
+        Raises:
+            OSError: Directory unreadable (permission denied, removed)
 
-                # Process file
+        AC1: Exclusions intelligentes
+        """
+        files: list[tuple[str, int, int, int]] = []
+        subdirs: list[str] = []
+        skipped = 0
+        errors = 0
+        need_inode = self.config.hash_index_path is not None
+
+        with os.scandir(directory) as entries:
+            for entry in entries:
                 try:
-                    await self._process_file(file_path)
-                    already_scanned.add(resolved_key)
-                except PermissionError:
-                    self.stats.total_errors += 1
-                    already_scanned.add(resolved_key)
-                    logger.debug(
-                        "dedup_permission_denied",
-                        file_path=str(file_path),
-                    )
-                except OSError as e:
-                    self.stats.total_errors += 1
-                    already_scanned.add(resolved_key)
-                    logger.debug(
-                        "dedup_os_error",
-                        file_path=str(file_path),
-                        error=str(e),
-                    )
+                    # Symlinks and junctions are not followed (loops, double counting)
+                    if entry.is_symlink() or getattr(entry, "is_junction", lambda: False)():
+                        skipped += 1
+                        continue
+
+                    if entry.is_dir(follow_symlinks=False):
+                        if not self._is_excluded_dir(entry.path, entry.name):
+                            subdirs.append(entry.path)
+                        continue
+
+                    if self._is_excluded_name(entry.name):
+                        skipped += 1
+                        continue
+
+                    stat = entry.stat(follow_symlinks=False)
+                    if not self._size_in_range(stat.st_size):
+                        skipped += 1
+                        continue
+
+                    inode = stat.st_ino or (entry.inode() if need_inode else 0)
+                except OSError:
+                    errors += 1
+                    continue
 
-                # Yield control periodically
-                if self.stats.total_scanned % 100 == 0:
-                    await asyncio.sleep(0)
+                files.append((entry.path, stat.st_size, stat.st_mtime_ns, inode))
 
-                    # Progress callback
-                    if self.progress_callback:
-                        self.stats.current_directory = str(directory)
-                        self.stats.duplicate_groups = self._dup_groups_count
-                        self.progress_callback(self.stats)
-
-        except PermissionError:
-            logger.debug(
-                "dedup_directory_permission_denied",
-                directory=str(directory),
-            )
+        return directory, files, subdirs, skipped, errors
 
     def _should_scan(self, file_path: Path) -> bool:
         """
         Check if file should be scanned (exclusions).
 
+        Same rules as the walker, for a single path.
+
         Args:
             file_path: File to check
 
@@ -240,27 +439,16 @@ class DedupScanner:
         AC1: Exclusions intelligentes
         """
         # System paths (case-insensitive)
-        path_str_lower = str(file_path).lower()
-        for excl in self.config.excluded_folders:
-            # Use path separator to avoid partial matches
-            if "\\" + excl + "\\" in path_str_lower or path_str_lower.startswith(excl):
-                return False
+        if self._in_excluded_folder(str(file_path)):
+            return False
 
         # Dev folders (check any part of path)
         for part in file_path.parts:
             if part in self.config.excluded_dev_folders:
                 return False
 
-        # System extensions
-        if file_path.suffix.lower() in self.config.excluded_extensions:
-            return False
-
-        # System filenames
-        if file_path.name.lower() in self.config.excluded_filenames:
-            return False
-
-        # Office temp files (~$*)
-        if file_path.name.startswith("~$"):
+        # System extensions, filenames, Office temp files
+        if self._is_excluded_name(file_path.name):
             return False
 
         # Size filters (handle stat errors)
@@ -269,10 +457,7 @@ class DedupScanner:
         except (OSError, PermissionError):
             return False
 
-        if file_size < self.config.min_file_size:
-            return False
-
-        if file_size > self.config.max_file_size:
+        if not self._size_in_range(file_size):
             return False
 
         # Skip symlinks
@@ -281,38 +466,264 @@ class DedupScanner:
 
         return True
 
-    async def _process_file(self, file_path: Path) -> None:
+    def _in_excluded_folder(self, path_str: str) -> bool:
+        """Path inside an excluded system folder (case-insensitive)."""
+        path_str_lower = path_str.lower()
+        for excl in self.config.excluded_folders:
+            # Use path separator to avoid partial matches
+            if "\\" + excl + "\\" in path_str_lower or path_str_lower.startswith(excl):
+                return True
+        return False
+
+    def _is_excluded_dir(self, dir_path: str, name: str) -> bool:
+        """Directory pruned by the walker (dev folder or excluded system folder)."""
+        if name in self.config.excluded_dev_folders:
+            return True
+        # Trailing separator: the directory itself matches "\\windows\\"
+        return self._in_excluded_folder(dir_path + "\\")
+
+    def _is_excluded_name(self, name: str) -> bool:
+        """System extension, system filename, dev folder name or Office temp file (~$*)."""
+        name_lower = name.lower()
+        return (
+            os.path.splitext(name_lower)[1] in self.config.excluded_extensions
+            or name_lower in self.config.excluded_filenames
+            or name in self.config.excluded_dev_folders
+            or name.startswith("~$")
+        )
+
+    def _size_in_range(self, file_size: int) -> bool:
+        """Size between min_file_size and max_file_size."""
+        return self.config.min_file_size <= file_size <= self.config.max_file_size
+
+    def _process_file(self, path_str: str, file_size: int, mtime_ns: int, inode: int) -> None:
         """
-        Process single file: compute hash and group duplicates.
+        Record file size (stage 1: group by size, no read).
+
+        A file whose size is unique cannot have a duplicate and is never read.
 
         Args:
-            file_path: File to process
+            path_str: File path
+            file_size: Size from the walker's DirEntry stat
+            mtime_ns: Modification time (hash index signature)
+            inode: Inode (hash index signature)
+        """
+        self.size_cache[path_str] = file_size
+        self._size_groups.setdefault(file_size, []).append(path_str)
+
+        if self._index is not None:
+            self._pending_stats.append((path_str, file_size, mtime_ns, inode))
+            if len(self._pending_stats) >= INDEX_BATCH_ROWS:
+                self._flush_stats()
 
-        AC2: SHA256 chunked hashing + grouping
+        # Stats
+        self.stats.total_scanned += 1
+
+    async def _hash_candidates(self, timeout_seconds: int) -> None:
         """
-        path_str = str(file_path)
+        Stages 2 and 3: partial hash of same-size files, full hash of collisions.
 
-        # Get file size
-        file_size = file_path.stat().st_size
-        self.size_cache[path_str] = file_size
+        Files no larger than two partial blocks are fully hashed directly
+        (the partial hash would read them entirely anyway).
+
+        Args:
+            timeout_seconds: Abort if exceeded
+
+        AC2: Deduplication SHA256
+        """
+        partial_bytes = self.config.partial_hash_bytes
+        same_size = [paths for paths in self._size_groups.values() if len(paths) > 1]
 
-        # Compute SHA256 (run in thread to avoid blocking)
-        sha256_hash = await asyncio.to_thread(self._hash_file, file_path)
+        small = [p for paths in same_size for p in paths if self.size_cache[p] <= 2 * partial_bytes]
+        large = [p for paths in same_size for p in paths if self.size_cache[p] > 2 * partial_bytes]
 
-        # Cache
-        self.hash_cache[path_str] = sha256_hash
+        executor = self._make_executor()
+        try:
+            # Stage 2: partial hash, grouped with size
+            partial_groups: dict[tuple[int, str], list[str]] = {}
+            for path_str, digest in await self._hash_or_reuse(
+                executor, "partial", large, timeout_seconds
+            ):
+                key = (self.size_cache[path_str], digest)
+                partial_groups.setdefault(key, []).append(path_str)
+
+            # Stage 3: full SHA256 of partial collisions
+            collisions = [p for paths in partial_groups.values() if len(paths) > 1 for p in paths]
+            for path_str, digest in await self._hash_or_reuse(
+                executor, "full", small + collisions, timeout_seconds
+            ):
+                self.hash_cache[path_str] = digest
+                self._hash_groups.setdefault(digest, []).append(path_str)
+                if len(self._hash_groups[digest]) == 2:
+                    self._dup_groups_count += 1
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
 
-        # Group by hash
-        if sha256_hash not in self._hash_groups:
-            self._hash_groups[sha256_hash] = []
-        self._hash_groups[sha256_hash].append(path_str)
+        logger.info(
+            "dedup_hashing_completed",
+            same_size_files=len(small) + len(large),
+            partial_hashed=len(large),
+            full_hashed=len(small) + len(collisions),
+            bytes_hashed=self.stats.bytes_hashed,
+        )
 
-        # Track duplicate groups incrementally (avoid O(n) recomputation)
-        if len(self._hash_groups[sha256_hash]) == 2:
-            self._dup_groups_count += 1
+    async def _hash_or_reuse(
+        self,
+        executor: Optional[Executor],
+        mode: str,
+        paths: list[str],
+        timeout_seconds: int,
+    ) -> list[tuple[str, str]]:
+        """
+        Reuse hashes of unchanged files from the hash index, hash the others.
 
-        # Stats
-        self.stats.total_scanned += 1
+        Args:
+            executor: Process pool (None = default thread pool)
+            mode: "partial" or "full"
+            paths: Files to hash
+            timeout_seconds: Abort if exceeded
+
+        Returns:
+            [(path, digest), ...] for readable files
+        """
+        slot = 0 if mode == "partial" else 1
+        reused: list[tuple[str, str]] = []
+        missing: list[str] = []
+        for path_str in paths:
+            cached = self._cached_hashes.get(path_str)
+            if cached is not None and cached[slot] is not None:
+                reused.append((path_str, cached[slot]))
+            else:
+                missing.append(path_str)
+        self.stats.hashes_reused += len(reused)
+
+        hashed = await self._hash_paths(executor, mode, missing, timeout_seconds)
+        self._new_hashes[mode].update(hashed)
+        return reused + hashed
+
+    def _flush_stats(self) -> None:
+        """Send buffered stat signatures to the hash index."""
+        if self._pending_stats:
+            self._index.record_stats(self._pending_stats)
+            self._pending_stats = []
+
+    def _load_index(self) -> Optional[ScanChanges]:
+        """
+        After the walk: load reusable hashes, diff against the previous scan.
+
+        Returns:
+            Changes since the previous complete scan (None on first scan)
+        """
+        self._flush_stats()
+        self._cached_hashes = self._index.cached_hashes(self.config.partial_hash_bytes)
+
+        self._walk_complete = not self._cancelled and not self._timed_out
+        added, modified, removed = self._index.changes(self.config.root_path, self._walk_complete)
+        logger.info(
+            "dedup_index_loaded",
+            reusable_hashes=len(self._cached_hashes),
+            added=len(added),
+            modified=len(modified),
+            removed=len(removed),
+        )
+        if self._index.previous_scan_date is None:
+            return None
+        return ScanChanges(
+            previous_scan_date=self._index.previous_scan_date,
+            added=[Path(p) for p in added],
+            modified=[Path(p) for p in modified],
+            removed=[Path(p) for p in removed],
+        )
+
+    def _commit_index(self) -> None:
+        """Persist stat signatures and new hashes (removals only if the walk completed)."""
+        self._flush_stats()
+        self._index.commit_scan(
+            self.config.root_path,
+            partial_hashes=self._new_hashes["partial"],
+            full_hashes=self._new_hashes["full"],
+            partial_bytes=self.config.partial_hash_bytes,
+            complete=self._walk_complete,
+        )
+
+    def _make_executor(self) -> Optional[Executor]:
+        """Process pool for hashing (None = default thread pool, single worker)."""
+        if self.config.hash_workers <= 1:
+            return None
+        return ProcessPoolExecutor(max_workers=self.config.hash_workers)
+
+    async def _hash_paths(
+        self,
+        executor: Optional[Executor],
+        mode: str,
+        paths: list[str],
+        timeout_seconds: int,
+    ) -> list[tuple[str, str]]:
+        """
+        Hash files in batches of HASH_BATCH_FILES on the executor.
+
+        Args:
+            executor: Process pool (None = default thread pool)
+            mode: "partial" or "full"
+            paths: Files to hash
+            timeout_seconds: Abort if exceeded
+
+        Returns:
+            [(path, digest), ...] for readable files
+        """
+        if not paths:
+            return []
+
+        loop = asyncio.get_running_loop()
+        results: list[tuple[str, str]] = []
+        self.stats.phase = f"{mode}_hash"
+
+        futures = [
+            loop.run_in_executor(
+                executor,
+                _hash_batch,
+                mode,
+                paths[i : i + HASH_BATCH_FILES],
+                self.config.chunk_size,
+                self.config.partial_hash_bytes,
+            )
+            for i in range(0, len(paths), HASH_BATCH_FILES)
+        ]
+
+        try:
+            for next_batch in asyncio.as_completed(futures):
+                for path_str, digest, bytes_read in await next_batch:
+                    if digest is None:
+                        self.stats.total_errors += 1
+                        logger.debug("dedup_hash_failed", file_path=path_str)
+                        continue
+                    self.stats.bytes_hashed += bytes_read
+                    results.append((path_str, digest))
+
+                self._report_progress(f"{mode}_hash")
+
+                if self._cancelled:
+                    break
+                if time.time() - self._start_time > timeout_seconds:
+                    self._timed_out = True
+                    logger.warning(
+                        "dedup_scan_timeout",
+                        timeout_hours=self.config.scan_timeout_hours,
+                    )
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+
+        return results
+
+    def _report_progress(self, phase: str) -> None:
+        """Update phase and duplicate count, then invoke progress callback."""
+        self.stats.phase = phase
+        self.stats.duplicate_groups = self._dup_groups_count
+        if self.progress_callback:
+            self.progress_callback(self.stats)
 
     def _hash_file(self, file_path: Path) -> str:
         """
@@ -326,13 +737,7 @@ class DedupScanner:
 
         AC2: SHA256 chunks 65536 bytes
         """
-        sha256 = hashlib.sha256()
-
-        with open(file_path, "rb") as f:
-            while chunk := f.read(self.config.chunk_size):
-                sha256.update(chunk)
-
-        return sha256.hexdigest()
+        return hash_file_full(str(file_path), self.config.chunk_size)[0]
 
     def _build_duplicate_groups(self) -> list[DedupGroup]:
         """
@@ -9,6 +9,9 @@ Ce module peuple le graphe de connaissances après classification d'un email :
 - Créer relations MENTIONS
 - Si PJ détectées → créer relations ATTACHED_TO vers Document nodes
 
+Tout le sous-graphe est écrit en un seul appel memorystore.upsert_subgraph
+(une transaction, 2 requêtes) puis l'embedding Email est généré.
+
 Dépendances :
 - memorystore.py (adaptateur graphe)
 - Presidio (anonymisation PII avant LLM)
@@ -31,8 +34,10 @@ Usage:
 
 from datetime import datetime
 from typing import Any, Optional
+from uuid import UUID
 
 import structlog
+from agents.src.adapters.embedding_bulk import EmbeddingRecord
 from agents.src.adapters.memorystore_interface import MemoryStore, NodeType, RelationType
 from agents.src.adapters.vectorstore import get_vectorstore_adapter
 from agents.src.tools.anonymize import anonymize_text
@@ -68,48 +73,158 @@ async def populate_email_graph(
 
     logger.info("Populating graph for email: %s", email_data["subject"])
 
-    # Task 9.1 : Créer Email node
-    email_node_id = await memorystore.create_node(
-        node_type=NodeType.EMAIL.value,
-        name=email_data["subject"],
-        metadata={
-            "message_id": email_data["message_id"],
-            "subject": email_data["subject"],
-            "sender": email_data["sender"],
-            "recipients": email_data.get("recipients", []),
-            "date": email_data["date"],
-            "category": email_data.get("category", "inconnu"),
-            "priority": email_data.get("priority", "normal"),
-            "thread_id": email_data.get("thread_id"),
-        },
-        source="email",
+    # Task 9.5 : NER sur email.body (avant écriture : tout le sous-graphe part en un batch)
+    # Note: Pour MVP, implémentation simplifiée - NER complet dans Story 2.2+
+    body = email_data.get("body", "")
+    entities = await extract_entities_ner(body) if body else []
+
+    # Task 9.1 : Email node
+    nodes: list[dict[str, Any]] = [
+        {
+            "key": "email",
+            "type": NodeType.EMAIL.value,
+            "name": email_data["subject"],
+            "metadata": {
+                "message_id": email_data["message_id"],
+                "subject": email_data["subject"],
+                "sender": email_data["sender"],
+                "recipients": email_data.get("recipients", []),
+                "date": email_data["date"],
+                "category": email_data.get("category", "inconnu"),
+                "priority": email_data.get("priority", "normal"),
+                "thread_id": email_data.get("thread_id"),
+            },
+            "source": "email",
+        }
+    ]
+    edges: list[dict[str, Any]] = []
+
+    # Task 9.2 + 9.3 : sender → Person node (dédupliqué sur email) + edge SENT_BY
+    sender_email = email_data["sender"]
+    nodes.append(
+        {
+            "key": "sender",
+            "type": NodeType.PERSON.value,
+            "name": email_data.get("sender_name", sender_email.split("@")[0]),
+            "metadata": {"email": sender_email},
+            "source": "email",
+        }
     )
+    edges.append(
+        {
+            "from": "email",
+            "to": "sender",
+            "relation_type": RelationType.SENT_BY.value,
+            "metadata": {"confidence": 1.0},
+        }
+    )
+
+    # Recipients → Person nodes + edges RECEIVED_BY
+    recipients = email_data.get("recipients", [])
+    for i, recipient_email in enumerate(recipients):
+        nodes.append(
+            {
+                "key": f"recipient:{i}",
+                "type": NodeType.PERSON.value,
+                "name": recipient_email.split("@")[0],
+                "metadata": {"email": recipient_email},
+                "source": "email",
+            }
+        )
+        edges.append(
+            {
+                "from": "email",
+                "to": f"recipient:{i}",
+                "relation_type": RelationType.RECEIVED_BY.value,
+                "metadata": {"confidence": 1.0},
+            }
+        )
+
+    # Task 9.4 : PJ → edges ATTACHED_TO vers Document nodes existants
+    for attachment in attachments or []:
+        doc_id = attachment.get("doc_id")
+        if doc_id:
+            edges.append(
+                {
+                    "from": doc_id,
+                    "to": "email",
+                    "relation_type": RelationType.ATTACHED_TO.value,
+                    "metadata": {
+                        "filename": attachment.get("filename"),
+                        "mime_type": attachment.get("mime_type"),
+                    },
+                }
+            )
 
-    logger.info("Created Email node: %s", email_node_id)
+    # Entities NER → Entity nodes + edges MENTIONS
+    for i, entity in enumerate(entities):
+        nodes.append(
+            {
+                "key": f"entity:{i}",
+                "type": NodeType.ENTITY.value,
+                "name": entity["name"],
+                "metadata": {
+                    "entity_type": entity["type"],
+                    "confidence": entity.get("confidence", 0.8),
+                },
+                "source": "email",
+            }
+        )
+        edges.append(
+            {
+                "from": "email",
+                "to": f"entity:{i}",
+                "relation_type": RelationType.MENTIONS.value,
+                "metadata": {"context": entity.get("context", "")},
+            }
+        )
+
+    # Une transaction, 2 requêtes (nœuds puis edges) au lieu d'un SELECT + INSERT par nœud
+    subgraph = await memorystore.upsert_subgraph(nodes, edges)
+    email_node_id = subgraph["nodes"]["email"]
+
+    logger.info(
+        "Created Email node %s: %d recipients, %d attachments, %d entities",
+        email_node_id,
+        len(recipients),
+        len(attachments or []),
+        len(entities),
+    )
 
     # Task 6.2 Subtask 2.1 : Générer embedding pour Email (subject + body anonymisé)
     try:
         # 1. Préparer texte : subject + body
         subject = email_data["subject"]
-        body = email_data.get("body", "")
         text_to_embed = f"{subject} {body}".strip()
 
         # 2. Anonymiser texte AVANT envoi à Voyage AI (RGPD obligatoire)
         anonymized_result = await anonymize_text(text_to_embed)
         anonymized_text = anonymized_result.anonymized_text
 
-        # 3. Générer embedding via Voyage AI
+        # 3. Générer embedding via Voyage AI (sauf texte déjà indexé : même content_hash)
         vectorstore = await get_vectorstore_adapter()
-        embedding_response = await vectorstore.embed(
-            [anonymized_text], anonymize=False
-        )  # Déjà anonymisé
-
-        # 4. Stocker embedding dans knowledge.embeddings
-        embedding = embedding_response.embeddings[0]
-        await vectorstore.store(
-            node_id=email_node_id,
-            embedding=embedding,
-            metadata={"source": "email", "anonymized": True},
+        embedding_cache = await vectorstore.get_embedding_cache()
+
+        async def _embed(texts: list[str]) -> list[list[float]]:
+            response = await vectorstore.embed(texts, anonymize=False)  # Déjà anonymisé
+            return response.embeddings
+
+        cached = await embedding_cache.embed_many(
+            [anonymized_text], vectorstore.model, vectorstore.dimensions, _embed
+        )
+
+        # 4. Stocker embedding dans knowledge.embeddings (content_hash/model/dimensions)
+        await vectorstore.store_many(
+            [
+                EmbeddingRecord(
+                    source_type="email",
+                    source_id=UUID(email_node_id),
+                    embedding=cached.embeddings[0],
+                    metadata={"source": "email", "anonymized": True},
+                    content_hash=cached.content_hashes[0],
+                    model=vectorstore.model,
+                )
+            ]
         )
 
         logger.info(
@@ -128,91 +243,6 @@ async def populate_email_graph(
         # TODO (Story 6.2 Subtask 2.3): Envoyer alerte Telegram + créer receipt status=failed
         # Job nightly retentera génération embedding pour nœuds sans embedding
 
-    # Task 9.2 : Extraire sender → Créer Person node (get_or_create pour déduplication)
-    sender_email = email_data["sender"]
-    sender_name = email_data.get("sender_name", sender_email.split("@")[0])
-
-    sender_node_id = await memorystore.get_or_create_node(
-        node_type=NodeType.PERSON.value,
-        name=sender_name,
-        metadata={"email": sender_email},
-        source="email",
-    )
-
-    # Task 9.3 : Créer edge SENT_BY (Email → Person)
-    await memorystore.create_edge(
-        from_node_id=email_node_id,
-        to_node_id=sender_node_id,
-        relation_type=RelationType.SENT_BY.value,
-        metadata={"confidence": 1.0},
-    )
-
-    logger.info("Linked Email SENT_BY Person: %s", sender_node_id)
-
-    # Extraire recipients → Créer Person nodes + edges RECEIVED_BY
-    recipients = email_data.get("recipients", [])
-    for recipient_email in recipients:
-        recipient_name = recipient_email.split("@")[0]
-
-        recipient_node_id = await memorystore.get_or_create_node(
-            node_type=NodeType.PERSON.value,
-            name=recipient_name,
-            metadata={"email": recipient_email},
-            source="email",
-        )
-
-        await memorystore.create_edge(
-            from_node_id=email_node_id,
-            to_node_id=recipient_node_id,
-            relation_type=RelationType.RECEIVED_BY.value,
-            metadata={"confidence": 1.0},
-        )
-
-    logger.info("Linked %d recipients via RECEIVED_BY", len(recipients))
-
-    # Task 9.4 : Si PJ détectées → Créer edges ATTACHED_TO vers Document nodes
-    if attachments:
-        for attachment in attachments:
-            doc_id = attachment.get("doc_id")
-            if doc_id:
-                await memorystore.create_edge(
-                    from_node_id=doc_id,
-                    to_node_id=email_node_id,
-                    relation_type=RelationType.ATTACHED_TO.value,
-                    metadata={
-                        "filename": attachment.get("filename"),
-                        "mime_type": attachment.get("mime_type"),
-                    },
-                )
-
-        logger.info("Linked %d attachments via ATTACHED_TO", len(attachments))
-
-    # Task 9.5 : NER sur email.body → Créer Entity nodes + edges MENTIONS
-    # Note: Pour MVP, implémentation simplifiée - NER complet dans Story 2.2+
-    body = email_data.get("body", "")
-    if body:
-        entities = await extract_entities_ner(body)
-
-        for entity in entities:
-            entity_node_id = await memorystore.get_or_create_node(
-                node_type=NodeType.ENTITY.value,
-                name=entity["name"],
-                metadata={
-                    "entity_type": entity["type"],
-                    "confidence": entity.get("confidence", 0.8),
-                },
-                source="email",
-            )
-
-            await memorystore.create_edge(
-                from_node_id=email_node_id,
-                to_node_id=entity_node_id,
-                relation_type=RelationType.MENTIONS.value,
-                metadata={"context": entity.get("context", "")},
-            )
-
-        logger.info("Extracted %d entities via NER", len(entities))
-
     return email_node_id
 
 
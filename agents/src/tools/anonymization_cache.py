@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Friday 2.0 - Cache anonymisation Presidio (hash de contenu)
+
+Les mêmes textes repassent sans cesse par Presidio : signatures, mentions
+légales, corps de newsletters, sujets ré-anonymisés par imap_fetcher, le
+consumer, VoyageAIAdapter.embed et SemanticSearcher.search. Ce cache évite
+l'aller-retour NER spaCy pour un texte déjà vu.
+
+Deux niveaux :
+    - LRU en mémoire (par process), borné en entrées + TTL
+    - LRU Redis partagé (optionnel, attach_redis), borné en entrées + TTL.
+      Redis tourne en maxmemory-policy noeviction : l'éviction LRU est faite
+      ici via un index ZSET (score = dernier accès).
+
+RGPD (zéro clair persisté) :
+    - Clé = HMAC-SHA256(ANONYMIZATION_CACHE_KEY, version + langue + entités + texte)
+    - Valeur = texte anonymisé + spans d'entités (type, start, end, score)
+    - JAMAIS le texte clair ni le mapping : le mapping est reconstruit à la
+      lecture depuis le texte clair fourni par l'appelant (anonymize_text)
+    - Sans ANONYMIZATION_CACHE_KEY : clé aléatoire par process, niveau Redis désactivé
+
+Config (env):
+    ANONYMIZATION_CACHE_ENABLED=true
+    ANONYMIZATION_CACHE_KEY=secret partagé entre services (niveau Redis)
+    ANONYMIZATION_CACHE_MAX_ENTRIES=2048 (mémoire)
+    ANONYMIZATION_CACHE_REDIS_MAX_ENTRIES=50000
+    ANONYMIZATION_CACHE_TTL_SECONDS=604800 (7 jours)
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+CACHE_ENABLED = os.getenv("ANONYMIZATION_CACHE_ENABLED", "true").lower() == "true"
+CACHE_MAX_ENTRIES = int(os.getenv("ANONYMIZATION_CACHE_MAX_ENTRIES", "2048"))
+CACHE_REDIS_MAX_ENTRIES = int(os.getenv("ANONYMIZATION_CACHE_REDIS_MAX_ENTRIES", "50000"))
+CACHE_TTL_SECONDS = int(os.getenv("ANONYMIZATION_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+REDIS_KEY_PREFIX = "presidio:cache"
+REDIS_LRU_INDEX = f"{REDIS_KEY_PREFIX}:lru"
+
+# À incrémenter si la config anonymizer (format placeholders) change
+CACHE_VERSION = "v1"
+
+# Seuls champs d'entité conservés (pas de texte, pas d'analysis_explanation)
+_SPAN_FIELDS = ("entity_type", "start", "end", "score")
+
+
+class AnonymizationCache:
+    """
+    Cache LRU mémoire + Redis des résultats Presidio, indexé par HMAC du contenu.
+
+    Usage:
+        cached = await cache.get(text, language, entities)
+        if cached is None:
+            ...  # Presidio
+            await cache.set(text, language, entities, anonymized_text, entities_found, conf)
+    """
+
+    def __init__(
+        self,
+        key: Optional[str] = None,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl_seconds: int = CACHE_TTL_SECONDS,
+        redis_max_entries: int = CACHE_REDIS_MAX_ENTRIES,
+        enabled: bool = CACHE_ENABLED,
+    ):
+        """
+        Args:
+            key: Secret HMAC partagé (None = clé aléatoire, niveau mémoire seulement)
+            max_entries: Entrées max en mémoire
+            ttl_seconds: Durée de vie d'une entrée (mémoire + Redis)
+            redis_max_entries: Entrées max dans Redis
+            enabled: False = cache totalement inactif
+        """
+        self._shared_key = bool(key)
+        self._key = key.encode("utf-8") if key else os.urandom(32)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis_max_entries = redis_max_entries
+        self.enabled = enabled
+
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._redis = None
+
+        self.hits_memory = 0
+        self.hits_redis = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+
+    def attach_redis(self, redis_client: Any) -> bool:
+        """
+        Active le niveau Redis partagé.
+
+        Returns:
+            True si activé, False si pas de clé HMAC partagée configurée
+        """
+        if not self._shared_key:
+            logger.warning(
+                "anonymization_cache_redis_disabled",
+                reason="ANONYMIZATION_CACHE_KEY manquante (clé par process)",
+            )
+            return False
+        self._redis = redis_client
+        logger.info("anonymization_cache_redis_enabled", max_entries=self.redis_max_entries)
+        return True
+
+    def clear(self) -> None:
+        """Vide le niveau mémoire et remet les compteurs à zéro."""
+        self._memory.clear()
+        self.hits_memory = 0
+        self.hits_redis = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+
+    def make_key(self, text: str, language: str, entities: Sequence[str]) -> str:
+        """HMAC-SHA256 hex du contenu (le texte clair n'apparaît jamais dans la clé)."""
+        message = "\x1f".join((CACHE_VERSION, language, ",".join(sorted(entities)), text))
+        return hmac.new(self._key, message.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    async def get(
+        self, text: str, language: str, entities: Sequence[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Cherche un résultat en cache.
+
+        Returns:
+            {"anonymized_text", "entities_found", "confidence_min"} ou None
+        """
+        if not self.enabled:
+            return None
+
+        key = self.make_key(text, language, entities)
+
+        entry = self._memory_get(key)
+        if entry is not None:
+            self.hits_memory += 1
+            return entry
+
+        if self._redis is not None:
+            entry = await self._redis_get(key)
+            if entry is not None:
+                self.hits_redis += 1
+                self._memory_set(key, entry)
+                return entry
+
+        self.misses += 1
+        return None
+
+    async def set(
+        self,
+        text: str,
+        language: str,
+        entities: Sequence[str],
+        anonymized_text: str,
+        entities_found: List[Dict[str, Any]],
+        confidence_min: float,
+    ) -> None:
+        """Stocke un résultat (texte anonymisé + spans uniquement). Ne lève jamais."""
+        if not self.enabled:
+            return
+
+        key = self.make_key(text, language, entities)
+        entry = {
+            "anonymized_text": anonymized_text,
+            "entities_found": [
+                {field: entity[field] for field in _SPAN_FIELDS if field in entity}
+                for entity in entities_found
+            ],
+            "confidence_min": confidence_min,
+        }
+        self._memory_set(key, entry)
+
+        if self._redis is not None:
+            await self._redis_set(key, entry)
+
+    def get_stats(self) -> dict:
+        """
+        Retourne statistiques hit/miss.
+
+        Returns:
+            Dict métriques
+        """
+        hits = self.hits_memory + self.hits_redis
+        lookups = hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "redis_enabled": self._redis is not None,
+            "memory_entries": len(self._memory),
+            "hits_memory": self.hits_memory,
+            "hits_redis": self.hits_redis,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Niveau mémoire
+    # ------------------------------------------------------------------
+
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        item = self._memory.get(key)
+        if item is None:
+            return None
+        stored_at, entry = item
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return entry
+
+    def _memory_set(self, key: str, entry: Dict[str, Any]) -> None:
+        self._memory[key] = (time.monotonic(), entry)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    # ------------------------------------------------------------------
+    # Niveau Redis (LRU via ZSET, Redis en noeviction)
+    # ------------------------------------------------------------------
+
+    async def _redis_get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = await self._redis.get(f"{REDIS_KEY_PREFIX}:{key}")
+            if raw is None:
+                return None
+            await self._redis.zadd(REDIS_LRU_INDEX, {key: time.time()})
+            return json.loads(raw)
+        except Exception as e:
+            logger.warning("anonymization_cache_redis_get_failed", error=str(e))
+            return None
+
+    async def _redis_set(self, key: str, entry: Dict[str, Any]) -> None:
+        try:
+            await self._redis.set(
+                f"{REDIS_KEY_PREFIX}:{key}", json.dumps(entry), ex=self.ttl_seconds
+            )
+            await self._redis.zadd(REDIS_LRU_INDEX, {key: time.time()})
+
+            overflow = await self._redis.zcard(REDIS_LRU_INDEX) - self.redis_max_entries
+            if overflow > 0:
+                evicted = await self._redis.zpopmin(REDIS_LRU_INDEX, overflow)
+                if evicted:
+                    await self._redis.delete(
+                        *(f"{REDIS_KEY_PREFIX}:{_decode(member)}" for member, _ in evicted)
+                    )
+                    self.evictions += len(evicted)
+        except Exception as e:
+            logger.warning("anonymization_cache_redis_set_failed", error=str(e))
+
+
+def _decode(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+# ============================================================
+# Global Instance
+# ============================================================
+
+# Instance globale (partagée par anonymize_text / anonymize_many)
+anonymization_cache = AnonymizationCache(key=os.getenv("ANONYMIZATION_CACHE_KEY") or None)
@@ -5,6 +5,7 @@ Pipeline anonymisation réversible AVANT tout appel LLM cloud
 
 Usage:
     from agents.src.tools.anonymize import anonymize_text, deanonymize_text
+    from agents.src.tools.anonymize import anonymize_many  # plusieurs champs/chunks
 
 RÈGLE CRITIQUE (CLAUDE.md):
     JAMAIS envoyer PII au LLM cloud sans anonymisation Presidio.
@@ -13,6 +14,8 @@ Architecture:
     - Presidio Analyzer (http://presidio-analyzer:5001) : détecte entités sensibles
     - Presidio Anonymizer (http://presidio-anonymizer:5002) : anonymise/deanonymise
     - Mapping éphémère en mémoire (JAMAIS stocké en clair, voir addendum section 9.1)
+    - Client httpx partagé (keep-alive) : PRESIDIO_MAX_CONNECTIONS, PRESIDIO_KEEPALIVE_EXPIRY
+    - Cache HMAC du contenu (tools/anonymization_cache.py) : textes répétés sans NER
 
 Benchmark (addendum section 1):
     - Latence: ~150-200ms (doc 1000 mots)
@@ -22,11 +25,13 @@ Date: 2026-02-05
 Version: 1.0.0 (Story 1.5.1)
 """
 
+import asyncio
 import os
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence
 
 import httpx
 import structlog
+from agents.src.tools.anonymization_cache import anonymization_cache
 from pydantic import BaseModel, Field
 
 from config.exceptions import PipelineError
@@ -36,6 +41,13 @@ from config.exceptions import PipelineError
 PRESIDIO_ANALYZER_URL = os.getenv("PRESIDIO_ANALYZER_URL", "http://presidio-analyzer:3000")
 PRESIDIO_ANONYMIZER_URL = os.getenv("PRESIDIO_ANONYMIZER_URL", "http://presidio-anonymizer:3000")
 PRESIDIO_TIMEOUT = int(os.getenv("PRESIDIO_TIMEOUT", "30"))
+# Pool keep-alive + concurrence max de anonymize_many()
+PRESIDIO_MAX_CONNECTIONS = int(os.getenv("PRESIDIO_MAX_CONNECTIONS", "10"))
+PRESIDIO_KEEPALIVE_EXPIRY = float(os.getenv("PRESIDIO_KEEPALIVE_EXPIRY", "30"))
+PRESIDIO_BATCH_CONCURRENCY = int(os.getenv("PRESIDIO_BATCH_CONCURRENCY", "4"))
+# POST /analyze/batch (analyzer custom docker/presidio-analyzer) pour anonymize_many()
+PRESIDIO_BATCH_ANALYZE = os.getenv("PRESIDIO_BATCH_ANALYZE", "true").lower() == "true"
+PRESIDIO_BATCH_MAX_TEXTS = int(os.getenv("PRESIDIO_BATCH_MAX_TEXTS", "256"))
 
 # Entités sensibles à détecter (France)
 # Note: Utilise seulement les recognizers supportés par Presidio + spaCy FR
@@ -56,19 +68,43 @@ FRENCH_ENTITIES = [
 logger = structlog.get_logger(__name__)
 
 # Module-level HTTP client (réutilisable, fix Bug B6)
-# Créé au premier appel, réutilisé ensuite (performance optimisation)
+# Créé au premier appel, réutilisé ensuite : keep-alive HTTP vers Presidio
+# (évite handshake TCP + pool neuf à chaque email/chunk)
 _http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+# Passe à False si l'analyzer répond 404 sur /analyze/batch (image standard)
+_batch_analyze_supported = True
 
 
 def _get_http_client() -> httpx.AsyncClient:
     """
-    Retourne un httpx.AsyncClient.
+    Retourne le httpx.AsyncClient partagé (pool de connexions keep-alive).
 
-    TEMPORARY FIX: Create new client each time to avoid connection pool issues.
-    Performance impact minimal (~5ms overhead vs connection errors).
+    Le client est lié à l'event loop qui l'a créé : s'il a été fermé ou si la
+    boucle courante a changé (asyncio.run successifs, tests), un nouveau client
+    est créé. C'était la cause des "connection pool issues" du fix temporaire
+    (un client par appel).
     """
-    # Always create new client to avoid connection pool state issues
-    return httpx.AsyncClient(timeout=PRESIDIO_TIMEOUT)
+    global _http_client, _http_client_loop
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            timeout=PRESIDIO_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=PRESIDIO_MAX_CONNECTIONS,
+                max_keepalive_connections=PRESIDIO_MAX_CONNECTIONS,
+                keepalive_expiry=PRESIDIO_KEEPALIVE_EXPIRY,
+            ),
+        )
+        _http_client_loop = loop
+        logger.debug("presidio_http_client_created", max_connections=PRESIDIO_MAX_CONNECTIONS)
+
+    return _http_client
 
 
 async def close_http_client():
@@ -78,10 +114,11 @@ async def close_http_client():
     Usage:
         await close_http_client()
     """
-    global _http_client
+    global _http_client, _http_client_loop
     if _http_client is not None and not _http_client.is_closed:
         await _http_client.aclose()
-        _http_client = None
+    _http_client = None
+    _http_client_loop = None
 
 
 class AnonymizationResult(BaseModel):
@@ -138,12 +175,7 @@ async def anonymize_text(
         {"[PERSON_1]": "Dupont", "[PERSON_2]": "Marie"}
     """
     # AC2 — Fail-explicit: Vérifier que Presidio est configuré
-    if not PRESIDIO_ANALYZER_URL or not PRESIDIO_ANONYMIZER_URL:
-        raise NotImplementedError(
-            "Presidio anonymization not configured. "
-            "PRESIDIO_ANALYZER_URL and PRESIDIO_ANONYMIZER_URL must be set. "
-            "Cannot proceed with LLM call without anonymization (RGPD compliance)."
-        )
+    _ensure_presidio_configured()
 
     if not text or not text.strip():
         return AnonymizationResult(
@@ -152,128 +184,160 @@ async def anonymize_text(
 
     entities_to_detect = entities or FRENCH_ENTITIES
 
-    print(f"[DEBUG] anonymize_text called, text_length={len(text)}", flush=True)
+    # Cache hash de contenu : texte déjà vu → pas d'aller-retour NER spaCy
+    cached = await anonymization_cache.get(text, language, entities_to_detect)
+    if cached is not None:
+        return _result_from_cache(text, cached, context)
 
-    client = None
-    try:
-        print("[DEBUG] Creating HTTP client...", flush=True)
-        # Create new client for this request
-        client = _get_http_client()
-        print(f"[DEBUG] HTTP client created: {client}", flush=True)
+    result = await _anonymize_uncached(
+        text, language=language, entities=entities_to_detect, context=context
+    )
+    await _cache_result(text, language, entities_to_detect, result)
+    return result
 
-        # DEBUG: Test connection first
-        print("[DEBUG] Testing Presidio connection...", flush=True)
-        try:
-            import socket
-
-            # Parse URL to get host and port
-            host = PRESIDIO_ANALYZER_URL.split("://")[1].split(":")[0]
-            port = 3000
-
-            print(f"[DEBUG] Resolving DNS for {host}...", flush=True)
-            # Resolve DNS
-            ip = socket.gethostbyname(host)
-            print(f"[DEBUG] DNS resolved: {host} -> {ip}", flush=True)
-
-            # Test TCP connection
-            print(f"[DEBUG] Testing TCP connection to {ip}:{port}...", flush=True)
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)
-            result = sock.connect_ex((ip, port))
-            sock.close()
-            print(f"[DEBUG] TCP test result: {result} (0=success)", flush=True)
-        except Exception as conn_test_error:
-            print(f"[DEBUG] Connection test failed: {conn_test_error}", flush=True)
-
-        # DEBUG: Log connection attempt details
-        analyzer_url = f"{PRESIDIO_ANALYZER_URL}/analyze"
-        print(f"[DEBUG] About to POST to {analyzer_url}...", flush=True)
 
-        # 1. Analyse: détection entités sensibles
-        try:
-            print("[DEBUG] Calling client.post()...", flush=True)
-            analyze_response = await client.post(
-                analyzer_url,
-                json={
-                    "text": text,
-                    "language": language,
-                    "entities": entities_to_detect,
-                },
-            )
-            print(f"[DEBUG] POST response: {analyze_response.status_code}", flush=True)
-            analyze_response.raise_for_status()
-            entities_found = analyze_response.json()
-        except Exception as analyze_error:
-            print(
-                f"[DEBUG] POST failed: {type(analyze_error).__name__}: {analyze_error}", flush=True
-            )
-            raise
+async def anonymize_many(
+    texts: Sequence[str],
+    language: str = "fr",
+    entities: Optional[List[str]] = None,
+    context: Optional[str] = None,
+    max_concurrency: int = PRESIDIO_BATCH_CONCURRENCY,
+) -> List[AnonymizationResult]:
+    """
+    Anonymise plusieurs textes (from/subject/body d'un email, chunks d'un
+    document) via le client Presidio partagé.
 
-        if not entities_found:
-            # Aucune PII détectée
-            logger.debug("no_pii_detected", context=context)
-            return AnonymizationResult(
-                anonymized_text=text, entities_found=[], mapping={}, confidence_min=1.0
-            )
+    L'analyse (spaCy, coût dominant) part en UNE requête POST /analyze/batch
+    (nlp.pipe côté analyzer). Seuls les textes contenant des entités passent
+    ensuite par l'anonymizer, en parallèle borné. Si l'analyzer ne connaît pas
+    /analyze/batch (image Presidio standard), repli sur /analyze par texte.
+    Les textes déjà en cache (anonymization_cache) ne sont pas renvoyés à Presidio.
 
-        # 2. Anonymisation: remplacer entités par placeholders
-        anonymize_response = await client.post(
-            f"{PRESIDIO_ANONYMIZER_URL}/anonymize",
-            json={
-                "text": text,
-                "analyzer_results": entities_found,
-                "anonymizers": {
-                    "DEFAULT": {"type": "replace"},
-                    "PERSON": {"type": "replace", "new_value": "[PERSON_{{{{ID}}}}]"},
-                    "EMAIL_ADDRESS": {"type": "replace", "new_value": "[EMAIL_{{{{ID}}}}]"},
-                    "PHONE_NUMBER": {"type": "replace", "new_value": "[PHONE_{{{{ID}}}}]"},
-                    "IBAN_CODE": {"type": "replace", "new_value": "[IBAN_{{{{ID}}}}]"},
-                    "LOCATION": {"type": "replace", "new_value": "[LOCATION_{{{{ID}}}}]"},
-                },
-            },
-        )
-        anonymize_response.raise_for_status()
-        anonymization_result = anonymize_response.json()
+    Args:
+        texts: Textes à anonymiser
+        language: Langue (défaut: 'fr')
+        entities: Liste entités à détecter (défaut: FRENCH_ENTITIES)
+        context: Context ID optionnel (pour debug, PAS stocké)
+        max_concurrency: Requêtes Presidio simultanées max
 
-        # Validation JSON : vérifier que la clé "text" est présente (Bug B2)
-        if "text" not in anonymization_result:
-            raise AnonymizationError(
-                f"Invalid Presidio anonymizer response: missing 'text' key. "
-                f"Response: {anonymization_result}"
-            )
+    Returns:
+        Un AnonymizationResult par texte, dans le même ordre que texts.
+        Chaque mapping est propre à son texte (placeholders non partagés).
+
+    Raises:
+        AnonymizationError: Si un des textes échoue (fail-explicit, aucun
+            résultat partiel : JAMAIS de PII envoyée au LLM)
+        NotImplementedError: Si anonymisation pas configurée/disponible (AC2)
+    """
+    global _batch_analyze_supported
 
-        anonymized_text = anonymization_result["text"]
+    if not texts:
+        return []
 
-        # 3. Construire mapping pour deanonymization (éphémère, JAMAIS stocké)
-        mapping = _build_mapping(text, entities_found, anonymized_text)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
 
-        # 4. Calculer confidence minimale (M2 fix: validation robuste)
+    # Textes identiques (ex: subject répété) → un seul appel Presidio
+    unique_texts = list(dict.fromkeys(texts))
+    to_analyze = [text for text in unique_texts if text and text.strip()]
+
+    # Textes vides : rien à analyser (même résultat que anonymize_text)
+    by_text: Dict[str, AnonymizationResult] = {
+        text: AnonymizationResult(
+            anonymized_text=text, entities_found=[], mapping={}, confidence_min=1.0
+        )
+        for text in unique_texts
+        if not (text and text.strip())
+    }
+
+    entities_to_detect = entities or FRENCH_ENTITIES
+    if to_analyze:
+        _ensure_presidio_configured()
+
+    # Cache hash de contenu : seuls les textes jamais vus partent chez Presidio
+    misses = []
+    for text in to_analyze:
+        cached = await anonymization_cache.get(text, language, entities_to_detect)
+        if cached is not None:
+            by_text[text] = _result_from_cache(text, cached, context)
+        else:
+            misses.append(text)
+    cache_hits = len(to_analyze) - len(misses)
+    to_analyze = misses
+
+    analyzed: Optional[List[List[Dict]]] = None
+    if to_analyze and PRESIDIO_BATCH_ANALYZE and _batch_analyze_supported:
+        client = _get_http_client()
         try:
-            confidence_min = min(
-                (entity.get("score", 1.0) for entity in entities_found), default=1.0
-            )
-        except (TypeError, ValueError) as e:
-            # Fallback si entities_found malformé
+            analyzed = await _analyze_batch(client, to_analyze, language, entities_to_detect)
+        except httpx.HTTPError as e:
+            logger.error("presidio_http_error", error=str(e), error_type=type(e).__name__)
+            raise AnonymizationError(f"Presidio unavailable: {e}") from e
+        except Exception as e:
+            logger.error("anonymization_failed", error=str(e), error_type=type(e).__name__)
+            raise AnonymizationError(f"Anonymization failed: {e}") from e
+
+        if analyzed is None:
+            _batch_analyze_supported = False
             logger.warning(
-                "confidence_calculation_failed",
-                error=str(e),
-                message="Using default confidence 1.0",
+                "presidio_batch_analyze_unavailable",
+                message="Analyzer sans /analyze/batch, repli sur /analyze par texte",
             )
-            confidence_min = 1.0
 
-        logger.info(
-            "anonymization_success",
-            entities_count=len(entities_found),
-            confidence_min=confidence_min,
-            context=context,
+    if analyzed is not None:
+
+        async def _anonymize_one(text: str, entities_found: List[Dict]) -> AnonymizationResult:
+            async with semaphore:
+                try:
+                    return await _anonymize_analyzed(client, text, entities_found, context)
+                except httpx.HTTPError as e:
+                    logger.error("presidio_http_error", error=str(e), error_type=type(e).__name__)
+                    raise AnonymizationError(f"Presidio unavailable: {e}") from e
+                except AnonymizationError:
+                    raise
+                except Exception as e:
+                    logger.error("anonymization_failed", error=str(e), error_type=type(e).__name__)
+                    raise AnonymizationError(f"Anonymization failed: {e}") from e
+
+        results = await asyncio.gather(
+            *(_anonymize_one(text, found) for text, found in zip(to_analyze, analyzed))
         )
+    else:
+
+        async def _anonymize_one_fallback(text: str) -> AnonymizationResult:
+            async with semaphore:
+                return await _anonymize_uncached(
+                    text, language=language, entities=entities_to_detect, context=context
+                )
+
+        results = await asyncio.gather(*(_anonymize_one_fallback(text) for text in to_analyze))
+
+    for text, result in zip(to_analyze, results):
+        by_text[text] = result
+        await _cache_result(text, language, entities_to_detect, result)
+
+    logger.debug(
+        "anonymization_batch_success",
+        texts_count=len(texts),
+        cache_hits=cache_hits,
+        analyzed_count=len(to_analyze),
+        batch_analyze=analyzed is not None,
+        context=context,
+    )
+    return [by_text[text] for text in texts]
 
-        return AnonymizationResult(
-            anonymized_text=anonymized_text,
-            entities_found=entities_found,
-            mapping=mapping,
-            confidence_min=confidence_min,
-        )
+
+async def _anonymize_uncached(
+    text: str, language: str, entities: List[str], context: Optional[str]
+) -> AnonymizationResult:
+    """Analyse + anonymisation Presidio d'un texte (sans cache)."""
+    try:
+        client = _get_http_client()
+
+        # 1. Analyse: détection entités sensibles
+        entities_found = await _analyze(client, text, language, entities)
+
+        # 2-4. Anonymisation + mapping éphémère
+        return await _anonymize_analyzed(client, text, entities_found, context)
 
     except httpx.HTTPError as e:
         logger.error("presidio_http_error", error=str(e), error_type=type(e).__name__)
@@ -281,10 +345,169 @@ async def anonymize_text(
     except Exception as e:
         logger.error("anonymization_failed", error=str(e), error_type=type(e).__name__)
         raise AnonymizationError(f"Anonymization failed: {e}") from e
-    finally:
-        # Close client to avoid resource leaks (new client per request)
-        if client is not None:
-            await client.aclose()
+
+
+def _result_from_cache(text: str, cached: Dict, context: Optional[str]) -> AnonymizationResult:
+    """
+    Reconstruit un AnonymizationResult depuis le cache.
+
+    Le cache ne contient ni texte clair ni mapping : le mapping éphémère est
+    recalculé depuis le texte clair de l'appelant + spans en cache.
+    """
+    entities_found = cached["entities_found"]
+    anonymized_text = cached["anonymized_text"]
+    logger.debug("anonymization_cache_hit", entities_count=len(entities_found), context=context)
+    return AnonymizationResult(
+        anonymized_text=anonymized_text,
+        entities_found=entities_found,
+        mapping=_build_mapping(text, entities_found, anonymized_text) if entities_found else {},
+        confidence_min=cached["confidence_min"],
+    )
+
+
+async def _cache_result(
+    text: str, language: str, entities: List[str], result: AnonymizationResult
+) -> None:
+    """Stocke texte anonymisé + spans (JAMAIS le clair ni le mapping)."""
+    await anonymization_cache.set(
+        text,
+        language,
+        entities,
+        anonymized_text=result.anonymized_text,
+        entities_found=result.entities_found,
+        confidence_min=result.confidence_min,
+    )
+
+
+def _ensure_presidio_configured() -> None:
+    """AC2 — Fail-explicit: Vérifier que Presidio est configuré."""
+    if not PRESIDIO_ANALYZER_URL or not PRESIDIO_ANONYMIZER_URL:
+        raise NotImplementedError(
+            "Presidio anonymization not configured. "
+            "PRESIDIO_ANALYZER_URL and PRESIDIO_ANONYMIZER_URL must be set. "
+            "Cannot proceed with LLM call without anonymization (RGPD compliance)."
+        )
+
+
+async def _analyze(
+    client: httpx.AsyncClient, text: str, language: str, entities: List[str]
+) -> List[Dict]:
+    """POST /analyze (un texte) → liste d'entités détectées."""
+    analyze_response = await client.post(
+        f"{PRESIDIO_ANALYZER_URL}/analyze",
+        json={
+            "text": text,
+            "language": language,
+            "entities": entities,
+        },
+    )
+    analyze_response.raise_for_status()
+    return analyze_response.json()
+
+
+async def _analyze_batch(
+    client: httpx.AsyncClient, texts: List[str], language: str, entities: List[str]
+) -> Optional[List[List[Dict]]]:
+    """
+    POST /analyze/batch (analyzer custom Friday) → entités par texte, même ordre.
+
+    Découpe en requêtes de PRESIDIO_BATCH_MAX_TEXTS textes max.
+
+    Returns:
+        Liste d'entités par texte, ou None si l'endpoint n'existe pas (404/405)
+    """
+    analyzed: List[List[Dict]] = []
+    for start in range(0, len(texts), PRESIDIO_BATCH_MAX_TEXTS):
+        batch = texts[start : start + PRESIDIO_BATCH_MAX_TEXTS]
+        response = await client.post(
+            f"{PRESIDIO_ANALYZER_URL}/analyze/batch",
+            json={"texts": batch, "language": language, "entities": entities},
+        )
+        if response.status_code in (404, 405):
+            return None
+        response.raise_for_status()
+        results = response.json()
+
+        if not isinstance(results, list) or len(results) != len(batch):
+            raise AnonymizationError(
+                f"Invalid Presidio batch response: expected {len(batch)} results, "
+                f"got {len(results) if isinstance(results, list) else type(results).__name__}"
+            )
+        analyzed.extend(results)
+
+    return analyzed
+
+
+async def _anonymize_analyzed(
+    client: httpx.AsyncClient,
+    text: str,
+    entities_found: List[Dict],
+    context: Optional[str],
+) -> AnonymizationResult:
+    """Anonymise un texte déjà analysé (étapes 2-4 de anonymize_text)."""
+    if not entities_found:
+        # Aucune PII détectée
+        logger.debug("no_pii_detected", context=context)
+        return AnonymizationResult(
+            anonymized_text=text, entities_found=[], mapping={}, confidence_min=1.0
+        )
+
+    # 2. Anonymisation: remplacer entités par placeholders
+    anonymize_response = await client.post(
+        f"{PRESIDIO_ANONYMIZER_URL}/anonymize",
+        json={
+            "text": text,
+            "analyzer_results": entities_found,
+            "anonymizers": {
+                "DEFAULT": {"type": "replace"},
+                "PERSON": {"type": "replace", "new_value": "[PERSON_{{{{ID}}}}]"},
+                "EMAIL_ADDRESS": {"type": "replace", "new_value": "[EMAIL_{{{{ID}}}}]"},
+                "PHONE_NUMBER": {"type": "replace", "new_value": "[PHONE_{{{{ID}}}}]"},
+                "IBAN_CODE": {"type": "replace", "new_value": "[IBAN_{{{{ID}}}}]"},
+                "LOCATION": {"type": "replace", "new_value": "[LOCATION_{{{{ID}}}}]"},
+            },
+        },
+    )
+    anonymize_response.raise_for_status()
+    anonymization_result = anonymize_response.json()
+
+    # Validation JSON : vérifier que la clé "text" est présente (Bug B2)
+    if "text" not in anonymization_result:
+        raise AnonymizationError(
+            f"Invalid Presidio anonymizer response: missing 'text' key. "
+            f"Response: {anonymization_result}"
+        )
+
+    anonymized_text = anonymization_result["text"]
+
+    # 3. Construire mapping pour deanonymization (éphémère, JAMAIS stocké)
+    mapping = _build_mapping(text, entities_found, anonymized_text)
+
+    # 4. Calculer confidence minimale (M2 fix: validation robuste)
+    try:
+        confidence_min = min((entity.get("score", 1.0) for entity in entities_found), default=1.0)
+    except (TypeError, ValueError) as e:
+        # Fallback si entities_found malformé
+        logger.warning(
+            "confidence_calculation_failed",
+            error=str(e),
+            message="Using default confidence 1.0",
+        )
+        confidence_min = 1.0
+
+    logger.info(
+        "anonymization_success",
+        entities_count=len(entities_found),
+        confidence_min=confidence_min,
+        context=context,
+    )
+
+    return AnonymizationResult(
+        anonymized_text=anonymized_text,
+        entities_found=entities_found,
+        mapping=mapping,
+        confidence_min=confidence_min,
+    )
 
 
 async def deanonymize_text(anonymized_text: str, mapping: Dict[str, str]) -> str:
@@ -392,10 +615,10 @@ async def healthcheck_presidio() -> bool:
         Utilisé par services/gateway/healthcheck.py pour monitoring système.
     """
     try:
-        async with httpx.AsyncClient(timeout=5) as client:
-            analyzer_health = await client.get(f"{PRESIDIO_ANALYZER_URL}/health")
-            anonymizer_health = await client.get(f"{PRESIDIO_ANONYMIZER_URL}/health")
-            return analyzer_health.status_code == 200 and anonymizer_health.status_code == 200
+        client = _get_http_client()
+        analyzer_health = await client.get(f"{PRESIDIO_ANALYZER_URL}/health", timeout=5)
+        anonymizer_health = await client.get(f"{PRESIDIO_ANONYMIZER_URL}/health", timeout=5)
+        return analyzer_health.status_code == 200 and anonymizer_health.status_code == 200
     except Exception as e:
         logger.error("presidio_healthcheck_failed", error=str(e))
         return False
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Friday 2.0 - Cache embeddings des requêtes de recherche
+
+Chaque `/search` Telegram et chaque `POST /api/v1/search/semantic` rappelait
+Voyage AI, même pour la même requête une minute plus tard. Ce cache stocke
+requête anonymisée → vecteur : une recherche répétée (ou la page suivante)
+ne coûte plus que la requête pgvector. Le leg Presidio est déjà couvert par
+tools/anonymization_cache.py.
+
+Deux niveaux (même schéma que anonymization_cache) :
+    - LRU en mémoire (par process), borné en entrées + TTL
+    - LRU Redis partagé bot/gateway (optionnel, attach_redis), borné en
+      entrées + TTL. Redis en noeviction : éviction via index ZSET.
+
+Clés :
+    SHA-256(version + modèle + dimensions + requête ANONYMISÉE). Modèle et
+    dimensions = ceux de l'adaptateur qui calcule le vecteur : un changement
+    ne relit jamais un vecteur incompatible. Casse conservée (Voyage distingue
+    "Orange" de "orange"), seuls les espaces sont normalisés.
+    Valeur Redis = float32 little-endian en base64 (4 Ko pour 1024 dims,
+    compatible clients decode_responses=True).
+
+Config (env):
+    QUERY_EMBEDDING_CACHE_ENABLED=true
+    QUERY_EMBEDDING_CACHE_MAX_ENTRIES=512 (mémoire)
+    QUERY_EMBEDDING_CACHE_REDIS_MAX_ENTRIES=10000
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS=86400 (24h)
+"""
+
+import base64
+import hashlib
+import os
+import struct
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+CACHE_ENABLED = os.getenv("QUERY_EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+CACHE_MAX_ENTRIES = int(os.getenv("QUERY_EMBEDDING_CACHE_MAX_ENTRIES", "512"))
+CACHE_REDIS_MAX_ENTRIES = int(os.getenv("QUERY_EMBEDDING_CACHE_REDIS_MAX_ENTRIES", "10000"))
+CACHE_TTL_SECONDS = int(os.getenv("QUERY_EMBEDDING_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+REDIS_KEY_PREFIX = "search:query_embedding"
+REDIS_LRU_INDEX = f"{REDIS_KEY_PREFIX}:lru"
+
+# À incrémenter si le format de valeur ou l'input_type Voyage change
+CACHE_VERSION = "v1"
+
+
+class QueryEmbeddingCache:
+    """
+    Cache LRU mémoire + Redis requête anonymisée → embedding.
+
+    Usage:
+        vector = await cache.get(anonymized_query, model, dimensions)
+        if vector is None:
+            vector = ...  # Voyage AI
+            await cache.set(anonymized_query, model, dimensions, vector)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl_seconds: int = CACHE_TTL_SECONDS,
+        redis_max_entries: int = CACHE_REDIS_MAX_ENTRIES,
+        enabled: bool = CACHE_ENABLED,
+    ):
+        """
+        Args:
+            max_entries: Entrées max en mémoire
+            ttl_seconds: Durée de vie d'une entrée (mémoire + Redis)
+            redis_max_entries: Entrées max dans Redis
+            enabled: False = cache totalement inactif
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis_max_entries = redis_max_entries
+        self.enabled = enabled
+
+        self._memory: "OrderedDict[str, tuple[float, list[float]]]" = OrderedDict()
+        self._redis = None
+
+        self.hits_memory = 0
+        self.hits_redis = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+
+    def attach_redis(self, redis_client: Any) -> None:
+        """Active le niveau Redis partagé (bot + gateway)."""
+        self._redis = redis_client
+        logger.info("query_embedding_cache_redis_enabled", max_entries=self.redis_max_entries)
+
+    def clear(self) -> None:
+        """Vide le niveau mémoire et remet les compteurs à zéro."""
+        self._memory.clear()
+        self.hits_memory = 0
+        self.hits_redis = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+
+    def make_key(self, anonymized_query: str, model: str, dimensions: int) -> str:
+        """SHA-256 hex (version, modèle, dimensions, requête aux espaces normalisés)."""
+        normalized = " ".join(anonymized_query.split())
+        message = "\x1f".join((CACHE_VERSION, model, str(dimensions), normalized))
+        return hashlib.sha256(message.encode("utf-8")).hexdigest()
+
+    async def get(
+        self, anonymized_query: str, model: str, dimensions: int
+    ) -> Optional[list[float]]:
+        """
+        Cherche l'embedding d'une requête.
+
+        Returns:
+            Vecteur ou None (miss, cache désactivé, Redis indisponible)
+        """
+        if not self.enabled:
+            return None
+
+        key = self.make_key(anonymized_query, model, dimensions)
+
+        vector = self._memory_get(key)
+        if vector is not None:
+            self.hits_memory += 1
+            return vector
+
+        if self._redis is not None:
+            vector = await self._redis_get(key, dimensions)
+            if vector is not None:
+                self.hits_redis += 1
+                self._memory_set(key, vector)
+                return vector
+
+        self.misses += 1
+        return None
+
+    async def set(
+        self, anonymized_query: str, model: str, dimensions: int, vector: list[float]
+    ) -> None:
+        """Stocke un embedding de requête. Ne lève jamais."""
+        if not self.enabled:
+            return
+
+        key = self.make_key(anonymized_query, model, dimensions)
+        self._memory_set(key, vector)
+
+        if self._redis is not None:
+            await self._redis_set(key, vector)
+
+    def get_stats(self) -> dict:
+        """
+        Retourne statistiques hit/miss.
+
+        Returns:
+            Dict métriques
+        """
+        hits = self.hits_memory + self.hits_redis
+        lookups = hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "redis_enabled": self._redis is not None,
+            "memory_entries": len(self._memory),
+            "hits_memory": self.hits_memory,
+            "hits_redis": self.hits_redis,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Niveau mémoire
+    # ------------------------------------------------------------------
+
+    def _memory_get(self, key: str) -> Optional[list[float]]:
+        item = self._memory.get(key)
+        if item is None:
+            return None
+        stored_at, vector = item
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return vector
+
+    def _memory_set(self, key: str, vector: list[float]) -> None:
+        self._memory[key] = (time.monotonic(), vector)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    # ------------------------------------------------------------------
+    # Niveau Redis (LRU via ZSET, Redis en noeviction)
+    # ------------------------------------------------------------------
+
+    async def _redis_get(self, key: str, dimensions: int) -> Optional[list[float]]:
+        try:
+            raw = await self._redis.get(f"{REDIS_KEY_PREFIX}:{key}")
+            if raw is None:
+                return None
+            vector = _unpack(raw)
+            if len(vector) != dimensions:
+                return None
+            await self._redis.zadd(REDIS_LRU_INDEX, {key: time.time()})
+            return vector
+        except Exception as e:
+            logger.warning("query_embedding_cache_redis_get_failed", error=str(e))
+            return None
+
+    async def _redis_set(self, key: str, vector: list[float]) -> None:
+        try:
+            await self._redis.set(f"{REDIS_KEY_PREFIX}:{key}", _pack(vector), ex=self.ttl_seconds)
+            await self._redis.zadd(REDIS_LRU_INDEX, {key: time.time()})
+
+            overflow = await self._redis.zcard(REDIS_LRU_INDEX) - self.redis_max_entries
+            if overflow > 0:
+                evicted = await self._redis.zpopmin(REDIS_LRU_INDEX, overflow)
+                if evicted:
+                    await self._redis.delete(
+                        *(f"{REDIS_KEY_PREFIX}:{_decode(member)}" for member, _ in evicted)
+                    )
+                    self.evictions += len(evicted)
+        except Exception as e:
+            logger.warning("query_embedding_cache_redis_set_failed", error=str(e))
+
+
+def _pack(vector: list[float]) -> str:
+    """list[float] → base64(float32 little-endian)."""
+    return base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode("ascii")
+
+
+def _unpack(raw: Any) -> list[float]:
+    """base64(float32 little-endian) → list[float]."""
+    data = base64.b64decode(_decode(raw))
+    return list(struct.unpack(f"<{len(data) // 4}f", data))
+
+
+def _decode(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+# ============================================================
+# Global Instance
+# ============================================================
+
+# Instance globale (partagée par SemanticSearcher et la route gateway /semantic)
+query_embedding_cache = QueryEmbeddingCache()
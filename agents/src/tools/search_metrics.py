@@ -10,6 +10,7 @@ Métriques:
 - pgvector_query_ms : Latence query pgvector
 - results_count : Nombre résultats retournés
 - top_score : Score meilleur résultat
+- embedding_cache_hit_rate : Taux de hit du cache embeddings query
 
 Date: 2026-02-16
 Story: 3.3 - Task 8
@@ -44,6 +45,8 @@ class SearchMetrics:
         self.window_size = window_size
         self.latencies = deque(maxlen=window_size)  # Fenêtre glissante
         self.total_queries = 0
+        self.embedding_cache_hits = 0
+        self.embedding_cache_misses = 0
         logger.info("SearchMetrics initialized", window_size=window_size)
 
     def record_query(
@@ -51,6 +54,7 @@ class SearchMetrics:
         query_duration_ms: float,
         results_count: int,
         top_score: float,
+        embedding_cache_hit: Optional[bool] = None,
     ) -> None:
         """
         Enregistre métriques d'une query (Task 8.1).
@@ -59,15 +63,22 @@ class SearchMetrics:
             query_duration_ms: Latence totale
             results_count: Nombre résultats
             top_score: Score meilleur résultat
+            embedding_cache_hit: Embedding query servi par le cache
+                (None = pas d'embedding, ex. fast path lexical)
         """
         self.latencies.append(query_duration_ms)
         self.total_queries += 1
+        if embedding_cache_hit is True:
+            self.embedding_cache_hits += 1
+        elif embedding_cache_hit is False:
+            self.embedding_cache_misses += 1
 
         logger.debug(
             "Search query metrics recorded",
             query_duration_ms=round(query_duration_ms, 2),
             results_count=results_count,
             top_score=round(top_score, 3),
+            embedding_cache_hit=embedding_cache_hit,
         )
 
     def get_median_latency(self) -> Optional[float]:
@@ -106,6 +117,18 @@ class SearchMetrics:
 
         return median > threshold_ms
 
+    def get_embedding_cache_hit_rate(self) -> Optional[float]:
+        """
+        Taux de hit du cache embeddings query.
+
+        Returns:
+            Ratio 0.0-1.0 ou None si aucune query avec embedding
+        """
+        lookups = self.embedding_cache_hits + self.embedding_cache_misses
+        if not lookups:
+            return None
+        return round(self.embedding_cache_hits / lookups, 3)
+
     def get_stats(self) -> dict:
         """
         Retourne statistiques complètes (Task 8.4).
@@ -113,6 +136,12 @@ class SearchMetrics:
         Returns:
             Dict métriques
         """
+        embedding_cache = {
+            "embedding_cache_hits": self.embedding_cache_hits,
+            "embedding_cache_misses": self.embedding_cache_misses,
+            "embedding_cache_hit_rate": self.get_embedding_cache_hit_rate(),
+        }
+
         if not self.latencies:
             return {
                 "total_queries": self.total_queries,
@@ -120,6 +149,7 @@ class SearchMetrics:
                 "median_latency_ms": None,
                 "min_latency_ms": None,
                 "max_latency_ms": None,
+                **embedding_cache,
             }
 
         sorted_latencies = sorted(self.latencies)
@@ -135,6 +165,7 @@ class SearchMetrics:
             "p99_latency_ms": round(sorted_latencies[p99_idx], 2),
             "min_latency_ms": round(min(sorted_latencies), 2),
             "max_latency_ms": round(max(sorted_latencies), 2),
+            **embedding_cache,
         }
 
 
@@ -28,6 +28,12 @@ logger = structlog.get_logger(__name__)
 
 # Report directory
 REPORTS_DIR = Path(os.getenv("DEDUP_REPORTS_DIR", r"C:\Users\lopez\BeeStation\Friday\Reports"))
+# Index local (pas sur BeeStation : SQLite ne supporte pas les partages synchronisés)
+HASH_INDEX_PATH = Path(
+    os.getenv(
+        "DEDUP_HASH_INDEX_PATH", r"C:\Users\lopez\AppData\Local\Friday\dedup_hash_index.sqlite"
+    )
+)
 
 # Rate limiting: 1 scan at a time
 _active_scan: Optional[str] = None  # dedup_id of active scan
@@ -101,7 +107,10 @@ async def scan_dedup_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
         from agents.src.agents.dedup.scanner import DedupScanner
 
         # Configure scan
-        config = ScanConfig(root_path=Path(os.getenv("DEDUP_ROOT_PATH", r"C:\Users\lopez")))
+        config = ScanConfig(
+            root_path=Path(os.getenv("DEDUP_ROOT_PATH", r"C:\Users\lopez")),
+            hash_index_path=HASH_INDEX_PATH,
+        )
 
         # Progress callback updates Telegram
         last_update_time = [0.0]
@@ -168,6 +177,13 @@ async def scan_dedup_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
         # Send final report with inline buttons
         elapsed = int(time.time() - scan_start)
+        changes_line = ""
+        if result.changes is not None:
+            changes_line = (
+                f"Depuis le {result.changes.previous_scan_date:%d/%m/%Y} : "
+                f"+{len(result.changes.added):,} / ~{len(result.changes.modified):,} / "
+                f"-{len(result.changes.removed):,} fichiers\n"
+            )
         keyboard = [
             [
                 InlineKeyboardButton(
@@ -196,7 +212,8 @@ async def scan_dedup_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
                 f"Groupes doublons : {result.duplicate_groups_count:,}\n"
                 f"Doublons detectes : {result.total_duplicates:,}\n"
                 f"Espace recuperable : {result.space_reclaimable_gb:.1f} Go\n"
-                f"Duree : {_format_duration(elapsed)}\n\n"
+                f"Duree : {_format_duration(elapsed)}\n"
+                f"{changes_line}\n"
                 f"Rapport CSV : {report_path.name}"
             ),
             reply_markup=InlineKeyboardMarkup(keyboard),
@@ -16,6 +16,7 @@ import time
 
 import asyncpg
 import structlog
+from agents.src.tools.query_embedding_cache import query_embedding_cache
 from bot.config import ConfigurationError, load_bot_config, validate_bot_permissions
 from bot.handlers import (
     arborescence_commands,
@@ -118,6 +119,7 @@ class FridayBot:
                         self.redis_client = redis_async.from_url(redis_url)
                         await self.redis_client.ping()
                         logger.info("Redis client initialisé")
+                        query_embedding_cache.attach_redis(self.redis_client)
                     except Exception as redis_err:
                         logger.warning(
                             "Impossible de connecter Redis",
@@ -0,0 +1,42 @@
+-- ============================================================
+-- Migration 043: Cache embeddings par content_hash
+-- ============================================================
+-- Date: 2026-10-16
+-- Description: Réutiliser les vecteurs existants au lieu de rappeler Voyage
+--              quand un chunk identique (même hash, même modèle, mêmes
+--              dimensions) est déjà indexé (reclassement, déplacement fichier).
+--              Lookup: agents/src/adapters/embedding_cache.py
+-- ============================================================
+
+BEGIN;
+
+-- 1. Modèle + dimensions du vecteur (un même texte n'a pas le même vecteur
+--    selon modèle/dimensions : clé de cache = (content_hash, model, dimensions))
+ALTER TABLE knowledge.embeddings
+ADD COLUMN IF NOT EXISTS model VARCHAR(100);
+
+ALTER TABLE knowledge.embeddings
+ADD COLUMN IF NOT EXISTS dimensions INTEGER;
+
+-- 2. Index composite pour lookup batch WHERE content_hash = ANY($1)
+CREATE INDEX IF NOT EXISTS idx_embeddings_hash_model
+ON knowledge.embeddings (content_hash, model, dimensions)
+WHERE content_hash IS NOT NULL;
+
+COMMENT ON COLUMN knowledge.embeddings.content_hash IS
+'SHA-256 du texte ANONYMISÉ envoyé au provider (jamais du texte clair)';
+COMMENT ON COLUMN knowledge.embeddings.model IS
+'Modèle embeddings ayant produit le vecteur (ex: voyage-4-large)';
+COMMENT ON COLUMN knowledge.embeddings.dimensions IS
+'Nombre de dimensions du vecteur (ex: 1024)';
+
+COMMIT;
+
+-- ============================================================
+-- Rollback (si nécessaire)
+-- ============================================================
+-- BEGIN;
+-- DROP INDEX IF EXISTS knowledge.idx_embeddings_hash_model;
+-- ALTER TABLE knowledge.embeddings DROP COLUMN IF EXISTS dimensions;
+-- ALTER TABLE knowledge.embeddings DROP COLUMN IF EXISTS model;
+-- COMMIT;
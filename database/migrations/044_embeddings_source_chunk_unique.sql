@@ -0,0 +1,46 @@
+-- ============================================================
+-- Migration 044: Clé d'upsert (source_type, source_id, chunk_index)
+-- ============================================================
+-- Date: 2026-10-16
+-- Description: Ingestion bulk des embeddings (COPY + INSERT ... ON CONFLICT)
+--              et upsert unitaire (memorystore) : une ligne par chunk de source.
+--              Écriture: agents/src/adapters/embedding_bulk.py
+-- ============================================================
+
+BEGIN;
+
+-- 1. chunk_index obligatoire (NULL ne déclencherait jamais ON CONFLICT)
+UPDATE knowledge.embeddings SET chunk_index = 0 WHERE chunk_index IS NULL;
+
+ALTER TABLE knowledge.embeddings
+ALTER COLUMN chunk_index SET NOT NULL;
+
+-- 2. Dédoublonner l'existant (INSERT sans upsert avant cette migration) :
+--    on garde la ligne la plus récente par (source_type, source_id, chunk_index)
+DELETE FROM knowledge.embeddings e
+USING (
+    SELECT id,
+           ROW_NUMBER() OVER (
+               PARTITION BY source_type, source_id, chunk_index
+               ORDER BY created_at DESC, id
+           ) AS rn
+    FROM knowledge.embeddings
+) d
+WHERE e.id = d.id AND d.rn > 1;
+
+-- 3. Index UNIQUE = cible ON CONFLICT
+CREATE UNIQUE INDEX IF NOT EXISTS idx_embeddings_source_chunk
+ON knowledge.embeddings (source_type, source_id, chunk_index);
+
+COMMENT ON INDEX knowledge.idx_embeddings_source_chunk IS
+'Clé upsert embeddings (bulk COPY + memorystore). Une ligne par chunk de source.';
+
+COMMIT;
+
+-- ============================================================
+-- Rollback (si nécessaire)
+-- ============================================================
+-- BEGIN;
+-- DROP INDEX IF EXISTS knowledge.idx_embeddings_source_chunk;
+-- ALTER TABLE knowledge.embeddings ALTER COLUMN chunk_index DROP NOT NULL;
+-- COMMIT;
@@ -0,0 +1,67 @@
+-- ============================================================
+-- Migration 045: NOTIFY sur modifications du graphe de connaissances
+-- ============================================================
+-- Date: 2026-10-16
+-- Description: Garde le snapshot mémoire du graphe (CSR) à jour sans polling.
+--              Canal: knowledge_graph. Payload JSON minimal (ids + clé d'edge),
+--              jamais de name/metadata (limite 8000 octets NOTIFY + RGPD).
+--              Consommateur: agents/src/adapters/graph_snapshot.py
+-- ============================================================
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION knowledge.notify_graph_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    rec RECORD;
+    payload JSONB;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        rec := OLD;
+    ELSE
+        rec := NEW;
+    END IF;
+
+    IF TG_TABLE_NAME = 'edges' THEN
+        payload := jsonb_build_object(
+            'table', 'edges',
+            'op', TG_OP,
+            'id', rec.id,
+            'from', rec.from_node_id,
+            'to', rec.to_node_id,
+            'relation_type', rec.relation_type
+        );
+    ELSE
+        payload := jsonb_build_object('table', 'nodes', 'op', TG_OP, 'id', rec.id);
+    END IF;
+
+    PERFORM pg_notify('knowledge_graph', payload::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS nodes_notify_graph_change ON knowledge.nodes;
+CREATE TRIGGER nodes_notify_graph_change
+    AFTER INSERT OR UPDATE OR DELETE ON knowledge.nodes
+    FOR EACH ROW
+    EXECUTE FUNCTION knowledge.notify_graph_change();
+
+DROP TRIGGER IF EXISTS edges_notify_graph_change ON knowledge.edges;
+CREATE TRIGGER edges_notify_graph_change
+    AFTER INSERT OR UPDATE OR DELETE ON knowledge.edges
+    FOR EACH ROW
+    EXECUTE FUNCTION knowledge.notify_graph_change();
+
+COMMENT ON FUNCTION knowledge.notify_graph_change() IS
+'NOTIFY knowledge_graph sur INSERT/UPDATE/DELETE nodes/edges (snapshot graphe en mémoire)';
+
+COMMIT;
+
+-- ============================================================
+-- Rollback (si nécessaire)
+-- ============================================================
+-- BEGIN;
+-- DROP TRIGGER IF EXISTS edges_notify_graph_change ON knowledge.edges;
+-- DROP TRIGGER IF EXISTS nodes_notify_graph_change ON knowledge.nodes;
+-- DROP FUNCTION IF EXISTS knowledge.notify_graph_change();
+-- COMMIT;
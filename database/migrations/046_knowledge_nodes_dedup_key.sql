@@ -0,0 +1,62 @@
+-- ============================================================
+-- Migration 046: Clé de déduplication des nœuds (upsert bulk)
+-- ============================================================
+-- Date: 2026-10-16
+-- Description: get_or_create_node = SELECT puis INSERT (2 allers-retours par
+--              nœud, course possible entre deux workers). La colonne dedup_key
+--              + index UNIQUE partiel permet INSERT ... ON CONFLICT en un seul
+--              statement pour tout un sous-graphe (upsert_subgraph).
+--              Règles (miroir de memorystore._dedup_key) :
+--                person   → LOWER(metadata->>'email')
+--                document → metadata->>'source_id'
+--                entity   → LOWER(entity_type || ':' || name)
+--              Autres types : NULL (jamais dédupliqués)
+-- ============================================================
+
+BEGIN;
+
+-- 1. Colonne (NULL = nœud non dédupliqué)
+ALTER TABLE knowledge.nodes
+ADD COLUMN IF NOT EXISTS dedup_key TEXT;
+
+COMMENT ON COLUMN knowledge.nodes.dedup_key IS
+'Clé de déduplication par type (email personne, source_id document, type:nom entité). NULL = pas de dédup';
+
+-- 2. Backfill : seul le nœud le plus ancien par (type, clé) reçoit la clé,
+--    les doublons historiques restent sans clé (pas de fusion destructive)
+WITH keyed AS (
+    SELECT id, type, key,
+           ROW_NUMBER() OVER (PARTITION BY type, key ORDER BY created_at, id) AS rn
+    FROM (
+        SELECT id, type, created_at,
+               NULLIF(CASE type
+                   WHEN 'person' THEN LOWER(metadata->>'email')
+                   WHEN 'document' THEN metadata->>'source_id'
+                   WHEN 'entity' THEN LOWER(COALESCE(metadata->>'entity_type', '') || ':' || name)
+               END, '') AS key
+        FROM knowledge.nodes
+    ) k
+    WHERE key IS NOT NULL
+)
+UPDATE knowledge.nodes n
+SET dedup_key = keyed.key
+FROM keyed
+WHERE n.id = keyed.id AND keyed.rn = 1;
+
+-- 3. Index UNIQUE partiel = cible ON CONFLICT (type, dedup_key) WHERE dedup_key IS NOT NULL
+CREATE UNIQUE INDEX IF NOT EXISTS idx_nodes_dedup_key
+ON knowledge.nodes (type, dedup_key)
+WHERE dedup_key IS NOT NULL;
+
+COMMENT ON INDEX knowledge.idx_nodes_dedup_key IS
+'Cible ON CONFLICT de create_node / upsert_subgraph (memorystore)';
+
+COMMIT;
+
+-- ============================================================
+-- Rollback (si nécessaire)
+-- ============================================================
+-- BEGIN;
+-- DROP INDEX IF EXISTS knowledge.idx_nodes_dedup_key;
+-- ALTER TABLE knowledge.nodes DROP COLUMN IF EXISTS dedup_key;
+-- COMMIT;
@@ -0,0 +1,41 @@
+-- ============================================================
+-- Migration 047: Index lexicaux pour la recherche hybride
+-- ============================================================
+-- Date: 2026-10-16
+-- Description: Recherche hybride (lexicale + pgvector, fusion RRF) dans
+--              SemanticSearcher. Les numéros de facture, SIRET ou noms de fichier
+--              exacts ne remontent pas en similarité cosinus : full-text
+--              français sur le texte OCR + trigrammes sur le nom de fichier.
+--              Lecture: agents/src/agents/archiviste/semantic_search.py
+-- ============================================================
+
+BEGIN;
+
+-- 1. Trigrammes (word_similarity / opérateur <% sur filename)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- 2. tsvector français du texte OCR (colonne générée : toujours à jour)
+ALTER TABLE ingestion.document_metadata
+ADD COLUMN IF NOT EXISTS search_tsv tsvector
+GENERATED ALWAYS AS (to_tsvector('french', COALESCE(ocr_text, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_document_metadata_search_tsv
+ON ingestion.document_metadata USING gin (search_tsv);
+
+-- 3. Trigrammes sur le nom de fichier (recherche par nom exact ou partiel)
+CREATE INDEX IF NOT EXISTS idx_document_metadata_filename_trgm
+ON ingestion.document_metadata USING gin (filename gin_trgm_ops);
+
+COMMENT ON COLUMN ingestion.document_metadata.search_tsv IS
+'to_tsvector(french, ocr_text) - branche lexicale de la recherche hybride';
+
+COMMIT;
+
+-- ============================================================
+-- Rollback (si nécessaire)
+-- ============================================================
+-- BEGIN;
+-- DROP INDEX IF EXISTS ingestion.idx_document_metadata_filename_trgm;
+-- DROP INDEX IF EXISTS ingestion.idx_document_metadata_search_tsv;
+-- ALTER TABLE ingestion.document_metadata DROP COLUMN IF EXISTS search_tsv;
+-- COMMIT;
@@ -0,0 +1,41 @@
+-- ============================================================
+-- Migration 048: Index HNSW partiels par source_type
+-- ============================================================
+-- Date: 2026-10-16
+-- Description: Recherche ANN filtrée. Avec un filtre sélectif (documents
+--              seulement, emails seulement), l'index HNSW global renvoie
+--              ef_search candidats dont la plupart sont ensuite rejetés par
+--              le WHERE : trop peu de résultats ou repli en scan séquentiel.
+--              Un index partiel par source_type ne contient que les vecteurs
+--              éligibles. Le planner ne l'utilise que si le prédicat est un
+--              littéral dans la requête (pas un paramètre $n).
+--              Lecture: agents/src/adapters/ann_search.py
+-- ============================================================
+
+BEGIN;
+
+-- Mêmes paramètres que l'index global (migration 008 : m=16, ef_construction=64)
+CREATE INDEX IF NOT EXISTS idx_embeddings_vector_document ON knowledge.embeddings
+    USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64)
+    WHERE source_type = 'document';
+
+CREATE INDEX IF NOT EXISTS idx_embeddings_vector_email ON knowledge.embeddings
+    USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64)
+    WHERE source_type = 'email';
+
+COMMENT ON INDEX knowledge.idx_embeddings_vector_document IS
+'HNSW partiel source_type=document (recherche archiviste filtrée)';
+COMMENT ON INDEX knowledge.idx_embeddings_vector_email IS
+'HNSW partiel source_type=email (recherche filtrée sur les emails)';
+
+COMMIT;
+
+-- ============================================================
+-- Rollback (si nécessaire)
+-- ============================================================
+-- BEGIN;
+-- DROP INDEX IF EXISTS knowledge.idx_embeddings_vector_email;
+-- DROP INDEX IF EXISTS knowledge.idx_embeddings_vector_document;
+-- COMMIT;
@@ -0,0 +1,41 @@
+-- ============================================================
+-- Migration 049: Tiers d'index HNSW quantifiés (halfvec / binary)
+-- ============================================================
+-- Date: 2026-10-16
+-- Description: Tier de stockage quantifié de l'index vectoriel. La colonne
+--              embedding reste en vector(1024) float32 (re-classement pleine
+--              précision) ; seul l'index HNSW change :
+--                - halfvec : embedding::halfvec(1024), 2 Ko par vecteur au
+--                  lieu de 4 Ko, recall@10 quasi identique
+--                - binary  : binary_quantize(embedding)::bit(1024), ~32x
+--              Repousse le seuil D19 (Qdrant au-delà de 300k vecteurs).
+--              Lecture (PGVECTOR_INDEX_MODE): agents/src/adapters/ann_search.py
+--
+-- Un seul tier indexé à la fois : chaque tier supplémentaire coûte sa
+-- mémoire d'index et est maintenu à chaque INSERT (ingestion bulk comprise).
+-- Cette migration ne crée donc AUCUN index : le tier full (migrations
+-- 008/048) reste actif tant que PGVECTOR_INDEX_MODE n'est pas changé.
+--
+-- Bascule de tier (agents/src/adapters/embedding_bulk.py) :
+--   1. PGVECTOR_INDEX_MODE=halfvec (ou binary) sur bot/gateway/workers
+--   2. rebuild_hnsw_index(conn) : crée les index du tier actif (global +
+--      partiels document/email) puis DROP ceux des autres tiers
+--      (idem bulk_upsert_embeddings(..., rebuild_index=True))
+--   3. Validation : tests/performance/test_vector_quantization_perf.py
+--   Retour au tier full : PGVECTOR_INDEX_MODE=full puis rebuild_hnsw_index(conn)
+-- ============================================================
+
+BEGIN;
+
+COMMENT ON COLUMN knowledge.embeddings.embedding IS
+'Vecteur 1024 dims float32. Index HNSW du tier PGVECTOR_INDEX_MODE uniquement (full, halfvec, binary) - bascule via rebuild_hnsw_index()';
+
+COMMIT;
+
+-- ============================================================
+-- Rollback (si nécessaire)
+-- ============================================================
+-- BEGIN;
+-- COMMENT ON COLUMN knowledge.embeddings.embedding IS
+-- 'Vecteur 1024 dims (configurable selon modèle embeddings)';
+-- COMMIT;
@@ -0,0 +1,30 @@
+-- ============================================================
+-- Migration 050: Voie d'extraction du texte des documents
+-- ============================================================
+-- Date: 2026-10-16
+-- Description: Les PDF natifs (couche texte) sont lus via PyMuPDF sans OCR
+--              Surya ; seules les pages scannées passent par Surya.
+--              extraction_method trace la voie utilisée par document :
+--                text_layer : couche texte native uniquement
+--                ocr        : Surya uniquement (images, PDF scannés)
+--                mixed      : pages natives + pages scannées
+--              Écriture: agents/src/agents/archiviste/pipeline.py
+-- ============================================================
+
+BEGIN;
+
+ALTER TABLE ingestion.document_metadata
+ADD COLUMN IF NOT EXISTS extraction_method TEXT
+CHECK (extraction_method IN ('text_layer', 'ocr', 'mixed'));
+
+COMMENT ON COLUMN ingestion.document_metadata.extraction_method IS
+'Voie d''extraction du texte: text_layer (PDF natif), ocr (Surya), mixed';
+
+COMMIT;
+
+-- ============================================================
+-- Rollback (si nécessaire)
+-- ============================================================
+-- BEGIN;
+-- ALTER TABLE ingestion.document_metadata DROP COLUMN IF EXISTS extraction_method;
+-- COMMIT;
@@ -1,20 +1,33 @@
-"""REST API server for analyzer with custom French model configuration."""
+"""REST API server for analyzer with custom French model configuration.
+
+Endpoints:
+    POST /analyze        : one text per request (Presidio standard API)
+    POST /analyze/batch  : list of texts, spaCy nlp.pipe in batches (BatchAnalyzerEngine)
+
+Served by gunicorn (see gunicorn_conf.py): the model is loaded once in the
+master (preload_app) and shared copy-on-write by the forked workers.
+"""
 
 import json
 import logging
 import os
 from logging.config import fileConfig
 from pathlib import Path
-from typing import Tuple
+from typing import List, Tuple
 
 from flask import Flask, Response, jsonify, request
-from presidio_analyzer import AnalyzerEngine
+from presidio_analyzer import AnalyzerEngine, BatchAnalyzerEngine
 from presidio_analyzer.analyzer_request import AnalyzerRequest
 from presidio_analyzer.nlp_engine import NlpEngineProvider
 from werkzeug.exceptions import HTTPException
 
 DEFAULT_PORT = "3000"
 
+# nlp.pipe batch size for /analyze/batch (overridable per request)
+BATCH_SIZE = int(os.environ.get("ANALYZER_BATCH_SIZE", "32"))
+# Max texts accepted by a single /analyze/batch request
+BATCH_MAX_TEXTS = int(os.environ.get("ANALYZER_BATCH_MAX_TEXTS", "256"))
+
 LOGGING_CONF_FILE = "logging.ini"
 
 WELCOME_MESSAGE = r"""
@@ -51,6 +64,9 @@ class Server:
         # We need to add "fr" manually
         self._add_french_support_to_spacy_recognizer()
 
+        # Batch engine shares the same AnalyzerEngine (registry + NLP model)
+        self.batch_engine = BatchAnalyzerEngine(analyzer_engine=self.engine)
+
         self.logger.info(WELCOME_MESSAGE)
 
         @self.app.route("/health")
@@ -103,6 +119,56 @@ class Server:
                 )
                 return jsonify(error=e.args[0]), 500
 
+        @self.app.route("/analyze/batch", methods=["POST"])
+        def analyze_batch() -> Tuple[str, int]:
+            """Analyze a list of texts in one request (spaCy nlp.pipe).
+
+            Body: {"texts": [...], "language": "fr", "entities": [...],
+                   "score_threshold": 0.0, "batch_size": 32}
+            Returns: one list of recognizer results per text, same order.
+            """
+            try:
+                req_data = request.get_json() or {}
+                texts = req_data.get("texts")
+                language = req_data.get("language")
+
+                if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                    raise TypeError("'texts' must be a list of strings")
+                if not language:
+                    raise TypeError("No language provided")
+                if len(texts) > BATCH_MAX_TEXTS:
+                    return (
+                        jsonify(error=f"Too many texts: {len(texts)} > {BATCH_MAX_TEXTS}"),
+                        413,
+                    )
+                if not texts:
+                    return jsonify([]), 200
+
+                batch_size = int(req_data.get("batch_size") or BATCH_SIZE)
+                results = self._analyze_texts(
+                    texts=texts,
+                    language=language,
+                    batch_size=max(1, batch_size),
+                    entities=req_data.get("entities"),
+                    score_threshold=req_data.get("score_threshold"),
+                )
+
+                return Response(
+                    json.dumps(results, default=lambda o: o.to_dict(), sort_keys=True),
+                    content_type="application/json",
+                )
+            except (TypeError, ValueError) as te:
+                error_msg = f"Failed to parse /analyze/batch request. {te.args[0]}"
+                self.logger.error(error_msg)
+                return jsonify(error=error_msg), 400
+
+            except Exception as e:
+                self.logger.error(
+                    f"A fatal error occurred during execution of "
+                    f"BatchAnalyzerEngine.analyze_iterator(). {e}"
+                )
+                return jsonify(error=e.args[0]), 500
+
         @self.app.route("/recognizers", methods=["GET"])
         def recognizers() -> Tuple[str, int]:
             """Return a list of supported recognizers."""
@@ -136,6 +202,27 @@ class Server:
         def http_exception(e):
             return jsonify(error=e.description), e.code
 
+    def _analyze_texts(
+        self,
+        texts: List[str],
+        language: str,
+        batch_size: int,
+        entities=None,
+        score_threshold=None,
+    ) -> List[list]:
+        """Run texts through nlp.pipe (batch_size docs at a time) then recognizers."""
+        kwargs = {}
+        if entities:
+            kwargs["entities"] = entities
+        if score_threshold is not None:
+            kwargs["score_threshold"] = score_threshold
+
+        results = self.batch_engine.analyze_iterator(
+            texts=texts, language=language, batch_size=batch_size, **kwargs
+        )
+        self.logger.debug(f"Analyzed batch of {len(texts)} texts (batch_size={batch_size})")
+        return list(results)
+
     def _create_nlp_engine(self, config_path: str):
         """Create NlpEngine with custom configuration for French support."""
         try:
@@ -204,6 +291,11 @@ class Server:
             )
 
 
+def create_app() -> Flask:
+    """WSGI factory for gunicorn (model loaded once in master with preload_app)."""
+    return Server().app
+
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", DEFAULT_PORT))
     server = Server()
@@ -0,0 +1,23 @@
+"""Gunicorn configuration for the custom Presidio Analyzer.
+
+preload_app loads spaCy fr_core_news_lg (~550 Mo) once in the master process;
+forked workers share the model pages copy-on-write instead of loading one copy
+each. gc.freeze() before fork keeps the garbage collector from touching (and
+therefore copying) the preloaded objects in every worker.
+"""
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '3000')}"
+workers = int(os.environ.get("ANALYZER_WORKERS", "2"))
+threads = int(os.environ.get("ANALYZER_THREADS", "1"))
+timeout = int(os.environ.get("ANALYZER_TIMEOUT", "120"))
+preload_app = True
+accesslog = None
+loglevel = os.environ.get("LOG_LEVEL", "INFO").lower()
+
+
+def pre_fork(server, worker):
+    """Freeze objects allocated by the preloaded app before each fork."""
+    gc.freeze()
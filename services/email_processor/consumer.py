@@ -3,7 +3,7 @@ Email Processor Consumer - Story 2.1 Task 3
 Consumer Redis Streams pour traiter les événements email.received
 
 Pipeline (D25: IMAP direct remplace EmailEngine):
-    1. Fetch email complet via adapter IMAP direct
+    1. Fetch email complet via adapter IMAP direct (ou handoff RFC822 du fetcher)
     2. Anonymiser body complet via Presidio
     3. Classification Claude Sonnet 4.5
     4. Stocker email dans PostgreSQL ingestion.emails
@@ -17,12 +17,14 @@ import asyncio
 import json
 import logging
 import os
+import signal
 import sys
 import time
+from collections import deque
 from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Deque, Dict, Optional, Set
 
 import asyncpg
 import httpx
@@ -37,9 +39,12 @@ sys.path.insert(0, str(repo_root))
 from agents.src.adapters.email import (
     EmailAdapter,
     EmailAdapterError,
+    EmailMessage,
     IMAPUIDNotFoundError,
     get_email_adapter,
+    parse_email_message,
 )
+from agents.src.adapters.email_handoff import RawEmailHandoff, get_raw_email_handoff
 
 # Event detection import removed - now done inline to avoid circular dependency
 from agents.src.agents.email.attachment_extractor import extract_attachments
@@ -53,7 +58,8 @@ from agents.src.agents.email.vip_detector import (
     update_vip_email_stats,
 )
 from agents.src.middleware.trust import init_trust_manager
-from agents.src.tools.anonymize import anonymize_text
+from agents.src.tools.anonymization_cache import anonymization_cache
+from agents.src.tools.anonymize import anonymize_text, close_http_client
 
 # ============================================
 # Logging Setup
@@ -103,6 +109,13 @@ STREAM_DLQ = "emails:failed"
 CONSUMER_GROUP = "email-processor"
 CONSUMER_NAME = f"consumer-{os.getpid()}"
 
+# Mode concurrent : nombre d'événements traités en parallèle (1 = séquentiel historique)
+CONSUMER_CONCURRENCY = max(1, int(os.getenv("EMAIL_CONSUMER_CONCURRENCY", "1")))
+# Plafond d'appels LLM simultanés (classification, tâches, événements, brouillon)
+LLM_CONCURRENCY = max(1, int(os.getenv("EMAIL_CONSUMER_LLM_CONCURRENCY", "3")))
+# Délai max (secondes) pour terminer les événements en vol à l'arrêt
+DRAIN_TIMEOUT_SECONDS = float(os.getenv("EMAIL_CONSUMER_DRAIN_TIMEOUT", "120"))
+
 
 # ============================================
 # Adapter Compat Wrapper (D25: pour extract_attachments)
@@ -155,6 +168,66 @@ class AdapterEmailCompat:
         return await self._adapter.download_attachment(account_id, msg_id, attachment_id)
 
 
+# ============================================
+# Ordered XACK (mode concurrent)
+# ============================================
+
+
+class OrderedAcker:
+    """
+    XACK dans l'ordre du stream pour le mode concurrent.
+
+    Les événements sont enregistrés dans l'ordre de lecture XREADGROUP. Un XACK n'est
+    émis que pour le préfixe contigu d'événements terminés : un email lent retient
+    l'ACK des suivants jusqu'à sa propre fin. Un événement terminé sans demande d'ACK
+    (erreur → reste dans la PEL) libère la file sans être acquitté.
+    """
+
+    def __init__(self, redis_client: Any, stream: str = STREAM_NAME, group: str = CONSUMER_GROUP):
+        self._redis = redis_client
+        self._stream = stream
+        self._group = group
+        self._order: Deque[str] = deque()
+        self._finished: Dict[str, bool] = {}
+        self._ack_requested: Set[str] = set()
+        self._lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Nombre d'événements enregistrés pas encore sortis de la file."""
+        return len(self._order)
+
+    def register(self, event_id: str) -> None:
+        """Enregistrer un événement au moment de sa lecture (ordre du stream)."""
+        self._order.append(event_id)
+
+    def request_ack(self, event_id: str) -> None:
+        """Marquer l'événement comme à acquitter (appelé par le pipeline)."""
+        self._ack_requested.add(event_id)
+
+    async def complete(self, event_id: str) -> int:
+        """
+        Signaler la fin du traitement et flusher le préfixe terminé.
+
+        Returns:
+            Nombre d'événements acquittés par ce flush
+        """
+        self._finished[event_id] = event_id in self._ack_requested
+        self._ack_requested.discard(event_id)
+
+        async with self._lock:
+            to_ack = []
+            while self._order and self._order[0] in self._finished:
+                head = self._order.popleft()
+                if self._finished.pop(head):
+                    to_ack.append(head)
+
+            if to_ack:
+                await self._redis.xack(self._stream, self._group, *to_ack)
+
+        return len(to_ack)
+
+
 # ============================================
 # EmailProcessorConsumer Class
 # ============================================
@@ -173,14 +246,33 @@ class EmailProcessorConsumer:
             d. Store PostgreSQL ingestion.emails
             e. Notify Telegram topic Email
         3. XACK après traitement complet
+
+    Mode concurrent (EMAIL_CONSUMER_CONCURRENCY > 1):
+        - Jusqu'à `concurrency` événements en vol (XREADGROUP borné aux slots libres)
+        - Étapes LLM bornées par un sémaphore (EMAIL_CONSUMER_LLM_CONCURRENCY)
+        - XACK ordonné via OrderedAcker
+        - Drain des événements en vol à l'arrêt (SIGTERM), le reste reste en PEL
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        concurrency: int = CONSUMER_CONCURRENCY,
+        llm_concurrency: int = LLM_CONCURRENCY,
+        drain_timeout: float = DRAIN_TIMEOUT_SECONDS,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.drain_timeout = drain_timeout
+        self._llm_semaphore = asyncio.Semaphore(max(1, llm_concurrency))
+        self._acker: Optional[OrderedAcker] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+
         self.redis: Optional[redis.Redis] = None
         self.db_pool: Optional[asyncpg.Pool] = None
         self.http_client: Optional[httpx.AsyncClient] = None
         self.email_adapter: Optional[EmailAdapter] = None
         self.email_compat: Optional[AdapterEmailCompat] = None  # D25: compat wrapper
+        self.raw_handoff: Optional[RawEmailHandoff] = None  # Handoff RFC822 du fetcher
         self.bot: Optional[Bot] = None  # M5 fix: Bot Telegram pour notifications
 
     async def connect(self):
@@ -191,8 +283,10 @@ class EmailProcessorConsumer:
         logger.info("redis_connected")
 
         # PostgreSQL Pool (pour @friday_action + detect_vip/urgency)
-        self.db_pool = await asyncpg.create_pool(DATABASE_URL, min_size=5, max_size=20)
-        logger.info("postgresql_pool_created", min_size=5, max_size=20)
+        # Mode concurrent : ~2 connexions par événement en vol
+        pool_max_size = max(20, self.concurrency * 2)
+        self.db_pool = await asyncpg.create_pool(DATABASE_URL, min_size=5, max_size=pool_max_size)
+        logger.info("postgresql_pool_created", min_size=5, max_size=pool_max_size)
 
         # Initialiser TrustManager avec le pool (requis pour @friday_action)
         init_trust_manager(db_pool=self.db_pool)
@@ -209,6 +303,14 @@ class EmailProcessorConsumer:
             "email_adapter_initialized", provider=os.getenv("EMAIL_PROVIDER", "imap_direct")
         )
 
+        # Handoff RFC822 : lire les bytes deposes par le fetcher (pas de 2e fetch IMAP)
+        self.raw_handoff = get_raw_email_handoff(redis_client=self.redis)
+        if self.raw_handoff:
+            logger.info("email_handoff_enabled", backend=self.raw_handoff.backend)
+
+        # Cache anonymisation partage (signatures, footers, sujets repetes)
+        anonymization_cache.attach_redis(self.redis)
+
         # M5 fix: Bot Telegram pour notifications Story 2.7 (AC3 + AC4)
         telegram_token = os.environ.get("TELEGRAM_BOT_TOKEN")
         if telegram_token:
@@ -231,8 +333,11 @@ class EmailProcessorConsumer:
 
     async def close(self):
         """Close all connections"""
+        if self.email_adapter:
+            await self.email_adapter.close()  # LOGOUT sessions IMAP poolees
         if self.http_client:
             await self.http_client.aclose()
+        await close_http_client()  # Client Presidio partage (keep-alive)
         if self.db_pool:
             await self.db_pool.close()
         if self.redis:
@@ -249,13 +354,33 @@ class EmailProcessorConsumer:
         enabled_str = enabled.decode("utf-8") if isinstance(enabled, bytes) else enabled
         return enabled_str == "true"
 
+    def request_stop(self):
+        """Demander l'arrêt gracieux (handler SIGTERM/SIGINT)"""
+        logger.info("consumer_stop_requested", in_flight=len(self._inflight))
+        self._stopping.set()
+
+    async def _ack(self, event_id: str):
+        """XACK immédiat en mode séquentiel, différé et ordonné en mode concurrent"""
+        if self._acker is not None:
+            self._acker.request_ack(event_id)
+        else:
+            await self.redis.xack(STREAM_NAME, CONSUMER_GROUP, event_id)
+
     async def start(self):
         """Start consumer loop"""
-        logger.info("consumer_starting", group=CONSUMER_GROUP, consumer=CONSUMER_NAME)
+        logger.info(
+            "consumer_starting",
+            group=CONSUMER_GROUP,
+            consumer=CONSUMER_NAME,
+            concurrency=self.concurrency,
+        )
+
+        if self.concurrency > 1:
+            self._acker = OrderedAcker(self.redis)
 
         logger.info("entering_main_loop")
 
-        while True:
+        while not self._stopping.is_set():
             try:
                 # Heartbeat Redis pour monitoring depuis le bot container
                 try:
@@ -276,13 +401,20 @@ class EmailProcessorConsumer:
                     await asyncio.sleep(10)
                     continue
 
+                # Mode concurrent : ne lire que ce qui tient dans les slots libres
+                count = 10
+                if self._acker is not None:
+                    count = await self._wait_for_free_slots(timeout=5.0)
+                    if count == 0:
+                        continue  # Tous les slots occupés → refresh heartbeat
+
                 # XREADGROUP: Lire événements du stream
                 logger.info("xreadgroup_calling", stream=STREAM_NAME, group=CONSUMER_GROUP)
                 events = await self.redis.xreadgroup(
                     groupname=CONSUMER_GROUP,
                     consumername=CONSUMER_NAME,
                     streams={STREAM_NAME: ">"},  # '>' = new messages only (don't reprocess pending)
-                    count=10,
+                    count=count,
                     block=5000,  # Block 5s si aucun événement
                 )
 
@@ -295,7 +427,10 @@ class EmailProcessorConsumer:
                 for stream_name, messages in events:
                     logger.info("processing_messages", count=len(messages))
                     for event_id, payload in messages:
-                        await self.process_email_event(event_id, payload)
+                        if self._acker is not None:
+                            self._dispatch_event(event_id, payload)
+                        else:
+                            await self.process_email_event(event_id, payload)
 
             except asyncio.CancelledError:
                 logger.info("consumer_cancelled")
@@ -304,6 +439,65 @@ class EmailProcessorConsumer:
                 logger.error("consumer_error", error=str(e), exc_info=True)
                 await asyncio.sleep(5)  # Backoff before retry
 
+        await self._drain_inflight()
+
+    async def _wait_for_free_slots(self, timeout: float) -> int:
+        """
+        Attendre qu'au moins un slot se libère (mode concurrent).
+
+        Timeout court pour que la boucle principale continue de rafraîchir
+        le heartbeat même si tous les événements en vol sont lents.
+
+        Returns:
+            Nombre de slots libres (0 si timeout)
+        """
+        if len(self._inflight) >= self.concurrency:
+            await asyncio.wait(
+                set(self._inflight), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+        return max(0, self.concurrency - len(self._inflight))
+
+    def _dispatch_event(self, event_id: str, payload: Dict[str, str]):
+        """Lancer le traitement d'un événement en tâche de fond (mode concurrent)"""
+        self._acker.register(event_id)
+        task = asyncio.create_task(
+            self._process_and_complete(event_id, payload), name=f"email-event-{event_id}"
+        )
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _process_and_complete(self, event_id: str, payload: Dict[str, str]):
+        """Traiter un événement puis libérer sa place dans la file d'ACK ordonnée"""
+        try:
+            await self.process_email_event(event_id, payload)
+        finally:
+            try:
+                await self._acker.complete(event_id)
+            except Exception as e:
+                # Événements non acquittés → restent dans la PEL
+                logger.error("ordered_xack_failed", event_id=event_id, error=str(e))
+
+    async def _drain_inflight(self):
+        """
+        Arrêt gracieux : attendre la fin des événements en vol (max drain_timeout).
+
+        Les événements encore en cours après le délai sont annulés sans XACK
+        et restent dans la PEL.
+        """
+        if not self._inflight:
+            return
+
+        logger.info(
+            "consumer_draining", in_flight=len(self._inflight), timeout_s=self.drain_timeout
+        )
+        done, pending = await asyncio.wait(set(self._inflight), timeout=self.drain_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        logger.info("consumer_drained", completed=len(done), abandoned=len(pending))
+
     async def process_email_event(self, event_id: str, payload: Dict[str, str]):
         """
         Process single email.received event
@@ -342,11 +536,17 @@ class EmailProcessorConsumer:
                     message_id=message_id,
                     existing_id=str(existing),
                 )
-                await self.redis.xack(STREAM_NAME, CONSUMER_GROUP, event_id)
+                await self._ack(event_id)
+                await self._release_handed_off_email(payload)
                 return
 
-            # Étape 1: Fetch email complet via adapter (D25: IMAP direct)
-            email_full = await self.fetch_email_with_retry(account_id, message_id, max_retries=6)
+            # Étape 1: Email complet depuis le handoff du fetcher, sinon fetch IMAP (D25)
+            raw_ref = payload.get("raw_ref")
+            email_full = await self.load_handed_off_email(account_id, message_id, raw_ref)
+            if email_full is None:
+                email_full = await self.fetch_email_with_retry(
+                    account_id, message_id, max_retries=6
+                )
 
             # Mode dégradé : si IMAP fetch échoue (UID supprimé/déplacé côté serveur),
             # utiliser les données anonymisées du Redis event pour classification.
@@ -372,7 +572,7 @@ class EmailProcessorConsumer:
                     await self.send_to_dlq(
                         event_id, payload, error="IMAP fetch failed after 6 retries"
                     )
-                    await self.redis.xack(STREAM_NAME, CONSUMER_GROUP, event_id)
+                    await self._ack(event_id)
                     return
 
             if not degraded_mode:
@@ -444,7 +644,8 @@ class EmailProcessorConsumer:
                 )
 
                 # Pas de notification pour blacklist
-                await self.redis.xack(STREAM_NAME, CONSUMER_GROUP, event_id)
+                await self._ack(event_id)
+                await self._release_handed_off_email(payload)
                 latency_ms = (datetime.utcnow() - start_time).total_seconds() * 1000
                 logger.info(
                     "email_processed_filtered",
@@ -500,11 +701,12 @@ class EmailProcessorConsumer:
             # Etape 4: Classification via Claude Sonnet 4.5 (A.5)
             # VIP, whitelist, et non-liste passent tous par le classifier
             try:
-                classification_result = await classify_email(
-                    email_id=message_id,
-                    email_text=f"{from_anon}\n{subject_anon}\n{body_anon}",
-                    db_pool=self.db_pool,
-                )
+                async with self._llm_semaphore:
+                    classification_result = await classify_email(
+                        email_id=message_id,
+                        email_text=f"{from_anon}\n{subject_anon}\n{body_anon}",
+                        db_pool=self.db_pool,
+                    )
                 category = classification_result.payload.get("category", "inconnu")
                 confidence = classification_result.confidence
                 logger.info(
@@ -634,15 +836,16 @@ class EmailProcessorConsumer:
                     from agents.src.agents.email.task_extractor import extract_tasks_from_email
 
                     # Extraire tâches via Claude Sonnet 4.5
-                    extraction_result = await extract_tasks_from_email(
-                        email_text=body_text_raw,
-                        email_metadata={
-                            "email_id": str(email_id),
-                            "sender": from_raw,
-                            "subject": subject_raw,
-                            "category": category,
-                        },
-                    )
+                    async with self._llm_semaphore:
+                        extraction_result = await extract_tasks_from_email(
+                            email_text=body_text_raw,
+                            email_metadata={
+                                "email_id": str(email_id),
+                                "sender": from_raw,
+                                "subject": subject_raw,
+                                "category": category,
+                            },
+                        )
 
                     # Filtrer par confidence >=0.7
                     valid_tasks = [
@@ -696,17 +899,18 @@ class EmailProcessorConsumer:
                     from agents.src.agents.calendar.event_detector import extract_events_from_email
 
                     # Extraire événements via Claude Sonnet 4.5
-                    event_detection_result = await extract_events_from_email(
-                        email_text=body_text_raw,
-                        email_id=str(email_id),
-                        metadata={
-                            "sender": from_raw,
-                            "subject": subject_raw,
-                            "category": category,
-                            "received_at": date_str,
-                        },
-                        current_date=None,  # Auto-detect current date
-                    )
+                    async with self._llm_semaphore:
+                        event_detection_result = await extract_events_from_email(
+                            email_text=body_text_raw,
+                            email_id=str(email_id),
+                            metadata={
+                                "sender": from_raw,
+                                "subject": subject_raw,
+                                "category": category,
+                                "received_at": date_str,
+                            },
+                            current_date=None,  # Auto-detect current date
+                        )
 
                     if event_detection_result.events_detected:
                         logger.info(
@@ -778,9 +982,10 @@ class EmailProcessorConsumer:
 
                     # Appel draft_email_reply (async, avec @friday_action)
                     # Notification Telegram envoyée automatiquement via middleware
-                    draft_result = await draft_email_reply(
-                        email_id=str(email_id), email_data=email_data, db_pool=self.db_pool
-                    )
+                    async with self._llm_semaphore:
+                        draft_result = await draft_email_reply(
+                            email_id=str(email_id), email_data=email_data, db_pool=self.db_pool
+                        )
 
                     logger.info(
                         "draft_reply_generated",
@@ -801,7 +1006,8 @@ class EmailProcessorConsumer:
                     # Continue quand même (draft optionnel, échec ne bloque pas pipeline)
 
             # XACK: Marquer comme traité
-            await self.redis.xack(STREAM_NAME, CONSUMER_GROUP, event_id)
+            await self._ack(event_id)
+            await self._release_handed_off_email(payload)
 
             # Log success avec latency
             latency_ms = (datetime.utcnow() - start_time).total_seconds() * 1000
@@ -816,6 +1022,39 @@ class EmailProcessorConsumer:
             logger.error("email_processing_error", event_id=event_id, error=str(e), exc_info=True)
             # Ne pas XACK → message reste dans PEL pour retry
 
+    async def load_handed_off_email(
+        self, account_id: str, message_id: str, raw_ref: Optional[str]
+    ) -> Optional[EmailMessage]:
+        """
+        Charger l'email depuis le handoff RFC822 du fetcher (sans fetch IMAP).
+
+        Returns:
+            EmailMessage, ou None si handoff désactivé, blob expiré/absent ou illisible
+            (le caller retombe alors sur fetch_email_with_retry)
+        """
+        if not raw_ref or self.raw_handoff is None:
+            return None
+
+        raw_bytes = await self.raw_handoff.load(raw_ref)
+        if raw_bytes is None:
+            logger.info("email_handoff_miss", message_id=message_id, raw_ref=raw_ref)
+            return None
+
+        try:
+            email_full = parse_email_message(account_id, message_id, raw_bytes)
+        except Exception as e:
+            logger.warning("email_handoff_parse_failed", message_id=message_id, error=str(e))
+            return None
+
+        logger.info("email_loaded_from_handoff", message_id=message_id, size=len(raw_bytes))
+        return email_full
+
+    async def _release_handed_off_email(self, payload: Dict[str, str]):
+        """Supprimer le blob handoff une fois l'événement acquitté"""
+        raw_ref = payload.get("raw_ref")
+        if raw_ref and self.raw_handoff is not None:
+            await self.raw_handoff.discard(raw_ref)
+
     async def fetch_email_with_retry(
         self, account_id: str, message_id: str, max_retries: int = 6
     ) -> Optional[Any]:
@@ -1438,6 +1677,14 @@ async def main():
     """Main entry point"""
     consumer = EmailProcessorConsumer()
 
+    # Arrêt gracieux : docker stop envoie SIGTERM → drain des événements en vol
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, consumer.request_stop)
+        except NotImplementedError:  # Windows
+            pass
+
     try:
         await consumer.connect()
         await consumer.start()
@@ -5,9 +5,12 @@ Daemon asyncio qui surveille 4 comptes IMAP en parallele :
 - IMAP IDLE pour Gmail + Zimbra (quasi-push, 2-5s latence)
 - Polling pour ProtonMail Bridge (IDLE instable sur Bridge)
 - IDLE renew toutes les 25 min (RFC 2177 timeout 29 min)
-- Deduplication UIDs via Redis SET (TTL 7 jours)
+- Deduplication UIDs via Redis SET (TTL 7 jours), SMISMEMBER en 1 round trip
+- Watermark UIDVALIDITY/dernier UID par compte : UID SEARCH UNSEEN limite aux UIDs > watermark
 - Anonymisation Presidio AVANT publication Redis Streams
 - Streaming attachments : BODYSTRUCTURE check, skip si >25 Mo
+- Handoff RFC822 optionnel (EMAIL_RAW_HANDOFF) : bytes bruts deposes chiffres,
+  le consumer ne re-fetch pas le message via IMAP
 
 Pipeline:
     IMAP IDLE/Poll -> nouveau mail detecte -> fetch headers+body
@@ -23,6 +26,7 @@ Version: 1.0.0
 import asyncio
 import email as email_lib
 import os
+import re
 import signal
 import ssl
 import sys
@@ -38,7 +42,9 @@ import structlog
 repo_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(repo_root))
 
-from agents.src.tools.anonymize import anonymize_text
+from agents.src.adapters.email_handoff import RawEmailHandoff, get_raw_email_handoff
+from agents.src.tools.anonymization_cache import anonymization_cache
+from agents.src.tools.anonymize import anonymize_many, close_http_client
 
 logger = structlog.get_logger(__name__)
 
@@ -61,6 +67,9 @@ IDLE_SILENCE_TIMEOUT = int(os.getenv("IMAP_IDLE_SILENCE_TIMEOUT", "1800"))  # 30
 # Deduplication TTL
 SEEN_UIDS_TTL_DAYS = int(os.getenv("IMAP_SEEN_UIDS_TTL_DAYS", "7"))
 
+# Taille max d'un sequence-set FETCH (fallback sans UID SEARCH)
+UID_FETCH_BATCH_SIZE = int(os.getenv("IMAP_UID_FETCH_BATCH_SIZE", "500"))
+
 # Attachment size limit (Mo)
 MAX_ATTACHMENT_SIZE_MB = int(os.getenv("MAX_ATTACHMENT_SIZE_MB", "25"))
 
@@ -120,6 +129,44 @@ def load_accounts_config() -> List[Dict[str, Any]]:
     return accounts
 
 
+# ============================================================================
+# Parsing reponses IMAP (UID)
+# ============================================================================
+
+
+def _line_to_str(item: Any) -> str:
+    if isinstance(item, (bytes, bytearray)):
+        return bytes(item).decode("utf-8", errors="replace")
+    return str(item)
+
+
+def parse_uidvalidity(lines: List[Any]) -> Optional[int]:
+    """Extrait UIDVALIDITY d'une reponse SELECT (ex: b'OK [UIDVALIDITY 42] UIDs valid')."""
+    for item in lines or []:
+        match = re.search(r"UIDVALIDITY\s+(\d+)", _line_to_str(item))
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def parse_search_uids(lines: List[Any]) -> List[int]:
+    """Extrait les UIDs d'une reponse (UID) SEARCH (ex: [b'12 15 18', b'SEARCH completed'])."""
+    uids: List[int] = []
+    for item in lines or []:
+        text = _line_to_str(item).strip()
+        if text and all(token.isdigit() for token in text.split()):
+            uids.extend(int(token) for token in text.split())
+    return uids
+
+
+def parse_fetch_uids(lines: List[Any]) -> List[int]:
+    """Extrait les UIDs d'une reponse FETCH seq-set (UID) (ex: b'3 FETCH (UID 120)')."""
+    uids: List[int] = []
+    for item in lines or []:
+        uids.extend(int(uid) for uid in re.findall(r"UID\s+(\d+)", _line_to_str(item)))
+    return uids
+
+
 # ============================================================================
 # IMAP Account Watcher
 # ============================================================================
@@ -135,6 +182,7 @@ class IMAPAccountWatcher:
     - Detection silence (force reconnexion si rien en 30 min)
     - Deduplication UIDs via Redis SET
     - Fetch nouveaux mails -> anonymise -> publie Redis Streams
+    - Handoff RFC822 au consumer (si active)
     - Reconnexion avec backoff exponentiel
     """
 
@@ -142,14 +190,20 @@ class IMAPAccountWatcher:
         self,
         account_config: Dict[str, Any],
         redis_client: redis.Redis,
+        raw_handoff: Optional[RawEmailHandoff] = None,
     ):
         self.config = account_config
         self.account_id = account_config["account_id"]
         self.redis = redis_client
+        self.raw_handoff = raw_handoff
         self._imap = None
         self._running = True
         self._last_activity = time.monotonic()
         self._seen_key = f"seen_uids:{self.account_id}"
+        self._state_key = f"imap_state:{self.account_id}"
+        self._uidvalidity: Optional[int] = None
+        self._last_uid = 0  # Watermark : tous les UIDs <= last_uid sont traites
+        self._state_synced = False
 
     async def run(self):
         """Boucle principale avec reconnexion automatique."""
@@ -228,7 +282,9 @@ class IMAPAccountWatcher:
         if response.result != "OK":
             raise Exception(f"IMAP login failed: {response.result}")
 
-        await self._imap.select("INBOX")
+        select_response = await self._imap.select("INBOX")
+        self._uidvalidity = parse_uidvalidity(getattr(select_response, "lines", None))
+        self._state_synced = False
 
         logger.info(
             "imap_connected",
@@ -304,61 +360,21 @@ class IMAPAccountWatcher:
         Cherche nouveaux mails non vus dans INBOX.
         Deduplique via Redis SET seen_uids:{account_id}.
 
-        Approche en 2 étapes (aioimaplib ne supporte pas UID SEARCH):
-        1. SEARCH UNSEEN → numéros de séquence (instables)
-        2. FETCH seq (UID) → UIDs stables pour dédup
+        Approche batchee :
+        1. UID SEARCH UNSEEN UID {last_uid+1}:* → UIDs stables en 1 round trip
+           (fallback : SEARCH UNSEEN + 1 seul FETCH seq-set (UID))
+        2. SMISMEMBER seen_uids → dedup en 1 round trip
+        3. Traitement par UID croissant, watermark avance tant que tout reussit
         """
-        import re
-
         try:
-            # Étape 1: SEARCH UNSEEN → numéros de séquence
-            status, data = await self._imap.search("UNSEEN")
-            if status != "OK":
-                logger.warning(
-                    "imap_search_failed",
-                    account_id=self.account_id,
-                    status=status,
-                )
-                return
+            await self._sync_uid_state()
 
-            seq_str = data[0] if data else b""
-            if isinstance(seq_str, (bytes, bytearray)):
-                seq_str = seq_str.decode("utf-8", errors="replace")
-
-            if not seq_str or not seq_str.strip():
+            uids = await self._search_unseen_uids()
+            if uids is None:
                 return
 
-            seq_nums = seq_str.strip().split()
-
-            # Étape 2: FETCH (UID) pour chaque séquence → UIDs stables
-            uids = []
-            for seq in seq_nums:
-                try:
-                    result = await self._imap.fetch(seq, "(UID)")
-                    if isinstance(result, tuple):
-                        fetch_status, fetch_data = result
-                    else:
-                        result.result
-                        fetch_data = result.lines
-
-                    for item in fetch_data:
-                        item_str = (
-                            item.decode("utf-8", errors="replace")
-                            if isinstance(item, (bytes, bytearray))
-                            else str(item)
-                        )
-                        match = re.search(r"UID\s+(\d+)", item_str)
-                        if match:
-                            uids.append(match.group(1))
-                            break
-                except Exception as e:
-                    logger.warning(
-                        "uid_fetch_failed",
-                        account_id=self.account_id,
-                        seq=seq,
-                        error=str(e),
-                    )
-
+            # UID SEARCH n:* renvoie toujours le plus grand UID meme s'il est < n
+            uids = sorted(uid for uid in set(uids) if uid > self._last_uid)
             if not uids:
                 return
 
@@ -366,12 +382,20 @@ class IMAPAccountWatcher:
                 "unseen_emails_found",
                 account_id=self.account_id,
                 count=len(uids),
+                last_uid=self._last_uid,
             )
 
-            for uid in uids:
-                # Deduplication (faille #2)
-                already_seen = await self.redis.sismember(self._seen_key, uid)
+            # Deduplication (faille #2) : 1 seul round trip Redis
+            uid_strs = [str(uid) for uid in uids]
+            seen_flags = await self.redis.smismember(self._seen_key, uid_strs)
+
+            watermark = self._last_uid
+            blocked = False  # Un echec bloque le watermark (retry au prochain passage)
+
+            for uid, already_seen in zip(uid_strs, seen_flags):
                 if already_seen:
+                    if not blocked:
+                        watermark = int(uid)
                     continue
 
                 try:
@@ -383,8 +407,11 @@ class IMAPAccountWatcher:
                         self._seen_key,
                         SEEN_UIDS_TTL_DAYS * 86400,
                     )
+                    if not blocked:
+                        watermark = int(uid)
 
                 except Exception as e:
+                    blocked = True
                     logger.error(
                         "email_processing_failed",
                         account_id=self.account_id,
@@ -393,6 +420,9 @@ class IMAPAccountWatcher:
                     )
                     # NE PAS marquer comme vu en erreur - retry au prochain passage
 
+            if watermark > self._last_uid:
+                await self._save_uid_state(watermark)
+
         except Exception as e:
             logger.error(
                 "fetch_new_emails_failed",
@@ -400,6 +430,95 @@ class IMAPAccountWatcher:
                 error=str(e),
             )
 
+    async def _sync_uid_state(self):
+        """
+        Charge le watermark Redis imap_state:{account_id} (une fois par connexion).
+
+        Si UIDVALIDITY a change (mailbox recreee/renumerotee), les UIDs connus
+        ne designent plus les memes messages : watermark et seen_uids sont remis a zero.
+        """
+        if self._state_synced:
+            return
+
+        state = await self.redis.hgetall(self._state_key) or {}
+        stored_validity = state.get("uidvalidity")
+        stored_last_uid = int(state.get("last_uid", 0) or 0)
+
+        if (
+            self._uidvalidity is not None
+            and stored_validity is not None
+            and int(stored_validity) != self._uidvalidity
+        ):
+            logger.warning(
+                "imap_uidvalidity_changed",
+                account_id=self.account_id,
+                old_uidvalidity=stored_validity,
+                new_uidvalidity=self._uidvalidity,
+            )
+            await self.redis.delete(self._seen_key)
+            stored_last_uid = 0
+            await self._save_uid_state(0)
+
+        self._last_uid = stored_last_uid
+        self._state_synced = True
+
+    async def _save_uid_state(self, last_uid: int):
+        """Persiste UIDVALIDITY + watermark dans Redis."""
+        self._last_uid = last_uid
+        mapping = {"last_uid": str(last_uid)}
+        if self._uidvalidity is not None:
+            mapping["uidvalidity"] = str(self._uidvalidity)
+        await self.redis.hset(self._state_key, mapping=mapping)
+
+    async def _search_unseen_uids(self) -> Optional[List[int]]:
+        """
+        UIDs des messages UNSEEN au-dela du watermark.
+
+        Returns:
+            Liste d'UIDs, ou None si la recherche a echoue
+        """
+        try:
+            status, data = await self._imap.uid_search("UNSEEN", "UID", f"{self._last_uid + 1}:*")
+            if status == "OK":
+                return parse_search_uids(data)
+            logger.warning(
+                "imap_uid_search_failed",
+                account_id=self.account_id,
+                status=status,
+            )
+        except Exception as e:
+            logger.warning(
+                "imap_uid_search_failed",
+                account_id=self.account_id,
+                error=str(e),
+            )
+
+        # Fallback : SEARCH UNSEEN (sequences) + FETCH seq-set (UID) batche
+        status, data = await self._imap.search("UNSEEN")
+        if status != "OK":
+            logger.warning(
+                "imap_search_failed",
+                account_id=self.account_id,
+                status=status,
+            )
+            return None
+
+        seq_nums = [str(seq) for seq in parse_search_uids(data)]
+        uids: List[int] = []
+        for i in range(0, len(seq_nums), UID_FETCH_BATCH_SIZE):
+            seq_set = ",".join(seq_nums[i : i + UID_FETCH_BATCH_SIZE])
+            try:
+                fetch_status, fetch_data = await self._imap.fetch(seq_set, "(UID)")
+                uids.extend(parse_fetch_uids(fetch_data))
+            except Exception as e:
+                logger.warning(
+                    "uid_fetch_failed",
+                    account_id=self.account_id,
+                    seq_count=len(seq_nums[i : i + UID_FETCH_BATCH_SIZE]),
+                    error=str(e),
+                )
+        return uids
+
     async def _process_email(self, uid: str):
         """
         Fetch un email complet (headers + body), anonymise, publie dans Redis Streams.
@@ -503,16 +622,31 @@ class IMAPAccountWatcher:
             # Skip cet email - ne pas bloquer toute la queue
             return
 
+        # Handoff RFC822 : deposer les bytes deja telecharges pour le consumer
+        raw_ref = None
+        if self.raw_handoff is not None:
+            try:
+                raw_ref = await self.raw_handoff.store(self.account_id, uid, raw_email)
+            except Exception as e:
+                # Non bloquant : le consumer retombera sur le fetch IMAP
+                logger.warning(
+                    "email_handoff_store_failed",
+                    account_id=self.account_id,
+                    uid=uid,
+                    error=str(e),
+                )
+
         # Tronquer body pour le stream (max 2000 chars)
         body_preview = body_text[:2000] if body_text else ""
 
         # Anonymiser via Presidio (RGPD obligatoire avant envoi cloud)
         try:
-            from_anon = (await anonymize_text(from_header)).anonymized_text
-            subject_anon = (await anonymize_text(subject)).anonymized_text
-            body_preview_anon = (
-                (await anonymize_text(body_preview)).anonymized_text if body_preview else ""
+            from_result, subject_result, body_result = await anonymize_many(
+                [from_header, subject, body_preview], context=f"{self.account_id}:{uid}"
             )
+            from_anon = from_result.anonymized_text
+            subject_anon = subject_result.anonymized_text
+            body_preview_anon = body_result.anonymized_text
         except Exception as e:
             logger.error(
                 "presidio_anonymization_failed",
@@ -535,6 +669,8 @@ class IMAPAccountWatcher:
             "has_attachments": str(has_attachments),
             "body_preview_anon": body_preview_anon,
         }
+        if raw_ref:
+            event["raw_ref"] = raw_ref
 
         try:
             event_id = await self.redis.xadd(STREAM_NAME, event)
@@ -615,6 +751,7 @@ class IMAPFetcherDaemon:
         self._tasks: List[asyncio.Task] = []
         self._running = True
         self._redis: Optional[redis.Redis] = None
+        self._raw_handoff: Optional[RawEmailHandoff] = None
 
     async def start(self):
         """Demarre le daemon."""
@@ -633,11 +770,20 @@ class IMAPFetcherDaemon:
 
         logger.info("accounts_loaded", count=len(accounts))
 
+        # Handoff RFC822 vers le consumer (EMAIL_RAW_HANDOFF, off par defaut)
+        self._raw_handoff = get_raw_email_handoff(redis_client=self._redis)
+        if self._raw_handoff:
+            logger.info("email_handoff_enabled", backend=self._raw_handoff.backend)
+
+        # Cache anonymisation partage avec le consumer (sujets/signatures repetes)
+        anonymization_cache.attach_redis(self._redis)
+
         # Lancer un watcher par compte
         for account_config in accounts:
             watcher = IMAPAccountWatcher(
                 account_config=account_config,
                 redis_client=self._redis,
+                raw_handoff=self._raw_handoff,
             )
             self._watchers.append(watcher)
             task = asyncio.create_task(
@@ -678,6 +824,8 @@ class IMAPFetcherDaemon:
         for task in self._tasks:
             task.cancel()
 
+        await close_http_client()
+
         if self._redis:
             await self._redis.close()
 
@@ -698,6 +846,12 @@ class IMAPFetcherDaemon:
                     )
             except Exception:
                 pass
+            # Purge des blobs spool expires (Redis gere le TTL nativement)
+            try:
+                if self._raw_handoff:
+                    await self._raw_handoff.purge_expired()
+            except Exception:
+                pass
             await asyncio.sleep(HEALTHCHECK_INTERVAL)
 
 
@@ -12,6 +12,7 @@ from typing import AsyncGenerator
 
 import asyncpg
 import structlog
+from agents.src.tools.query_embedding_cache import query_embedding_cache
 from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -62,6 +63,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
             )
             await redis_client.ping()
             logger.info("redis_connected")
+            query_embedding_cache.attach_redis(redis_client)
         except Exception as exc:
             logger.error("redis_connection_failed", error=str(exc))
             redis_client = None
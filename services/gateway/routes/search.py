@@ -16,6 +16,7 @@ Date: 2026-02-11
 Story: 6.2 - Task 4
 """
 
+import time
 from typing import Optional
 
 import structlog
@@ -24,7 +25,9 @@ from agents.src.adapters.vectorstore import (
     VectorStoreError,
     get_vectorstore_adapter,
 )
-from agents.src.tools.anonymize import AnonymizationError
+from agents.src.tools.anonymize import AnonymizationError, anonymize_text
+from agents.src.tools.query_embedding_cache import query_embedding_cache
+from agents.src.tools.search_metrics import search_metrics
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field, ValidationError
 
@@ -65,7 +68,7 @@ async def semantic_search(request: SemanticSearchRequest):
     """
     Recherche sémantique dans knowledge graph via embeddings.
 
-    1. Query → embedding Voyage AI (anonymisé)
+    1. Query anonymisée → embedding (cache query_embedding_cache, sinon Voyage AI)
     2. Recherche pgvector cosine similarity
     3. Retourne top_k résultats triés par similarité
 
@@ -92,14 +95,24 @@ async def semantic_search(request: SemanticSearchRequest):
             "count": 5
         }
     """
+    start_time = time.time()
     try:
         # 1. Obtenir adaptateur vectorstore
         vectorstore = await get_vectorstore_adapter()
 
-        # 2. Générer embedding query (anonymisation automatique)
+        # 2. Embedding query : anonymisation puis cache, Voyage AI seulement si miss
         # Note: query courte, pas besoin de chunking
-        embedding_response = await vectorstore.embed([request.query], anonymize=True)
-        query_embedding = embedding_response.embeddings[0]
+        anonymized_query = (await anonymize_text(request.query)).anonymized_text
+        query_embedding = await query_embedding_cache.get(
+            anonymized_query, vectorstore.model, vectorstore.dimensions
+        )
+        embedding_cache_hit = query_embedding is not None
+        if not embedding_cache_hit:
+            embedding_response = await vectorstore.embed([anonymized_query], anonymize=False)
+            query_embedding = embedding_response.embeddings[0]
+            await query_embedding_cache.set(
+                anonymized_query, vectorstore.model, vectorstore.dimensions, query_embedding
+            )
 
         # 3. Recherche dans pgvector
         results = await vectorstore.search(
@@ -119,6 +132,13 @@ async def semantic_search(request: SemanticSearchRequest):
             for r in results
         ]
 
+        search_metrics.record_query(
+            query_duration_ms=(time.time() - start_time) * 1000,
+            results_count=len(formatted_results),
+            top_score=formatted_results[0].similarity if formatted_results else 0.0,
+            embedding_cache_hit=embedding_cache_hit,
+        )
+
         return SemanticSearchResponse(
             query=request.query,
             results=formatted_results,
@@ -105,9 +105,15 @@ async def test_email_to_search_e2e_pipeline(db_pool: asyncpg.Pool, clean_test_da
             )
         return email_node_id
 
-    mock_memorystore.create_node = create_node_real
-    mock_memorystore.get_or_create_node = AsyncMock(return_value="person_node_test_001")
-    mock_memorystore.create_edge = AsyncMock()
+    async def upsert_subgraph_real(nodes, edges):
+        """Seul l'Email node est écrit (Persons + edges hors scope du test)"""
+        email = nodes[0]
+        node_id = await create_node_real(
+            email["type"], email["name"], email["metadata"], email["source"]
+        )
+        return {"nodes": {"email": node_id, "sender": "person_node_test_001"}, "edges": []}
+
+    mock_memorystore.upsert_subgraph = upsert_subgraph_real
 
     # Mock Voyage AI + Presidio
     with patch(
@@ -245,9 +251,15 @@ async def test_multi_email_semantic_search_e2e(db_pool: asyncpg.Pool, clean_test
         email_nodes_created.append(node_id)
         return node_id
 
-    mock_memorystore.create_node = create_node_multi
-    mock_memorystore.get_or_create_node = AsyncMock(return_value="person_node_multi")
-    mock_memorystore.create_edge = AsyncMock()
+    async def upsert_subgraph_multi(nodes, edges):
+        """Seul l'Email node est écrit (Persons + edges hors scope du test)"""
+        email = nodes[0]
+        node_id = await create_node_multi(
+            email["type"], email["name"], email["metadata"], email["source"]
+        )
+        return {"nodes": {"email": node_id, "sender": "person_node_multi"}, "edges": []}
+
+    mock_memorystore.upsert_subgraph = upsert_subgraph_multi
 
     # Mock Voyage AI
     with patch(
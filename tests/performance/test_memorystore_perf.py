@@ -252,6 +252,80 @@ class TestQueryPerformance:
         assert len(path) == 1
         assert elapsed < 0.5, f"Pathfinding took {elapsed*1000:.2f}ms (expected <500ms)"
 
+    @pytest.mark.asyncio
+    async def test_query_path_multi_hop_on_100k_node_graph(self, memorystore_perf, perf_db_pool):
+        """
+        query_path() depth 3 (WITH RECURSIVE) sur graphe 100k nodes / 300k edges.
+
+        Acceptance: <500ms unidirectionnel et bidirectionnel, get_node_with_relations(depth=2)
+        <500ms
+        """
+        import uuid
+
+        async with perf_db_pool.acquire() as conn:
+            await conn.execute("TRUNCATE knowledge.nodes, knowledge.edges CASCADE")
+
+            node_ids = [uuid.uuid4() for _ in range(100_000)]
+            await conn.copy_records_to_table(
+                "nodes",
+                schema_name="knowledge",
+                columns=["id", "type", "name"],
+                records=[(node_id, "person", f"Person {i}") for i, node_id in enumerate(node_ids)],
+            )
+
+            # Graphe de contacts dense : 3 relations sortantes aléatoires par nœud
+            rng = random.Random(42)
+            edges = set()
+            for i, node_id in enumerate(node_ids):
+                for j in rng.sample(range(len(node_ids)), 4):
+                    if j != i and len(edges) < (i + 1) * 3:
+                        edges.add((node_id, node_ids[j]))
+            await conn.copy_records_to_table(
+                "edges",
+                schema_name="knowledge",
+                columns=["from_node_id", "to_node_id", "relation_type"],
+                records=[(a, b, "related_to") for a, b in edges],
+            )
+            await conn.execute("ANALYZE knowledge.nodes")
+            await conn.execute("ANALYZE knowledge.edges")
+
+            # Cible garantie à 3 sauts : source → hop1 → hop2 → cible
+            source = node_ids[0]
+            hop1 = await conn.fetchval(
+                "SELECT to_node_id FROM knowledge.edges WHERE from_node_id = $1 LIMIT 1", source
+            )
+            hop2 = await conn.fetchval(
+                "SELECT to_node_id FROM knowledge.edges WHERE from_node_id = $1 LIMIT 1", hop1
+            )
+            target = await conn.fetchval(
+                "SELECT to_node_id FROM knowledge.edges WHERE from_node_id = $1 LIMIT 1", hop2
+            )
+
+        for bidirectional in (False, True):
+            start = time.time()
+            path = await memorystore_perf.query_path(
+                str(source), str(target), max_depth=3, bidirectional=bidirectional
+            )
+            elapsed = time.time() - start
+
+            print(
+                f"\n📊 query_path() 100k nodes (bidirectional={bidirectional}): {elapsed*1000:.2f}ms"
+            )
+
+            assert 1 <= len(path) <= 3
+            assert path[0]["from_node_id"] == str(source)
+            assert path[-1]["to_node_id"] == str(target)
+            assert elapsed < 0.5, f"Pathfinding took {elapsed*1000:.2f}ms (expected <500ms)"
+
+        start = time.time()
+        result = await memorystore_perf.get_node_with_relations(str(source), depth=2)
+        elapsed = time.time() - start
+
+        print(f"\n📊 get_node_with_relations(depth=2) 100k nodes: {elapsed*1000:.2f}ms")
+
+        assert result["edges_out"]
+        assert elapsed < 0.5, f"Relations depth=2 took {elapsed*1000:.2f}ms (expected <500ms)"
+
 
 @pytest.mark.performance
 @pytest.mark.skipif(True, reason="Performance tests skip by default")
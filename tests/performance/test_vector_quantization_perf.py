@@ -0,0 +1,164 @@
+"""Tests de performance des tiers d'index vectoriel (ann_search.py).
+
+Test Strategy:
+- Corpus synthétique 10k vecteurs 1024 dims (clusters gaussiens normalisés)
+- Pour chaque tier (full, halfvec, binary) : index HNSW seul, puis
+  recherche nearest_sql() (re-classement pleine précision)
+- Vérité terrain : scan exact (enable_indexscan = off)
+- SKIP en CI (trop lents), run manuel en local
+
+Acceptance Criteria:
+- halfvec : index >= 1.8x plus petit, recall@10 à moins de 1 % du tier full
+- binary : index >= 10x plus petit, recall@10 à moins de 1 % du tier full
+  (PGVECTOR_RERANK_FACTOR_BINARY ajustable si le corpus réel l'exige)
+"""
+
+import random
+import statistics
+import time
+from pathlib import Path
+from uuid import uuid4
+
+import asyncpg
+import pytest
+from agents.src.adapters.ann_search import hnsw_index_ddls, nearest_sql
+
+TEST_DB_CONFIG = {
+    "user": "postgres",
+    "password": "postgres",
+    "host": "localhost",
+    "port": 5432,
+}
+
+CORPUS_SIZE = 10_000
+DIMENSIONS = 1024
+CLUSTERS = 50
+QUERIES = 50
+TOP_K = 10
+
+COLUMNS = "e.source_id"
+FROM_SQL = "FROM knowledge.embeddings e"
+
+
+def _normalize(vector: list[float]) -> list[float]:
+    norm = sum(v * v for v in vector) ** 0.5
+    return [v / norm for v in vector]
+
+
+def _vector_str(vector: list[float]) -> str:
+    return "[" + ",".join(f"{v:.6f}" for v in vector) + "]"
+
+
+def _corpus(rng: random.Random) -> tuple[list[list[float]], list[list[float]]]:
+    """Clusters gaussiens (plus proche d'embeddings réels qu'un bruit uniforme)."""
+    centers = [[rng.gauss(0, 1) for _ in range(DIMENSIONS)] for _ in range(CLUSTERS)]
+
+    def around(center):
+        return _normalize([c + rng.gauss(0, 0.6) for c in center])
+
+    corpus = [around(rng.choice(centers)) for _ in range(CORPUS_SIZE)]
+    queries = [around(rng.choice(centers)) for _ in range(QUERIES)]
+    return corpus, queries
+
+
+@pytest.fixture(scope="module")
+async def quant_db_pool():
+    """Base de test avec knowledge.embeddings peuplée (sans index HNSW)."""
+    conn = await asyncpg.connect(database="postgres", **TEST_DB_CONFIG)
+    test_db_name = "friday_test_perf_quantization"
+    await conn.execute(f"DROP DATABASE IF EXISTS {test_db_name}")
+    await conn.execute(f"CREATE DATABASE {test_db_name}")
+    await conn.close()
+
+    pool = await asyncpg.create_pool(database=test_db_name, **TEST_DB_CONFIG)
+    migrations_dir = Path(__file__).parent.parent.parent / "database" / "migrations"
+
+    async with pool.acquire() as conn:
+        await conn.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"')
+        await conn.execute("CREATE SCHEMA IF NOT EXISTS knowledge")
+        await conn.execute((migrations_dir / "008_knowledge_embeddings.sql").read_text())
+        await conn.execute("DROP INDEX IF EXISTS knowledge.idx_embeddings_vector")
+
+        corpus, queries = _corpus(random.Random(42))
+        await conn.executemany(
+            """
+            INSERT INTO knowledge.embeddings (source_type, source_id, embedding)
+            VALUES ('document', $1, $2::vector)
+            """,
+            [(uuid4(), _vector_str(v)) for v in corpus],
+        )
+        await conn.execute("ANALYZE knowledge.embeddings")
+
+    pool.queries = [_vector_str(q) for q in queries]
+    yield pool
+
+    await pool.close()
+    conn = await asyncpg.connect(database="postgres", **TEST_DB_CONFIG)
+    await conn.execute(f"DROP DATABASE IF EXISTS {test_db_name}")
+    await conn.close()
+
+
+async def _benchmark_mode(pool, mode: str, truth: list[set]) -> dict:
+    """Construit l'index du tier, mesure taille, latence et recall@10."""
+    ddls = hnsw_index_ddls(mode)
+    index_name = next(iter(ddls))
+
+    async with pool.acquire() as conn:
+        build_start = time.time()
+        await conn.execute(ddls[index_name])
+        build_s = time.time() - build_start
+        size = await conn.fetchval(f"SELECT pg_relation_size('knowledge.{index_name}')")
+
+        await conn.execute("SET hnsw.ef_search = 100")
+        sql = nearest_sql(COLUMNS, FROM_SQL, mode=mode)
+        latencies, recalls = [], []
+        for query, expected in zip(pool.queries, truth):
+            start = time.perf_counter()
+            rows = await conn.fetch(sql, query, TOP_K)
+            latencies.append((time.perf_counter() - start) * 1000)
+            recalls.append(len({r["source_id"] for r in rows} & expected) / TOP_K)
+
+        await conn.execute(f"DROP INDEX knowledge.{index_name}")
+
+    return {
+        "mode": mode,
+        "index_bytes": size,
+        "build_s": round(build_s, 2),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "recall_at_10": round(statistics.mean(recalls), 4),
+    }
+
+
+@pytest.mark.performance
+@pytest.mark.skipif(
+    True,  # Skip par défaut (trop lent pour CI)
+    reason="Performance tests skip by default - run manually with: pytest -m performance tests/performance/",
+)
+class TestVectorQuantizationPerformance:
+    """Tiers full / halfvec / binary : taille index, latence, recall@10."""
+
+    @pytest.mark.asyncio
+    async def test_quantized_tiers_shrink_index_and_keep_recall(self, quant_db_pool):
+        async with quant_db_pool.acquire() as conn:
+            await conn.execute("SET enable_indexscan = off")
+            exact_sql = nearest_sql(COLUMNS, FROM_SQL, exact=True)
+            truth = [
+                {r["source_id"] for r in await conn.fetch(exact_sql, q, TOP_K)}
+                for q in quant_db_pool.queries
+            ]
+
+        full = await _benchmark_mode(quant_db_pool, "full", truth)
+        halfvec = await _benchmark_mode(quant_db_pool, "halfvec", truth)
+        binary = await _benchmark_mode(quant_db_pool, "binary", truth)
+
+        for result in (full, halfvec, binary):
+            print(
+                f"\n📊 {result['mode']:8s} index={result['index_bytes'] / 1e6:.1f}MB "
+                f"build={result['build_s']}s p50={result['p50_ms']}ms "
+                f"recall@10={result['recall_at_10']:.3f}"
+            )
+
+        assert full["index_bytes"] / halfvec["index_bytes"] >= 1.8
+        assert full["index_bytes"] / binary["index_bytes"] >= 10
+        assert halfvec["recall_at_10"] >= full["recall_at_10"] - 0.01
+        assert binary["recall_at_10"] >= full["recall_at_10"] - 0.01
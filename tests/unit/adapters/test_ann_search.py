@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Friday 2.0 - Tests Unitaires recherche ANN filtrée
+
+Tests unitaires pour adapters/ann_search.py.
+
+Coverage:
+    - Sans filtre : ef_search >= top_k, pas de COUNT
+    - Petit ensemble filtré : scan exact (enable_indexscan off puis RESET)
+    - Gros ensemble filtré : HNSW itératif, repli exact si < top_k résultats
+    - Prédicat source_type littéral uniquement pour les index partiels
+    - Tiers halfvec/binary : candidats quantifiés re-classés en pleine précision
+"""
+
+import pytest
+from agents.src.adapters.ann_search import (
+    ANN_EXACT_SCAN_MAX_ROWS,
+    HNSW_EF_SEARCH,
+    RERANK_FACTORS,
+    bounded_count_sql,
+    candidate_limit,
+    fetch_nearest,
+    hnsw_index_ddls,
+    nearest_sql,
+    source_type_predicate,
+)
+
+COLUMNS = "e.id"
+FROM_WHERE = "FROM knowledge.embeddings e WHERE x"
+COUNT_SQL = bounded_count_sql(FROM_WHERE)
+
+
+class FakeConn:
+    """Connexion asyncpg minimale : enregistre execute/fetch, rows par appel"""
+
+    def __init__(self, candidates: int = 0, results=None):
+        self.executed = []
+        self.fetches = 0
+        self.candidates = candidates
+        self.results = list(results or [[]])
+
+    async def execute(self, query, *args):
+        self.executed.append(query)
+        return "SET"
+
+    async def fetchval(self, query, *args):
+        return self.candidates
+
+    async def fetch(self, query, *args):
+        self.fetches += 1
+        return self.results[min(self.fetches, len(self.results)) - 1]
+
+
+@pytest.mark.asyncio
+async def test_unfiltered_raises_ef_search_to_top_k():
+    conn = FakeConn(results=[[{"id": 1}]])
+
+    rows = await fetch_nearest(conn, COLUMNS, FROM_WHERE, [[0.1], 100], top_k=100)
+
+    assert rows == [{"id": 1}]
+    assert conn.executed == [f"SET hnsw.ef_search = {max(HNSW_EF_SEARCH, 100)}"]
+
+
+@pytest.mark.asyncio
+async def test_small_filtered_set_uses_exact_scan():
+    conn = FakeConn(candidates=ANN_EXACT_SCAN_MAX_ROWS, results=[[{"id": 1}]])
+
+    rows = await fetch_nearest(conn, COLUMNS, FROM_WHERE, [[0.1], 5], 5, COUNT_SQL, ["finance"])
+
+    assert rows == [{"id": 1}]
+    assert conn.fetches == 1
+    assert conn.executed == ["SET enable_indexscan = off", "RESET enable_indexscan"]
+
+
+@pytest.mark.asyncio
+async def test_large_filtered_set_uses_iterative_scan():
+    results = [[{"id": i} for i in range(5)]]
+    conn = FakeConn(candidates=ANN_EXACT_SCAN_MAX_ROWS + 1, results=results)
+
+    rows = await fetch_nearest(conn, COLUMNS, FROM_WHERE, [[0.1], 5], 5, COUNT_SQL, ["finance"])
+
+    assert len(rows) == 5
+    assert conn.fetches == 1
+    assert "SET hnsw.iterative_scan = strict_order" in conn.executed[0]
+    assert "SET hnsw.max_scan_tuples" in conn.executed[0]
+
+
+@pytest.mark.asyncio
+async def test_iterative_scan_short_falls_back_to_exact():
+    """max_scan_tuples atteint avant k résultats → scan exact"""
+    results = [[{"id": 0}], [{"id": i} for i in range(5)]]
+    conn = FakeConn(candidates=ANN_EXACT_SCAN_MAX_ROWS + 1, results=results)
+
+    rows = await fetch_nearest(conn, COLUMNS, FROM_WHERE, [[0.1], 5], 5, COUNT_SQL, ["finance"])
+
+    assert len(rows) == 5
+    assert conn.fetches == 2
+    assert conn.executed[-2:] == ["SET enable_indexscan = off", "RESET enable_indexscan"]
+
+
+def test_bounded_count_sql_limit():
+    assert f"LIMIT {ANN_EXACT_SCAN_MAX_ROWS + 1}) c" in COUNT_SQL
+
+
+def test_source_type_predicate_whitelist():
+    assert source_type_predicate("document") == "e.source_type = 'document'"
+    assert source_type_predicate("email", column="source_type") == "source_type = 'email'"
+    assert source_type_predicate("x'; DROP TABLE y; --") is None
+
+
+def test_full_mode_orders_by_full_precision():
+    sql = nearest_sql(COLUMNS, FROM_WHERE, mode="full")
+    assert "ORDER BY e.embedding <=> $1" in sql
+    assert "halfvec" not in sql
+
+
+def test_halfvec_mode_reranks_candidates():
+    """Candidats via l'index halfvec, tri final sur la distance float32"""
+    sql = " ".join(nearest_sql(COLUMNS, FROM_WHERE, mode="halfvec").split())
+    assert "ORDER BY e.embedding::halfvec(1024) <=> $1::vector::halfvec(1024)" in sql
+    assert f"LIMIT LEAST($2 * {RERANK_FACTORS['halfvec']}, 1000)" in sql
+    assert sql.endswith("ORDER BY full_distance LIMIT $2")
+
+
+def test_binary_mode_uses_hamming_distance():
+    sql = nearest_sql(COLUMNS, FROM_WHERE, mode="binary")
+    assert "binary_quantize(e.embedding)::bit(1024) <~> binary_quantize($1::vector)" in sql
+    assert "e.embedding <=> $1 AS full_distance" in sql
+
+
+def test_exact_scan_ignores_quantized_index():
+    sql = nearest_sql(COLUMNS, FROM_WHERE, mode="binary", exact=True)
+    assert "binary_quantize" not in sql
+    assert "ORDER BY e.embedding <=> $1" in sql
+
+
+def test_candidate_limit_capped_by_ef_search_max():
+    assert candidate_limit(10, mode="full") == 10
+    assert candidate_limit(10, mode="binary") == 10 * RERANK_FACTORS["binary"]
+    assert candidate_limit(100, mode="binary") <= 1000
+
+
+def test_hnsw_index_ddls_per_mode():
+    """Noms et expressions alignés sur les migrations 008/048/049"""
+    assert list(hnsw_index_ddls("full")) == [
+        "idx_embeddings_vector",
+        "idx_embeddings_vector_document",
+        "idx_embeddings_vector_email",
+    ]
+    halfvec = hnsw_index_ddls("halfvec")
+    halfvec_ddl = halfvec["idx_embeddings_vector_halfvec"]
+    assert "(embedding::halfvec(1024)) halfvec_cosine_ops" in halfvec_ddl
+    binary = hnsw_index_ddls("binary")
+    assert "bit_hamming_ops" in binary["idx_embeddings_vector_binary_email"]
+    assert "WHERE source_type = 'email'" in binary["idx_embeddings_vector_binary_email"]
@@ -0,0 +1,130 @@
+"""
+Friday 2.0 - Tests Unitaires handoff RFC822 fetcher -> consumer
+
+Tests unitaires pour adapters/email_handoff.py + chargement cote consumer.
+
+Coverage:
+    - Roundtrip chiffre Redis / spool
+    - Aucun clair stocke (Redis, disque)
+    - Blob lie a son raw_ref (donnee associee AEAD)
+    - Emails trop gros / TTL spool / factory desactivee sans cle
+    - Consumer : handoff utilise, fallback IMAP si blob absent
+"""
+
+import os
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from agents.src.adapters.email_handoff import RawEmailHandoff, get_raw_email_handoff
+
+RAW_EMAIL = (
+    b"From: Jean Dupont <jean.dupont@example.com>\r\n"
+    b"To: me@example.com\r\n"
+    b"Subject: Facture 2026-0042\r\n"
+    b"\r\n"
+    b"Bonjour, voici la facture.\r\n"
+)
+
+
+class FakeRedis:
+    """Redis minimal (decode_responses=True) pour GET/SET/DELETE"""
+
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+        self.ttls[key] = ex
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def delete(self, key):
+        self.store.pop(key, None)
+
+
+@pytest.mark.asyncio
+async def test_redis_roundtrip_encrypted_with_ttl():
+    """store → load restitue les bytes, Redis ne contient que du chiffre"""
+    redis_client = FakeRedis()
+    handoff = RawEmailHandoff(key="secret", redis_client=redis_client, ttl_seconds=600)
+
+    ref = await handoff.store("account_gmail1", "4242", RAW_EMAIL)
+
+    assert ref == "account_gmail1:4242"
+    stored = redis_client.store["email_raw:account_gmail1:4242"]
+    assert "jean.dupont" not in stored
+    assert b"jean.dupont" not in stored.encode()
+    assert redis_client.ttls["email_raw:account_gmail1:4242"] == 600
+    assert await handoff.load(ref) == RAW_EMAIL
+
+    await handoff.discard(ref)
+    assert await handoff.load(ref) is None
+
+
+@pytest.mark.asyncio
+async def test_blob_bound_to_ref_and_key():
+    """Blob copie sous un autre ref ou mauvaise cle → illisible (None)"""
+    redis_client = FakeRedis()
+    handoff = RawEmailHandoff(key="secret", redis_client=redis_client)
+    ref = await handoff.store("account_gmail1", "1", RAW_EMAIL)
+
+    redis_client.store["email_raw:account_gmail1:2"] = redis_client.store[f"email_raw:{ref}"]
+    assert await handoff.load("account_gmail1:2") is None
+
+    other = RawEmailHandoff(key="autre-secret", redis_client=redis_client)
+    assert await other.load(ref) is None
+
+
+@pytest.mark.asyncio
+async def test_store_skips_oversized_email():
+    """Email > max_bytes → pas de blob, le consumer fera un fetch IMAP"""
+    redis_client = FakeRedis()
+    handoff = RawEmailHandoff(key="secret", redis_client=redis_client, max_bytes=10)
+
+    assert await handoff.store("account_gmail1", "1", RAW_EMAIL) is None
+    assert redis_client.store == {}
+
+
+@pytest.mark.asyncio
+async def test_spool_roundtrip_and_expiry(tmp_path):
+    """Backend spool : fichier chiffre, expire apres TTL"""
+    handoff = RawEmailHandoff(key="secret", backend="spool", spool_dir=str(tmp_path))
+
+    ref = await handoff.store("account_gmail1", "7", RAW_EMAIL)
+    files = list(tmp_path.glob("*.eml.enc"))
+    assert len(files) == 1
+    assert b"jean.dupont" not in files[0].read_bytes()
+    assert await handoff.load(ref) == RAW_EMAIL
+
+    old = time.time() - handoff.ttl_seconds - 10
+    os.utime(files[0], (old, old))
+    assert await handoff.purge_expired() == 1
+    assert await handoff.load(ref) is None
+
+
+def test_factory_disabled_without_key():
+    """Mode actif mais EMAIL_HANDOFF_KEY absente → handoff desactive (pas de clair)"""
+    with patch.dict(os.environ, {"EMAIL_HANDOFF_KEY": ""}):
+        assert get_raw_email_handoff(redis_client=FakeRedis(), mode="redis") is None
+    assert get_raw_email_handoff(redis_client=FakeRedis(), mode="off") is None
+
+
+@pytest.mark.asyncio
+async def test_consumer_uses_handoff_then_falls_back_to_imap():
+    """Consumer : blob present → pas de fetch IMAP ; blob absent → fetch IMAP"""
+    from services.email_processor.consumer import EmailProcessorConsumer
+
+    consumer = EmailProcessorConsumer()
+    consumer.raw_handoff = RawEmailHandoff(key="secret", redis_client=FakeRedis())
+    ref = await consumer.raw_handoff.store("account_gmail1", "99", RAW_EMAIL)
+
+    email_full = await consumer.load_handed_off_email("account_gmail1", "99", ref)
+    assert email_full.from_address == "jean.dupont@example.com"
+    assert email_full.subject == "Facture 2026-0042"
+
+    await consumer._release_handed_off_email({"raw_ref": ref})
+    assert await consumer.load_handed_off_email("account_gmail1", "99", ref) is None
+    assert await consumer.load_handed_off_email("account_gmail1", "99", None) is None
@@ -0,0 +1,156 @@
+"""
+Friday 2.0 - Tests Unitaires pool de sessions IMAP
+
+Tests unitaires pour IMAPSessionPool + IMAPDirectAdapter (adapters/email.py).
+
+Coverage:
+    - Reutilisation session entre get_message / download_attachment
+    - Plafond sessions simultanees par compte
+    - Health check NOOP + reconnexion session perimee
+    - close() → LOGOUT de toutes les sessions
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from agents.src.adapters.email import IMAPDirectAdapter, IMAPSessionPool
+
+RAW_EMAIL = (
+    b"From: John <john@example.com>\r\n"
+    b"To: me@example.com\r\n"
+    b"Subject: Test\r\n"
+    b"\r\n"
+    b"Bonjour\r\n"
+)
+
+
+def _make_client(fetch_data=None):
+    """Client IMAP mock (API aioimaplib)"""
+    client = MagicMock()
+    client.uid = AsyncMock(
+        return_value=("OK", fetch_data or [b"1 FETCH (BODY[] {50}", bytearray(RAW_EMAIL), b")"])
+    )
+    client.noop = AsyncMock(return_value=MagicMock(result="OK"))
+    client.logout = AsyncMock()
+    client.get_state = MagicMock(return_value="SELECTED")
+    return client
+
+
+@pytest.fixture
+def accounts_config():
+    return {
+        "account_test": {
+            "email": "me@example.com",
+            "imap_host": "imap.example.com",
+            "imap_port": 993,
+            "imap_user": "me@example.com",
+            "imap_password": "secret",
+            "smtp_host": "smtp.example.com",
+            "smtp_port": 587,
+            "auth_method": "app_password",
+        }
+    }
+
+
+@pytest.mark.asyncio
+async def test_adapter_reuses_session_across_fetches(accounts_config):
+    """get_message + 4 download_attachment → un seul handshake"""
+    adapter = IMAPDirectAdapter(accounts_config=accounts_config)
+    client = _make_client()
+    adapter._open_session = AsyncMock(return_value=client)
+    adapter._pool._connect = adapter._open_session
+
+    message = await adapter.get_message("account_test", "42")
+    for part in range(4):
+        await adapter.download_attachment("account_test", "42", str(part + 2))
+
+    assert message.from_address == "john@example.com"
+    assert adapter._open_session.await_count == 1
+    assert client.uid.await_count == 5
+    client.logout.assert_not_called()
+
+    await adapter.close()
+    client.logout.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_pool_caps_concurrent_sessions_per_account():
+    """Jamais plus de max_sessions_per_account sessions en vol"""
+    in_flight = 0
+    peak = 0
+
+    async def connect(account_id):
+        return _make_client()
+
+    async def operation(client):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return "OK"
+
+    pool = IMAPSessionPool(connect=connect, max_sessions_per_account=2)
+    await asyncio.gather(*(pool.run("account_test", operation) for _ in range(6)))
+
+    assert peak == 2
+    assert pool.idle_count("account_test") == 2
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_replaces_unhealthy_idle_session():
+    """Session idle dont le NOOP echoue → jetee, nouvelle session ouverte"""
+    stale = _make_client()
+    fresh = _make_client()
+    connect = AsyncMock(side_effect=[stale, fresh])
+
+    pool = IMAPSessionPool(connect=connect, keepalive_interval=0.0)
+    await pool.run("account_test", lambda client: client.uid("fetch", "1", "(UID)"))
+    stale.noop = AsyncMock(side_effect=ConnectionResetError("reset"))
+
+    await pool.run("account_test", lambda client: client.uid("fetch", "2", "(BODY.PEEK[])"))
+
+    assert connect.await_count == 2
+    stale.logout.assert_awaited()
+    fresh.uid.assert_awaited_once()
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_retries_once_when_reused_session_breaks():
+    """Erreur transport sur session reutilisee → reconnexion + retry unique"""
+    broken = _make_client()
+    fresh = _make_client()
+    connect = AsyncMock(side_effect=[broken, fresh])
+
+    pool = IMAPSessionPool(connect=connect)
+    await pool.run("account_test", lambda client: client.uid("fetch", "1", "(UID)"))
+
+    broken.uid = AsyncMock(side_effect=ConnectionResetError("server closed"))
+    status, _ = await pool.run("account_test", lambda client: client.uid("fetch", "2", "(UID)"))
+
+    assert status == "OK"
+    assert connect.await_count == 2
+    broken.logout.assert_awaited()
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_drops_sessions_idle_beyond_max_idle():
+    """Session idle depuis plus de max_idle → fermee sans NOOP"""
+    old = _make_client()
+    new = _make_client()
+    connect = AsyncMock(side_effect=[old, new])
+
+    pool = IMAPSessionPool(connect=connect, max_idle=60)
+    await pool.run("account_test", lambda client: client.noop())
+    pool._idle["account_test"][0].last_used = time.monotonic() - 120
+
+    await pool.run("account_test", lambda client: client.noop())
+
+    assert connect.await_count == 2
+    old.logout.assert_awaited()
+    await pool.close()
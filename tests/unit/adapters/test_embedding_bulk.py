@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Friday 2.0 - Tests Unitaires ingestion bulk embeddings
+
+Tests unitaires pour adapters/embedding_bulk.py.
+
+Coverage:
+    - COPY binaire (float4[]) dans la table temporaire, une transaction par batch
+    - Upsert ON CONFLICT (source_type, source_id, chunk_index), dernière ligne gagnante
+    - Mode rebuild_index : DROP avant, CREATE après (même si échec)
+    - Bascule de tier : index des autres tiers supprimés
+    - PgvectorStore.store_many → VectorStoreError
+"""
+
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+from agents.src.adapters.embedding_bulk import (
+    HNSW_INDEX_NAME,
+    EmbeddingRecord,
+    bulk_upsert_embeddings,
+    rebuild_hnsw_index,
+)
+
+
+class FakeConn:
+    """Connexion asyncpg minimale : enregistre execute/COPY"""
+
+    def __init__(self, fail_on_copy: bool = False):
+        self.executed = []
+        self.copies = []
+        self.transactions = 0
+        self.fail_on_copy = fail_on_copy
+
+    async def execute(self, query, *args):
+        self.executed.append(" ".join(query.split()))
+        if query.lstrip().startswith("INSERT"):
+            return f"INSERT 0 {len(self.copies[-1]['records'])}"
+        return "OK"
+
+    async def copy_records_to_table(self, table_name, records, columns):
+        if self.fail_on_copy:
+            raise RuntimeError("copy failed")
+        self.copies.append({"table": table_name, "records": records, "columns": columns})
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.transactions += 1
+        yield
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def _records(count: int, source_id=None) -> list[EmbeddingRecord]:
+    source_id = source_id or uuid4()
+    return [
+        EmbeddingRecord(
+            source_type="document",
+            source_id=source_id,
+            chunk_index=i,
+            total_chunks=count,
+            embedding=[0.1 * i, 0.2, 0.3],
+            metadata={"page": i},
+            content_hash=f"hash_{i}",
+            model="voyage-4-large",
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_copies_in_batches():
+    """5 lignes, batch de 2 → 3 COPY, 3 transactions, upsert sur la clé chunk"""
+    conn = FakeConn()
+
+    written = await bulk_upsert_embeddings(FakePool(conn), _records(5), batch_size=2)
+
+    assert written == 5
+    assert conn.transactions == 3
+    assert [len(c["records"]) for c in conn.copies] == [2, 2, 1]
+
+    row = conn.copies[0]["records"][1]
+    columns = conn.copies[0]["columns"]
+    assert row[columns.index("embedding")] == [0.1, 0.2, 0.3]  # Liste float, pas de texte
+    assert row[columns.index("metadata")] == '{"page": 1}'
+    assert row[columns.index("dimensions")] == 3
+
+    inserts = [q for q in conn.executed if q.startswith("INSERT")]
+    assert len(inserts) == 3
+    assert "embedding::vector" in inserts[0]
+    assert "ON CONFLICT (source_type, source_id, chunk_index) DO UPDATE" in inserts[0]
+    assert "seq DESC" in inserts[0]  # Doublons : dernière occurrence conservée
+    assert not any("DROP INDEX" in q for q in conn.executed)
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_empty_is_noop():
+    """Aucune ligne → aucune requête"""
+    conn = FakeConn()
+    assert await bulk_upsert_embeddings(FakePool(conn), []) == 0
+    assert conn.executed == []
+
+
+@pytest.mark.asyncio
+async def test_rebuild_index_drops_then_recreates():
+    """rebuild_index : DROP INDEX avant chargement, CREATE INDEX hnsw après"""
+    conn = FakeConn()
+
+    await bulk_upsert_embeddings(FakePool(conn), _records(3), rebuild_index=True)
+
+    drop = next(i for i, q in enumerate(conn.executed) if "DROP INDEX" in q)
+    create = next(i for i, q in enumerate(conn.executed) if "CREATE INDEX" in q)
+    first_insert = next(i for i, q in enumerate(conn.executed) if q.startswith("INSERT"))
+    assert drop < first_insert < create
+    assert HNSW_INDEX_NAME in conn.executed[create]
+    assert "USING hnsw" in conn.executed[create]
+    assert any(q.startswith("SET maintenance_work_mem") for q in conn.executed)
+    assert "RESET maintenance_work_mem" in conn.executed
+    # Index des autres tiers supprimés avant chargement : jamais maintenus
+    assert (
+        "DROP INDEX IF EXISTS knowledge.idx_embeddings_vector_halfvec"
+        in conn.executed[:first_insert]
+    )
+
+
+@pytest.mark.asyncio
+async def test_rebuild_index_recreated_on_failure():
+    """Chargement en échec → index HNSW quand même recréé"""
+    conn = FakeConn(fail_on_copy=True)
+
+    with pytest.raises(RuntimeError):
+        await bulk_upsert_embeddings(FakePool(conn), _records(2), rebuild_index=True)
+
+    assert any("CREATE INDEX" in q for q in conn.executed)
+
+
+@pytest.mark.asyncio
+async def test_rebuild_hnsw_index_switches_tier():
+    """Bascule halfvec : index halfvec créés, puis index full/binary supprimés"""
+    conn = FakeConn()
+
+    await rebuild_hnsw_index(conn, mode="halfvec")
+
+    creates = [q for q in conn.executed if q.startswith("CREATE INDEX")]
+    drops = [q.split(".")[-1] for q in conn.executed if q.startswith("DROP INDEX")]
+    assert len(creates) == 3
+    assert all("halfvec_cosine_ops" in q for q in creates)
+    assert set(drops) == {
+        "idx_embeddings_vector",
+        "idx_embeddings_vector_document",
+        "idx_embeddings_vector_email",
+        "idx_embeddings_vector_binary",
+        "idx_embeddings_vector_binary_document",
+        "idx_embeddings_vector_binary_email",
+    }
+    last_create = max(i for i, q in enumerate(conn.executed) if q.startswith("CREATE INDEX"))
+    first_drop = min(i for i, q in enumerate(conn.executed) if q.startswith("DROP INDEX"))
+    assert last_create < first_drop
+
+
+@pytest.mark.asyncio
+async def test_pgvector_store_many_wraps_errors():
+    """PgvectorStore.store_many : erreur DB → VectorStoreError"""
+    from agents.src.adapters.vectorstore import PgvectorStore, VectorStoreError
+
+    ok_store = PgvectorStore(pool=FakePool(FakeConn()))
+    assert await ok_store.store_many(_records(2)) == 2
+
+    failing_store = PgvectorStore(pool=FakePool(FakeConn(fail_on_copy=True)))
+    with pytest.raises(VectorStoreError):
+        await failing_store.store_many(_records(2))
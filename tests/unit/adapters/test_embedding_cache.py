@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Friday 2.0 - Tests Unitaires cache embeddings (content_hash)
+
+Tests unitaires pour adapters/embedding_cache.py + intégration archiviste.
+
+Coverage:
+    - Hash du texte anonymisé, clé (content_hash, model, dimensions)
+    - Lookup DB batch unique, seuls les misses partent au provider
+    - Dédup intra-batch + LRU mémoire
+    - Erreur DB = miss (jamais bloquant)
+    - EmbeddingGenerator : cache hit → aucun appel Voyage ni budget
+    - generate_document_embeddings : chunks connus réutilisés, 1 seul embed()
+"""
+
+import hashlib
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+from agents.src.adapters.embedding_cache import EmbeddingCache, compute_content_hash
+
+MODEL = "voyage-4-large"
+
+
+def _vector(value: float, dims: int = 3) -> list[float]:
+    return [value] * dims
+
+
+def test_content_hash_is_sha256_of_anonymized_text():
+    """content_hash = SHA-256 hex du texte anonymisé"""
+    text = "Facture [PERSON_1] 1250 EUR"
+    assert compute_content_hash(text) == hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_embed_many_only_sends_misses():
+    """Hits DB réutilisés, doublons dédupliqués, misses envoyés en un appel"""
+    known = compute_content_hash("chunk connu")
+    db_pool = AsyncMock()
+    db_pool.fetch = AsyncMock(return_value=[{"content_hash": known, "embedding": "[0.5,0.5,0.5]"}])
+    embed_fn = AsyncMock(return_value=[_vector(0.1), _vector(0.2)])
+    cache = EmbeddingCache(db_pool=db_pool)
+
+    result = await cache.embed_many(
+        ["chunk connu", "nouveau A", "nouveau B", "nouveau A"], MODEL, 3, embed_fn
+    )
+
+    embed_fn.assert_awaited_once_with(["nouveau A", "nouveau B"])
+    assert result.embeddings == [_vector(0.5), _vector(0.1), _vector(0.2), _vector(0.1)]
+    assert result.cache_hits == 1
+    assert result.api_texts == 2
+
+    # Requête unique filtrée par modèle + dimensions
+    db_pool.fetch.assert_awaited_once()
+    args = db_pool.fetch.await_args.args
+    assert "content_hash = ANY($1::varchar[])" in args[0]
+    assert args[2:] == (MODEL, 3)
+
+    # Second passage : tout en mémoire, ni DB ni provider
+    db_pool.fetch.reset_mock()
+    embed_fn.reset_mock()
+    await cache.embed_many(["nouveau B", "chunk connu"], MODEL, 3, embed_fn)
+    db_pool.fetch.assert_not_awaited()
+    embed_fn.assert_not_awaited()
+    assert cache.get_stats()["hits_memory"] == 2
+
+
+@pytest.mark.asyncio
+async def test_other_model_or_dimensions_is_a_miss():
+    """Même texte, autre modèle/dimensions → pas de réutilisation"""
+    cache = EmbeddingCache()
+    content_hash = compute_content_hash("texte")
+    cache.remember(content_hash, MODEL, 3, _vector(0.1))
+
+    assert await cache.get_many([content_hash], MODEL, 3) == {content_hash: _vector(0.1)}
+    assert await cache.get_many([content_hash], "voyage-3.5", 3) == {}
+    assert await cache.get_many([content_hash], MODEL, 1024) == {}
+
+
+@pytest.mark.asyncio
+async def test_db_error_is_treated_as_miss():
+    """Lookup DB en échec → miss, le provider est appelé"""
+    db_pool = AsyncMock()
+    db_pool.fetch = AsyncMock(side_effect=Exception("column model does not exist"))
+    embed_fn = AsyncMock(return_value=[_vector(0.3)])
+
+    result = await EmbeddingCache(db_pool=db_pool).embed_many(["texte"], MODEL, 3, embed_fn)
+
+    assert result.embeddings == [_vector(0.3)]
+    embed_fn.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_embedding_generator_reuses_cached_vector():
+    """EmbeddingGenerator : même content_hash → pas d'appel Voyage, pas de budget"""
+    from agents.src.agents.archiviste.embedding_generator import EmbeddingGenerator
+    from agents.src.tools.anonymize import AnonymizationResult
+
+    anonymized = "Facture [PERSON_1] 1250 EUR"
+    vector = [1.0 / 32] * 1024
+    cache = EmbeddingCache()
+    cache.remember(compute_content_hash(anonymized), MODEL, 1024, vector)
+
+    db_pool = AsyncMock()
+    generator = EmbeddingGenerator(db_pool=db_pool, embedding_cache=cache)
+    adapter = AsyncMock()
+
+    with (
+        patch(
+            "agents.src.agents.archiviste.embedding_generator.anonymize_text",
+            return_value=AnonymizationResult(anonymized_text=anonymized, confidence_min=0.9),
+        ),
+        patch(
+            "agents.src.agents.archiviste.embedding_generator.get_embedding_adapter",
+            return_value=adapter,
+        ),
+    ):
+        result = await generator.generate_embedding(
+            document_id=uuid4(), text_content="Facture Jean Dupont 1250 EUR"
+        )
+
+    adapter.embed.assert_not_awaited()
+    db_pool.execute.assert_not_awaited()  # Pas de core.api_usage
+    assert result.embedding_vector == vector
+    assert result.metadata["embedding_cache_hit"] is True
+    assert result.metadata["content_hash"] == compute_content_hash(anonymized)
+
+
+@pytest.mark.asyncio
+async def test_generate_document_embeddings_with_cache():
+    """Chunks déjà indexés réutilisés, chunks manquants en un seul embed()"""
+    from agents.src.agents.archiviste.embedding_generator import generate_document_embeddings
+    from agents.src.tools.anonymize import AnonymizationResult
+
+    document_id = uuid4()
+    cache = EmbeddingCache()
+    cache.remember(compute_content_hash("A" * 2000), MODEL, 1024, _vector(0.5, 1024))
+
+    vectorstore = AsyncMock()
+    vectorstore.embed = AsyncMock(
+        side_effect=lambda texts, anonymize: AsyncMock(
+            embeddings=[_vector(0.1, 1024) for _ in texts]
+        )
+    )
+
+    async def fake_anonymize(text):
+        return AnonymizationResult(anonymized_text=text, confidence_min=1.0)
+
+    with patch(
+        "agents.src.agents.archiviste.embedding_generator.anonymize_text",
+        side_effect=fake_anonymize,
+    ):
+        count = await generate_document_embeddings(
+            document_node_id=str(document_id),
+            text="A" * 2000 + "B" * 2000,
+            vectorstore=vectorstore,
+            chunk_size=2000,
+            overlap=0,
+            embedding_cache=cache,
+        )
+
+    assert count == 2
+    vectorstore.embed.assert_awaited_once_with(["B" * 2000], anonymize=False)
+    # Stockage bulk : colonnes content_hash/model renseignées (lookup DB du cache)
+    vectorstore.store.assert_not_awaited()
+    records = vectorstore.store_many.await_args.args[0]
+    assert [r.chunk_index for r in records] == [0, 1]
+    assert all(r.source_id == document_id and r.source_type == "document" for r in records)
+    assert records[0].embedding == _vector(0.5, 1024)
+    assert records[1].embedding == _vector(0.1, 1024)
+    assert records[1].content_hash == compute_content_hash("B" * 2000)
+    assert records[1].model == MODEL
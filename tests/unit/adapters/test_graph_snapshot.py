@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Friday 2.0 - Tests Unitaires snapshot mémoire du graphe
+
+Tests unitaires pour adapters/graph_snapshot.py + read-through memorystore.
+
+Coverage:
+    - Chargement CSR, get_related_nodes (out/in/both, filtre relation, limit)
+    - query_path : plus court chemin, filtres, bidirectionnel, direction both
+    - Delta incrémental (add/remove edge, notifications) + compaction
+    - Refresh watermark, borne max_edges
+    - PostgreSQLMemorystore : lecture snapshot, write-through
+    - Empreinte mémoire bornée (500k edges)
+"""
+
+import asyncio
+import json
+import random
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from agents.src.adapters.graph_snapshot import GraphSnapshot, GraphSnapshotError
+
+T0 = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def _node(node_id, node_type="person", name=None, metadata="{}"):
+    return {"id": node_id, "type": node_type, "name": name or node_id[:8], "metadata": metadata}
+
+
+def _edge(from_id, to_id, relation_type="related_to", metadata="{}"):
+    return {
+        "id": uuid.uuid4(),
+        "from_node_id": from_id,
+        "to_node_id": to_id,
+        "relation_type": relation_type,
+        "metadata": metadata,
+    }
+
+
+class FakeConn:
+    def __init__(self, nodes, edges, watermark=T0):
+        self.nodes = nodes
+        self.edges = edges
+        self.watermark = watermark
+        self.fetch_calls = []
+
+    async def fetchval(self, query, *args):
+        if "COUNT(*)" in query:
+            return len(self.edges)
+        return self.watermark
+
+    async def fetch(self, query, *args):
+        self.fetch_calls.append((query, args))
+        if "FROM knowledge.nodes" in query:
+            return self.nodes
+        return self.edges
+
+
+def _pool(conn):
+    pool = MagicMock()
+
+    @asynccontextmanager
+    async def acquire():
+        yield conn
+
+    pool.acquire = acquire
+    return pool
+
+
+def _ids(count):
+    return [str(uuid.uuid4()) for _ in range(count)]
+
+
+async def _snapshot(nodes, edges, **kwargs):
+    snapshot = GraphSnapshot(_pool(FakeConn(nodes, edges)), **kwargs)
+    await snapshot.load()
+    return snapshot
+
+
+@pytest.mark.asyncio
+async def test_related_nodes_from_csr():
+    """get_related_nodes : out / in / both, filtre relation, metadata décodées"""
+    a, b, c = _ids(3)
+    snapshot = await _snapshot(
+        [_node(a), _node(b, "email", metadata='{"subject": "RE: Projet"}'), _node(c, "document")],
+        [_edge(b, a, "sent_by"), _edge(b, c, "attached_to"), _edge(c, a, "mentions")],
+    )
+
+    out = snapshot.get_related_nodes(b, direction="out")
+    assert {(n["id"], n["relation_type"]) for n in out} == {(a, "sent_by"), (c, "attached_to")}
+
+    incoming = snapshot.get_related_nodes(a, direction="in")
+    assert {n["id"] for n in incoming} == {b, c}
+    assert next(n for n in incoming if n["id"] == b)["metadata"] == {"subject": "RE: Projet"}
+
+    assert [n["id"] for n in snapshot.get_related_nodes(c, "both", relation_type="mentions")] == [a]
+    assert snapshot.get_related_nodes(a, "in", limit=1).__len__() == 1
+    assert snapshot.get_related_nodes(str(uuid.uuid4())) == []
+    with pytest.raises(ValueError):
+        snapshot.get_related_nodes(a, direction="sideways")
+
+
+@pytest.mark.asyncio
+async def test_query_path_shortest_and_filters():
+    """query_path : plus court chemin, respect max_depth / relation_types / direction"""
+    a, b, c, d, e = _ids(5)
+    nodes = [_node(n) for n in (a, b, c, d, e)]
+    edges = [
+        _edge(a, b, "mentions"),
+        _edge(b, c, "mentions"),
+        _edge(c, d, "mentions"),
+        _edge(a, e, "related_to"),
+        _edge(e, d, "related_to"),
+    ]
+    snapshot = await _snapshot(nodes, edges)
+
+    path = snapshot.query_path(a, d, max_depth=3)
+    assert [(p["from_node_id"], p["to_node_id"]) for p in path] == [(a, e), (e, d)]
+    assert path[0]["id"] == str(edges[3]["id"])
+
+    mentions_only = snapshot.query_path(a, d, max_depth=3, relation_types=["mentions"])
+    assert [p["to_node_id"] for p in mentions_only] == [b, c, d]
+    assert snapshot.query_path(a, d, max_depth=2, relation_types=["mentions"]) == []
+
+    # Sens des edges : d → a introuvable en "out", trouvé en "both"
+    assert snapshot.query_path(d, a) == []
+    reverse = snapshot.query_path(d, a, direction="both")
+    assert len(reverse) == 2
+    assert reverse[0]["from_node_id"] == e  # Orientation stockée conservée
+
+
+@pytest.mark.asyncio
+async def test_query_path_bidirectional_matches_unidirectional():
+    """Recherche bidirectionnelle = même longueur que BFS unidirectionnel"""
+    rng = random.Random(7)
+    ids = _ids(300)
+    edges = {(rng.choice(ids), rng.choice(ids)) for _ in range(900)}
+    snapshot = await _snapshot([_node(n) for n in ids], [_edge(f, t) for f, t in edges if f != t])
+
+    for _ in range(50):
+        source, target = rng.sample(ids, 2)
+        uni = snapshot.query_path(source, target, max_depth=5)
+        bi = snapshot.query_path(source, target, max_depth=5, bidirectional=True)
+        assert len(uni) == len(bi)
+        for path in (uni, bi):
+            if path:
+                assert path[0]["from_node_id"] == source
+                assert path[-1]["to_node_id"] == target
+                for prev, nxt in zip(path, path[1:]):
+                    assert prev["to_node_id"] == nxt["from_node_id"]
+
+
+@pytest.mark.asyncio
+async def test_incremental_updates_and_compaction():
+    """add/remove edge visibles immédiatement, compaction transparente"""
+    a, b, c = _ids(3)
+    snapshot = await _snapshot([_node(a), _node(b), _node(c)], [_edge(a, b)], compact_threshold=3)
+
+    edge_id = str(uuid.uuid4())
+    snapshot.add_edge(edge_id, b, c, "mentions", {"confidence": 0.9})
+    snapshot.add_edge(edge_id, b, c, "mentions", {"confidence": 0.9})  # Idempotent
+    assert [p["id"] for p in snapshot.query_path(a, c)][1] == edge_id
+    assert snapshot.get_stats()["pending_delta"] == 1
+
+    snapshot.remove_edge(a, b, "related_to")
+    assert snapshot.get_related_nodes(a) == []
+    assert snapshot.query_path(a, c) == []
+
+    snapshot.add_edge(str(uuid.uuid4()), a, c, "related_to")  # 3e delta → compaction
+    assert snapshot.get_stats()["pending_delta"] == 0
+    assert snapshot.get_stats()["edges"] == 2
+    assert snapshot.query_path(b, c)[0]["metadata"] == {"confidence": 0.9}
+
+    snapshot.remove_node(c)
+    assert snapshot.get_related_nodes(b) == []
+
+
+@pytest.mark.asyncio
+async def test_notifications_apply_deletes_and_schedule_refresh():
+    """NOTIFY : DELETE appliqué tout de suite, INSERT → refresh watermark"""
+    a, b, c = _ids(3)
+    conn = FakeConn([_node(a), _node(b)], [_edge(a, b)])
+    snapshot = GraphSnapshot(_pool(conn))
+    await snapshot.load()
+
+    snapshot._on_notify(
+        None,
+        0,
+        "knowledge_graph",
+        json.dumps(
+            {"table": "edges", "op": "DELETE", "from": a, "to": b, "relation_type": "related_to"}
+        ),
+    )
+    assert snapshot.get_related_nodes(a) == []
+
+    # Nouvelle edge en base, notifiée
+    conn.nodes = [dict(_node(c), updated_at=T0 + timedelta(seconds=5))]
+    conn.edges = [dict(_edge(b, c), created_at=T0 + timedelta(seconds=5))]
+    snapshot._on_notify(None, 0, "knowledge_graph", json.dumps({"table": "edges", "op": "INSERT"}))
+    await snapshot._refresh_task
+
+    assert [n["id"] for n in snapshot.get_related_nodes(b)] == [c]
+    assert snapshot.watermark == T0 + timedelta(seconds=5)
+    query, args = conn.fetch_calls[-1]
+    assert "created_at >= $1" in query and args[0] == T0
+
+
+@pytest.mark.asyncio
+async def test_load_refuses_oversized_graph():
+    """Plus de max_edges → GraphSnapshotError (fallback SQL)"""
+    a, b = _ids(2)
+    snapshot = GraphSnapshot(_pool(FakeConn([_node(a), _node(b)], [_edge(a, b)])), max_edges=0)
+    with pytest.raises(GraphSnapshotError):
+        await snapshot.load()
+    assert snapshot.ready is False
+
+
+@pytest.mark.asyncio
+async def test_memorystore_reads_through_snapshot():
+    """PostgreSQLMemorystore : snapshot prêt → aucune requête, write-through create_edge"""
+    from agents.src.adapters.memorystore import PostgreSQLMemorystore
+
+    a, b = _ids(2)
+    snapshot = await _snapshot([_node(a), _node(b)], [])
+
+    db_pool = MagicMock()
+    db_pool.fetch = AsyncMock()
+    conn = MagicMock()
+    new_edge_id = uuid.uuid4()
+    conn.fetchval = AsyncMock(return_value=new_edge_id)
+    acquire_ctx = AsyncMock()
+    acquire_ctx.__aenter__ = AsyncMock(return_value=conn)
+    acquire_ctx.__aexit__ = AsyncMock(return_value=None)
+    db_pool.acquire = MagicMock(return_value=acquire_ctx)
+
+    memorystore = PostgreSQLMemorystore(db_pool, graph_snapshot=snapshot)
+    await memorystore.create_edge(a, b, "mentions")
+
+    related = await memorystore.get_related_nodes(a)
+    path = await memorystore.query_path(a, b)
+
+    assert [n["id"] for n in related] == [b]
+    assert path[0]["id"] == str(new_edge_id)
+    db_pool.fetch.assert_not_awaited()
+
+
+def _listen_pool(conn):
+    """Pool dont acquire() sert aussi bien `async with` que la connexion LISTEN."""
+    pool = _pool(conn)
+    listen_conn = MagicMock()
+    listen_conn.add_listener = AsyncMock()
+    listen_conn.remove_listener = AsyncMock()
+    pool.acquire = MagicMock(side_effect=lambda: _Acquire(conn, listen_conn))
+    pool.release = AsyncMock()
+    return pool, listen_conn
+
+
+class _Acquire:
+    def __init__(self, conn, listen_conn):
+        self.conn = conn
+        self.listen_conn = listen_conn
+
+    def __await__(self):
+        async def _listen():
+            return self.listen_conn
+
+        return _listen().__await__()
+
+    async def __aenter__(self):
+        return self.conn
+
+    async def __aexit__(self, *exc):
+        return None
+
+
+@pytest.mark.asyncio
+async def test_listen_connection_lost_reconnects_and_reloads():
+    """Connexion LISTEN fermée → ready=False (fallback SQL), reconnexion puis reload"""
+    a, b = _ids(2)
+    conn = FakeConn([_node(a), _node(b)], [])
+    pool, listen_conn = _listen_pool(conn)
+    snapshot = GraphSnapshot(pool, full_reload_seconds=0)
+    await snapshot.load()
+    await snapshot.start_listening()
+    listen_conn.add_termination_listener.assert_called_once_with(snapshot._on_connection_lost)
+
+    conn.edges = [_edge(a, b)]
+    snapshot._on_connection_lost(listen_conn)
+    assert snapshot.ready is False
+    await snapshot._reconnect_task
+
+    assert snapshot.ready is True
+    assert [n["id"] for n in snapshot.get_related_nodes(a)] == [b]
+    pool.release.assert_awaited_once_with(listen_conn)
+    assert listen_conn.add_listener.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_periodic_full_reload_without_notifications(monkeypatch):
+    """Timer de reload : snapshot périmé rechargé même sans NOTIFY"""
+    from agents.src.adapters import graph_snapshot
+
+    monkeypatch.setattr(graph_snapshot, "RETRY_SECONDS", 0)
+    a, b = _ids(2)
+    conn = FakeConn([_node(a), _node(b)], [])
+    pool, _ = _listen_pool(conn)
+    snapshot = GraphSnapshot(pool, full_reload_seconds=60)
+    await snapshot.load()
+    await snapshot.start_listening()
+
+    conn.edges = [_edge(a, b)]
+    snapshot.loaded_at -= 61
+    for _ in range(10):
+        await asyncio.sleep(0)
+        if snapshot.get_related_nodes(a):
+            break
+
+    assert [n["id"] for n in snapshot.get_related_nodes(a)] == [b]
+    await snapshot.stop()
+    assert snapshot._reload_task is None
+
+
+@pytest.mark.asyncio
+async def test_memorystore_close_releases_listen_connection():
+    """PostgreSQLMemorystore.close() → snapshot.stop() : connexion LISTEN rendue au pool"""
+    from agents.src.adapters.memorystore import PostgreSQLMemorystore
+
+    pool, listen_conn = _listen_pool(FakeConn([], []))
+    snapshot = GraphSnapshot(pool)
+    await snapshot.load()
+    await snapshot.start_listening()
+
+    await PostgreSQLMemorystore(pool, graph_snapshot=snapshot).close()
+
+    listen_conn.remove_listener.assert_awaited_once_with("knowledge_graph", snapshot._on_notify)
+    listen_conn.remove_termination_listener.assert_called_once_with(snapshot._on_connection_lost)
+    pool.release.assert_awaited_once_with(listen_conn)
+    assert snapshot._reload_task is None
+
+
+@pytest.mark.asyncio
+async def test_memory_bounded_for_500k_edges():
+    """Empreinte linéaire : 20k nœuds / 100k edges x5 (= 500k edges) < 100 Mo"""
+    rng = random.Random(1)
+    node_count = 20_000
+    ids = _ids(node_count)
+    snapshot = GraphSnapshot(_pool(FakeConn([], [])))
+    for node_id in ids:
+        snapshot.upsert_node(node_id, "person", f"Person {node_id[:8]}")
+    for _ in range(100_000):
+        snapshot._append_edge(
+            str(uuid.uuid4()),
+            ids[rng.randrange(node_count)],
+            ids[rng.randrange(node_count)],
+            "related_to",
+            None,
+        )
+    snapshot._compact()
+
+    assert snapshot.memory_bytes() * 5 < 100_000_000
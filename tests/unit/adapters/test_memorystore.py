@@ -212,6 +212,124 @@ class TestEdgeCreation:
         assert "invalid_relation" in str(exc_info.value)
 
 
+class TestSubgraphUpsert:
+    """Tests upsert bulk d'un sous-graphe (nœuds + edges, une transaction)."""
+
+    @pytest.fixture
+    def subgraph_conn(self, mock_db_pool, mock_conn):
+        """Connexion : transaction comptée, sender déjà en base (conflit dedup_key)."""
+        existing_person = str(uuid4())
+        transaction_ctx = AsyncMock()
+        transaction_ctx.__aenter__ = AsyncMock(return_value=None)
+        transaction_ctx.__aexit__ = AsyncMock(return_value=None)
+        mock_conn.transaction = MagicMock(return_value=transaction_ctx)
+
+        async def fetch(query, *args):
+            if "INSERT INTO knowledge.nodes" in query:
+                ids, types, names, metadata, _sources, keys = args
+                return [
+                    {
+                        "id": existing_person if node_type == "person" else node_id,
+                        "type": node_type,
+                        "name": name,
+                        "metadata": meta,
+                        "dedup_key": key,
+                    }
+                    for node_id, node_type, name, meta, key in zip(
+                        ids, types, names, metadata, keys
+                    )
+                ]
+            ids, froms, tos, relations, metadata = args
+            return [
+                {
+                    "id": edge_id,
+                    "from_node_id": from_id,
+                    "to_node_id": to_id,
+                    "relation_type": relation,
+                    "metadata": meta,
+                }
+                for edge_id, from_id, to_id, relation, meta in zip(
+                    ids, froms, tos, relations, metadata
+                )
+            ]
+
+        mock_conn.fetch = AsyncMock(side_effect=fetch)
+        mock_db_pool.acquire.return_value.__aenter__.return_value = mock_conn
+        return existing_person
+
+    @pytest.mark.asyncio
+    async def test_upsert_subgraph_two_queries(self, memorystore, mock_conn, subgraph_conn):
+        """Nœuds puis edges en 2 requêtes unnest, doublons fusionnés localement."""
+        doc_id = str(uuid4())
+        result = await memorystore.upsert_subgraph(
+            nodes=[
+                {"key": "email", "type": "email", "name": "RE: Projet", "metadata": {}},
+                {
+                    "key": "sender",
+                    "type": "person",
+                    "name": "antonio",
+                    "metadata": {"email": "Antonio@example.com"},
+                },
+                {
+                    "key": "recipient",
+                    "type": "person",
+                    "name": "Antonio",
+                    "metadata": {"email": "antonio@example.com", "role": "Mainteneur"},
+                },
+            ],
+            edges=[
+                {"from": "email", "to": "sender", "relation_type": "sent_by"},
+                {"from": "email", "to": "recipient", "relation_type": "received_by"},
+                {"from": doc_id, "to": "email", "relation_type": "attached_to"},
+                {"from": "email", "to": "sender", "relation_type": "sent_by"},
+            ],
+        )
+
+        assert mock_conn.fetch.await_count == 2
+        mock_conn.transaction.assert_called_once()
+
+        # Sender et recipient = même personne → une seule ligne, métadonnées fusionnées
+        node_call = mock_conn.fetch.await_args_list[0]
+        assert "ON CONFLICT (type, dedup_key)" in node_call.args[0]
+        assert node_call.args[2] == ["email", "person"]
+        assert node_call.args[6] == [None, "antonio@example.com"]
+        assert '"role": "Mainteneur"' in node_call.args[4][1]
+
+        # Conflit → id du nœud existant
+        assert result["nodes"]["sender"] == subgraph_conn
+        assert result["nodes"]["recipient"] == subgraph_conn
+        email_id = result["nodes"]["email"]
+        assert email_id != subgraph_conn
+
+        edge_call = mock_conn.fetch.await_args_list[1]
+        assert "ON CONFLICT (from_node_id, to_node_id, relation_type)" in edge_call.args[0]
+        assert len(edge_call.args[1]) == 3  # sent_by en double fusionné
+        assert edge_call.args[2][2] == doc_id and edge_call.args[3][2] == email_id
+
+        assert len(result["edges"]) == 4
+        assert result["edges"][0] == result["edges"][3]
+
+    @pytest.mark.asyncio
+    async def test_upsert_subgraph_validation(self, memorystore, mock_conn, subgraph_conn):
+        """Type invalide, key dupliquée ou extrémité inconnue → ValueError sans requête."""
+        node = {"key": "a", "type": "person", "name": "A", "metadata": {}}
+
+        with pytest.raises(ValueError, match="Invalid node_type"):
+            await memorystore.upsert_subgraph([{**node, "type": "invalid_type"}])
+        with pytest.raises(ValueError, match="Duplicate node key"):
+            await memorystore.upsert_subgraph([node, node])
+        with pytest.raises(ValueError, match="Invalid relation_type"):
+            await memorystore.upsert_subgraph(
+                [node], [{"from": "a", "to": "a", "relation_type": "invalid_relation"}]
+            )
+        with pytest.raises(ValueError, match="Unknown edge endpoint"):
+            await memorystore.upsert_subgraph(
+                [node], [{"from": "a", "to": "missing", "relation_type": "related_to"}]
+            )
+
+        mock_conn.fetch.assert_not_awaited()
+
+
 class TestGraphQueries:
     """Tests requêtes graphe (Task 5.7-5.14)."""
 
@@ -327,15 +445,17 @@ class TestGraphQueries:
         to_id = str(uuid4())
         edge_id = uuid4()
 
-        # Mock connexion directe trouvée
-        mock_db_pool.fetchrow = AsyncMock(
-            return_value={
-                "id": edge_id,
-                "from_node_id": from_id,
-                "to_node_id": to_id,
-                "relation_type": "sent_by",
-                "metadata": {},
-            }
+        # Mock connexion directe trouvée (requête WITH RECURSIVE unique)
+        mock_db_pool.fetch = AsyncMock(
+            return_value=[
+                {
+                    "id": edge_id,
+                    "from_node_id": from_id,
+                    "to_node_id": to_id,
+                    "relation_type": "sent_by",
+                    "metadata": {},
+                }
+            ]
         )
 
         path = await memorystore.query_path(from_id, to_id)
@@ -344,6 +464,113 @@ class TestGraphQueries:
         assert len(path) == 1
         assert path[0]["relation_type"] == "sent_by"
 
+    @pytest.mark.asyncio
+    async def test_query_path_single_recursive_query(self, memorystore, mock_db_pool):
+        """query_path() : 1 seule requête WITH RECURSIVE, filtres et profondeur en paramètres."""
+        a, b, c = str(uuid4()), str(uuid4()), str(uuid4())
+        mock_db_pool.fetch = AsyncMock(
+            return_value=[
+                {
+                    "id": uuid4(),
+                    "from_node_id": a,
+                    "to_node_id": b,
+                    "relation_type": "mentions",
+                    "metadata": {},
+                },
+                {
+                    "id": uuid4(),
+                    "from_node_id": b,
+                    "to_node_id": c,
+                    "relation_type": "attached_to",
+                    "metadata": {},
+                },
+            ]
+        )
+        mock_db_pool.fetchrow = AsyncMock()
+
+        path = await memorystore.query_path(
+            a, c, max_depth=3, relation_types=["mentions", "attached_to"]
+        )
+
+        assert [edge["to_node_id"] for edge in path] == [b, c]
+        mock_db_pool.fetchrow.assert_not_awaited()
+        mock_db_pool.fetch.assert_awaited_once()
+        query, *params = mock_db_pool.fetch.await_args.args
+        assert "WITH RECURSIVE" in query
+        assert params == [a, c, 3, 0, ["mentions", "attached_to"]]
+
+    @pytest.mark.asyncio
+    async def test_query_path_bidirectional_splits_depth(self, memorystore, mock_db_pool):
+        """bidirectional=True : profondeur répartie entre source et cible, sens 'both'."""
+        mock_db_pool.fetch = AsyncMock(return_value=[])
+
+        path = await memorystore.query_path(
+            str(uuid4()), str(uuid4()), max_depth=5, direction="both", bidirectional=True
+        )
+
+        assert path == []
+        query, *params = mock_db_pool.fetch.await_args.args
+        assert params[2:4] == [3, 2]
+        assert "e.to_node_id = r.node_id" in query  # Arêtes parcourues dans les deux sens
+
+    @pytest.mark.asyncio
+    async def test_query_path_invalid_direction_and_same_node(self, memorystore, mock_db_pool):
+        """direction invalide → ValueError ; source == cible → [] sans requête."""
+        node_id = str(uuid4())
+        mock_db_pool.fetch = AsyncMock(return_value=[])
+
+        with pytest.raises(ValueError):
+            await memorystore.query_path(node_id, str(uuid4()), direction="in")
+
+        assert await memorystore.query_path(node_id, node_id) == []
+        mock_db_pool.fetch.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_get_node_with_relations_depth_2_single_query(self, memorystore, mock_db_pool):
+        """depth=2 : voisinage récupéré en 1 requête, arbre reconstruit en Python."""
+        root, email, person = uuid4(), uuid4(), uuid4()
+        now = datetime.utcnow()
+        mock_db_pool.fetchrow = AsyncMock(
+            return_value={
+                "id": root,
+                "type": "document",
+                "name": "Facture",
+                "metadata": {},
+                "created_at": now,
+            }
+        )
+
+        def _row(anchor, direction, node_id, node_type, relation_type):
+            return {
+                "anchor_id": anchor,
+                "direction": direction,
+                "relation_type": relation_type,
+                "id": node_id,
+                "type": node_type,
+                "name": node_type.title(),
+                "metadata": {},
+                "created_at": now,
+            }
+
+        mock_db_pool.fetch = AsyncMock(
+            return_value=[
+                _row(root, "in", email, "email", "attached_to"),
+                _row(email, "out", root, "document", "attached_to"),
+                _row(email, "out", person, "person", "sent_by"),
+            ]
+        )
+
+        result = await memorystore.get_node_with_relations(str(root), depth=2)
+
+        mock_db_pool.fetch.assert_awaited_once()
+        assert mock_db_pool.fetch.await_args.args[2] == 1  # Nœuds développés: depth - 1 sauts
+        assert result["edges_out"] == []
+        child = result["edges_in"][0]
+        assert child["id"] == str(email)
+        assert child["children"]["node"]["type"] == "email"
+        assert [r["id"] for r in child["children"]["edges_out"]] == [str(root), str(person)]
+        assert "children" not in child["children"]["edges_out"][0]
+
     @pytest.mark.asyncio
     async def test_count_nodes_and_edges(self, memorystore, mock_db_pool):
         """Test count_nodes() / count_edges() (Task 5.15)."""
@@ -7,6 +7,7 @@ Tests unitaires pour adapters/vectorstore.py (Story 6.2 - Task 7).
 Coverage:
     - VoyageAIAdapter initialization
     - VoyageAIAdapter.embed() (mocked)
+    - Découpage batches / thread / budget RPM
     - PgvectorStore.store() (mocked)
     - PgvectorStore.search() (mocked)
     - Factory pattern get_vectorstore_adapter()
@@ -21,6 +22,7 @@ Story: 6.2 - Task 7
 """
 
 import os
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -29,10 +31,12 @@ from agents.src.adapters.vectorstore import (
     EmbeddingProviderError,
     EmbeddingResponse,
     PgvectorStore,
+    RateLimiter,
     SearchResult,
     VectorStoreError,
     VoyageAIAdapter,
     get_vectorstore_adapter,
+    split_embedding_batches,
 )
 
 # ============================================================
@@ -113,15 +117,77 @@ async def test_voyage_embed_empty_texts():
 
 
 @pytest.mark.asyncio
-async def test_voyage_embed_batch_limit():
-    """Test VoyageAIAdapter.embed() raise ValueError si >50 textes (batch limit)"""
-    with patch("voyageai.Client"):
+async def test_voyage_embed_splits_large_input_in_order():
+    """Test VoyageAIAdapter.embed() découpe >50 textes en batches, ordre conservé"""
+
+    def fake_embed(texts, model, input_type):
+        response = MagicMock()
+        response.embeddings = [[float(text.split()[1])] for text in texts]
+        response.total_tokens = len(texts)
+        return response
+
+    mock_client = MagicMock()
+    mock_client.embed = MagicMock(side_effect=fake_embed)
+
+    with patch("voyageai.Client", return_value=mock_client):
+        adapter = VoyageAIAdapter(api_key="vo-test-key")
+
+        texts = [f"text {i}" for i in range(120)]
+        response = await adapter.embed(texts, anonymize=False)
+
+    assert mock_client.embed.call_count == 3  # 50 + 50 + 20
+    assert [len(c.kwargs["texts"]) for c in mock_client.embed.call_args_list] == [50, 50, 20]
+    assert response.embeddings == [[float(i)] for i in range(120)]
+    assert response.tokens_used == 120
+
+
+def test_split_embedding_batches_respects_token_budget():
+    """Test split_embedding_batches : limite textes + budget tokens estimé"""
+    texts = ["a" * 299, "b" * 299, "c" * 299, "d"]  # ~100 tokens chacun (3 chars/token)
+
+    batches = split_embedding_batches(texts, max_texts=50, max_tokens=250)
+
+    assert batches == [["a" * 299, "b" * 299], ["c" * 299, "d"]]
+    assert split_embedding_batches(["x"] * 5, max_texts=2) == [["x", "x"], ["x", "x"], ["x"]]
+
+
+@pytest.mark.asyncio
+async def test_voyage_embed_runs_off_event_loop():
+    """Test appel Voyage sync exécuté dans un thread (event loop non bloquée)"""
+    import threading
+
+    loop_thread = threading.get_ident()
+    call_threads = []
+
+    def fake_embed(texts, model, input_type):
+        call_threads.append(threading.get_ident())
+        response = MagicMock()
+        response.embeddings = [[0.1]] * len(texts)
+        response.total_tokens = 1
+        return response
+
+    mock_client = MagicMock()
+    mock_client.embed = MagicMock(side_effect=fake_embed)
+
+    with patch("voyageai.Client", return_value=mock_client):
         adapter = VoyageAIAdapter(api_key="vo-test-key")
+        await adapter.embed(["text"], anonymize=False)
+        await adapter.embed_query("query", anonymize=False)
+
+    assert len(call_threads) == 2
+    assert all(thread != loop_thread for thread in call_threads)
+
 
-        texts = ["text"] * 51  # 51 textes
+@pytest.mark.asyncio
+async def test_rate_limiter_waits_when_window_full():
+    """Test RateLimiter : au-delà de N requêtes dans la fenêtre → attente"""
+    limiter = RateLimiter(requests_per_minute=2, window_seconds=0.05)
+
+    start = time.monotonic()
+    for _ in range(3):
+        await limiter.acquire()
 
-        with pytest.raises(ValueError, match="Batch max 50 textes"):
-            await adapter.embed(texts, anonymize=False)
+    assert time.monotonic() - start >= 0.04
 
 
 @pytest.mark.asyncio
@@ -240,6 +306,7 @@ async def test_pgvector_search_with_filters():
 
     mock_conn = AsyncMock()
     mock_conn.fetch.return_value = []
+    mock_conn.fetchval.return_value = 100_000  # Ensemble filtré volumineux → HNSW itératif
     mock_pool = AsyncMock()
     # Configurer acquire() pour retourner un async context manager
     mock_acquire = AsyncMock()
@@ -259,9 +326,27 @@ async def test_pgvector_search_with_filters():
     query_sql = call_args[0]
 
     assert "WHERE" in query_sql
-    assert "n.node_type = $3" in query_sql  # Filter node_type
+    assert "n.type = $3" in query_sql  # Filter node_type (colonne knowledge.nodes.type)
     assert "e.created_at >= $4" in query_sql  # Filter date_range.start
 
+    # COUNT borné des lignes éligibles : filtres numérotés depuis $1
+    count_sql = mock_conn.fetchval.call_args[0][0]
+    assert "n.type = $1" in count_sql
+    assert "e.created_at >= $2" in count_sql
+
+
+@pytest.mark.asyncio
+async def test_pgvector_search_source_type_literal_for_partial_index():
+    """source_type avec index HNSW partiel → littéral SQL, sinon paramètre"""
+
+    where_sql, params = PgvectorStore._build_filters({"source_type": "email"}, param_idx=3)
+    assert where_sql == "WHERE e.source_type = 'email'"
+    assert params == []
+
+    where_sql, params = PgvectorStore._build_filters({"source_type": "person"}, param_idx=3)
+    assert where_sql == "WHERE e.source_type = $3"
+    assert params == ["person"]
+
 
 @pytest.mark.asyncio
 async def test_pgvector_search_top_k_limit():
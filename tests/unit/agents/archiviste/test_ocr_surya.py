@@ -8,8 +8,13 @@ from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, call, patch
 
 import pytest
-from agents.src.agents.archiviste.models import OCRResult
-from agents.src.agents.archiviste.ocr import SuryaOCREngine
+from agents.src.agents.archiviste.models import OCRPage, OCRResult
+from agents.src.agents.archiviste.ocr import (
+    OCR_TEXT_LAYER_MIN_COVERAGE,
+    SuryaOCREngine,
+    text_layer_coverage,
+    text_layer_needs_ocr,
+)
 
 
 @pytest.fixture
@@ -127,6 +132,7 @@ async def test_ocr_document_pdf_multipage(
         mock_pix.height = 1000
         mock_pix.samples = b"fake_image_data"
         mock_page.get_pixmap.return_value = mock_pix
+        mock_page.get_text.return_value = ""  # PDF scanné : pas de couche texte
         mock_pages.append(mock_page)
 
     mock_pdf.__getitem__.side_effect = lambda i: mock_pages[i]
@@ -158,6 +164,8 @@ async def test_ocr_document_pdf_multipage(
     async def mock_thread_exec(func, *args, **kwargs):
         if getattr(func, "__name__", "") == "run_ocr":
             return [page1_result, page2_result, page3_result]
+        if getattr(func, "__name__", "") in ("_read_text_layer", "_render_pdf_pages"):
+            return func(*args, **kwargs)
         return MagicMock()
 
     mock_to_thread.side_effect = mock_thread_exec
@@ -175,6 +183,233 @@ async def test_ocr_document_pdf_multipage(
     assert result.page_count == 3
 
 
+def _mock_pdf(page_count: int, page_texts: list[str] | None = None):
+    """
+    PDF PyMuPDF simulé : page_count pages, couche texte page_texts (défaut : scan).
+    Pages sans couche texte = scans (une image raster), les autres sans image.
+    """
+    page_texts = page_texts or [""] * page_count
+    mock_pdf = MagicMock()
+    mock_pdf.__len__.return_value = page_count
+    mock_pages = []
+    for index in range(page_count):
+        mock_page = MagicMock()
+        mock_pix = MagicMock()
+        mock_pix.width = 800
+        mock_pix.height = 1000
+        mock_pix.samples = b"fake_image_data"
+        mock_page.get_pixmap.return_value = mock_pix
+        mock_page.get_text.return_value = page_texts[index]
+        mock_page.get_images.return_value = [] if page_texts[index] else [SCAN_IMAGE]
+        mock_pages.append(mock_page)
+    mock_pdf.__getitem__.side_effect = lambda i: mock_pages[i]
+    return mock_pdf, mock_pages
+
+
+# Entrée page.get_images() : (xref, smask, width, height, bpc, colorspace, ...)
+SCAN_IMAGE = (12, 0, 2480, 3508, 8, "DeviceRGB", "", "Im0", "DCTDecode")
+
+
+def _page_result(text: str, confidence: float):
+    """Prédiction Surya d'une page (une ligne)."""
+    result = MagicMock()
+    line = MagicMock()
+    line.text = text
+    line.confidence = confidence
+    result.text_lines = [line]
+    return result
+
+
+@pytest.mark.asyncio
+@patch("agents.src.agents.archiviste.ocr.fitz")
+@patch("agents.src.agents.archiviste.ocr.Image")
+@patch("agents.src.agents.archiviste.ocr.asyncio.to_thread")
+@patch("agents.src.agents.archiviste.ocr.Path")
+async def test_ocr_document_pdf_batches_pages(
+    mock_path_class, mock_to_thread, mock_image, mock_fitz, ocr_engine
+):
+    """
+    Rendu + OCR par lots : 3 pages, batch_size=2 → deux appels run_ocr (2 puis 1 image),
+    une liste de langues par image, dpi transmis à get_pixmap().
+    """
+    mock_path = MagicMock()
+    mock_path.exists.return_value = True
+    mock_path.suffix = ".pdf"
+    mock_path_class.return_value = mock_path
+
+    mock_pdf, mock_pages = _mock_pdf(3)
+    mock_fitz.open.return_value = mock_pdf
+
+    run_ocr_calls = []
+
+    async def mock_thread_exec(func, *args, **kwargs):
+        name = getattr(func, "__name__", "")
+        if name == "run_ocr":
+            images, langs = args[0], args[1]
+            run_ocr_calls.append((len(images), langs))
+            return [
+                _page_result(f"Ligne {len(run_ocr_calls)}.{i}", 0.9) for i in range(len(images))
+            ]
+        if name in ("_read_text_layer", "_render_pdf_pages"):
+            return func(*args, **kwargs)
+        return MagicMock()
+
+    mock_to_thread.side_effect = mock_thread_exec
+
+    result = await ocr_engine.ocr_document("releve.pdf", dpi=150, batch_size=2)
+
+    assert [count for count, _ in run_ocr_calls] == [2, 1]
+    assert run_ocr_calls[0][1] == [["fr"], ["fr"]]
+    assert result.page_count == 3
+    assert result.text.splitlines() == ["Ligne 1.0", "Ligne 1.1", "Ligne 2.0"]
+    for page in mock_pages:
+        page.get_pixmap.assert_called_once_with(dpi=150)
+    # Lecture couche texte + un rendu par lot, PDF refermé à chaque fois
+    assert mock_fitz.open.call_count == 3
+    assert mock_pdf.close.call_count == 3
+
+
+@pytest.mark.asyncio
+@patch("agents.src.agents.archiviste.ocr.fitz")
+@patch("agents.src.agents.archiviste.ocr.Image")
+@patch("agents.src.agents.archiviste.ocr.asyncio.to_thread")
+@patch("agents.src.agents.archiviste.ocr.Path")
+async def test_ocr_pages_streams_per_page(
+    mock_path_class, mock_to_thread, mock_image, mock_fitz, ocr_engine
+):
+    """ocr_pages() produit un OCRPage par page, confiance par page."""
+    mock_path = MagicMock()
+    mock_path.exists.return_value = True
+    mock_path.suffix = ".pdf"
+    mock_path_class.return_value = mock_path
+
+    mock_pdf, _ = _mock_pdf(3)
+    mock_fitz.open.return_value = mock_pdf
+
+    confidences = iter([0.9, 0.8, 0.7])
+
+    async def mock_thread_exec(func, *args, **kwargs):
+        name = getattr(func, "__name__", "")
+        if name == "run_ocr":
+            return [_page_result("Texte", next(confidences)) for _ in args[0]]
+        if name in ("_read_text_layer", "_render_pdf_pages"):
+            return func(*args, **kwargs)
+        return MagicMock()
+
+    mock_to_thread.side_effect = mock_thread_exec
+
+    pages = [page async for page in ocr_engine.ocr_pages("gros.pdf", batch_size=1)]
+
+    assert all(isinstance(page, OCRPage) for page in pages)
+    assert [page.page_number for page in pages] == [1, 2, 3]
+    assert [page.confidence for page in pages] == [0.9, 0.8, 0.7]
+
+
+NATIVE_PAGE = "FACTURE N° 2026-0042\nLaboratoire Cerba\nTotal TTC : 145,00 EUR\nDate : 08/02/2026"
+
+
+@pytest.mark.asyncio
+@patch("agents.src.agents.archiviste.ocr.fitz")
+@patch("agents.src.agents.archiviste.ocr.Image")
+@patch("agents.src.agents.archiviste.ocr.asyncio.to_thread")
+@patch("agents.src.agents.archiviste.ocr.Path")
+async def test_ocr_document_native_pdf_skips_surya(
+    mock_path_class, mock_to_thread, mock_image, mock_fitz, ocr_engine
+):
+    """PDF natif : couche texte lue, Surya ni chargé ni appelé."""
+    mock_path = MagicMock()
+    mock_path.exists.return_value = True
+    mock_path.suffix = ".pdf"
+    mock_path_class.return_value = mock_path
+
+    mock_pdf, mock_pages = _mock_pdf(2, [NATIVE_PAGE, NATIVE_PAGE])
+    mock_fitz.open.return_value = mock_pdf
+
+    called = []
+
+    async def mock_thread_exec(func, *args, **kwargs):
+        name = getattr(func, "__name__", "")
+        called.append(name)
+        if name == "_read_text_layer":
+            return func(*args, **kwargs)
+        return MagicMock()
+
+    mock_to_thread.side_effect = mock_thread_exec
+
+    result = await ocr_engine.ocr_document("facture_native.pdf")
+
+    assert called == ["_read_text_layer"]
+    assert ocr_engine.model is None
+    assert result.extraction_method == "text_layer"
+    assert result.text_layer_pages == 2
+    assert result.page_count == 2
+    assert result.confidence == 1.0
+    assert "Laboratoire Cerba" in result.text
+    for page in mock_pages:
+        page.get_pixmap.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("agents.src.agents.archiviste.ocr.fitz")
+@patch("agents.src.agents.archiviste.ocr.Image")
+@patch("agents.src.agents.archiviste.ocr.asyncio.to_thread")
+@patch("agents.src.agents.archiviste.ocr.Path")
+async def test_ocr_document_mixed_pdf_ocrs_scanned_pages_only(
+    mock_path_class, mock_to_thread, mock_image, mock_fitz, ocr_engine
+):
+    """PDF mixte : seule la page scannée est rendue et passée à Surya, ordre conservé."""
+    mock_path = MagicMock()
+    mock_path.exists.return_value = True
+    mock_path.suffix = ".pdf"
+    mock_path_class.return_value = mock_path
+
+    mock_pdf, mock_pages = _mock_pdf(3, [NATIVE_PAGE, "", NATIVE_PAGE])
+    mock_fitz.open.return_value = mock_pdf
+
+    async def mock_thread_exec(func, *args, **kwargs):
+        name = getattr(func, "__name__", "")
+        if name == "run_ocr":
+            assert len(args[0]) == 1
+            return [_page_result("Annexe scannée", 0.8)]
+        if name in ("_read_text_layer", "_render_pdf_pages"):
+            return func(*args, **kwargs)
+        return MagicMock()
+
+    mock_to_thread.side_effect = mock_thread_exec
+
+    pages = [page async for page in ocr_engine.ocr_pages("facture_annexe.pdf")]
+
+    assert [page.source for page in pages] == ["text_layer", "ocr", "text_layer"]
+    assert pages[1].text == "Annexe scannée"
+    mock_pages[0].get_pixmap.assert_not_called()
+    mock_pages[1].get_pixmap.assert_called_once()
+    mock_pages[2].get_pixmap.assert_not_called()
+
+
+def test_text_layer_coverage_scores():
+    """Score couche texte : vide → 0, page dense → 1, texte illisible pénalisé."""
+    assert text_layer_coverage("") == 0.0
+    assert text_layer_coverage("  \n ") == 0.0
+    assert text_layer_coverage(NATIVE_PAGE) == 1.0
+    assert text_layer_coverage("Page 1/3") < OCR_TEXT_LAYER_MIN_COVERAGE
+    assert text_layer_coverage("\ufffd" * 80) == 0.0
+
+
+def test_text_layer_needs_ocr_only_for_raster_or_unreadable_pages():
+    """OCR : page scannée (image) ou couche texte illisible, jamais page native courte."""
+    # Pages natives sans image : blanche, couverture, signature → couche texte
+    assert text_layer_needs_ocr("", has_images=False) is False
+    assert text_layer_needs_ocr("Page 1/3", has_images=False) is False
+    assert text_layer_needs_ocr("Lu et approuvé\nSignature", has_images=False) is False
+    # Police sans table ToUnicode : couche texte présente mais illisible
+    assert text_layer_needs_ocr("\ufffd" * 80, has_images=False) is True
+    # Scan : image sans couche texte (ou quelques caractères) → Surya
+    assert text_layer_needs_ocr("", has_images=True) is True
+    assert text_layer_needs_ocr("Page 1/3", has_images=True) is True
+    # Page native dense avec logo : couche texte
+    assert text_layer_needs_ocr(NATIVE_PAGE, has_images=True) is False
+
+
 @pytest.mark.asyncio
 @patch("agents.src.agents.archiviste.ocr.Image")
 @patch("agents.src.agents.archiviste.ocr.asyncio.to_thread")
@@ -11,6 +11,7 @@ Tests:
 - Excerpt extraction (<= 200 chars)
 - ActionResult wrapper
 - Métriques search_metrics integration
+- Cache embeddings query (hit → aucun appel Voyage)
 
 Date: 2026-02-16
 Story: 3.3 - Task 4
@@ -22,21 +23,41 @@ from uuid import uuid4
 
 import pytest
 from agents.src.agents.archiviste.models import SearchResult
-from agents.src.agents.archiviste.semantic_search import EXCERPT_LENGTH, TOP_K_MAX, SemanticSearcher
+from agents.src.agents.archiviste.semantic_search import (
+    EXCERPT_LENGTH,
+    TOP_K_MAX,
+    SemanticSearcher,
+    looks_like_identifier,
+)
 from agents.src.middleware.models import ActionResult
 from agents.src.tools.anonymize import AnonymizationResult
+from agents.src.tools.query_embedding_cache import QueryEmbeddingCache
 
 # ============================================================
 # Fixtures
 # ============================================================
 
 
+@pytest.fixture(autouse=True)
+def query_cache():
+    """Cache embeddings query vierge par test (l'instance globale fuirait entre tests)."""
+    cache = QueryEmbeddingCache()
+    with patch("agents.src.agents.archiviste.semantic_search.query_embedding_cache", cache):
+        yield cache
+
+
 @pytest.fixture
 def db_pool():
-    """Fixture asyncpg pool mock."""
+    """Fixture asyncpg pool mock (acquire() renvoie le pool lui-même comme connexion)."""
     pool = AsyncMock()
     pool.execute = AsyncMock()
     pool.fetch = AsyncMock(return_value=[])
+    # Ensemble filtré volumineux par défaut → chemin HNSW itératif
+    pool.fetchval = AsyncMock(return_value=100_000)
+    acquire = AsyncMock()
+    acquire.__aenter__ = AsyncMock(return_value=pool)
+    acquire.__aexit__ = AsyncMock(return_value=None)
+    pool.acquire = MagicMock(return_value=acquire)
     return pool
 
 
@@ -124,7 +145,7 @@ async def test_search_basic_success(
         "agents.src.agents.archiviste.semantic_search.anonymize_text",
         return_value=mock_anonymization_result,
     ):
-        mock_adapter = AsyncMock()
+        mock_adapter = AsyncMock(model="voyage-4-large", dimensions=1024)
         mock_adapter.embed.return_value = mock_embedding_response
 
         with patch(
@@ -188,7 +209,7 @@ async def test_anonymization_before_embedding(
         "agents.src.agents.archiviste.semantic_search.anonymize_text",
         return_value=mock_anonymization_result,
     ) as mock_anonymize:
-        mock_adapter = AsyncMock()
+        mock_adapter = AsyncMock(model="voyage-4-large", dimensions=1024)
         mock_adapter.embed.return_value = mock_embedding_response
 
         with patch(
@@ -221,7 +242,7 @@ async def test_search_filter_category(searcher, mock_anonymization_result, mock_
         "agents.src.agents.archiviste.semantic_search.anonymize_text",
         return_value=mock_anonymization_result,
     ):
-        mock_adapter = AsyncMock()
+        mock_adapter = AsyncMock(model="voyage-4-large", dimensions=1024)
         mock_adapter.embed.return_value = mock_embedding_response
 
         with patch(
@@ -230,8 +251,15 @@ async def test_search_filter_category(searcher, mock_anonymization_result, mock_
         ):
             await searcher.search(query="facture", filters={"category": "finance"})
 
-    # Vérifier SET LOCAL hnsw.iterative_scan activé
-    searcher.db_pool.execute.assert_called_once_with("SET LOCAL hnsw.iterative_scan = on")
+    # Ensemble filtré volumineux → HNSW itératif (session de la connexion)
+    settings = searcher.db_pool.execute.call_args_list[0][0][0]
+    assert "SET hnsw.iterative_scan = strict_order" in settings
+    assert "SET hnsw.ef_search = 200" in settings
+
+    # COUNT borné : filtres numérotés depuis $1
+    count_sql = searcher.db_pool.fetchval.call_args[0][0]
+    assert "dm.classification_category = $1" in count_sql
+    assert searcher.db_pool.fetchval.call_args[0][1:] == ("finance",)
 
     # Vérifier query SQL contient filtre category
     fetch_call = searcher.db_pool.fetch.call_args
@@ -259,7 +287,7 @@ async def test_search_multiple_filters(
         "agents.src.agents.archiviste.semantic_search.anonymize_text",
         return_value=mock_anonymization_result,
     ):
-        mock_adapter = AsyncMock()
+        mock_adapter = AsyncMock(model="voyage-4-large", dimensions=1024)
         mock_adapter.embed.return_value = mock_embedding_response
 
         with patch(
@@ -332,7 +360,7 @@ async def test_search_action_success(
         "agents.src.agents.archiviste.semantic_search.anonymize_text",
         return_value=mock_anonymization_result,
     ):
-        mock_adapter = AsyncMock()
+        mock_adapter = AsyncMock(model="voyage-4-large", dimensions=1024)
         mock_adapter.embed.return_value = mock_embedding_response
 
         with patch(
@@ -376,7 +404,7 @@ async def test_search_no_results(searcher, mock_anonymization_result, mock_embed
         "agents.src.agents.archiviste.semantic_search.anonymize_text",
         return_value=mock_anonymization_result,
     ):
-        mock_adapter = AsyncMock()
+        mock_adapter = AsyncMock(model="voyage-4-large", dimensions=1024)
         mock_adapter.embed.return_value = mock_embedding_response
 
         with patch(
@@ -404,7 +432,7 @@ async def test_search_records_metrics(
         "agents.src.agents.archiviste.semantic_search.anonymize_text",
         return_value=mock_anonymization_result,
     ):
-        mock_adapter = AsyncMock()
+        mock_adapter = AsyncMock(model="voyage-4-large", dimensions=1024)
         mock_adapter.embed.return_value = mock_embedding_response
 
         with patch(
@@ -432,21 +460,247 @@ async def test_search_records_metrics(
 async def test_no_iterative_scan_without_filters(
     searcher, mock_anonymization_result, mock_embedding_response
 ):
-    """Test SET LOCAL hnsw.iterative_scan NON appelé sans filtres."""
+    """Sans filtres : ni COUNT ni scan itératif, seulement ef_search >= top_k."""
     searcher.db_pool.fetch.return_value = []
 
     with patch(
         "agents.src.agents.archiviste.semantic_search.anonymize_text",
         return_value=mock_anonymization_result,
     ):
-        mock_adapter = AsyncMock()
+        mock_adapter = AsyncMock(model="voyage-4-large", dimensions=1024)
+        mock_adapter.embed.return_value = mock_embedding_response
+
+        with patch(
+            "agents.src.agents.archiviste.semantic_search.get_embedding_adapter",
+            return_value=mock_adapter,
+        ):
+            await searcher.search(query="test", top_k=100)
+
+    searcher.db_pool.fetchval.assert_not_called()
+    searcher.db_pool.execute.assert_called_once_with("SET hnsw.ef_search = 100")
+
+    # Prédicat littéral → index HNSW partiel documents (migration 048)
+    # (mode hybride : la branche lexicale appelle aussi fetch)
+    vector_sqls = [
+        c[0][0] for c in searcher.db_pool.fetch.call_args_list if "e.embedding <=>" in c[0][0]
+    ]
+    assert vector_sqls
+    assert "e.source_type = 'document'" in vector_sqls[-1]
+
+
+# ============================================================
+# Test 11b: petit ensemble filtré → scan exact
+# ============================================================
+
+
+@pytest.mark.asyncio
+async def test_selective_filter_uses_exact_scan(
+    searcher, mock_anonymization_result, mock_embedding_response, mock_db_rows
+):
+    """Peu de lignes éligibles → scan exact (index HNSW désactivé), pas d'itératif."""
+    searcher.db_pool.fetchval.return_value = 12
+    searcher.db_pool.fetch.return_value = mock_db_rows
+
+    with patch(
+        "agents.src.agents.archiviste.semantic_search.anonymize_text",
+        return_value=mock_anonymization_result,
+    ):
+        mock_adapter = AsyncMock(model="voyage-4-large", dimensions=1024)
         mock_adapter.embed.return_value = mock_embedding_response
 
         with patch(
             "agents.src.agents.archiviste.semantic_search.get_embedding_adapter",
             return_value=mock_adapter,
         ):
-            await searcher.search(query="test")
+            results = await searcher.search(
+                query="facture", filters={"category": "finance"}, mode="vector"
+            )
+
+    assert len(results) == 2
+    executed = [c[0][0] for c in searcher.db_pool.execute.call_args_list]
+    assert executed == ["SET enable_indexscan = off", "RESET enable_indexscan"]
 
-    # execute NE devrait PAS être appelé (pas de SET LOCAL)
-    searcher.db_pool.execute.assert_not_called()
+
+# ============================================================
+# Test 12: Recherche hybride (lexicale + vectorielle, RRF)
+# ============================================================
+
+
+def _row(document_id, title, score):
+    return {
+        "document_id": document_id,
+        "title": title,
+        "path": f"/archives/{title}",
+        "score": score,
+        "ocr_text": "texte",
+        "classification_category": "finance",
+        "classification_subcategory": "selarl",
+        "classification_confidence": 0.9,
+        "document_metadata": {},
+    }
+
+
+@pytest.mark.parametrize(
+    "query,expected",
+    [
+        ("FAC-2026-0042", True),
+        ("123 456 789 00012", True),
+        ("2026-01-15_Facture_Plombier.pdf", True),
+        ("FR76 3000 6000 0112 3456 7890 189", True),
+        ("facture plombier 2026", False),
+        ("2026", False),
+        ("garantie", False),
+    ],
+)
+def test_looks_like_identifier(query, expected):
+    """Identifiants (n° facture, SIRET, fichier, IBAN) vs langage naturel."""
+    assert looks_like_identifier(query) is expected
+
+
+@pytest.mark.asyncio
+async def test_identifier_fast_path_skips_embedding(searcher):
+    """Query identifiant → lexical seul : ni Presidio ni Voyage AI."""
+    searcher.db_pool.fetch.return_value = [_row(uuid4(), "FAC-2026-0042.pdf", 0.8)]
+
+    with patch("agents.src.agents.archiviste.semantic_search.anonymize_text") as mock_anonymize:
+        with patch(
+            "agents.src.agents.archiviste.semantic_search.get_embedding_adapter"
+        ) as mock_factory:
+            results = await searcher.search(query="FAC-2026-0042")
+
+    assert len(results) == 1
+    mock_anonymize.assert_not_called()
+    mock_factory.assert_not_called()
+    searcher.db_pool.fetch.assert_awaited_once()
+    sql = searcher.db_pool.fetch.call_args[0][0]
+    assert "websearch_to_tsquery('french', $1)" in sql
+    assert "$1 <% dm.filename" in sql
+
+
+@pytest.mark.asyncio
+async def test_identifier_fast_path_falls_back_to_hybrid(
+    searcher, mock_anonymization_result, mock_embedding_response
+):
+    """Fast path sans résultat lexical → recherche hybride complète."""
+    searcher.db_pool.fetch.return_value = []
+
+    with patch(
+        "agents.src.agents.archiviste.semantic_search.anonymize_text",
+        return_value=mock_anonymization_result,
+    ):
+        mock_adapter = AsyncMock(model="voyage-4-large", dimensions=1024)
+        mock_adapter.embed.return_value = mock_embedding_response
+
+        with patch(
+            "agents.src.agents.archiviste.semantic_search.get_embedding_adapter",
+            return_value=mock_adapter,
+        ):
+            results = await searcher.search(query="FAC-2026-0042")
+
+    assert results == []
+    mock_adapter.embed.assert_awaited_once()
+    # Fast path + (lexical, vectoriel) hybride
+    assert searcher.db_pool.fetch.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_reciprocal_rank_fusion(
+    searcher, mock_anonymization_result, mock_embedding_response
+):
+    """Documents présents dans les deux branches remontent en tête (RRF)."""
+    both, vector_only, lexical_only = uuid4(), uuid4(), uuid4()
+
+    async def fetch(sql, *params):
+        if "websearch_to_tsquery" in sql:
+            return [_row(lexical_only, "lexical.pdf", 0.9), _row(both, "both.pdf", 0.4)]
+        return [_row(vector_only, "vector.pdf", 0.95), _row(both, "both.pdf", 0.9)]
+
+    searcher.db_pool.fetch.side_effect = fetch
+
+    with patch(
+        "agents.src.agents.archiviste.semantic_search.anonymize_text",
+        return_value=mock_anonymization_result,
+    ):
+        mock_adapter = AsyncMock(model="voyage-4-large", dimensions=1024)
+        mock_adapter.embed.return_value = mock_embedding_response
+
+        with patch(
+            "agents.src.agents.archiviste.semantic_search.get_embedding_adapter",
+            return_value=mock_adapter,
+        ):
+            results = await searcher.search(query="facture plombier", top_k=3)
+
+    assert [r.document_id for r in results][0] == str(both)
+    assert {r.document_id for r in results} == {str(both), str(vector_only), str(lexical_only)}
+    assert sorted(results[0].metadata["retrieval"]) == ["lexical", "vector"]
+    assert results[0].metadata["vector_score"] == 0.9
+    assert all(0.0 <= r.score <= 1.0 for r in results)
+    assert results[0].score >= results[1].score >= results[2].score
+
+
+@pytest.mark.asyncio
+async def test_vector_mode_single_query(
+    searcher, mock_anonymization_result, mock_embedding_response, mock_db_rows
+):
+    """mode="vector" → uniquement la requête pgvector (comportement historique)."""
+    searcher.db_pool.fetch.return_value = mock_db_rows
+
+    with patch(
+        "agents.src.agents.archiviste.semantic_search.anonymize_text",
+        return_value=mock_anonymization_result,
+    ):
+        mock_adapter = AsyncMock(model="voyage-4-large", dimensions=1024)
+        mock_adapter.embed.return_value = mock_embedding_response
+
+        with patch(
+            "agents.src.agents.archiviste.semantic_search.get_embedding_adapter",
+            return_value=mock_adapter,
+        ):
+            results = await searcher.search(query="FAC-2026-0042", mode="vector")
+
+    searcher.db_pool.fetch.assert_awaited_once()
+    assert "e.embedding <=> $1" in searcher.db_pool.fetch.call_args[0][0]
+    assert results[0].score == pytest.approx(0.92)
+
+    with pytest.raises(ValueError, match="mode must be one of"):
+        await searcher.search(query="facture", mode="bm25")
+
+
+# ============================================================
+# Test: cache embeddings query
+# ============================================================
+
+
+@pytest.mark.asyncio
+async def test_repeated_query_served_from_embedding_cache(
+    searcher, query_cache, mock_anonymization_result, mock_embedding_response, mock_db_rows
+):
+    """Requête répétée → un seul appel Voyage, hit enregistré dans search_metrics."""
+    searcher.db_pool.fetch.return_value = mock_db_rows
+
+    with patch(
+        "agents.src.agents.archiviste.semantic_search.anonymize_text",
+        return_value=mock_anonymization_result,
+    ):
+        mock_adapter = AsyncMock(model="voyage-4-large", dimensions=1024)
+        mock_adapter.embed.return_value = mock_embedding_response
+
+        with (
+            patch(
+                "agents.src.agents.archiviste.semantic_search.get_embedding_adapter",
+                return_value=mock_adapter,
+            ),
+            patch("agents.src.agents.archiviste.semantic_search.search_metrics") as mock_metrics,
+        ):
+            await searcher.search(query="facture plombier Dupont", mode="vector")
+            await searcher.search(query="facture plombier Dupont", mode="vector")
+            # Autre modèle côté adaptateur → vecteur incompatible, pas de hit
+            mock_adapter.model = "voyage-3.5"
+            await searcher.search(query="facture plombier Dupont", mode="vector")
+
+    assert mock_adapter.embed.await_count == 2
+    hits = [c.kwargs["embedding_cache_hit"] for c in mock_metrics.record_query.call_args_list]
+    assert hits == [False, True, False]
+    # Clé = requête anonymisée (jamais le texte clair) + modèle de l'adaptateur
+    assert query_cache.get_stats()["memory_entries"] == 2
+    assert searcher.db_pool.fetch.call_args[0][1] == mock_embedding_response["embeddings"][0]
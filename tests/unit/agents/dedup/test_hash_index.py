@@ -0,0 +1,166 @@
+"""
+Unit tests for HashIndex (persistent dedup hash index).
+
+Tests:
+- Hashes of unchanged files reused across scans
+- Changed stat signature invalidates stored hashes
+- Unknown stored inode (Windows DirEntry) is not a change
+- Added / modified / removed files since the last scan
+- Removals only recorded after a complete walk
+- Scanner rescan reads only changed files
+"""
+
+import os
+
+import pytest
+from agents.src.agents.dedup.hash_index import HashIndex
+from agents.src.agents.dedup.models import ScanConfig
+from agents.src.agents.dedup.scanner import DedupScanner
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Hash index stored outside the scanned root."""
+    idx = HashIndex(tmp_path / "index" / "hashes.sqlite")
+    yield idx
+    idx.close()
+
+
+def _scan(index, root, rows, partial=None, full=None, complete=True):
+    """Run one scan cycle on the index and return the changes."""
+    index.begin_scan(root)
+    index.record_stats(rows)
+    changes = index.changes(root, complete)
+    cached = index.cached_hashes(partial_bytes=1024)
+    index.commit_scan(root, partial or {}, full or {}, partial_bytes=1024, complete=complete)
+    return changes, cached
+
+
+class TestHashIndex:
+    """HashIndex revalidation and change tracking."""
+
+    def test_unchanged_file_hashes_reused(self, index, tmp_path):
+        root = tmp_path / "data"
+        path = os.path.join(str(root), "a.bin")
+        _scan(index, root, [(path, 10, 1, 7)], partial={path: "p"}, full={path: "f"})
+
+        changes, cached = _scan(index, root, [(path, 10, 1, 7)])
+
+        assert cached == {path: ("p", "f")}
+        assert changes == ([], [], [])
+        assert index.previous_scan_date is not None
+
+    def test_changed_signature_invalidates_hashes(self, index, tmp_path):
+        root = tmp_path / "data"
+        path = os.path.join(str(root), "a.bin")
+        _scan(index, root, [(path, 10, 1, 7)], full={path: "f"})
+
+        changes, cached = _scan(index, root, [(path, 10, 2, 7)])  # mtime changed
+        assert cached == {}
+        assert changes[1] == [path]
+
+        # Hash dropped by the commit: still not reusable on the next scan
+        _, cached = _scan(index, root, [(path, 10, 2, 7)])
+        assert cached == {}
+
+    def test_unknown_stored_inode_not_a_change(self, index, tmp_path):
+        """Rows written with Windows DirEntry stats (inode 0) stay valid, then get the inode."""
+        root = tmp_path / "data"
+        path = os.path.join(str(root), "a.bin")
+        _scan(index, root, [(path, 10, 1, 0)], full={path: "f"})
+
+        changes, cached = _scan(index, root, [(path, 10, 1, 7)])
+        assert cached == {path: (None, "f")}
+        assert changes == ([], [], [])
+
+        changes, cached = _scan(index, root, [(path, 10, 1, 8)])  # inode now known
+        assert cached == {}
+        assert changes[1] == [path]
+
+    def test_partial_hash_size_must_match(self, index, tmp_path):
+        root = tmp_path / "data"
+        path = os.path.join(str(root), "a.bin")
+        index.begin_scan(root)
+        index.record_stats([(path, 10, 1, 7)])
+        index.commit_scan(root, {path: "p"}, {}, partial_bytes=4096, complete=True)
+
+        _, cached = _scan(index, root, [(path, 10, 1, 7)])
+
+        assert cached == {}
+
+    def test_added_and_removed(self, index, tmp_path):
+        root = tmp_path / "data"
+        old = os.path.join(str(root), "old.bin")
+        new = os.path.join(str(root), "new.bin")
+        sibling = os.path.join(str(root) + "2", "other.bin")  # same prefix, other root
+        _scan(index, root, [(old, 10, 1, 1), (sibling, 10, 1, 2)])
+
+        (added, modified, removed), _ = _scan(index, root, [(new, 10, 1, 3)])
+
+        assert added == [new]
+        assert modified == []
+        assert removed == [old]
+
+    def test_incomplete_walk_keeps_unseen_files(self, index, tmp_path):
+        root = tmp_path / "data"
+        a = os.path.join(str(root), "a.bin")
+        b = os.path.join(str(root), "b.bin")
+        _scan(index, root, [(a, 10, 1, 1), (b, 10, 1, 2)], full={a: "fa", b: "fb"})
+
+        (_, _, removed), _ = _scan(index, root, [(a, 10, 1, 1)], complete=False)
+        assert removed == []
+
+        _, cached = _scan(index, root, [(a, 10, 1, 1), (b, 10, 1, 2)])
+        assert cached == {a: (None, "fa"), b: (None, "fb")}
+
+
+class TestScannerWithIndex:
+    """DedupScanner reusing the index across scans."""
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        root = tmp_path / "data"
+        root.mkdir()
+        return ScanConfig(
+            root_path=root,
+            excluded_folders=set(),
+            min_file_size=1,
+            hash_workers=1,
+            hash_index_path=tmp_path / "index.sqlite",
+        )
+
+    @pytest.mark.asyncio
+    async def test_rescan_reads_only_changed_files(self, config):
+        root = config.root_path
+        for i in range(3):
+            (root / f"dup_{i}.bin").write_bytes(b"same" * 100)
+        (root / "other.bin").write_bytes(b"diff" * 100)
+
+        first = DedupScanner(config=config)
+        result = await first.scan()
+        assert result.duplicate_groups_count == 1
+        assert result.changes is None
+        assert first.stats.bytes_hashed == 4 * 400
+
+        second = DedupScanner(config=config)
+        result = await second.scan()
+        assert result.duplicate_groups_count == 1
+        assert len(result.groups[0].files) == 3
+        assert second.stats.bytes_hashed == 0
+        assert second.stats.hashes_reused == 4
+        assert result.changes.added == []
+        assert result.changes.modified == []
+
+        # Same size, new content: only this file is read again
+        changed = root / "other.bin"
+        changed.write_bytes(b"same" * 100)
+        stat = changed.stat()
+        os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        (root / "dup_2.bin").unlink()
+
+        third = DedupScanner(config=config)
+        result = await third.scan()
+        assert third.stats.bytes_hashed == 400
+        assert len(result.groups[0].files) == 3
+        assert result.changes.modified == [changed]
+        assert result.changes.removed == [root / "dup_2.bin"]
@@ -3,7 +3,9 @@ Unit tests for DedupScanner (Story 3.8, AC1 + AC2).
 
 Tests:
 - Exclusion rules (system paths, dev folders, extensions, size)
+- os.scandir walker (pruning, priority paths walked once, symlinks)
 - SHA256 chunked hashing
+- Size -> partial hash -> full hash pipeline
 - Duplicate grouping
 - Priority paths scanned first
 - Edge cases (symlinks, permissions, file deleted during scan)
@@ -17,7 +19,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 from agents.src.agents.dedup.models import ScanConfig
-from agents.src.agents.dedup.scanner import DedupScanner
+from agents.src.agents.dedup.scanner import DedupScanner, hash_file_partial
 
 
 @pytest.fixture
@@ -252,6 +254,257 @@ class TestDuplicateGrouping:
         assert result.total_duplicates == 3  # (2-1) + (3-1) = 3
 
 
+# ============================================================================
+# AC1: Parallel os.scandir walker
+# ============================================================================
+
+
+class TestWalker:
+    """Test directory pruning and single visit of each directory."""
+
+    def test_list_directory_prunes_dev_folders(self, clean_scanner, tmp_path):
+        """Excluded directories are not returned for descent."""
+        (tmp_path / "node_modules").mkdir()
+        (tmp_path / ".git").mkdir()
+        (tmp_path / "photos").mkdir()
+        (tmp_path / "photo.jpg").write_bytes(b"x" * 200)
+        (tmp_path / "setup.exe").write_bytes(b"x" * 200)
+
+        directory, files, subdirs, skipped, errors = clean_scanner._list_directory(str(tmp_path))
+
+        assert directory == str(tmp_path)
+        assert subdirs == [str(tmp_path / "photos")]
+        assert [f[0] for f in files] == [str(tmp_path / "photo.jpg")]
+        assert files[0][1] == 200
+        assert skipped == 1
+        assert errors == 0
+
+    def test_list_directory_reads_inode_when_dir_entry_has_none(self, tmp_path):
+        """Windows DirEntry stat has st_ino = 0: the hash index gets entry.inode()."""
+        (tmp_path / "photo.jpg").write_bytes(b"x" * 200)
+        real_scandir = os.scandir
+
+        class WindowsEntry:
+            def __init__(self, entry):
+                self._entry = entry
+                self.path, self.name = entry.path, entry.name
+
+            def __getattr__(self, name):
+                return getattr(self._entry, name)
+
+            def stat(self, follow_symlinks=True):
+                stat = self._entry.stat(follow_symlinks=follow_symlinks)
+                return os.stat_result((stat.st_mode, 0, *stat[2:]))
+
+            def inode(self):
+                return 4242
+
+        class WindowsScandir:
+            def __init__(self, path):
+                self._it = real_scandir(path)
+
+            def __enter__(self):
+                return (WindowsEntry(entry) for entry in self._it)
+
+            def __exit__(self, *exc):
+                self._it.close()
+
+        with_index = DedupScanner(
+            config=ScanConfig(
+                root_path=tmp_path,
+                excluded_folders=set(),
+                min_file_size=1,
+                hash_index_path=tmp_path / "index.sqlite",
+            )
+        )
+        without_index = DedupScanner(
+            config=ScanConfig(root_path=tmp_path, excluded_folders=set(), min_file_size=1)
+        )
+        with patch("agents.src.agents.dedup.scanner.os.scandir", WindowsScandir):
+            _, indexed, _, _, _ = with_index._list_directory(str(tmp_path))
+            _, plain, _, _, _ = without_index._list_directory(str(tmp_path))
+
+        assert indexed[0][3] == 4242
+        # Without the index, no extra call per file
+        assert plain[0][3] == 0
+
+    @pytest.mark.asyncio
+    async def test_pruned_directory_never_listed(self, clean_config, tmp_path):
+        """Files below a dev folder are neither listed nor counted."""
+        deps = tmp_path / "project" / "node_modules" / "pkg"
+        deps.mkdir(parents=True)
+        (deps / "index.js").write_bytes(b"x" * 200)
+        (tmp_path / "project" / "main.py").write_bytes(b"y" * 200)
+
+        scanner = DedupScanner(config=clean_config)
+        listed = []
+        original = scanner._list_directory
+        scanner._list_directory = lambda d: listed.append(d) or original(d)
+        result = await scanner.scan()
+
+        assert result.total_scanned == 1
+        assert not any("node_modules" in d for d in listed)
+
+    @pytest.mark.asyncio
+    async def test_priority_path_walked_once(self, tmp_path):
+        """Root walk skips directories already walked as priority paths."""
+        photos = tmp_path / "BeeStation" / "Photos"
+        photos.mkdir(parents=True)
+        for i in range(3):
+            (photos / f"img_{i}.jpg").write_bytes(f"image {i}".encode() * 20)
+        (tmp_path / "notes.txt").write_bytes(b"notes" * 20)
+
+        config = ScanConfig(
+            root_path=tmp_path,
+            priority_paths={str(Path("BeeStation") / "Photos"): 100, "BeeStation": 80},
+            excluded_folders=set(),
+            min_file_size=1,
+        )
+        scanner = DedupScanner(config=config)
+        result = await scanner.scan()
+
+        assert result.total_scanned == 4
+
+    @pytest.mark.asyncio
+    async def test_symlinked_directory_not_followed(self, clean_config, tmp_path):
+        """A symlink to a directory is not walked (no loop, no double count)."""
+        real = tmp_path / "real"
+        real.mkdir()
+        (real / "file.bin").write_bytes(b"x" * 200)
+        try:
+            (tmp_path / "loop").symlink_to(tmp_path, target_is_directory=True)
+        except OSError:
+            pytest.skip("Symlinks not supported on this platform")
+
+        scanner = DedupScanner(config=clean_config)
+        result = await scanner.scan()
+
+        assert result.total_scanned == 1
+
+    @pytest.mark.asyncio
+    async def test_walk_progress_reports_directory(self, clean_config, tmp_path):
+        """Walk progress goes through progress_callback with phase and directory."""
+        for i in range(100):
+            (tmp_path / f"file_{i}.txt").write_bytes(f"content {i}".encode())
+
+        phases = []
+        scanner = DedupScanner(
+            config=clean_config,
+            progress_callback=lambda stats: phases.append((stats.phase, stats.current_directory)),
+        )
+        await scanner.scan()
+
+        assert ("walk", str(tmp_path)) in phases
+
+
+# ============================================================================
+# AC2: Size -> partial hash -> full hash pipeline
+# ============================================================================
+
+
+class TestMultiStageHashing:
+    """Test that only files that can still have a duplicate are read."""
+
+    def test_hash_file_partial_head_and_tail(self, tmp_path):
+        """Partial hash covers first + last block only."""
+        content = b"A" * 100 + b"middle" + b"Z" * 100
+        f = tmp_path / "file.bin"
+        f.write_bytes(content)
+
+        digest, bytes_read = hash_file_partial(str(f), partial_bytes=100)
+
+        assert digest == hashlib.sha256(b"A" * 100 + b"Z" * 100).hexdigest()
+        assert bytes_read == 200
+
+    def test_hash_file_partial_small_file_not_read_twice(self, tmp_path):
+        """Head and tail never overlap on a file smaller than 2 blocks."""
+        f = tmp_path / "small.bin"
+        f.write_bytes(b"0123456789")
+
+        digest, bytes_read = hash_file_partial(str(f), partial_bytes=8)
+
+        assert digest == hashlib.sha256(b"0123456789").hexdigest()
+        assert bytes_read == 10
+
+    @pytest.mark.asyncio
+    async def test_unique_sizes_are_never_read(self, clean_config, tmp_path):
+        """Files with a unique size cannot be duplicates: no hashing at all."""
+        for i in range(5):
+            (tmp_path / f"unique_{i}.bin").write_bytes(b"x" * (100 + i))
+
+        scanner = DedupScanner(config=clean_config)
+        result = await scanner.scan()
+
+        assert result.total_scanned == 5
+        assert result.duplicate_groups_count == 0
+        assert scanner.stats.bytes_hashed == 0
+        assert scanner.hash_cache == {}
+
+    @pytest.mark.asyncio
+    async def test_partial_hash_rules_out_same_size_files(self, tmp_path):
+        """Same size, different head: partial hash only, no full read."""
+        config = ScanConfig(
+            root_path=tmp_path,
+            excluded_folders=set(),
+            min_file_size=1,
+            partial_hash_bytes=1024,
+            hash_workers=1,
+        )
+        size = 64 * 1024
+        (tmp_path / "a.bin").write_bytes(b"a" + b"x" * (size - 1))
+        (tmp_path / "b.bin").write_bytes(b"b" + b"x" * (size - 1))
+
+        scanner = DedupScanner(config=config)
+        result = await scanner.scan()
+
+        assert result.duplicate_groups_count == 0
+        assert scanner.stats.bytes_hashed == 2 * 2 * 1024
+        assert scanner.hash_cache == {}
+
+    @pytest.mark.asyncio
+    async def test_partial_collision_confirmed_by_full_hash(self, tmp_path):
+        """Same head/tail but different middle: full hash separates them."""
+        config = ScanConfig(
+            root_path=tmp_path,
+            excluded_folders=set(),
+            min_file_size=1,
+            partial_hash_bytes=1024,
+            hash_workers=1,
+        )
+        head, tail = b"h" * 1024, b"t" * 1024
+        (tmp_path / "a.bin").write_bytes(head + b"1" * 4096 + tail)
+        (tmp_path / "b.bin").write_bytes(head + b"2" * 4096 + tail)
+        (tmp_path / "c.bin").write_bytes(head + b"1" * 4096 + tail)
+
+        scanner = DedupScanner(config=config)
+        result = await scanner.scan()
+
+        assert result.duplicate_groups_count == 1
+        names = sorted(entry.file_path.name for entry in result.groups[0].files)
+        assert names == ["a.bin", "c.bin"]
+        assert len(scanner.hash_cache) == 3
+
+    @pytest.mark.asyncio
+    async def test_process_pool_hashing(self, tmp_path):
+        """hash_workers > 1: same groups via the process pool."""
+        config = ScanConfig(
+            root_path=tmp_path,
+            excluded_folders=set(),
+            min_file_size=1,
+            hash_workers=2,
+        )
+        for i in range(3):
+            (tmp_path / f"dup_{i}.bin").write_bytes(b"same content" * 100)
+        (tmp_path / "other.bin").write_bytes(b"diff content" * 100)
+
+        scanner = DedupScanner(config=config)
+        result = await scanner.scan()
+
+        assert result.duplicate_groups_count == 1
+        assert len(result.groups[0].files) == 3
+        assert result.groups[0].sha256_hash == hashlib.sha256(b"same content" * 100).hexdigest()
+
+
 # ============================================================================
 # Edge cases
 # ============================================================================
@@ -7,13 +7,14 @@ Coverage:
 - Recursive folder scan with filters
 - SHA256 deduplication
 - System files skip
-- Pipeline processing
+- Pipeline processing (event-driven completion, windowed concurrency)
 - Rate limiting
 - Fail-safe error handling
 - Pause/cancel support
 """
 
 import asyncio
+import json
 from datetime import datetime, timedelta
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -213,44 +214,120 @@ def test_matches_filters_max_size(tmp_path):
 
 
 @pytest.mark.asyncio
-async def test_deduplicate_files_sha256():
+async def test_deduplicate_files_sha256(tmp_path):
     """
-    Test déduplication SHA256
+    Test déduplication SHA256 : une seule requête pour tous les hashes
 
     AC2: skip fichiers déjà traités
     """
+    from agents.src.agents.archiviste.batch_processor import (
+        BatchFilters,
+        BatchProcessor,
+        compute_sha256,
+    )
+
+    file1 = tmp_path / "file1.pdf"
+    file1.write_text("test1")
+    file2 = tmp_path / "file2.pdf"
+    file2.write_text("test2")
+
+    # file1 déjà en base
+    mock_db = MagicMock()
+    mock_db.fetch = AsyncMock(return_value=[{"sha256_hash": compute_sha256(file1)}])
+    mock_db.fetchval = AsyncMock()
+
+    processor = BatchProcessor(
+        batch_id="test",
+        folder_path=str(tmp_path),
+        filters=BatchFilters(),
+        progress_tracker=None,
+    )
+    processor.db = mock_db
+
+    deduped = await processor.deduplicate_files([file1, file2])
+
+    # Assert only file2 kept (file1 already exists in DB)
+    assert deduped == [file2]
+    mock_db.fetch.assert_called_once()
+    assert "ANY($1::text[])" in mock_db.fetch.call_args[0][0]
+    assert sorted(mock_db.fetch.call_args[0][1]) == sorted(
+        [compute_sha256(file1), compute_sha256(file2)]
+    )
+    mock_db.fetchval.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_deduplicate_files_skips_duplicates_in_batch(tmp_path):
+    """
+    Test contenu identique dans le même batch : traité une seule fois
+
+    AC2: déduplication SHA256
+    """
     from agents.src.agents.archiviste.batch_processor import BatchFilters, BatchProcessor
 
-    # Mock database
+    original = tmp_path / "facture.pdf"
+    original.write_bytes(b"same content")
+    copy = tmp_path / "facture (1).pdf"
+    copy.write_bytes(b"same content")
+    unreadable = tmp_path / "missing.pdf"  # Jamais créé : hash impossible
+
     mock_db = MagicMock()
-    mock_db.fetchval = AsyncMock(side_effect=[True, False])  # First exists, second doesn't
-
-    # Create temp files
-    import tempfile
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        file1 = Path(tmpdir) / "file1.pdf"
-        file1.write_text("test1")
-        file2 = Path(tmpdir) / "file2.pdf"
-        file2.write_text("test2")
-
-        # Processor
-        filters = BatchFilters()
-        processor = BatchProcessor(
-            batch_id="test",
-            folder_path=tmpdir,
-            filters=filters,
-            progress_tracker=None,
-        )
-        processor.db = mock_db
+    mock_db.fetch = AsyncMock(return_value=[])
+    mock_progress = MagicMock()
+
+    processor = BatchProcessor(
+        batch_id="test",
+        folder_path=str(tmp_path),
+        filters=BatchFilters(),
+        progress_tracker=mock_progress,
+    )
+    processor.db = mock_db
+
+    deduped = await processor.deduplicate_files([original, copy, unreadable])
+
+    # Fichier illisible conservé : il échouera (et sera rapporté) au traitement
+    assert deduped == [original, unreadable]
+    mock_progress.increment_skipped.assert_called_once_with(str(copy), "Duplicate in batch")
 
-        # Deduplicate
-        files = [file1, file2]
-        deduped = await processor.deduplicate_files(files)
 
-        # Assert only file2 kept (file1 already exists in DB)
-        assert len(deduped) == 1
-        assert deduped[0] == file2
+@pytest.mark.asyncio
+async def test_hash_files_reuses_cache_until_file_changes(tmp_path):
+    """
+    Test cache (path, size, mtime) : pas de re-hash tant que le fichier est inchangé
+
+    AC2: déduplication SHA256 (perf)
+    """
+    import os
+
+    from agents.src.agents.archiviste.batch_processor import BatchFilters, BatchProcessor
+
+    test_file = tmp_path / "test.pdf"
+    test_file.write_bytes(b"v1")
+
+    processor = BatchProcessor(
+        batch_id="test",
+        folder_path=str(tmp_path),
+        filters=BatchFilters(),
+        progress_tracker=None,
+    )
+
+    with patch(
+        "agents.src.agents.archiviste.batch_processor.compute_sha256",
+        side_effect=lambda path: f"hash-{path.read_bytes().decode()}",
+    ) as mock_hash:
+        first = await processor.hash_files([test_file])
+        second = await processor.hash_files([test_file])
+        assert mock_hash.call_count == 1
+        assert first == second == {test_file: "hash-v1"}
+
+        # Contenu modifié (taille + mtime) → re-hash
+        test_file.write_bytes(b"v2 longer")
+        stat = test_file.stat()
+        os.utime(test_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        third = await processor.hash_files([test_file])
+
+    assert mock_hash.call_count == 2
+    assert third == {test_file: "hash-v2 longer"}
 
 
 # ============================================================================
@@ -258,21 +335,59 @@ async def test_deduplicate_files_sha256():
 # ============================================================================
 
 
+class FakeStreams:
+    """Redis minimal : XREAD renvoie les événements poussés dans une queue."""
+
+    def __init__(self):
+        self.events: asyncio.Queue = asyncio.Queue()
+        self.reads = 0
+
+    async def xrevrange(self, stream, count=None):
+        return []
+
+    async def xread(self, streams, count=None, block=None):
+        self.reads += 1
+        try:
+            stream, data = await asyncio.wait_for(self.events.get(), block / 1000)
+        except asyncio.TimeoutError:
+            return []
+        return [[stream.encode(), [(b"1-0", {b"data": json.dumps(data).encode()})]]]
+
+
+def _make_processor(tmpdir, redis_client=None, progress=None):
+    from agents.src.agents.archiviste.batch_processor import BatchFilters, BatchProcessor
+
+    return BatchProcessor(
+        batch_id="test",
+        folder_path=tmpdir,
+        filters=BatchFilters(),
+        progress_tracker=progress,
+        redis_client=redis_client,
+    )
+
+
 @pytest.mark.asyncio
-async def test_process_single_file_success():
+async def test_process_single_file_success(tmp_path):
     """
-    Test traitement fichier réussi
+    Test traitement fichier réussi : complétion via l'événement document.processed
 
     AC2: pipeline Archiviste complet
     """
-    from agents.src.agents.archiviste.batch_processor import BatchFilters, BatchProcessor
-
-    # Mock dependencies
+    redis_client = FakeStreams()
     mock_db = MagicMock()
-    mock_db.fetchrow = AsyncMock(
-        return_value={"status": "completed", "final_path": "/path", "category": "finance"}
-    )
-    mock_redis = MagicMock()
+    mock_db.fetchrow = AsyncMock()
+
+    async def publish(**kwargs):
+        await redis_client.events.put(
+            (
+                "document.processed",
+                {
+                    "file_path": kwargs["file_path"],
+                    "filename": kwargs["filename"],
+                    "metadata": {"doc_type": "Facture"},
+                },
+            )
+        )
 
     with patch(
         "agents.src.agents.archiviste.batch_processor.upload_file_to_vps",
@@ -280,46 +395,137 @@ async def test_process_single_file_success():
     ) as mock_upload:
         with patch(
             "agents.src.agents.archiviste.batch_processor.publish_document_received",
-            new_callable=AsyncMock,
+            new=AsyncMock(side_effect=publish),
         ) as mock_publish:
-            # Processor
-            import tempfile
-
-            with tempfile.TemporaryDirectory() as tmpdir:
-                test_file = Path(tmpdir) / "test.pdf"
-                test_file.write_text("test")
-
-                filters = BatchFilters()
-                processor = BatchProcessor(
-                    batch_id="test",
-                    folder_path=tmpdir,
-                    filters=filters,
-                    progress_tracker=None,
-                )
-                processor.db = mock_db
-                processor.redis = mock_redis
+            test_file = tmp_path / "test.pdf"
+            test_file.write_text("test")
+
+            processor = _make_processor(str(tmp_path), redis_client)
+            processor.db = mock_db
+
+            await processor.process_single_file(test_file)
+
+            assert mock_upload.called
+            assert mock_publish.called
+            # Plus de polling PostgreSQL
+            assert not mock_db.fetchrow.called
+            assert not processor._completions.running
 
-                # Process
+
+@pytest.mark.asyncio
+async def test_process_single_file_pipeline_error(tmp_path):
+    """
+    Test événement pipeline.error pour le fichier → échec immédiat
+
+    AC6: error handling
+    """
+    redis_client = FakeStreams()
+
+    async def publish(**kwargs):
+        await redis_client.events.put(
+            (
+                "pipeline.error",
+                {
+                    "filename": kwargs["filename"],
+                    "file_path": kwargs["file_path"],
+                    "error_type": "timeout",
+                    "message": "45s",
+                },
+            )
+        )
+
+    with patch(
+        "agents.src.agents.archiviste.batch_processor.upload_file_to_vps",
+        new_callable=AsyncMock,
+    ):
+        with patch(
+            "agents.src.agents.archiviste.batch_processor.publish_document_received",
+            new=AsyncMock(side_effect=publish),
+        ):
+            test_file = tmp_path / "test.pdf"
+            test_file.write_text("test")
+
+            processor = _make_processor(str(tmp_path), redis_client)
+
+            with pytest.raises(RuntimeError, match="Pipeline error"):
                 await processor.process_single_file(test_file)
 
-                # Assert upload and publish called
-                assert mock_upload.called
-                assert mock_publish.called
+
+@pytest.mark.asyncio
+async def test_process_single_file_same_name_in_flight(tmp_path):
+    """
+    Test deux fichiers de même nom (sous-dossiers différents) en parallèle :
+    chemins transit distincts, chaque événement résout son propre fichier
+
+    AC2: pipeline Archiviste complet
+    """
+    redis_client = FakeStreams()
+    published = []
+
+    async def publish(**kwargs):
+        published.append(kwargs)
+        if len(published) < 2:
+            return
+        # Erreur pour le premier, succès pour le second (même filename)
+        first, second = published
+        await redis_client.events.put(
+            (
+                "pipeline.error",
+                {
+                    "filename": first["filename"],
+                    "file_path": first["file_path"],
+                    "error_type": "ocr",
+                    "message": "scan illisible",
+                },
+            )
+        )
+        await redis_client.events.put(
+            (
+                "document.processed",
+                {"filename": second["filename"], "file_path": second["file_path"]},
+            )
+        )
+
+    first_file = tmp_path / "a" / "facture.pdf"
+    second_file = tmp_path / "b" / "facture.pdf"
+    for file_path in (first_file, second_file):
+        file_path.parent.mkdir()
+        file_path.write_text(str(file_path))
+
+    with patch(
+        "agents.src.agents.archiviste.batch_processor.upload_file_to_vps",
+        new_callable=AsyncMock,
+    ) as mock_upload:
+        with patch(
+            "agents.src.agents.archiviste.batch_processor.publish_document_received",
+            new=AsyncMock(side_effect=publish),
+        ):
+            processor = _make_processor(str(tmp_path), redis_client)
+            await processor._start_completions()
+            try:
+                results = await asyncio.gather(
+                    processor.process_single_file(first_file),
+                    processor.process_single_file(second_file),
+                    return_exceptions=True,
+                )
+            finally:
+                await processor._completions.stop()
+
+    transit_paths = [call.args[1] for call in mock_upload.call_args_list]
+    assert len(set(transit_paths)) == 2
+    assert all(path.endswith("_facture.pdf") for path in transit_paths)
+    assert isinstance(results[0], RuntimeError)
+    assert results[1] is None
 
 
 @pytest.mark.asyncio
-async def test_process_single_file_timeout():
+async def test_process_single_file_timeout(tmp_path):
     """
-    Test timeout après 5 min
+    Test timeout par fichier (aucun événement de complétion)
 
     AC6: timeout protection
     """
-    from agents.src.agents.archiviste.batch_processor import BatchFilters, BatchProcessor
-
-    # Mock dependencies (never returns completed)
-    mock_db = MagicMock()
-    mock_db.fetchrow = AsyncMock(return_value=None)  # Never completes
-    mock_redis = MagicMock()
+    redis_client = FakeStreams()
 
     with patch(
         "agents.src.agents.archiviste.batch_processor.upload_file_to_vps",
@@ -329,29 +535,55 @@ async def test_process_single_file_timeout():
             "agents.src.agents.archiviste.batch_processor.publish_document_received",
             new_callable=AsyncMock,
         ):
-            # Processor with short timeout
-            import tempfile
-
-            with tempfile.TemporaryDirectory() as tmpdir:
-                test_file = Path(tmpdir) / "test.pdf"
-                test_file.write_text("test")
-
-                filters = BatchFilters()
-                processor = BatchProcessor(
-                    batch_id="test",
-                    folder_path=tmpdir,
-                    filters=filters,
-                    progress_tracker=None,
-                )
-                processor.db = mock_db
-                processor.redis = mock_redis
+            test_file = tmp_path / "test.pdf"
+            test_file.write_text("test")
+
+            processor = _make_processor(str(tmp_path), redis_client)
+
+            # Override timeout for test
+            processor.processing_timeout = 1  # 1 second
+
+            # Process should timeout
+            with pytest.raises(TimeoutError):
+                await processor.process_single_file(test_file)
+
+
+@pytest.mark.asyncio
+async def test_process_keeps_max_in_flight_files(tmp_path):
+    """
+    Test fenêtre de traitement : max_in_flight fichiers simultanés, tous traités
+
+    AC2: débit proportionnel au nombre de workers OCR
+    """
+    files = []
+    for i in range(7):
+        file_path = tmp_path / f"file{i}.pdf"
+        file_path.write_text(f"test{i}")
+        files.append(file_path)
+
+    active = 0
+    peak = 0
+
+    async def fake_process_single_file(file_path):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+
+    processor = _make_processor(str(tmp_path), FakeStreams())
+    processor.max_in_flight = 3
+    processor.scan_folder_with_filters = MagicMock(return_value=files)
+    processor.rate_limiter = MagicMock()
+    processor.rate_limiter.wait = AsyncMock()
+    processor.generate_final_report = AsyncMock()
+    processor.process_single_file = fake_process_single_file
 
-                # Override timeout for test
-                processor.processing_timeout = 1  # 1 second
+    await processor.process()
 
-                # Process should timeout
-                with pytest.raises(TimeoutError):
-                    await processor.process_single_file(test_file)
+    assert peak == 3
+    assert active == 0
+    assert not processor._completions.running
 
 
 # ============================================================================
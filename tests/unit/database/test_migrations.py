@@ -105,12 +105,20 @@ class TestMigrationFilesExist:
         "040_knowledge_warranties",
         "041_warranty_nodes_edges",
         "042_dedup_jobs",
+        "043_embeddings_content_hash_cache",
+        "044_embeddings_source_chunk_unique",
+        "045_knowledge_graph_notify",
+        "046_knowledge_nodes_dedup_key",
+        "047_document_metadata_lexical_search",
+        "048_embeddings_partial_hnsw",
+        "049_embeddings_halfvec_hnsw",
+        "050_document_metadata_extraction_method",
     ]
 
     def test_migration_files_exist(self, migration_files: list[Path]) -> None:
-        """AC#1: 47 migrations disponibles."""
-        assert len(migration_files) == 47, (
-            f"Expected 47 migration files, found {len(migration_files)}: "
+        """AC#1: 55 migrations disponibles."""
+        assert len(migration_files) == 55, (
+            f"Expected 55 migration files, found {len(migration_files)}: "
             f"{[f.name for f in migration_files]}"
         )
 
@@ -199,8 +207,8 @@ class TestMigrationsTracking:
 
     def test_migrations_would_produce_tracking_records(self, migration_files: list[Path]) -> None:
         """Les 23 fichiers de migration produiraient 23 enregistrements dans schema_migrations."""
-        assert len(migration_files) == 47, (
-            f"Expected 47 migration files to produce 47 tracking records, "
+        assert len(migration_files) == 55, (
+            f"Expected 55 migration files to produce 55 tracking records, "
             f"found {len(migration_files)}"
         )
 
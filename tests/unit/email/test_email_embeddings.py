@@ -19,9 +19,12 @@ import os
 from unittest.mock import AsyncMock, patch
 
 import pytest
+from agents.src.adapters.embedding_cache import EmbeddingCache, compute_content_hash
 from agents.src.adapters.memorystore import PostgreSQLMemorystore
 from agents.src.agents.email.graph_populator import populate_email_graph
 
+EMAIL_NODE_ID = "7c9e6679-7425-40de-944b-e07fc1f90ae7"
+
 
 @pytest.mark.integration
 @pytest.mark.asyncio
@@ -38,9 +41,12 @@ async def test_email_creates_embedding_automatically():
     """
     # Mock memorystore
     mock_memorystore = AsyncMock(spec=PostgreSQLMemorystore)
-    mock_memorystore.create_node = AsyncMock(return_value="email_node_123")
-    mock_memorystore.get_or_create_node = AsyncMock(return_value="person_node_456")
-    mock_memorystore.create_edge = AsyncMock()
+    mock_memorystore.upsert_subgraph = AsyncMock(
+        return_value={
+            "nodes": {"email": EMAIL_NODE_ID, "sender": "person_node_456"},
+            "edges": [],
+        }
+    )
 
     # Mock vectorstore + anonymization
     with patch(
@@ -54,7 +60,10 @@ async def test_email_creates_embedding_automatically():
             mock_embed_response.embeddings = [[0.1] * 1024]
             mock_embed_response.anonymization_applied = True
             mock_vectorstore.embed = AsyncMock(return_value=mock_embed_response)
-            mock_vectorstore.store = AsyncMock()
+            mock_vectorstore.store_many = AsyncMock(return_value=1)
+            mock_vectorstore.get_embedding_cache = AsyncMock(return_value=EmbeddingCache())
+            mock_vectorstore.model = "voyage-4-large"
+            mock_vectorstore.dimensions = 1024
 
             mock_vectorstore_factory.return_value = mock_vectorstore
 
@@ -80,10 +89,10 @@ async def test_email_creates_embedding_automatically():
             email_node_id = await populate_email_graph(email_data, mock_memorystore)
 
             # Vérifications
-            assert email_node_id == "email_node_123"
+            assert email_node_id == EMAIL_NODE_ID
 
             # 1. Email node créé
-            mock_memorystore.create_node.assert_awaited_once()
+            mock_memorystore.upsert_subgraph.assert_awaited_once()
 
             # 2. Anonymisation appelée
             mock_anon.assert_awaited_once()
@@ -97,14 +106,15 @@ async def test_email_creates_embedding_automatically():
             assert len(texts_sent) == 1
             assert "Facture plombier" in texts_sent[0]
 
-            # 4. Embedding stocké
-            mock_vectorstore.store.assert_awaited_once()
-            store_call_args = mock_vectorstore.store.call_args
+            # 4. Embedding stocké (source = Email node, clé cache content_hash)
+            mock_vectorstore.store_many.assert_awaited_once()
+            (record,) = mock_vectorstore.store_many.call_args[0][0]
 
-            # node_id = email_node_id
-            assert store_call_args[1]["node_id"] == "email_node_123"
-            # embedding = 1024 dims
-            assert len(store_call_args[1]["embedding"]) == 1024
+            assert str(record.source_id) == EMAIL_NODE_ID
+            assert record.source_type == "email"
+            assert len(record.embedding) == 1024
+            assert record.content_hash == compute_content_hash(texts_sent[0])
+            assert record.model == "voyage-4-large"
 
 
 @pytest.mark.integration
@@ -116,9 +126,12 @@ async def test_email_embedding_anonymizes_pii():
     Selon AC1 Story 6.2 : AUCUNE PII ne doit être envoyée à Voyage AI.
     """
     mock_memorystore = AsyncMock(spec=PostgreSQLMemorystore)
-    mock_memorystore.create_node = AsyncMock(return_value="email_node_789")
-    mock_memorystore.get_or_create_node = AsyncMock(return_value="person_node_012")
-    mock_memorystore.create_edge = AsyncMock()
+    mock_memorystore.upsert_subgraph = AsyncMock(
+        return_value={
+            "nodes": {"email": "email_node_789", "sender": "person_node_012"},
+            "edges": [],
+        }
+    )
 
     # Mock vectorstore + anonymization
     with patch(
@@ -131,7 +144,10 @@ async def test_email_embedding_anonymizes_pii():
             mock_embed_response.embeddings = [[0.2] * 1024]
             mock_embed_response.anonymization_applied = True
             mock_vectorstore.embed = AsyncMock(return_value=mock_embed_response)
-            mock_vectorstore.store = AsyncMock()
+            mock_vectorstore.store_many = AsyncMock(return_value=1)
+            mock_vectorstore.get_embedding_cache = AsyncMock(return_value=EmbeddingCache())
+            mock_vectorstore.model = "voyage-4-large"
+            mock_vectorstore.dimensions = 1024
 
             mock_vectorstore_factory.return_value = mock_vectorstore
 
@@ -188,9 +204,12 @@ async def test_email_embedding_error_handling():
         - Job nightly retentera plus tard
     """
     mock_memorystore = AsyncMock(spec=PostgreSQLMemorystore)
-    mock_memorystore.create_node = AsyncMock(return_value="email_node_err")
-    mock_memorystore.get_or_create_node = AsyncMock(return_value="person_node_err")
-    mock_memorystore.create_edge = AsyncMock()
+    mock_memorystore.upsert_subgraph = AsyncMock(
+        return_value={
+            "nodes": {"email": "email_node_err", "sender": "person_node_err"},
+            "edges": [],
+        }
+    )
 
     # Mock vectorstore qui lève exception
     with patch(
@@ -213,7 +232,7 @@ async def test_email_embedding_error_handling():
 
         # Email node créé
         assert email_node_id == "email_node_err"
-        mock_memorystore.create_node.assert_awaited_once()
+        mock_memorystore.upsert_subgraph.assert_awaited_once()
 
         # Embedding non stocké (erreur gérée gracieusement)
         # Note: Alertes Telegram + receipt status="failed" implémentés dans Story 6.2 Subtask 2.3
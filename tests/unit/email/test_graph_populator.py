@@ -0,0 +1,102 @@
+"""
+Friday 2.0 - Tests unitaires graph_populator (population graphe Email)
+
+Coverage:
+    - Sous-graphe complet (Email, Persons, PJ, Entities) en un seul upsert_subgraph
+    - Aucun appel unitaire get_or_create_node / create_node / create_edge
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from agents.src.adapters.embedding_cache import EmbeddingCache
+from agents.src.adapters.memorystore import PostgreSQLMemorystore
+from agents.src.agents.email.graph_populator import populate_email_graph
+
+EMAIL_NODE_ID = str(uuid4())
+
+
+@pytest.fixture
+def mock_memorystore():
+    memorystore = AsyncMock(spec=PostgreSQLMemorystore)
+    memorystore.upsert_subgraph = AsyncMock(
+        return_value={"nodes": {"email": EMAIL_NODE_ID}, "edges": []}
+    )
+    return memorystore
+
+
+@pytest.fixture(autouse=True)
+def mock_embedding():
+    """Embedding Email hors sujet ici : vectorstore + anonymisation mockés."""
+    with (
+        patch("agents.src.agents.email.graph_populator.get_vectorstore_adapter") as factory,
+        patch("agents.src.agents.email.graph_populator.anonymize_text") as anonymize,
+    ):
+        vectorstore = AsyncMock()
+        vectorstore.embed = AsyncMock(return_value=MagicMock(embeddings=[[0.1] * 1024]))
+        vectorstore.get_embedding_cache = AsyncMock(return_value=EmbeddingCache())
+        vectorstore.model = "voyage-4-large"
+        vectorstore.dimensions = 1024
+        factory.return_value = vectorstore
+        anonymize.return_value = MagicMock(anonymized_text="texte", entities=[])
+        yield vectorstore
+
+
+@pytest.mark.asyncio
+async def test_populate_email_graph_single_subgraph_upsert(mock_memorystore, mock_embedding):
+    """Email + sender + recipients + PJ + entités = un seul upsert_subgraph."""
+    doc_id = str(uuid4())
+    email_data = {
+        "message_id": "<abc@example.com>",
+        "subject": "RE: Projet",
+        "sender": "john@example.com",
+        "recipients": ["alice@example.com", "bob@example.com"],
+        "body": "Bonjour, rendez-vous à Lyon.",
+        "date": "2026-02-11T14:30:00Z",
+    }
+    entities = [{"name": "Lyon", "type": "LOC", "confidence": 0.9, "context": "à Lyon"}]
+
+    with patch(
+        "agents.src.agents.email.graph_populator.extract_entities_ner",
+        AsyncMock(return_value=entities),
+    ):
+        email_node_id = await populate_email_graph(
+            email_data,
+            mock_memorystore,
+            attachments=[{"doc_id": doc_id, "filename": "a.pdf", "mime_type": "application/pdf"}],
+        )
+
+    assert email_node_id == EMAIL_NODE_ID
+    mock_memorystore.upsert_subgraph.assert_awaited_once()
+    mock_memorystore.create_node.assert_not_awaited()
+    mock_memorystore.get_or_create_node.assert_not_awaited()
+    mock_memorystore.create_edge.assert_not_awaited()
+
+    nodes, edges = mock_memorystore.upsert_subgraph.await_args.args
+    assert [n["type"] for n in nodes] == ["email", "person", "person", "person", "entity"]
+    assert nodes[1]["metadata"] == {"email": "john@example.com"}
+    assert nodes[4]["metadata"]["entity_type"] == "LOC"
+
+    relations = [(e["from"], e["to"], e["relation_type"]) for e in edges]
+    assert relations == [
+        ("email", "sender", "sent_by"),
+        ("email", "recipient:0", "received_by"),
+        ("email", "recipient:1", "received_by"),
+        (doc_id, "email", "attached_to"),
+        ("email", "entity:0", "mentions"),
+    ]
+
+    # Embedding stocké sur l'id renvoyé par l'upsert
+    (record,) = mock_embedding.store_many.await_args.args[0]
+    assert str(record.source_id) == EMAIL_NODE_ID
+    assert record.source_type == "email"
+
+
+@pytest.mark.asyncio
+async def test_populate_email_graph_missing_field(mock_memorystore):
+    """Champ requis manquant → ValueError avant toute écriture."""
+    with pytest.raises(ValueError, match="Missing required field"):
+        await populate_email_graph({"subject": "x"}, mock_memorystore)
+
+    mock_memorystore.upsert_subgraph.assert_not_awaited()
@@ -380,3 +380,125 @@ class TestProcessEmailEvent:
 
         # Vérifier PAS de XACK (message reste dans PEL)
         consumer.redis.xack.assert_not_called()
+
+
+class TestOrderedAcker:
+    """Tests XACK ordonné (mode concurrent)"""
+
+    @pytest.mark.asyncio
+    async def test_ack_waits_for_head_of_queue(self):
+        """Un événement terminé avant son prédécesseur n'est pas acquitté tout de suite"""
+        from services.email_processor.consumer import OrderedAcker
+
+        redis_mock = AsyncMock()
+        acker = OrderedAcker(redis_mock, stream="s", group="g")
+        for event_id in ("1-0", "2-0", "3-0"):
+            acker.register(event_id)
+
+        acker.request_ack("2-0")
+        assert await acker.complete("2-0") == 0
+        redis_mock.xack.assert_not_called()
+
+        acker.request_ack("1-0")
+        assert await acker.complete("1-0") == 2
+        redis_mock.xack.assert_called_once_with("s", "g", "1-0", "2-0")
+        assert acker.pending == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_event_does_not_block_queue(self):
+        """Événement terminé sans ACK (erreur) → reste en PEL mais libère la file"""
+        from services.email_processor.consumer import OrderedAcker
+
+        redis_mock = AsyncMock()
+        acker = OrderedAcker(redis_mock, stream="s", group="g")
+        acker.register("1-0")
+        acker.register("2-0")
+
+        await acker.complete("1-0")  # Pas de request_ack
+        acker.request_ack("2-0")
+        await acker.complete("2-0")
+
+        redis_mock.xack.assert_called_once_with("s", "g", "2-0")
+        assert acker.pending == 0
+
+
+class TestConcurrentMode:
+    """Tests mode multi-worker du consumer"""
+
+    @pytest.mark.asyncio
+    async def test_sequential_mode_acks_immediately(self):
+        """concurrency=1 → XACK direct (comportement historique)"""
+        consumer = EmailProcessorConsumer(concurrency=1)
+        consumer.redis = AsyncMock()
+
+        await consumer._ack("event-1")
+
+        consumer.redis.xack.assert_called_once_with("emails:received", "email-processor", "event-1")
+
+    @pytest.mark.asyncio
+    async def test_events_processed_in_parallel_with_ordered_ack(self):
+        """Événements traités en parallèle, XACK dans l'ordre du stream"""
+        from services.email_processor.consumer import OrderedAcker
+
+        consumer = EmailProcessorConsumer(concurrency=3)
+        consumer.redis = AsyncMock()
+        consumer._acker = OrderedAcker(consumer.redis)
+
+        running = 0
+        max_running = 0
+
+        async def fake_process(event_id, payload):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            # Le premier événement est le plus lent
+            await asyncio.sleep(0.05 if event_id == "1-0" else 0.01)
+            running -= 1
+            await consumer._ack(event_id)
+
+        with patch.object(consumer, "process_email_event", side_effect=fake_process):
+            for event_id in ("1-0", "2-0", "3-0"):
+                consumer._dispatch_event(event_id, {})
+            await consumer._drain_inflight()
+
+        assert max_running == 3
+        acked = [eid for call in consumer.redis.xack.call_args_list for eid in call.args[2:]]
+        assert acked == ["1-0", "2-0", "3-0"]
+        assert consumer._acker.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_drain_timeout_leaves_events_unacked(self):
+        """Drain expiré → tâches annulées sans XACK (restent en PEL)"""
+        from services.email_processor.consumer import OrderedAcker
+
+        consumer = EmailProcessorConsumer(concurrency=2, drain_timeout=0.01)
+        consumer.redis = AsyncMock()
+        consumer._acker = OrderedAcker(consumer.redis)
+
+        async def stuck_process(event_id, payload):
+            await asyncio.sleep(10)
+            await consumer._ack(event_id)
+
+        with patch.object(consumer, "process_email_event", side_effect=stuck_process):
+            consumer._dispatch_event("1-0", {})
+            await consumer._drain_inflight()
+
+        consumer.redis.xack.assert_not_called()
+        assert not consumer._inflight
+
+    @pytest.mark.asyncio
+    async def test_free_slots_bounded_by_concurrency(self):
+        """XREADGROUP ne lit que le nombre de slots libres"""
+        consumer = EmailProcessorConsumer(concurrency=2)
+        blocker = asyncio.Event()
+        task = asyncio.create_task(blocker.wait())
+        consumer._inflight.add(task)
+
+        assert await consumer._wait_for_free_slots(timeout=0.01) == 1
+
+        task2 = asyncio.create_task(blocker.wait())
+        consumer._inflight.add(task2)
+        assert await consumer._wait_for_free_slots(timeout=0.01) == 0
+
+        blocker.set()
+        await asyncio.gather(task, task2)
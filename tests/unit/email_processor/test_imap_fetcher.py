@@ -0,0 +1,109 @@
+"""
+Tests unitaires pour IMAP Fetcher - decouverte UIDs batchee
+
+Tests: parsing reponses IMAP, UID SEARCH borne par watermark, SMISMEMBER unique,
+watermark bloque sur echec, reset sur changement UIDVALIDITY, fallback FETCH seq-set.
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+repo_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(repo_root))
+
+from services.email_processor.imap_fetcher import (
+    IMAPAccountWatcher,
+    parse_fetch_uids,
+    parse_search_uids,
+    parse_uidvalidity,
+)
+
+
+@pytest.fixture
+def watcher():
+    """Watcher avec IMAP + Redis mockes"""
+    redis_client = AsyncMock()
+    redis_client.hgetall = AsyncMock(return_value={})
+    redis_client.smismember = AsyncMock(side_effect=lambda key, uids: [0] * len(uids))
+    w = IMAPAccountWatcher(
+        account_config={"account_id": "account_test", "use_idle": False},
+        redis_client=redis_client,
+    )
+    w._imap = MagicMock()
+    w._uidvalidity = 777
+    w._process_email = AsyncMock()
+    return w
+
+
+def test_parse_imap_responses():
+    """Parsing SELECT / SEARCH / FETCH (UID)"""
+    assert parse_uidvalidity([b"OK [UIDVALIDITY 1234] UIDs valid", b"3 EXISTS"]) == 1234
+    assert parse_uidvalidity([b"3 EXISTS"]) is None
+    assert parse_search_uids([b"12 15 18", b"SEARCH completed"]) == [12, 15, 18]
+    assert parse_search_uids([b"SEARCH completed"]) == []
+    assert parse_fetch_uids([b"1 FETCH (UID 120)", b"2 FETCH (UID 121)", b"FETCH completed"]) == [
+        120,
+        121,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_uid_search_bounded_by_watermark_single_dedup_call(watcher):
+    """UID SEARCH UNSEEN au-dela du watermark + 1 seul SMISMEMBER"""
+    watcher.redis.hgetall = AsyncMock(return_value={"uidvalidity": "777", "last_uid": "100"})
+    watcher._imap.uid_search = AsyncMock(return_value=("OK", [b"100 101 102", b"completed"]))
+
+    await watcher._fetch_new_emails()
+
+    watcher._imap.uid_search.assert_awaited_once_with("UNSEEN", "UID", "101:*")
+    watcher.redis.smismember.assert_awaited_once_with("seen_uids:account_test", ["101", "102"])
+    assert [c.args[0] for c in watcher._process_email.await_args_list] == ["101", "102"]
+    watcher.redis.hset.assert_awaited_with(
+        "imap_state:account_test", mapping={"last_uid": "102", "uidvalidity": "777"}
+    )
+
+
+@pytest.mark.asyncio
+async def test_watermark_stops_at_first_failure(watcher):
+    """Echec sur un UID → watermark bloque juste avant (retry au prochain passage)"""
+    watcher._imap.uid_search = AsyncMock(return_value=("OK", [b"5 6 7"]))
+    watcher.redis.smismember = AsyncMock(return_value=[1, 0, 0])
+    watcher._process_email = AsyncMock(side_effect=[Exception("boom"), None])
+
+    await watcher._fetch_new_emails()
+
+    assert watcher._last_uid == 5
+    # UID 7 traite avec succes → marque vu malgre le watermark bloque
+    watcher.redis.sadd.assert_awaited_once_with("seen_uids:account_test", "7")
+
+
+@pytest.mark.asyncio
+async def test_uidvalidity_change_resets_state(watcher):
+    """UIDVALIDITY different → seen_uids vide et watermark remis a 0"""
+    watcher.redis.hgetall = AsyncMock(return_value={"uidvalidity": "1", "last_uid": "900"})
+    watcher._imap.uid_search = AsyncMock(return_value=("OK", [b""]))
+
+    await watcher._fetch_new_emails()
+
+    watcher.redis.delete.assert_awaited_once_with("seen_uids:account_test")
+    watcher._imap.uid_search.assert_awaited_once_with("UNSEEN", "UID", "1:*")
+    assert watcher._last_uid == 0
+
+
+@pytest.mark.asyncio
+async def test_fallback_batched_fetch_when_uid_search_fails(watcher):
+    """UID SEARCH indisponible → SEARCH UNSEEN + 1 FETCH seq-set (UID)"""
+    watcher._imap.uid_search = AsyncMock(side_effect=Exception("not supported"))
+    watcher._imap.search = AsyncMock(return_value=("OK", [b"1 2 3"]))
+    watcher._imap.fetch = AsyncMock(
+        return_value=("OK", [b"1 FETCH (UID 10)", b"2 FETCH (UID 11)", b"3 FETCH (UID 12)"])
+    )
+
+    await watcher._fetch_new_emails()
+
+    watcher._imap.fetch.assert_awaited_once_with("1,2,3", "(UID)")
+    assert watcher._process_email.await_count == 3
+    assert watcher._last_uid == 12
@@ -0,0 +1,110 @@
+"""
+Tests unitaires pour scripts/benchmark_semantic_search.py (helpers purs).
+
+Tests:
+- recall@k contre la vérité terrain (k réduit si peu de lignes éligibles)
+- percentiles p50/p95
+- corpus/requêtes reproductibles (seed), vecteurs normalisés
+- parsing CLI (tailles, tiers inconnus rejetés)
+- chemin en échec reporté sans interrompre le run
+- schéma : migrations ignorées / patchs appliqués avant leur migration
+"""
+
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+from scripts import benchmark_semantic_search
+from scripts.benchmark_semantic_search import (
+    DIMENSIONS,
+    SCHEMA_PATCHES,
+    apply_schema,
+    make_queries,
+    parse_args,
+    percentile,
+    recall_at_k,
+    run_scenario,
+)
+
+
+def test_recall_at_k():
+    truth = [{"a", "b"}, {"c", "d"}]
+    assert recall_at_k([["a", "b"], ["c", "x"]], truth, top_k=2) == 0.75
+
+
+def test_recall_at_k_fewer_eligible_rows_than_k():
+    """Filtre très sélectif : 1 seule ligne éligible, la trouver = recall 1.0"""
+    assert recall_at_k([["a"]], [{"a"}], top_k=10) == 1.0
+    assert recall_at_k([[]], [set()], top_k=10) == 0.0
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 0.50) == 51.0
+    assert percentile(values, 0.95) == 96.0
+
+
+def test_queries_reproducible_and_normalized():
+    first = make_queries(seed=7, count=3)
+    assert first == make_queries(seed=7, count=3)
+    assert len(first[0]) == DIMENSIONS
+    assert np.linalg.norm(first[0]) == pytest.approx(1.0, abs=1e-5)
+
+
+def test_parse_args():
+    args = parse_args(["--sizes", "10000,100000", "--modes", "full,binary"])
+    assert args.sizes == [10000, 100000]
+    assert args.modes == ["full", "binary"]
+
+    with pytest.raises(SystemExit):
+        parse_args(["--modes", "pq"])
+
+
+@pytest.mark.asyncio
+async def test_run_scenario_reports_error():
+    """Chemin incompatible avec le schéma migré : erreur dans le rapport, pas d'exception"""
+
+    async def broken(q):
+        raise RuntimeError("column e.node_id does not exist")
+
+    report = await run_scenario(
+        {"name": "pgvector_store", "filtered": False, "run": broken}, [[0.0]], [set()], top_k=10
+    )
+
+    assert report == {
+        "method": "pgvector_store",
+        "filtered": False,
+        "error": "RuntimeError: column e.node_id does not exist",
+    }
+
+
+@pytest.mark.asyncio
+async def test_apply_schema_skips_and_patches(tmp_path, monkeypatch):
+    """036 ignorée, document_id ajouté avant la FK de 038, autres migrations appliquées"""
+    for name in ("030a_ocr_metadata", "036_events_support", "038_embeddings_document_fk"):
+        (tmp_path / f"{name}.sql").write_text("SELECT 1;")
+
+    calls = []
+    conn = AsyncMock()
+    conn.execute.side_effect = lambda sql: calls.append(("execute", sql))
+
+    async def apply_migration(conn, filepath, *args, **kwargs):
+        calls.append(("migration", filepath.stem))
+
+    migrations = benchmark_semantic_search.apply_migrations
+    monkeypatch.setattr(migrations, "MIGRATIONS_DIR", tmp_path)
+    monkeypatch.setattr(migrations, "ensure_migrations_table", AsyncMock())
+    monkeypatch.setattr(migrations, "apply_migration", apply_migration)
+    monkeypatch.setattr(benchmark_semantic_search.asyncpg, "connect", AsyncMock(return_value=conn))
+
+    await apply_schema("postgresql://bench")
+
+    assert calls == [
+        ("execute", "SET search_path = public, knowledge"),
+        ("migration", "030a_ocr_metadata"),
+        ("execute", SCHEMA_PATCHES["038_embeddings_document_fk"]),
+        ("migration", "038_embeddings_document_fk"),
+    ]
+    assert "document_id UUID UNIQUE" in SCHEMA_PATCHES["038_embeddings_document_fk"]
+    conn.close.assert_awaited_once()
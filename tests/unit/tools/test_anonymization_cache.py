@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour anonymization_cache.py
+
+Tests couvrant :
+- Clé HMAC (texte clair absent, dépend langue/entités/secret)
+- Aucun texte clair ni mapping stocké (mémoire, Redis)
+- LRU mémoire borné + TTL
+- LRU Redis borné (Redis en noeviction)
+- anonymize_text : texte répété → aucun appel Presidio, mapping reconstruit
+- Métriques hit/miss
+"""
+
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from agents.src.tools.anonymization_cache import REDIS_KEY_PREFIX, AnonymizationCache
+
+ENTITIES = ["PERSON", "EMAIL_ADDRESS"]
+
+
+class FakeRedis:
+    """Redis minimal (decode_responses=True) : GET/SET + ZSET d'index LRU"""
+
+    def __init__(self):
+        self.store = {}
+        self.zsets = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    async def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    async def zpopmin(self, key, count):
+        zset = self.zsets.get(key, {})
+        popped = sorted(zset.items(), key=lambda item: item[1])[:count]
+        for member, _ in popped:
+            del zset[member]
+        return popped
+
+
+def _entry(cache, text="Jean Dupont signe", anonymized="[PERSON_1] signe"):
+    return cache.set(
+        text,
+        "fr",
+        ENTITIES,
+        anonymized_text=anonymized,
+        entities_found=[
+            {
+                "entity_type": "PERSON",
+                "start": 0,
+                "end": 11,
+                "score": 0.85,
+                "analysis_explanation": {"textual_explanation": "Jean Dupont"},
+            }
+        ],
+        confidence_min=0.85,
+    )
+
+
+def test_key_is_hmac_of_content():
+    """Clé = HMAC : stable, sans clair, dépend de langue/entités/secret"""
+    cache = AnonymizationCache(key="secret")
+    key = cache.make_key("Jean Dupont", "fr", ENTITIES)
+
+    assert "Jean" not in key
+    assert key == cache.make_key("Jean Dupont", "fr", list(reversed(ENTITIES)))
+    assert key != cache.make_key("Jean Dupont", "en", ENTITIES)
+    assert key != cache.make_key("Jean Dupont", "fr", ["PERSON"])
+    assert key != AnonymizationCache(key="autre").make_key("Jean Dupont", "fr", ENTITIES)
+
+
+@pytest.mark.asyncio
+async def test_stores_only_anonymized_text_and_spans():
+    """Ni texte clair, ni explication Presidio dans l'entrée (mémoire + Redis)"""
+    redis_client = FakeRedis()
+    cache = AnonymizationCache(key="secret")
+    assert cache.attach_redis(redis_client)
+
+    await _entry(cache)
+
+    stored = json.dumps(list(redis_client.store.values())) + repr(cache._memory)
+    assert "Jean" not in stored
+    cached = await cache.get("Jean Dupont signe", "fr", ENTITIES)
+    assert cached["entities_found"] == [
+        {"entity_type": "PERSON", "start": 0, "end": 11, "score": 0.85}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_memory_lru_eviction_and_ttl():
+    """LRU mémoire borné, entrée expirée = miss"""
+    cache = AnonymizationCache(key="secret", max_entries=2, ttl_seconds=60)
+
+    await _entry(cache, text="a")
+    await _entry(cache, text="b")
+    assert await cache.get("a", "fr", ENTITIES) is not None  # a devient le plus récent
+    await _entry(cache, text="c")  # évince b
+
+    assert await cache.get("b", "fr", ENTITIES) is None
+    assert await cache.get("a", "fr", ENTITIES) is not None
+    assert cache.evictions == 1
+
+    key = cache.make_key("c", "fr", ENTITIES)
+    stored_at, entry = cache._memory[key]
+    cache._memory[key] = (stored_at - 120, entry)
+    assert await cache.get("c", "fr", ENTITIES) is None
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_shared_and_bounded():
+    """Niveau Redis : hit inter-process, éviction des entrées les plus anciennes"""
+    redis_client = FakeRedis()
+    writer = AnonymizationCache(key="secret", redis_max_entries=2)
+    writer.attach_redis(redis_client)
+    for text in ("a", "b", "c"):
+        await _entry(writer, text=text)
+        time.sleep(0.001)
+
+    assert len([k for k in redis_client.store if k.startswith(REDIS_KEY_PREFIX)]) == 2
+
+    reader = AnonymizationCache(key="secret")
+    reader.attach_redis(redis_client)
+    assert await reader.get("c", "fr", ENTITIES) is not None
+    assert await reader.get("a", "fr", ENTITIES) is None
+    assert reader.get_stats()["hits_redis"] == 1
+
+
+def test_redis_tier_refused_without_shared_key():
+    """Sans ANONYMIZATION_CACHE_KEY : clé par process, pas de niveau Redis"""
+    cache = AnonymizationCache(key=None)
+    assert cache.attach_redis(FakeRedis()) is False
+    assert cache.get_stats()["redis_enabled"] is False
+
+
+@pytest.mark.asyncio
+async def test_anonymize_text_skips_presidio_on_repeat():
+    """Texte répété → aucun appel Presidio, mapping recalculé depuis le clair"""
+    from agents.src.tools.anonymize import anonymize_text
+
+    cache = AnonymizationCache(key="secret")
+    analyze = MagicMock()
+    analyze.json = MagicMock(
+        return_value=[{"entity_type": "PERSON", "start": 0, "end": 4, "score": 0.9}]
+    )
+    anonymized = MagicMock()
+    anonymized.json = MagicMock(return_value={"text": "[PERSON_1] habite Paris."})
+    client = AsyncMock()
+    client.post = AsyncMock(side_effect=[analyze, anonymized])
+
+    with (
+        patch("agents.src.tools.anonymize.anonymization_cache", cache),
+        patch("agents.src.tools.anonymize._get_http_client", return_value=client),
+    ):
+        first = await anonymize_text("Jean habite Paris.")
+        second = await anonymize_text("Jean habite Paris.")
+
+    assert client.post.await_count == 2  # analyze + anonymize, une seule fois
+    assert second.anonymized_text == first.anonymized_text
+    assert second.mapping == {"[PERSON_1]": "Jean"}
+    assert cache.get_stats() == {
+        "enabled": True,
+        "redis_enabled": False,
+        "memory_entries": 1,
+        "hits_memory": 1,
+        "hits_redis": 0,
+        "misses": 1,
+        "evictions": 0,
+        "hit_rate": 0.5,
+    }
@@ -30,6 +30,16 @@ from agents.src.tools.anonymize import (
 from config.exceptions import PipelineError
 
 
+@pytest.fixture(autouse=True)
+def _clear_anonymization_cache():
+    """Chaque test part d'un cache anonymisation vide"""
+    from agents.src.tools.anonymization_cache import anonymization_cache
+
+    anonymization_cache.clear()
+    yield
+    anonymization_cache.clear()
+
+
 class TestFrenchEntitiesConfiguration:
     """Tests configuration entités françaises (Bug B1)"""
 
@@ -257,19 +267,188 @@ class TestDeanonymizeText:
         assert result == "Jean appelle Jean demain."
 
 
+@pytest.mark.asyncio
 class TestHttpClientReuse:
     """Tests réutilisation httpx.AsyncClient (Bug B6)"""
 
-    def test_http_client_should_be_module_level_or_injected(self):
-        """
-        B6: httpx.AsyncClient devrait être réutilisable (pas recréé à chaque appel)
+    async def test_http_client_is_shared_across_calls(self):
+        """B6: un seul client keep-alive réutilisé, recréé après fermeture"""
+        from agents.src.tools.anonymize import _get_http_client, close_http_client
 
-        NOTE: Ce test documente l'intention, mais la correction complète nécessiterait
-        un refactoring plus large (injection de dépendance ou client module-level).
-        Pour Story 1.5, on accepte la création par appel mais on documente l'amélioration future.
-        """
-        # Ce test est documentaire - skip pour l'instant
-        pytest.skip("B6 - Optimisation future: réutiliser AsyncClient (non bloquant Story 1.5)")
+        await close_http_client()
+        client = _get_http_client()
+        assert _get_http_client() is client
+
+        await close_http_client()
+        assert client.is_closed
+        new_client = _get_http_client()
+        assert new_client is not client
+        await close_http_client()
+
+    @patch("agents.src.tools.anonymize._get_http_client")
+    async def test_anonymize_text_does_not_close_shared_client(self, mock_get_client):
+        """B6: anonymize_text ne ferme plus le client après chaque requête"""
+        mock_client = AsyncMock()
+        mock_get_client.return_value = mock_client
+        mock_response = MagicMock()
+        mock_response.json = MagicMock(return_value=[])
+        mock_client.post = AsyncMock(return_value=mock_response)
+
+        await anonymize_text("Bonjour")
+
+        mock_client.aclose.assert_not_called()
+
+
+def _json_response(payload, status_code=200):
+    """Réponse httpx mockée (status + json)"""
+    response = MagicMock()
+    response.status_code = status_code
+    response.raise_for_status = MagicMock()
+    response.json = MagicMock(return_value=payload)
+    return response
+
+
+@pytest.mark.asyncio
+class TestAnonymizeMany:
+    """Tests anonymize_many (from/subject/body, chunks document)"""
+
+    @pytest.fixture(autouse=True)
+    def _reset_batch_support(self):
+        with patch("agents.src.tools.anonymize._batch_analyze_supported", True):
+            yield
+
+    @patch("agents.src.tools.anonymize._get_http_client")
+    async def test_single_batch_analyze_request(self, mock_get_client):
+        """Une seule requête /analyze/batch, anonymizer seulement si entités"""
+        from agents.src.tools.anonymize import anonymize_many
+
+        mock_client = AsyncMock()
+        mock_get_client.return_value = mock_client
+        mock_client.post = AsyncMock(
+            side_effect=[
+                _json_response(
+                    [
+                        [{"entity_type": "PERSON", "start": 0, "end": 4, "score": 0.9}],
+                        [],
+                        [],
+                    ]
+                ),
+                _json_response({"text": "[PERSON_1] <jean@example.com>"}),
+            ]
+        )
+
+        results = await anonymize_many(["Jean <jean@example.com>", "Facture", "Bonjour", ""])
+
+        urls = [c.args[0] for c in mock_client.post.await_args_list]
+        assert urls[0].endswith("/analyze/batch")
+        assert mock_client.post.await_args_list[0].kwargs["json"]["texts"] == [
+            "Jean <jean@example.com>",
+            "Facture",
+            "Bonjour",
+        ]
+        assert urls[1].endswith("/anonymize")
+        assert len(urls) == 2
+        assert [r.anonymized_text for r in results] == [
+            "[PERSON_1] <jean@example.com>",
+            "Facture",
+            "Bonjour",
+            "",
+        ]
+        assert results[0].mapping == {"[PERSON_1]": "Jean"}
+
+    @patch("agents.src.tools.anonymize._get_http_client")
+    async def test_falls_back_when_batch_endpoint_missing(self, mock_get_client):
+        """Analyzer standard (404 sur /analyze/batch) → repli /analyze par texte"""
+        from agents.src.tools import anonymize as anonymize_module
+
+        mock_client = AsyncMock()
+        mock_get_client.return_value = mock_client
+        mock_client.post = AsyncMock(return_value=_json_response({}, status_code=404))
+        mock_fallback = AsyncMock(
+            side_effect=lambda text, **kwargs: AnonymizationResult(
+                anonymized_text=text, confidence_min=1.0
+            )
+        )
+
+        with patch("agents.src.tools.anonymize._anonymize_uncached", mock_fallback):
+            results = await anonymize_module.anonymize_many(["a", "b"])
+
+        assert [r.anonymized_text for r in results] == ["a", "b"]
+        assert mock_fallback.await_count == 2
+        assert anonymize_module._batch_analyze_supported is False
+
+    @patch("agents.src.tools.anonymize._get_http_client")
+    async def test_batch_analyzer_unavailable_raises(self, mock_get_client):
+        """Fail-explicit: analyzer injoignable → AnonymizationError"""
+        from agents.src.tools.anonymize import anonymize_many
+
+        mock_client = AsyncMock()
+        mock_get_client.return_value = mock_client
+        mock_client.post.side_effect = httpx.ConnectError("Connection refused")
+
+        with pytest.raises(AnonymizationError, match="Presidio unavailable"):
+            await anonymize_many(["Jean Dupont", "Marie"])
+
+    @patch("agents.src.tools.anonymize.PRESIDIO_BATCH_ANALYZE", False)
+    async def test_results_keep_input_order_and_bounded_concurrency(self):
+        """Repli par texte : ordre conservé, jamais plus de max_concurrency en vol"""
+        import asyncio
+
+        from agents.src.tools.anonymize import anonymize_many
+
+        in_flight = 0
+        peak = 0
+
+        async def fake_anonymize(text, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return AnonymizationResult(anonymized_text=f"anon:{text}", confidence_min=1.0)
+
+        texts = [f"chunk {i}" for i in range(6)]
+        with patch("agents.src.tools.anonymize._anonymize_uncached", side_effect=fake_anonymize):
+            results = await anonymize_many(texts, max_concurrency=2)
+
+        assert [r.anonymized_text for r in results] == [f"anon:{t}" for t in texts]
+        assert peak == 2
+
+    @patch("agents.src.tools.anonymize.PRESIDIO_BATCH_ANALYZE", False)
+    async def test_duplicate_texts_call_presidio_once(self):
+        """Textes identiques → un seul appel Presidio"""
+        from agents.src.tools.anonymize import anonymize_many
+
+        mock_anonymize = AsyncMock(
+            side_effect=lambda text, **kwargs: AnonymizationResult(
+                anonymized_text=text.upper(), confidence_min=1.0
+            )
+        )
+        with patch("agents.src.tools.anonymize._anonymize_uncached", mock_anonymize):
+            results = await anonymize_many(["a", "b", "a"])
+
+        assert [r.anonymized_text for r in results] == ["A", "B", "A"]
+        assert mock_anonymize.await_count == 2
+
+    @patch("agents.src.tools.anonymize.PRESIDIO_BATCH_ANALYZE", False)
+    async def test_any_failure_raises(self):
+        """Fail-explicit: un texte en échec → AnonymizationError (pas de résultat partiel)"""
+        from agents.src.tools.anonymize import anonymize_many
+
+        async def fake_anonymize(text, **kwargs):
+            if text == "boom":
+                raise AnonymizationError("Presidio unavailable")
+            return AnonymizationResult(anonymized_text=text, confidence_min=1.0)
+
+        with patch("agents.src.tools.anonymize._anonymize_uncached", side_effect=fake_anonymize):
+            with pytest.raises(AnonymizationError):
+                await anonymize_many(["ok", "boom"])
+
+    async def test_empty_input(self):
+        """Liste vide → liste vide"""
+        from agents.src.tools.anonymize import anonymize_many
+
+        assert await anonymize_many([]) == []
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour query_embedding_cache.py
+
+Tests couvrant :
+- Clé dépendante du modèle / des dimensions, requête normalisée
+- LRU mémoire borné + TTL
+- Niveau Redis partagé (float32 base64, bytes ou str) + LRU borné
+- Redis indisponible → miss silencieux
+- Métriques hit/miss
+"""
+
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from agents.src.tools.query_embedding_cache import (
+    REDIS_KEY_PREFIX,
+    REDIS_LRU_INDEX,
+    QueryEmbeddingCache,
+)
+
+MODEL = "voyage-4-large"
+VECTOR = [0.25, -0.5, 1.0]
+
+
+class FakeRedis:
+    """Redis minimal : GET/SET + ZSET d'index LRU"""
+
+    def __init__(self, as_bytes: bool = False):
+        self.as_bytes = as_bytes
+        self.store = {}
+        self.zsets = {}
+
+    async def get(self, key):
+        value = self.store.get(key)
+        if value is not None and self.as_bytes:
+            return value.encode("ascii")
+        return value
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    async def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    async def zpopmin(self, key, count):
+        zset = self.zsets.get(key, {})
+        popped = sorted(zset.items(), key=lambda item: item[1])[:count]
+        for member, _ in popped:
+            del zset[member]
+        return popped
+
+
+def test_key_depends_on_model_and_dimensions():
+    """Changement de modèle/dimensions = autre clé ; espaces normalisés, casse conservée."""
+    cache = QueryEmbeddingCache()
+    key = cache.make_key("facture  [PERSON_1]", MODEL, 3)
+
+    assert key == cache.make_key(" facture [PERSON_1] ", MODEL, 3)
+    assert key != cache.make_key("Facture [PERSON_1]", MODEL, 3)
+    assert key != cache.make_key("facture [PERSON_1]", "voyage-3.5", 3)
+    assert key != cache.make_key("facture [PERSON_1]", MODEL, 1024)
+
+
+@pytest.mark.asyncio
+async def test_memory_hit_and_stats():
+    cache = QueryEmbeddingCache(max_entries=10)
+
+    assert await cache.get("facture edf", MODEL, 3) is None
+    await cache.set("facture edf", MODEL, 3, VECTOR)
+    assert await cache.get("facture edf", MODEL, 3) == VECTOR
+
+    stats = cache.get_stats()
+    assert stats["hits_memory"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_memory_lru_bounded_and_ttl():
+    cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=60)
+    for query in ("a", "b", "c"):
+        await cache.set(query, MODEL, 3, VECTOR)
+
+    assert await cache.get("a", MODEL, 3) is None
+    assert cache.get_stats()["evictions"] == 1
+
+    expired = time.monotonic() + 61
+    with patch("agents.src.tools.query_embedding_cache.time.monotonic", return_value=expired):
+        assert await cache.get("c", MODEL, 3) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("as_bytes", [False, True])
+async def test_redis_tier_shared_between_processes(as_bytes):
+    """Vecteur écrit par un process (bot) relu par un autre (gateway)."""
+    redis = FakeRedis(as_bytes=as_bytes)
+    writer, reader = QueryEmbeddingCache(), QueryEmbeddingCache()
+    writer.attach_redis(redis)
+    reader.attach_redis(redis)
+
+    await writer.set("facture edf", MODEL, 3, VECTOR)
+
+    assert await reader.get("facture edf", MODEL, 3) == VECTOR
+    assert reader.get_stats()["hits_redis"] == 1
+    # Pas de texte de requête dans Redis
+    assert all("facture" not in key for key in redis.store)
+
+
+@pytest.mark.asyncio
+async def test_redis_lru_bounded():
+    redis = FakeRedis()
+    cache = QueryEmbeddingCache(redis_max_entries=2)
+    cache.attach_redis(redis)
+
+    for query in ("a", "b", "c"):
+        await cache.set(query, MODEL, 3, VECTOR)
+
+    assert len(redis.zsets[REDIS_LRU_INDEX]) == 2
+    assert f"{REDIS_KEY_PREFIX}:{cache.make_key('a', MODEL, 3)}" not in redis.store
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_is_a_miss():
+    redis = AsyncMock()
+    redis.get.side_effect = ConnectionError("redis down")
+    redis.set.side_effect = ConnectionError("redis down")
+    cache = QueryEmbeddingCache(max_entries=0)
+    cache.attach_redis(redis)
+
+    await cache.set("facture edf", MODEL, 3, VECTOR)
+    assert await cache.get("facture edf", MODEL, 3) is None
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache():
+    cache = QueryEmbeddingCache(enabled=False)
+    await cache.set("facture edf", MODEL, 3, VECTOR)
+
+    assert await cache.get("facture edf", MODEL, 3) is None
+    assert cache.get_stats()["misses"] == 0
@@ -149,3 +149,23 @@ def test_sliding_window_overflow(metrics):
     assert metrics.total_queries == 7
     # Les 2 premieres (0, 100) ont ete evictees
     assert list(metrics.latencies) == [200.0, 300.0, 400.0, 500.0, 600.0]
+
+
+# ============================================================
+# Tests: embedding cache hit rate
+# ============================================================
+
+
+def test_embedding_cache_hit_rate(metrics):
+    """Hit rate cache embeddings query ; None (fast path lexical) non compté."""
+    assert metrics.get_stats()["embedding_cache_hit_rate"] is None
+
+    for hit in (True, True, False, None):
+        metrics.record_query(
+            query_duration_ms=10.0, results_count=1, top_score=0.5, embedding_cache_hit=hit
+        )
+
+    stats = metrics.get_stats()
+    assert stats["embedding_cache_hits"] == 2
+    assert stats["embedding_cache_misses"] == 1
+    assert stats["embedding_cache_hit_rate"] == 0.667